@@ -1,16 +1,22 @@
 import asyncio
+import base64
 import contextlib
+import hashlib
+import json
 import os
+import time
 import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Awaitable, Callable, List
 
-import requests
+import httpx
 from fastapi import Cookie, FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 
 BASE_DIR = Path(__file__).resolve().parent
 PUBLIC_DIR = BASE_DIR / "public"
@@ -21,8 +27,76 @@ JWT_SERVER_URL = os.getenv("JWT_SERVER_URL", "http://localhost:8011").rstrip("/"
 JWT_COOKIE_NAME = os.getenv("JWT_COOKIE_NAME", "access_token")
 JWT_COOKIE_MAX_AGE = int(os.getenv("JWT_COOKIE_MAX_AGE", "3600"))
 JWT_COOKIE_SECURE = os.getenv("JWT_COOKIE_SECURE", "false").lower() in {"1", "true", "yes"}
+ORCHESTRATOR_TIMEOUT = float(os.getenv("ORCHESTRATOR_TIMEOUT", "30"))
+ORCHESTRATOR_STREAM_TIMEOUT = float(os.getenv("ORCHESTRATOR_STREAM_TIMEOUT", "300"))
+# 오케스트레이터로 동시에 보낼 수 있는 요청 수와 슬롯 대기 한도(초). 초과 시 503을 반환한다.
+ORCHESTRATOR_MAX_CONCURRENCY = int(os.getenv("ORCHESTRATOR_MAX_CONCURRENCY", "32"))
+ORCHESTRATOR_QUEUE_TIMEOUT = float(os.getenv("ORCHESTRATOR_QUEUE_TIMEOUT", "10"))
+JWT_SERVER_TIMEOUT = float(os.getenv("JWT_SERVER_TIMEOUT", "10"))
+# /users/me 결과를 토큰별로 캐시하는 시간(초). 토큰 만료 시각을 넘기지는 않는다.
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))
+PROFILE_CACHE_MAX = int(os.getenv("PROFILE_CACHE_MAX", "1024"))
+# 에이전트 실행기가 최종 응답/토큰 스트림에 사용하는 아티팩트 이름
+RESPONSE_ARTIFACT = "response"
+STREAM_ARTIFACT = "stream"
+
+_http_client: httpx.AsyncClient | None = None
+_orchestrator_slots = asyncio.Semaphore(ORCHESTRATOR_MAX_CONCURRENCY)
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """JWT 서버/오케스트레이터 호출이 공유하는 keep-alive AsyncClient."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(ORCHESTRATOR_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=ORCHESTRATOR_MAX_CONCURRENCY + 32,
+                max_keepalive_connections=32,
+            ),
+        )
+    return _http_client
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI):
+    yield
+    if _http_client is not None:
+        await _http_client.aclose()
+
+
+async def _acquire_orchestrator_slot() -> Callable[[], Awaitable[None]]:
+    """오케스트레이터 슬롯을 얻고 한 번만 반납되는 release 함수를 돌려준다. 대기 한도를 넘기면 503."""
+    try:
+        await asyncio.wait_for(_orchestrator_slots.acquire(), timeout=ORCHESTRATOR_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="요청이 많아 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(int(ORCHESTRATOR_QUEUE_TIMEOUT) or 1)},
+        ) from exc
+    released = False
+
+    async def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            _orchestrator_slots.release()
 
-app = FastAPI(title="Orchestrator Chat Client")
+    return release
+
+
+@asynccontextmanager
+async def _orchestrator_slot():
+    """오케스트레이터 동시 요청 수를 제한한다. 대기 한도를 넘기면 503."""
+    release = await _acquire_orchestrator_slot()
+    try:
+        yield
+    finally:
+        await release()
+
+
+app = FastAPI(title="Orchestrator Chat Client", lifespan=_lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -36,11 +110,14 @@ app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 class ChatRequest(BaseModel):
     message: str
+    # 이전 응답에서 받은 A2A contextId. 같은 값을 보내면 오케스트레이터가 대화 세션을 이어 쓴다.
+    context_id: str | None = None
 
 
 class ChatResponse(BaseModel):
     reply: str
     raw_response: dict
+    context_id: str | None = None
 
 
 class MetaResponse(BaseModel):
@@ -88,11 +165,13 @@ async def meta() -> MetaResponse:
     return MetaResponse(orchestrator_url=ORCHESTRATOR_RPC_URL)
 
 
-def _build_rpc_payload(user_message: str) -> dict:
-    return {
+def _build_rpc_payload(
+    user_message: str, method: str = "message/send", context_id: str | None = None
+) -> dict:
+    payload = {
         "id": str(uuid.uuid4()),
         "jsonrpc": "2.0",
-        "method": "message/send",
+        "method": method,
         "params": {
             "message": {
                 "message_id": str(uuid.uuid4()),
@@ -106,6 +185,9 @@ def _build_rpc_payload(user_message: str) -> dict:
             }
         },
     }
+    if context_id:
+        payload["params"]["message"]["context_id"] = context_id
+    return payload
 
 
 def _combine_parts(message_obj: dict) -> str:
@@ -134,6 +216,16 @@ def _extract_reply_from_result(result_obj: dict) -> str:
     if isinstance(latest, dict):
         candidates.append(latest)
 
+    # Task 응답: 최종 응답 아티팩트 → 완료 상태 메시지 순으로 확인
+    artifacts = result_obj.get("artifacts")
+    if isinstance(artifacts, list):
+        candidates.extend(
+            art for art in artifacts if isinstance(art, dict) and art.get("name") == RESPONSE_ARTIFACT
+        )
+    status = result_obj.get("status")
+    if isinstance(status, dict) and isinstance(status.get("message"), dict):
+        candidates.append(status["message"])
+
     messages = result_obj.get("messages")
     if isinstance(messages, list):
         candidates.extend(msg for msg in messages if isinstance(msg, dict))
@@ -153,16 +245,7 @@ def _normalize_tenants(candidate: object) -> List[str]:
     return []
 
 
-def _request_jwt_token(email: str, password: str) -> dict:
-    try:
-        response = requests.post(
-            f"{JWT_SERVER_URL}/token",
-            data={"username": email, "password": password},
-            timeout=10,
-        )
-    except requests.RequestException as exc:
-        raise HTTPException(status_code=502, detail=f"JWT 서버 요청 실패: {exc}") from exc
-
+def _raise_for_jwt_response(response: httpx.Response) -> dict:
     if response.status_code >= 400:
         detail = response.text
         with contextlib.suppress(ValueError):
@@ -175,38 +258,101 @@ def _request_jwt_token(email: str, password: str) -> dict:
         raise HTTPException(status_code=502, detail="JWT 서버 응답이 JSON이 아닙니다") from exc
 
 
-def _request_jwt_profile(token: str) -> dict:
+async def _request_jwt_token(email: str, password: str) -> dict:
+    try:
+        response = await _get_http_client().post(
+            f"{JWT_SERVER_URL}/token",
+            data={"username": email, "password": password},
+            timeout=JWT_SERVER_TIMEOUT,
+        )
+    except httpx.HTTPError as exc:
+        raise HTTPException(status_code=502, detail=f"JWT 서버 요청 실패: {exc}") from exc
+    return _raise_for_jwt_response(response)
+
+
+async def _request_jwt_profile(token: str) -> dict:
     headers = {"Authorization": f"Bearer {token}"}
     try:
-        response = requests.get(
+        response = await _get_http_client().get(
             f"{JWT_SERVER_URL}/users/me",
             headers=headers,
-            timeout=10,
+            timeout=JWT_SERVER_TIMEOUT,
         )
-    except requests.RequestException as exc:
+    except httpx.HTTPError as exc:
         raise HTTPException(status_code=502, detail=f"JWT 서버 요청 실패: {exc}") from exc
+    return _raise_for_jwt_response(response)
 
-    if response.status_code >= 400:
-        detail = response.text
-        with contextlib.suppress(ValueError):
-            detail = response.json()
-        raise HTTPException(status_code=response.status_code, detail=detail)
 
+def _token_expiry(token: str) -> float | None:
+    """서명 검증 없이 exp 클레임만 읽는다 (캐시 만료 상한 계산용)."""
     try:
-        return response.json()
-    except ValueError as exc:
-        raise HTTPException(status_code=502, detail="JWT 서버 응답이 JSON이 아닙니다") from exc
+        segment = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class _ProfileCache:
+    """토큰 해시 → /users/me 응답 캐시. 성공 응답만 저장하고 토큰 만료 후에는 쓰지 않는다."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, dict]] = {}
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            self._entries.pop(key, None)
+            return None
+        return entry[1]
+
+    def put(self, token: str, profile: dict) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        token_exp = _token_expiry(token)
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        if len(self._entries) >= self.max_entries:
+            now = time.time()
+            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            while len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[self._key(token)] = (expires_at, profile)
+
+    def invalidate(self, token: str) -> None:
+        self._entries.pop(self._key(token), None)
+
+
+_profile_cache = _ProfileCache(PROFILE_CACHE_TTL, PROFILE_CACHE_MAX)
+
+
+async def _get_jwt_profile(token: str) -> dict:
+    profile = _profile_cache.get(token)
+    if profile is None:
+        profile = await _request_jwt_profile(token)
+        _profile_cache.put(token, profile)
+    return profile
 
 
 @app.post("/api/login", response_model=LoginResponse)
-def login(body: LoginRequest, response: Response) -> LoginResponse:
-    token_payload = _request_jwt_token(body.email, body.password)
+async def login(body: LoginRequest, response: Response) -> LoginResponse:
+    token_payload = await _request_jwt_token(body.email, body.password)
     access_token = token_payload.get("access_token")
     token_type = token_payload.get("token_type", "bearer")
     if not access_token:
         raise HTTPException(status_code=502, detail="JWT 토큰을 발급받지 못했습니다")
 
-    user_payload = _request_jwt_profile(access_token)
+    user_payload = await _get_jwt_profile(access_token)
     email = user_payload.get("email")
     tenants = _normalize_tenants(user_payload.get("tenant"))
     if not email:
@@ -228,7 +374,10 @@ def login(body: LoginRequest, response: Response) -> LoginResponse:
 
 
 @app.post("/api/logout")
-def logout(response: Response) -> dict:
+def logout(response: Response, access_token: str | None = Cookie(default=None, alias=JWT_COOKIE_NAME)) -> dict:
+    token = _extract_token(access_token)
+    if token:
+        _profile_cache.invalidate(token)
     response.delete_cookie(
         key=JWT_COOKIE_NAME,
         path="/",
@@ -240,12 +389,12 @@ def logout(response: Response) -> dict:
 
 
 @app.get("/api/session", response_model=SessionResponse)
-def session_state(access_token: str | None = Cookie(default=None)) -> SessionResponse:
+async def session_state(access_token: str | None = Cookie(default=None)) -> SessionResponse:
     token = _extract_token(access_token)
     if not token:
         return SessionResponse(authenticated=False, user=None)
 
-    user_payload = _request_jwt_profile(token)
+    user_payload = await _get_jwt_profile(token)
     email = user_payload.get("email")
     tenants = _normalize_tenants(user_payload.get("tenant"))
     if not email:
@@ -256,14 +405,14 @@ def session_state(access_token: str | None = Cookie(default=None)) -> SessionRes
 
 async def _send_rpc(payload: dict, headers: dict | None = None) -> dict:
     try:
-        response = await asyncio.to_thread(
-            requests.post,
-            ORCHESTRATOR_RPC_URL,
-            json=payload,
-            headers=headers,
-            timeout=30,
-        )
-    except requests.RequestException as exc:  # pragma: no cover - runtime safety
+        async with _orchestrator_slot():
+            response = await _get_http_client().post(
+                ORCHESTRATOR_RPC_URL,
+                json=payload,
+                headers=headers,
+                timeout=ORCHESTRATOR_TIMEOUT,
+            )
+    except httpx.HTTPError as exc:  # pragma: no cover - runtime safety
         raise HTTPException(status_code=502, detail=f"오케스트레이터 요청 실패: {exc}") from exc
 
     if response.status_code >= 400:
@@ -297,13 +446,13 @@ def _bearer_header(raw_token: str) -> str:
     return token if token.lower().startswith("bearer ") else f"Bearer {token}"
 
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def send_message(
+async def _prepare_chat(
     body: ChatRequest,
-    authorization: str | None = Header(default=None),
-    x_user_email: str | None = Header(default=None, alias="X-User-Email"),
-    access_token: str | None = Cookie(default=None, alias=JWT_COOKIE_NAME),
-) -> ChatResponse:
+    authorization: str | None,
+    x_user_email: str | None,
+    access_token: str | None,
+    method: str,
+) -> tuple[dict, dict]:
     token = _extract_token(authorization) or _extract_token(access_token)
     if not token:
         raise HTTPException(status_code=401, detail="로그인 후 이용해 주세요.")
@@ -311,7 +460,7 @@ async def send_message(
     # 보조 헤더가 비어 있을 경우 토큰에서 사용자 이메일을 복구한다.
     if not x_user_email:
         with contextlib.suppress(HTTPException):
-            profile = _request_jwt_profile(token)
+            profile = await _get_jwt_profile(token)
             recovered_email = profile.get("email")
             if recovered_email:
                 x_user_email = str(recovered_email)
@@ -320,7 +469,7 @@ async def send_message(
     if not user_message:
         raise HTTPException(status_code=400, detail="메시지를 입력해 주세요.")
 
-    payload = _build_rpc_payload(user_message)
+    payload = _build_rpc_payload(user_message, method, body.context_id)
     auth_header = _bearer_header(authorization or token)
     # 메타데이터로도 토큰/사용자 정보를 전달하여 서버 측 플러그인이 초기 페치 단계에서 활용할 수 있다.
     payload["params"].setdefault("metadata", {})
@@ -330,13 +479,22 @@ async def send_message(
             "user_email": x_user_email or "",
         }
     )
-    rpc_result = await _send_rpc(
-        payload,
-        headers={
-            "Authorization": auth_header,
-            "X-User-Email": x_user_email or "",
-        },
-    )
+    headers = {
+        "Authorization": auth_header,
+        "X-User-Email": x_user_email or "",
+    }
+    return payload, headers
+
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def send_message(
+    body: ChatRequest,
+    authorization: str | None = Header(default=None),
+    x_user_email: str | None = Header(default=None, alias="X-User-Email"),
+    access_token: str | None = Cookie(default=None, alias=JWT_COOKIE_NAME),
+) -> ChatResponse:
+    payload, headers = await _prepare_chat(body, authorization, x_user_email, access_token, "message/send")
+    rpc_result = await _send_rpc(payload, headers=headers)
 
     result_obj = rpc_result.get("result") or rpc_result.get("root", {}).get("result")
     reply_text = _extract_reply_from_result(result_obj) if result_obj else ""
@@ -344,7 +502,112 @@ async def send_message(
     if not reply_text:
         reply_text = "오케스트레이터 응답을 해석하지 못했습니다."
 
-    return ChatResponse(reply=reply_text, raw_response=rpc_result)
+    context_id = result_obj.get("contextId") if isinstance(result_obj, dict) else None
+    return ChatResponse(reply=reply_text, raw_response=rpc_result, context_id=context_id)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _iter_rpc_stream(payload: dict, headers: dict) -> AsyncIterator[dict]:
+    """오케스트레이터 message/stream 응답(SSE)을 JSON-RPC 이벤트 단위로 읽는다 (슬롯은 호출자가 잡는다)."""
+    request_headers = {**headers, "Accept": "text/event-stream"}
+    timeout = httpx.Timeout(ORCHESTRATOR_STREAM_TIMEOUT, connect=5.0)
+    client = _get_http_client()
+    async with client.stream(
+        "POST", ORCHESTRATOR_RPC_URL, json=payload, headers=request_headers, timeout=timeout
+    ) as response:
+        if response.status_code >= 400:
+            detail = (await response.aread()).decode("utf-8", "replace")
+            raise HTTPException(
+                status_code=502,
+                detail=f"오케스트레이터 응답 오류({response.status_code}): {detail}",
+            )
+        data_lines: list[str] = []
+        async for line in response.aiter_lines():
+            if line.startswith("data:"):
+                data_lines.append(line[5:].lstrip())
+                continue
+            if line or not data_lines:
+                continue
+            raw = "\n".join(data_lines)
+            data_lines = []
+            with contextlib.suppress(ValueError):
+                yield json.loads(raw)
+
+
+async def _chat_event_stream(
+    payload: dict, headers: dict, release: Callable[[], Awaitable[None]]
+) -> AsyncIterator[str]:
+    reply = ""
+    context_id = None
+    try:
+        async for rpc_event in _iter_rpc_stream(payload, headers):
+            if rpc_event.get("error"):
+                yield _sse("error", {"detail": rpc_event["error"]})
+                return
+            result = rpc_event.get("result") or {}
+            context_id = result.get("contextId") or context_id
+            kind = result.get("kind")
+            if kind == "artifact-update":
+                artifact = result.get("artifact") or {}
+                name = artifact.get("name") or ""
+                if name == RESPONSE_ARTIFACT:
+                    reply = _combine_parts(artifact)
+                    continue
+                # 토큰 청크는 공백이 의미를 가지므로 strip 없이 그대로 이어 붙인다.
+                chunk = "".join(
+                    str(part.get("text") or "") for part in artifact.get("parts") or [] if isinstance(part, dict)
+                )
+                if not chunk:
+                    continue
+                if name == STREAM_ARTIFACT:
+                    yield _sse("delta", {"text": chunk})
+                else:
+                    source = (artifact.get("metadata") or {}).get("source_agent") or name
+                    yield _sse("progress", {"source": source, "text": chunk})
+            elif kind == "status-update":
+                status = result.get("status") or {}
+                message_text = _combine_parts(status.get("message") or {})
+                if result.get("final"):
+                    reply = reply or message_text
+                    yield _sse(
+                        "done",
+                        {"reply": reply or "응답 없음", "state": status.get("state"), "context_id": context_id},
+                    )
+                    return
+                if message_text:
+                    yield _sse("status", {"state": status.get("state"), "text": message_text})
+            elif kind == "message":
+                reply = _combine_parts(result)
+        yield _sse("done", {"reply": reply or "오케스트레이터 응답을 해석하지 못했습니다.", "context_id": context_id})
+    except HTTPException as exc:
+        yield _sse("error", {"detail": exc.detail})
+    except httpx.HTTPError as exc:  # pragma: no cover - runtime safety
+        yield _sse("error", {"detail": f"오케스트레이터 요청 실패: {exc}"})
+    finally:
+        await release()
+
+
+@app.post("/api/chat/stream")
+async def stream_message(
+    body: ChatRequest,
+    authorization: str | None = Header(default=None),
+    x_user_email: str | None = Header(default=None, alias="X-User-Email"),
+    access_token: str | None = Cookie(default=None, alias=JWT_COOKIE_NAME),
+) -> StreamingResponse:
+    """`/api/chat`의 SSE 버전: delta/status/progress 이벤트를 흘려보내고 done으로 끝난다."""
+    payload, headers = await _prepare_chat(body, authorization, x_user_email, access_token, "message/stream")
+    # 200 응답을 시작하기 전에 슬롯을 잡아야 대기 초과를 503 + Retry-After 로 돌려줄 수 있다.
+    release = await _acquire_orchestrator_slot()
+    return StreamingResponse(
+        _chat_event_stream(payload, headers, release),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # 스트림이 시작되기 전에 연결이 끊겨 제너레이터가 돌지 않은 경우에도 반납
+        background=BackgroundTask(release),
+    )
 
 
 if __name__ == "__main__":
@@ -96,6 +96,8 @@ if (page === "chat") {
   const userTenant = document.getElementById("user-tenant");
 
   let currentUser = null;
+  // 오케스트레이터 대화 ID (A2A contextId). 응답마다 갱신해 다음 요청에 다시 보낸다.
+  let conversationId = null;
 
   function addMessage(role, text) {
     if (!chatLog) return;
@@ -104,6 +106,42 @@ if (page === "chat") {
     div.textContent = text;
     chatLog.appendChild(div);
     chatLog.scrollTop = chatLog.scrollHeight;
+    return div;
+  }
+
+  function updateMessage(div, text) {
+    if (!div || !chatLog) return;
+    div.textContent = text;
+    chatLog.scrollTop = chatLog.scrollHeight;
+  }
+
+  // /api/chat/stream 의 SSE 응답을 (event, data) 단위로 읽는다.
+  async function* readEventStream(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let eventName = "message";
+        const dataLines = [];
+        for (const line of block.split("\n")) {
+          if (line.startsWith("event:")) eventName = line.slice(6).trim();
+          else if (line.startsWith("data:")) dataLines.push(line.slice(5).trimStart());
+        }
+        if (dataLines.length === 0) continue;
+        try {
+          yield { event: eventName, data: JSON.parse(dataLines.join("\n")) };
+        } catch (error) {
+          console.warn("SSE 파싱 실패", error);
+        }
+      }
+    }
   }
 
   function setChatEnabled(enabled) {
@@ -187,17 +225,18 @@ if (page === "chat") {
     setButtonLoading(sendButton, true, "전송", "전송 중...");
 
     try {
-      const response = await fetch("/api/chat", {
+      const response = await fetch("/api/chat/stream", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
+          Accept: "text/event-stream",
           ...(currentUser?.email ? { "X-User-Email": currentUser.email } : {}),
         },
-        body: JSON.stringify({ message: text }),
+        body: JSON.stringify({ message: text, context_id: conversationId }),
         credentials: "include",
       });
-      const data = await response.json();
       if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
         const detail = data?.detail || "오류가 발생했습니다.";
         addMessage("system", typeof detail === "string" ? detail : "오류가 발생했습니다.");
         showToast(typeof detail === "string" ? detail : "오류가 발생했습니다.", true);
@@ -206,7 +245,34 @@ if (page === "chat") {
         }
         return;
       }
-      addMessage("agent", data.reply || "응답 없음");
+
+      const agentMessage = addMessage("agent", "...");
+      let streamed = "";
+      let finished = false;
+      for await (const { event: name, data } of readEventStream(response)) {
+        if (name === "delta") {
+          streamed += data.text || "";
+          updateMessage(agentMessage, streamed);
+        } else if (name === "status" || name === "progress") {
+          if (!streamed) {
+            const prefix = data.source ? `[${data.source}] ` : "";
+            updateMessage(agentMessage, `${prefix}${data.text || ""}`);
+          }
+        } else if (name === "done") {
+          updateMessage(agentMessage, data.reply || streamed || "응답 없음");
+          conversationId = data.context_id || conversationId;
+          finished = true;
+        } else if (name === "error") {
+          const detail = typeof data.detail === "string" ? data.detail : "오류가 발생했습니다.";
+          updateMessage(agentMessage, streamed || detail);
+          addMessage("system", detail);
+          showToast(detail, true);
+          finished = true;
+        }
+      }
+      if (!finished) {
+        updateMessage(agentMessage, streamed || "응답 없음");
+      }
     } catch (error) {
       addMessage("system", `요청 실패: ${error.message}`);
       showToast(error.message, true);
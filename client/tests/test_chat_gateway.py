@@ -0,0 +1,109 @@
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import httpx
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from client import app as chat_app  # noqa: E402
+
+HEADERS = {"Authorization": "Bearer test-token", "X-User-Email": "user@example.com"}
+
+
+def _rpc_event(result: dict) -> str:
+    return f"data: {json.dumps({'jsonrpc': '2.0', 'id': '1', 'result': result})}\n\n"
+
+
+def _artifact(name: str, text: str | None, **extra) -> dict:
+    parts = [] if text is None else [{"kind": "text", "text": text}]
+    return {
+        "kind": "artifact-update", "taskId": "t1", "contextId": "ctx-1",
+        "artifact": {"artifactId": f"t1-{name}", "name": name, "parts": parts, **extra},
+    }
+
+
+def _status(state: str, text: str, final: bool = False) -> dict:
+    return {
+        "kind": "status-update", "taskId": "t1", "contextId": "ctx-1", "final": final,
+        "status": {"state": state, "message": {"role": "agent", "parts": [{"kind": "text", "text": text}]}},
+    }
+
+
+def _parse_sse(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class ChatGatewayTests(unittest.TestCase):
+    def _serve(self, handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        patch = mock.patch.object(chat_app, "_http_client", client)
+        patch.start()
+        self.addCleanup(patch.stop)
+        return TestClient(chat_app.app)
+
+    def test_stream_translates_task_updates_into_sse_events(self):
+        upstream = "".join(_rpc_event(r) for r in (
+            _status("working", "delivery_agent 호출 중"),
+            _artifact("stream", "안녕"),
+            _artifact("stream", " 하세요", append=True),
+            _artifact("stream", None, append=True, lastChunk=True),
+            _artifact("delivery_agent", "배송 조회 완료", metadata={"source_agent": "delivery_agent"}),
+            _artifact("response", "안녕 하세요"),
+            _status("completed", "안녕 하세요", final=True),
+        ))
+        seen = {}
+
+        def handler(request):
+            seen["method"] = json.loads(request.content)["method"]
+            seen["accept"] = request.headers["Accept"]
+            return httpx.Response(200, text=upstream, headers={"Content-Type": "text/event-stream"})
+
+        free_slots = chat_app._orchestrator_slots._value
+        with self._serve(handler) as client:
+            response = client.post("/api/chat/stream", json={"message": "안녕"}, headers=HEADERS)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        self.assertEqual((seen["method"], seen["accept"]), ("message/stream", "text/event-stream"))
+        self.assertEqual(_parse_sse(response.text), [
+            ("status", {"state": "working", "text": "delivery_agent 호출 중"}),
+            ("delta", {"text": "안녕"}),
+            ("delta", {"text": " 하세요"}),
+            ("progress", {"source": "delivery_agent", "text": "배송 조회 완료"}),
+            ("done", {"reply": "안녕 하세요", "state": "completed", "context_id": "ctx-1"}),
+        ])
+        self.assertEqual(chat_app._orchestrator_slots._value, free_slots)
+
+    def test_upstream_error_becomes_an_error_event(self):
+        with self._serve(lambda request: httpx.Response(500, text="boom")) as client:
+            response = client.post("/api/chat/stream", json={"message": "안녕"}, headers=HEADERS)
+        events = _parse_sse(response.text)
+        self.assertEqual([name for name, _ in events], ["error"])
+        self.assertIn("500", events[0][1]["detail"])
+
+    def test_exhausted_slots_return_503_with_retry_after(self):
+        def handler(request):  # pragma: no cover - 슬롯을 얻지 못하면 호출되지 않아야 한다
+            raise AssertionError("orchestrator must not be called")
+
+        with mock.patch.object(chat_app, "_orchestrator_slots", asyncio.Semaphore(0)), \
+                mock.patch.object(chat_app, "ORCHESTRATOR_QUEUE_TIMEOUT", 0.05), \
+                self._serve(handler) as client:
+            streamed = client.post("/api/chat/stream", json={"message": "안녕"}, headers=HEADERS)
+            plain = client.post("/api/chat", json={"message": "안녕"}, headers=HEADERS)
+
+        for response in (streamed, plain):
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers["Retry-After"], "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,10 @@ from .database import IAMDatabase, get_db  # Re-export lightweight DB helpers
 
 __all__ = [
     "PolicyEnforcementPlugin",
+    "ADKAgentExecutor",
+    "build_agent_app",
+    "serve_agent",
+    "SessionManager",
     "IAMDatabase",
     "get_db",
 ]
@@ -14,6 +18,18 @@ def __getattr__(name: str):  # pragma: no cover - module attribute hook
         from .policy_enforcement import PolicyEnforcementPlugin
 
         return PolicyEnforcementPlugin
+    if name == "ADKAgentExecutor":
+        from .agent_executor import ADKAgentExecutor
+
+        return ADKAgentExecutor
+    if name in {"build_agent_app", "serve_agent"}:
+        from . import agent_server
+
+        return getattr(agent_server, name)
+    if name == "SessionManager":
+        from .session_manager import SessionManager
+
+        return SessionManager
     if name in {"IAMDatabase", "get_db"}:
         return globals()[name]
     raise AttributeError(name)
@@ -0,0 +1,343 @@
+"""Shared A2A executor that runs an ADK agent behind the IAM policy plugin."""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import os
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+from uuid import uuid4
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import Part, TaskState, TextPart
+from a2a.utils import new_task
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.genai import types
+
+from .policy_enforcement import AUTH_TOKEN_STATE_KEY, GLOBAL_REQUEST_TOKEN
+from .session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+_DEFAULT_USER_ERROR = "요청을 처리하는 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+
+# (auth_token, RequestContext) -> 세션 초기 state에 병합할 dict ("temp:" 키는 이번 요청에만 적용)
+StateInitializer = Callable[[str, RequestContext], Awaitable[Dict[str, Any]]]
+
+# 최종 응답 아티팩트 이름. 스트리밍 델타는 STREAM_ARTIFACT 아티팩트에 append 된다.
+RESPONSE_ARTIFACT = "response"
+STREAM_ARTIFACT = "stream"
+
+
+class TaskStream:
+    """실행 중인 A2A 태스크로 중간 결과를 흘려보내는 헬퍼.
+
+    텍스트 델타는 아티팩트 청크(append)로 보내 태스크 history가 토큰 단위 메시지로
+    불어나지 않게 하고, 도구 호출 같은 진행 상황만 working 상태 메시지로 보낸다.
+    스트림 아티팩트는 ``close()`` 가 last_chunk=True 청크로 닫는다.
+    """
+
+    def __init__(self, updater: TaskUpdater) -> None:
+        self.updater = updater
+        # 열려 있는 스트림 아티팩트 ID -> 이름
+        self._started: dict[str, str] = {}
+
+    async def text(self, text: str, *, key: str = STREAM_ARTIFACT, metadata: Optional[dict] = None) -> None:
+        if not text:
+            return
+        artifact_id = f"{self.updater.task_id}-{key}"
+        append = artifact_id in self._started
+        self._started[artifact_id] = key
+        await self.updater.add_artifact(
+            [Part(root=TextPart(text=text))],
+            artifact_id=artifact_id,
+            name=key,
+            metadata=metadata,
+            append=append,
+            last_chunk=False,
+        )
+
+    async def close(self) -> None:
+        """열린 스트림 아티팩트마다 빈 마지막 청크를 보내 스트리밍 클라이언트에 끝을 알린다."""
+        started, self._started = self._started, {}
+        for artifact_id, key in started.items():
+            await self.updater.add_artifact(
+                [], artifact_id=artifact_id, name=key, append=True, last_chunk=True
+            )
+
+    async def status(self, text: str, *, metadata: Optional[dict] = None) -> None:
+        await self.updater.update_status(
+            TaskState.working,
+            message=self.updater.new_agent_message([Part(root=TextPart(text=text))], metadata=metadata),
+        )
+
+
+CURRENT_TASK_STREAM: ContextVar[Optional[TaskStream]] = ContextVar("current_task_stream", default=None)
+
+
+def current_task_stream() -> Optional[TaskStream]:
+    """도구 내부에서 현재 요청의 TaskStream을 얻는다 (없으면 None)."""
+    return CURRENT_TASK_STREAM.get()
+
+
+def _decode_jwt_payload(token: str) -> dict:
+    """JWT 토큰에서 payload를 디코딩합니다 (서명 검증 없이)."""
+    if not token:
+        return {}
+    try:
+        parts = token.split(".")
+        if len(parts) < 2:
+            return {}
+        # base64url 디코딩
+        padded = parts[1] + "=" * (4 - len(parts[1]) % 4)
+        decoded = base64.urlsafe_b64decode(padded)
+        return json.loads(decoded)
+    except Exception:
+        return {}
+
+
+def _extract_user_id_from_token(token: str) -> str:
+    """JWT 토큰에서 사용자 ID(이메일)를 추출합니다."""
+    payload = _decode_jwt_payload(token)
+    # sub 클레임에서 이메일 추출
+    user_id = payload.get("sub") or payload.get("email") or ""
+    return user_id if isinstance(user_id, str) else ""
+
+
+def _strip_bearer(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    value = str(value).strip()
+    if value.lower().startswith("bearer "):
+        return value[7:].strip()
+    return value
+
+
+class ADKAgentExecutor(AgentExecutor):
+    """ADK Runner를 A2A AgentExecutor 인터페이스로 감싼 공용 실행기.
+
+    모든 에이전트(오케스트레이터 포함)가 같은 구현을 사용하며, 에이전트별 차이는
+    생성자 인자(agent, app_name, plugins, state_initializer)로만 주입한다.
+    ``state_initializer``는 세션 생성 전에 호출되어 도구가 로컬에서 읽을 값
+    (예: 오케스트레이터의 에이전트 카드)을 초기 state에 미리 넣는다.
+
+    실행 결과는 A2A Task로 보고한다. ``streaming``이 켜져 있으면(기본값, 환경변수
+    AGENT_STREAMING) Runner를 SSE 모드로 돌려 LLM 토큰을 아티팩트 청크로 즉시 흘려보낸다.
+
+    ADK 세션은 ``SessionManager``가 (사용자, A2A context_id) 단위로 재사용하므로 같은
+    대화의 후속 메시지는 이전 턴의 히스토리를 이어 받는다.
+    """
+
+    def __init__(
+        self,
+        agent,
+        *,
+        app_name: str = "orchestrator_app",
+        user_id: Optional[str] = None,
+        plugins=None,
+        state_initializer: Optional[StateInitializer] = None,
+        streaming: Optional[bool] = None,
+        session_manager: Optional[SessionManager] = None,
+    ):
+        self.agent = agent
+        self.app_name = app_name
+        # user_id를 지정하지 않으면 요청 토큰의 sub 클레임을 사용한다.
+        self.user_id = user_id
+        self.plugins = plugins or []
+        self.state_initializer = state_initializer
+        if streaming is None:
+            streaming = os.getenv("AGENT_STREAMING", "true").lower() in {"1", "true", "yes"}
+        self.streaming = streaming
+        self.sessions = session_manager or SessionManager(app_name=self.app_name)
+        self.session_service = self.sessions.session_service
+        self.runner = Runner(
+            agent=self.agent,
+            app_name=self.app_name,
+            session_service=self.session_service,
+            plugins=self.plugins,
+        )
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        auth_token = self._resolve_auth_token(context)
+        user_id = self.user_id or _extract_user_id_from_token(auth_token)
+        # 사용자 ID가 없으면 익명으로 처리 (익명 요청은 대화 세션을 이어 쓰지 않는다)
+        conversation_id = context.context_id
+        if not user_id:
+            user_id = f"anonymous_{uuid4().hex[:8]}"
+            conversation_id = None
+
+        task = context.current_task
+        if task is None:
+            task = new_task(context.message)
+            await event_queue.enqueue_event(task)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        stream = TaskStream(updater)
+        stream_token = CURRENT_TASK_STREAM.set(stream)
+
+        try:
+            initial_state: Dict[str, Any] = {}
+            if self.state_initializer is not None:
+                try:
+                    initial_state.update(await self.state_initializer(auth_token, context) or {})
+                except Exception:
+                    logger.exception("세션 초기 state 구성 중 오류")
+            # 토큰 등 요청 범위 값은 "temp:" 키로 실행에만 전달하고 세션 저장소에는 남기지 않는다.
+            request_state = {k: v for k, v in initial_state.items() if k.startswith("temp:")}
+            session_state = {k: v for k, v in initial_state.items() if not k.startswith("temp:")}
+            if auth_token:
+                request_state[AUTH_TOKEN_STATE_KEY] = auth_token
+            else:
+                print("[2. Executor] ⚠️ 실패: 주입할 토큰이 없습니다.", flush=True)
+
+            user_message = types.Content(
+                role="user", parts=[types.Part(text=self._extract_user_input(context))]
+            )
+
+            # Pass the request headers/metadata to plugins before execution so
+            # policy enforcement can capture the client JWT on the very first
+            # fetch.
+            callback_context = self._build_callback_context(context)
+            for plugin in self.plugins:
+                try:
+                    plugin._capture_auth_from_context(callback_context)  # noqa: SLF001
+                    plugin.fetch_policy(tool_context=callback_context)
+                except Exception:
+                    logger.exception("플러그인 사전 준비 중 오류")
+
+            run_config = RunConfig(streaming_mode=StreamingMode.SSE) if self.streaming else None
+            final_response = None
+
+            # 같은 대화(context_id)의 세션을 재사용하고, 바뀐 state만 갱신한다.
+            async with self.sessions.session(user_id, conversation_id, session_state) as session_id:
+                await updater.start_work()
+
+                # Runner 실행 → 이벤트를 A2A 태스크 업데이트로 즉시 전달
+                async for event in self.runner.run_async(
+                    user_id=user_id,
+                    session_id=session_id,
+                    new_message=user_message,
+                    state_delta=request_state or None,
+                    run_config=run_config,
+                ):
+                    if not event.content or not event.content.parts:
+                        continue
+                    if event.partial:
+                        delta = "".join(p.text for p in event.content.parts if getattr(p, "text", None))
+                        await stream.text(delta, metadata={"author": event.author})
+                        continue
+                    for call in event.get_function_calls():
+                        await stream.status(
+                            f"도구 호출: {call.name}",
+                            metadata={"tool_call": call.name, "author": event.author},
+                        )
+                    for part in event.content.parts:
+                        if getattr(part, "text", None):
+                            final_response = part.text
+
+            if not final_response:
+                final_response = "응답 없음"
+
+            # 스트림 아티팩트를 닫은 뒤 최종 응답: 아티팩트 + 완료 상태 메시지
+            # (비스트리밍 클라이언트는 status.message를 읽음)
+            await stream.close()
+            final_parts = [Part(root=TextPart(text=final_response))]
+            await updater.add_artifact(final_parts, name=RESPONSE_ARTIFACT)
+            await updater.complete(updater.new_agent_message(final_parts))
+
+        except Exception as e:
+            logger.exception("ADKAgentExecutor.execute 오류")
+            safe_error = self._format_user_error(str(e))
+            try:
+                await stream.close()
+                await updater.failed(updater.new_agent_message([Part(root=TextPart(text=safe_error))]))
+            except RuntimeError:
+                # 이미 종료 상태에 도달한 태스크는 더 이상 갱신할 수 없다.
+                pass
+
+        finally:
+            CURRENT_TASK_STREAM.reset(stream_token)
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        return
+
+    @staticmethod
+    def _resolve_auth_token(context: RequestContext) -> str:
+        """요청 메타데이터 → ContextVar 순으로 호출자 토큰을 찾는다."""
+        metadata = getattr(context, "metadata", None) or {}
+        token = _strip_bearer(metadata.get("Authorization") or metadata.get("authorization"))
+        if not token:
+            token = _strip_bearer(GLOBAL_REQUEST_TOKEN.get(None))
+            print(f"[2. Executor] ContextVar 조회 결과: {bool(token)}", flush=True)
+        return token
+
+    @staticmethod
+    def _extract_user_input(context: RequestContext) -> str:
+        if context.message and context.message.parts:
+            return " ".join(
+                getattr(p.root, "text", "")
+                for p in context.message.parts
+                if hasattr(p.root, "text")
+            )
+        return ""
+
+    def _build_callback_context(self, context: RequestContext) -> dict:
+        headers = {}
+        state = {}
+        if getattr(context, "call_context", None):
+            state = getattr(context.call_context, "state", {}) or {}
+            headers = state.get("headers") or {}
+
+        message = getattr(context, "message", None)
+        message_metadata = {}
+        task_id = None
+        message_id = None
+        if message is not None:
+            message_metadata = getattr(message, "metadata", {}) or {}
+            task_id = getattr(message, "taskId", None) or message_metadata.get("taskId")
+            message_id = getattr(message, "messageId", None)
+
+        # Ensure downstream plugins and tools can access the caller token even
+        # if the request handler didn't attach headers/state. We rely on the
+        # GLOBAL_REQUEST_TOKEN set by the token capture middleware.
+        token = GLOBAL_REQUEST_TOKEN.get(None)
+
+        safe_headers = dict(headers) if isinstance(headers, dict) else {}
+        safe_state = dict(state) if isinstance(state, dict) else {}
+
+        if token:
+            safe_headers.setdefault("Authorization", f"Bearer {token}")
+            safe_state.setdefault("auth_token", token)
+
+        return {
+            "headers": safe_headers,
+            "metadata": getattr(context, "metadata", {}) or {},
+            "state": safe_state,
+            "message": {
+                "metadata": message_metadata,
+                "taskId": task_id,
+                "messageId": message_id,
+            },
+        }
+
+    def _format_user_error(self, raw_message: str) -> str:
+        message = raw_message or ""
+        for plugin in self.plugins:
+            sanitizer = getattr(plugin, "sanitize_error_message", None)
+            if callable(sanitizer):
+                try:
+                    return sanitizer(message)
+                except Exception:  # pragma: no cover - defensive
+                    logger.exception("에러 메시지 정제 실패")
+        condensed = message.strip()
+        if condensed:
+            if len(condensed) > 200:
+                condensed = condensed[:200] + "..."
+            return f"{_DEFAULT_USER_ERROR}\n세부 정보: {condensed}"
+        return _DEFAULT_USER_ERROR
+
+
+__all__ = ["ADKAgentExecutor", "TaskStream", "current_task_stream"]
@@ -0,0 +1,170 @@
+"""Shared A2A server bootstrap for the Attager agents.
+
+Every agent (including the orchestrator) exposes the same Starlette app: the
+A2A JSON-RPC handler, the policy cache endpoints and the middleware that copies
+the caller's Authorization header into ``GLOBAL_REQUEST_TOKEN``. Only the
+AgentCard, the ADK agent and its plugins differ per agent.
+"""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Iterable, Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from .policy_enforcement import GLOBAL_REQUEST_TOKEN
+
+
+async def token_capture_middleware(request, call_next):
+    """Authorization 헤더를 낚아채서 ContextVar(GLOBAL_REQUEST_TOKEN)에 저장한다."""
+    auth_header = request.headers.get("Authorization") or request.headers.get("authorization")
+
+    token_reset_token = None
+    if auth_header:
+        token_val = auth_header
+        if token_val.lower().startswith("bearer "):
+            token_val = token_val[7:].strip()
+
+        # 플러그인이 볼 수 있는 변수에 저장
+        token_reset_token = GLOBAL_REQUEST_TOKEN.set(token_val)
+        print(f"[1. Middleware] 토큰을 GLOBAL_VAR에 저장함: {token_val[:10]}...", flush=True)
+    else:
+        print("[1. Middleware] 헤더 없음", flush=True)
+
+    try:
+        response = await call_next(request)
+        return response
+    finally:
+        # 요청 처리가 끝나면 변수 초기화 (메모리 누수 방지)
+        if token_reset_token:
+            GLOBAL_REQUEST_TOKEN.reset(token_reset_token)
+
+
+def build_policy_routes(policy_plugin) -> list:
+    """정책 캐시 새로고침/상태 조회 라우트를 생성한다."""
+
+    async def refresh_policy_handler(request: Request):
+        """정책 캐시를 비우고 새로고침합니다."""
+        try:
+            body = {}
+            try:
+                body = await request.json()
+            except Exception:
+                pass
+
+            tenant = body.get("tenant") if body else None
+            result = policy_plugin.clear_policy_cache(tenant=tenant)
+
+            return JSONResponse({
+                "success": True,
+                "message": "정책 캐시가 새로고침되었습니다.",
+                "details": result,
+            })
+        except Exception as e:
+            return JSONResponse({
+                "success": False,
+                "error": str(e),
+            }, status_code=500)
+
+    async def get_cache_status_handler(request: Request):
+        """현재 정책 캐시 상태를 반환합니다."""
+        try:
+            status = policy_plugin.get_cache_status()
+            return JSONResponse({
+                "success": True,
+                "cache": status,
+            })
+        except Exception as e:
+            return JSONResponse({
+                "success": False,
+                "error": str(e),
+            }, status_code=500)
+
+    return [
+        Route("/api/refresh-policy", refresh_policy_handler, methods=["POST"]),
+        Route("/api/cache-status", get_cache_status_handler, methods=["GET"]),
+    ]
+
+
+def build_agent_app(
+    *,
+    agent_card,
+    agent,
+    plugins: Optional[Iterable] = None,
+    policy_plugin=None,
+    app_name: str = "orchestrator_app",
+    state_initializer=None,
+    on_shutdown: Iterable[Callable[[], Awaitable[None]]] = (),
+):
+    """AgentCard와 ADK 에이전트로 A2A Starlette 앱을 구성한다.
+
+    ``policy_plugin``을 생략하면 ``plugins``의 첫 번째 항목을 정책 플러그인으로 사용한다.
+    ``on_shutdown``의 코루틴 함수들은 서버 종료(lifespan shutdown) 시 순서대로 호출된다.
+    """
+    from a2a.server.apps import A2AStarletteApplication
+    from a2a.server.request_handlers import DefaultRequestHandler
+    from a2a.server.tasks import InMemoryTaskStore
+
+    from .agent_executor import ADKAgentExecutor
+
+    plugins = list(plugins or [])
+    if policy_plugin is None and plugins:
+        policy_plugin = plugins[0]
+
+    request_handler = DefaultRequestHandler(
+        agent_executor=ADKAgentExecutor(
+            agent,
+            app_name=app_name,
+            plugins=plugins,
+            state_initializer=state_initializer,
+        ),
+        task_store=InMemoryTaskStore(),
+    )
+
+    server_app = A2AStarletteApplication(
+        agent_card=agent_card,
+        http_handler=request_handler,
+    )
+
+    shutdown_hooks = list(on_shutdown or ())
+
+    @asynccontextmanager
+    async def _lifespan(_app):
+        yield
+        for hook in shutdown_hooks:
+            try:
+                await hook()
+            except Exception as e:
+                print(f"[agent_server] 종료 처리 실패 ({getattr(hook, '__qualname__', hook)}): {e}", flush=True)
+
+    # .build()를 먼저 호출해 Starlette 앱 객체를 얻은 뒤 라우트/미들웨어를 붙인다.
+    app = server_app.build(lifespan=_lifespan)
+
+    if policy_plugin is not None:
+        app.routes.extend(build_policy_routes(policy_plugin))
+
+    app.add_middleware(BaseHTTPMiddleware, dispatch=token_capture_middleware)
+    return app
+
+
+def serve_agent(*, host: str, port: int, **app_kwargs) -> None:
+    """build_agent_app으로 앱을 만들고 uvicorn으로 실행한다."""
+    import uvicorn
+
+    app = build_agent_app(**app_kwargs)
+    agent_card = app_kwargs.get("agent_card")
+    name = getattr(agent_card, "name", None) or "Agent"
+    print(f"{name} Running on {host}:{port}", flush=True)
+    uvicorn.run(app, host=host, port=port)
+
+
+__all__ = [
+    "build_agent_app",
+    "build_policy_routes",
+    "serve_agent",
+    "token_capture_middleware",
+]
@@ -1,12 +1,239 @@
-"""
-Redis Database Manager for IAM Policy System
-"""
+"""
+Redis Database Manager for IAM Policy System
+"""
 import redis
 import json
-from typing import Dict, List, Optional, Any, Tuple
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime
+from .log_archive import LogArchive, parse_stream_id
 import os
-
+
+logger = logging.getLogger(__name__)
+
+POLICY_RULESET_FIELDS = ("prompt_validation_rulesets", "tool_validation_rulesets", "response_filtering_rulesets")
+
+# agent_id -> policy_id 인덱스 (HASH)
+POLICY_AGENT_INDEX_KEY = "policies:by_agent"
+# agent_id -> 룰셋이 반영된 정책 문서 JSON (HASH). 정책/룰셋 쓰기 시 무효화된다.
+POLICY_CACHE_KEY = "policies:enriched"
+# 무효화 세대 번호. 캐시를 채우는 동안 쓰기가 있었으면 채우지 않는다.
+POLICY_CACHE_GEN_KEY = "policies:enriched:gen"
+
+# KEYS[1] = ID 집합 / ARGV[1] = 해시 키 prefix. 반환: {id, {field, value, ...}, ...}
+_LOAD_ALL_LUA = """
+local ids = redis.call('SMEMBERS', KEYS[1])
+local out = {}
+for _, id in ipairs(ids) do
+  out[#out + 1] = id
+  out[#out + 1] = redis.call('HGETALL', ARGV[1] .. id)
+end
+return out
+"""
+# Lua를 쓸 수 없을 때 파이프라인 한 번에 묶을 HGETALL 수
+BULK_BATCH_SIZE = int(os.getenv("IAM_DB_BULK_BATCH", "1000"))
+
+# 보안 로그: 전체 스트림 + 에이전트별 스트림 (같은 엔트리 ID를 공유)
+LOG_STREAM_KEY = "logs:stream"
+LOG_AGENT_STREAM_PREFIX = "logs:stream:agent:"
+LEGACY_LOG_LIST_KEY = "logs:all"
+LOG_STREAM_MAXLEN = int(os.getenv("IAM_LOG_STREAM_MAXLEN", "100000"))
+LOG_AGENT_STREAM_MAXLEN = int(os.getenv("IAM_LOG_AGENT_STREAM_MAXLEN", "20000"))
+# 필터 조회 한 번에 서버에서 검사할 최대 엔트리 수 (초과하면 next_cursor로 이어서 조회)
+LOG_SCAN_BUDGET = int(os.getenv("IAM_LOG_SCAN_BUDGET", "5000"))
+# 보관(cold) 설정: 디렉터리를 지정하면 보존 기간이 지난 로그를 압축 세그먼트로 옮긴 뒤 스트림에서 잘라낸다.
+# 이때 스트림은 MAXLEN으로 자르지 않는다 (보관 전 유실 방지).
+LOG_ARCHIVE_DIR = os.getenv("IAM_LOG_ARCHIVE_DIR", "")
+LOG_ARCHIVE_CODEC = os.getenv("IAM_LOG_ARCHIVE_CODEC", "")
+LOG_HOT_RETENTION_HOURS = float(os.getenv("IAM_LOG_HOT_RETENTION_HOURS", "72"))
+LOG_ARCHIVE_BATCH = int(os.getenv("IAM_LOG_ARCHIVE_BATCH", "5000"))
+LOG_ARCHIVE_LOCK_KEY = "logs:archive:lock"
+LOG_ARCHIVE_WATERMARK_KEY = "logs:archive:last_id"
+LOG_FILTER_FIELDS = ("agent_id", "verdict", "policy_type")
+
+# 에이전트 흐름 그래프 카운터: 로그 적재 시 HINCRBY로 누적
+# flow:total (전체 기간) + flow:{bucket_seconds}:{bucket_start} (시간 버킷, TTL = 보존 기간)
+# 필드: n|{source}|events, n|{source}|violations, e|{source}|{target}|count, e|{source}|{target}|violations
+FLOW_TOTAL_KEY = "flow:total"
+FLOW_BUCKET_PREFIX = "flow:"
+# (버킷 크기 초, 보존 기간 초). 조회 창에 맞는 가장 촘촘한 단위를 고른다.
+FLOW_GRANULARITIES = (
+    (60, int(os.getenv("IAM_FLOW_MINUTE_RETENTION", str(3 * 3600)))),
+    (3600, int(os.getenv("IAM_FLOW_HOUR_RETENTION", str(8 * 24 * 3600)))),
+)
+FLOW_MAX_BUCKETS = 200
+FLOW_VIOLATION_VERDICTS = {"VIOLATION", "BLOCKED"}
+_STREAM_ID = re.compile(r"^\d+(-\d+)?$")
+
+# KEYS[1] = 전체 스트림, KEYS[2] = 에이전트 스트림(선택) / ARGV = maxlen, agent maxlen, field, value, ...
+_LOG_APPEND_LUA = """
+local unpack = unpack or table.unpack
+local fields = {}
+for i = 3, #ARGV do fields[#fields + 1] = ARGV[i] end
+local function add(key, maxlen, id)
+  if tonumber(maxlen) > 0 then
+    return redis.call('XADD', key, 'MAXLEN', '~', maxlen, id, unpack(fields))
+  end
+  return redis.call('XADD', key, id, unpack(fields))
+end
+local id = add(KEYS[1], ARGV[1], '*')
+if KEYS[2] then add(KEYS[2], ARGV[2], id) end
+return id
+"""
+
+# KEYS[1] = 스트림 / ARGV = 상한 ID, 하한 ID, limit, 검사 한도, 청크 크기, [필드, 값, ...]
+# 최신 → 과거 순으로 필터에 맞는 엔트리를 limit 개까지 모은다.
+# 반환: {next_cursor('' = 끝), {id, data, id, data, ...}}
+_LOG_QUERY_LUA = """
+local hi, lo = ARGV[1], ARGV[2]
+local limit, budget, chunk = tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+local filters = {}
+for i = 6, #ARGV, 2 do filters[ARGV[i]] = ARGV[i + 1] end
+local out, found, scanned, cursor = {}, 0, 0, ''
+while found < limit and scanned < budget do
+  local want = math.min(chunk, budget - scanned)
+  local rows = redis.call('XREVRANGE', KEYS[1], hi, lo, 'COUNT', want)
+  if #rows == 0 then cursor = ''; break end
+  for _, row in ipairs(rows) do
+    scanned = scanned + 1
+    cursor = row[1]
+    local f = {}
+    for j = 1, #row[2], 2 do f[row[2][j]] = row[2][j + 1] end
+    local ok = true
+    for k, v in pairs(filters) do
+      if f[k] ~= v then ok = false; break end
+    end
+    if ok then
+      out[#out + 1] = row[1]
+      out[#out + 1] = f['data'] or '{}'
+      found = found + 1
+      if found >= limit then break end
+    end
+  end
+  if #rows < want and found < limit then cursor = ''; break end
+  hi = '(' .. cursor
+end
+return {cursor, out}
+"""
+
+# KEYS[1] = 세대 키, KEYS[2] = 캐시 HASH / ARGV = 읽을 때의 세대, agent_id, 문서
+_CACHE_FILL_LUA = """
+local gen = redis.call('GET', KEYS[1]) or '0'
+if gen == ARGV[1] then
+  redis.call('HSET', KEYS[2], ARGV[2], ARGV[3])
+  return 1
+end
+return 0
+"""
+
+
+def _decode_json(value: Optional[str], fallback: Any, *, record: str, field_name: str) -> Any:
+    """JSON 문자열 필드를 디코딩한다. 값이 없거나 깨졌으면 fallback."""
+    if value is None:
+        return fallback
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError) as exc:
+        logger.warning("Invalid JSON in %s.%s: %s", record, field_name, exc)
+        return fallback
+
+
+def _decode_bool(value: Optional[str]) -> bool:
+    return str(value).lower() == "true"
+
+
+@dataclass
+class AgentRecord:
+    """agents:{agent_id} 해시. JSON 필드는 생성 시 한 번만 디코딩한다."""
+
+    agent_id: str
+    plugins: List[Dict[str, Any]] = field(default_factory=list)
+    fields: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_redis(cls, raw: Dict[str, str], agent_id: str = "") -> "AgentRecord":
+        fields = dict(raw)
+        agent_id = fields.pop("agent_id", agent_id)
+        plugins = _decode_json(fields.pop("plugins", None), [], record=f"agents:{agent_id}", field_name="plugins")
+        return cls(agent_id=agent_id, plugins=plugins if isinstance(plugins, list) else [], fields=fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.fields, "agent_id": self.agent_id, "plugins": self.plugins}
+
+
+@dataclass
+class RulesetRecord:
+    """rulesets:{ruleset_id} 해시. rules/blocked_keywords 는 디코딩 실패 시 원문 문자열을 유지한다."""
+
+    ruleset_id: str
+    enabled: bool = False
+    rules: Any = None
+    blocked_keywords: Any = None
+    fields: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_redis(cls, raw: Dict[str, str], ruleset_id: str = "") -> "RulesetRecord":
+        fields = dict(raw)
+        ruleset_id = fields.pop("ruleset_id", ruleset_id)
+        name = f"rulesets:{ruleset_id}"
+        rules = fields.pop("rules", None)
+        blocked_keywords = fields.pop("blocked_keywords", None)
+        return cls(
+            ruleset_id=ruleset_id,
+            enabled=_decode_bool(fields.pop("enabled", None)),
+            rules=_decode_json(rules, rules, record=name, field_name="rules"),
+            blocked_keywords=_decode_json(blocked_keywords, blocked_keywords, record=name, field_name="blocked_keywords"),
+            fields=fields,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {**self.fields, "ruleset_id": self.ruleset_id, "enabled": self.enabled}
+        if self.rules is not None:
+            data["rules"] = self.rules
+        if self.blocked_keywords is not None:
+            data["blocked_keywords"] = self.blocked_keywords
+        return data
+
+
+@dataclass
+class PolicyRecord:
+    """policies:{policy_id} 해시. 룰셋 ID 목록은 디코딩 실패 시 빈 목록."""
+
+    policy_id: str
+    agent_id: Optional[str] = None
+    enabled: bool = False
+    prompt_validation_rulesets: List[str] = field(default_factory=list)
+    tool_validation_rulesets: List[str] = field(default_factory=list)
+    response_filtering_rulesets: List[str] = field(default_factory=list)
+    fields: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_redis(cls, raw: Dict[str, str], policy_id: str = "") -> "PolicyRecord":
+        fields = dict(raw)
+        policy_id = fields.pop("policy_id", policy_id)
+        ruleset_lists = {
+            name: _decode_json(fields.pop(name, None), [], record=f"policies:{policy_id}", field_name=name)
+            for name in POLICY_RULESET_FIELDS
+        }
+        return cls(
+            policy_id=policy_id,
+            agent_id=fields.pop("agent_id", None),
+            enabled=_decode_bool(fields.pop("enabled", None)),
+            fields=fields,
+            **ruleset_lists,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {**self.fields, "policy_id": self.policy_id, "enabled": self.enabled}
+        if self.agent_id is not None:
+            data["agent_id"] = self.agent_id
+        for name in POLICY_RULESET_FIELDS:
+            data[name] = list(getattr(self, name))
+        return data
+
+
 class IAMDatabase:
     def __init__(self, redis_host: str = "localhost", redis_port: int = 6379, redis_db: int = 0):
         """Initialize Redis connection"""
@@ -21,17 +248,23 @@ class IAMDatabase:
             "port": redis_port,
             "db": redis_db,
         }
-        
-        # Initialize with default data if empty
-        self._init_default_data()
-    
-    def _init_default_data(self):
-        """Initialize database with default agents and policies"""
-        # Check if already initialized
-        if self.redis_client.exists("agents:orchestrator"):
-            return
-        
-        # Default agents
+        self._cache_fill = self.redis_client.register_script(_CACHE_FILL_LUA)
+        self._load_all = self.redis_client.register_script(_LOAD_ALL_LUA)
+        self._log_append = self.redis_client.register_script(_LOG_APPEND_LUA)
+        self._log_query = self.redis_client.register_script(_LOG_QUERY_LUA)
+        self.log_archive = LogArchive(LOG_ARCHIVE_DIR, LOG_ARCHIVE_CODEC) if LOG_ARCHIVE_DIR else None
+        
+        # Initialize with default data if empty
+        self._init_default_data()
+        self._migrate_legacy_logs()
+    
+    def _init_default_data(self):
+        """Initialize database with default agents and policies"""
+        # Check if already initialized
+        if self.redis_client.exists("agents:orchestrator"):
+            return
+        
+        # Default agents
         default_agents = [
             {
                 "agent_id": "orchestrator",
@@ -94,118 +327,120 @@ class IAMDatabase:
                 "created_at": datetime.now().isoformat()
             }
         ]
-        
-        for agent in default_agents:
-            agent_id = agent["agent_id"]
-            self.redis_client.hset(f"agents:{agent_id}", mapping=agent)
-            self.redis_client.sadd("agents:all", agent_id)
-        
-        # Default rulesets
-        default_rulesets = [
-            {
-                "ruleset_id": "ruleset_prompt_orchestrator",
-                "name": "Orchestrator Prompt Validation",
-                "type": "prompt_validation",
-                "description": "Validates user prompts for orchestrator",
-                "system_prompt": """당신은 사용자 질문이 정책에 위반되는지 검증하는 보안 검사 AI입니다.
-
-[검증 규칙]
-1. 위험한 시스템 명령어 실행 요청 (예: 파일 삭제, 권한 변경, 시스템 설정 변경)
-2. 내부 시스템 구조/설정 변경 요청
-3. 관리자 권한이 필요한 작업
-
-[응답 형식]
-- 위반인 경우: "VIOLATION"
-- 정상인 경우: "PASS"
-
-사용자 질문: {prompt}
-
-판정:""",
-                "model": "gemini-2.0-flash-exp",
-                "enabled": "true",
-                "created_at": datetime.now().isoformat()
-            },
-            {
-                "ruleset_id": "ruleset_tool_call_remote_agent",
-                "name": "Call Remote Agent Validation",
-                "type": "tool_validation",
-                "tool_name": "call_remote_agent",
-                "description": "Validates call_remote_agent tool arguments",
-                "rules": json.dumps({
-                    "allowed_agents": ["Delivery Agent", "Item Agent", "Quality Agent", "Vehicle Agent"],
-                    "max_task_length": 500,
-                    "rate_limit": 10
-                }),
-                "enabled": "true",
-                "created_at": datetime.now().isoformat()
-            }
-        ]
-        
-        for ruleset in default_rulesets:
-            ruleset_id = ruleset["ruleset_id"]
-            self.redis_client.hset(f"rulesets:{ruleset_id}", mapping=ruleset)
-            self.redis_client.sadd("rulesets:all", ruleset_id)
-        
-        # Default policies (mapping agents to rulesets)
-        default_policies = [
-            {
-                "policy_id": "policy_orchestrator",
-                "agent_id": "orchestrator",
-                "name": "Orchestrator Policy",
-                "prompt_validation_rulesets": json.dumps(["ruleset_prompt_orchestrator"]),
-                "tool_validation_rulesets": json.dumps(["ruleset_tool_call_remote_agent"]),
-                "response_filtering_rulesets": json.dumps([]),
-                "enabled": "true",
-                "created_at": datetime.now().isoformat()
-            },
-            {
-                "policy_id": "policy_delivery",
-                "agent_id": "delivery_agent",
-                "name": "Delivery Agent Policy",
-                "prompt_validation_rulesets": json.dumps([]),
-                "tool_validation_rulesets": json.dumps([]),
-                "response_filtering_rulesets": json.dumps([]),
-                "enabled": "true",
-                "created_at": datetime.now().isoformat()
-            },
-            {
-                "policy_id": "policy_item",
-                "agent_id": "item_agent",
-                "name": "Item Agent Policy",
-                "prompt_validation_rulesets": json.dumps([]),
-                "tool_validation_rulesets": json.dumps([]),
-                "response_filtering_rulesets": json.dumps([]),
-                "enabled": "true",
-                "created_at": datetime.now().isoformat()
-            },
-            {
-                "policy_id": "policy_quality",
-                "agent_id": "quality_agent",
-                "name": "Quality Agent Policy",
-                "prompt_validation_rulesets": json.dumps([]),
-                "tool_validation_rulesets": json.dumps([]),
-                "response_filtering_rulesets": json.dumps([]),
-                "enabled": "true",
-                "created_at": datetime.now().isoformat()
-            },
-            {
-                "policy_id": "policy_vehicle",
-                "agent_id": "vehicle_agent",
-                "name": "Vehicle Agent Policy",
-                "prompt_validation_rulesets": json.dumps([]),
-                "tool_validation_rulesets": json.dumps([]),
-                "response_filtering_rulesets": json.dumps([]),
-                "enabled": "true",
-                "created_at": datetime.now().isoformat()
-            }
-        ]
-        
-        for policy in default_policies:
-            policy_id = policy["policy_id"]
-            self.redis_client.hset(f"policies:{policy_id}", mapping=policy)
-            self.redis_client.sadd("policies:all", policy_id)
-    
-    # ========== Agent Operations ==========
+        
+        for agent in default_agents:
+            agent_id = agent["agent_id"]
+            self.redis_client.hset(f"agents:{agent_id}", mapping=agent)
+            self.redis_client.sadd("agents:all", agent_id)
+        
+        # Default rulesets
+        default_rulesets = [
+            {
+                "ruleset_id": "ruleset_prompt_orchestrator",
+                "name": "Orchestrator Prompt Validation",
+                "type": "prompt_validation",
+                "description": "Validates user prompts for orchestrator",
+                "system_prompt": """당신은 사용자 질문이 정책에 위반되는지 검증하는 보안 검사 AI입니다.
+
+[검증 규칙]
+1. 위험한 시스템 명령어 실행 요청 (예: 파일 삭제, 권한 변경, 시스템 설정 변경)
+2. 내부 시스템 구조/설정 변경 요청
+3. 관리자 권한이 필요한 작업
+
+[응답 형식]
+- 위반인 경우: "VIOLATION"
+- 정상인 경우: "PASS"
+
+사용자 질문: {prompt}
+
+판정:""",
+                "model": "gemini-2.0-flash-exp",
+                "enabled": "true",
+                "created_at": datetime.now().isoformat()
+            },
+            {
+                "ruleset_id": "ruleset_tool_call_remote_agent",
+                "name": "Call Remote Agent Validation",
+                "type": "tool_validation",
+                "tool_name": "call_remote_agent",
+                "description": "Validates call_remote_agent tool arguments",
+                "rules": json.dumps({
+                    "allowed_agents": ["Delivery Agent", "Item Agent", "Quality Agent", "Vehicle Agent"],
+                    "max_task_length": 500,
+                    "rate_limit": 10
+                }),
+                "enabled": "true",
+                "created_at": datetime.now().isoformat()
+            }
+        ]
+        
+        for ruleset in default_rulesets:
+            ruleset_id = ruleset["ruleset_id"]
+            self.redis_client.hset(f"rulesets:{ruleset_id}", mapping=ruleset)
+            self.redis_client.sadd("rulesets:all", ruleset_id)
+        
+        # Default policies (mapping agents to rulesets)
+        default_policies = [
+            {
+                "policy_id": "policy_orchestrator",
+                "agent_id": "orchestrator",
+                "name": "Orchestrator Policy",
+                "prompt_validation_rulesets": json.dumps(["ruleset_prompt_orchestrator"]),
+                "tool_validation_rulesets": json.dumps(["ruleset_tool_call_remote_agent"]),
+                "response_filtering_rulesets": json.dumps([]),
+                "enabled": "true",
+                "created_at": datetime.now().isoformat()
+            },
+            {
+                "policy_id": "policy_delivery",
+                "agent_id": "delivery_agent",
+                "name": "Delivery Agent Policy",
+                "prompt_validation_rulesets": json.dumps([]),
+                "tool_validation_rulesets": json.dumps([]),
+                "response_filtering_rulesets": json.dumps([]),
+                "enabled": "true",
+                "created_at": datetime.now().isoformat()
+            },
+            {
+                "policy_id": "policy_item",
+                "agent_id": "item_agent",
+                "name": "Item Agent Policy",
+                "prompt_validation_rulesets": json.dumps([]),
+                "tool_validation_rulesets": json.dumps([]),
+                "response_filtering_rulesets": json.dumps([]),
+                "enabled": "true",
+                "created_at": datetime.now().isoformat()
+            },
+            {
+                "policy_id": "policy_quality",
+                "agent_id": "quality_agent",
+                "name": "Quality Agent Policy",
+                "prompt_validation_rulesets": json.dumps([]),
+                "tool_validation_rulesets": json.dumps([]),
+                "response_filtering_rulesets": json.dumps([]),
+                "enabled": "true",
+                "created_at": datetime.now().isoformat()
+            },
+            {
+                "policy_id": "policy_vehicle",
+                "agent_id": "vehicle_agent",
+                "name": "Vehicle Agent Policy",
+                "prompt_validation_rulesets": json.dumps([]),
+                "tool_validation_rulesets": json.dumps([]),
+                "response_filtering_rulesets": json.dumps([]),
+                "enabled": "true",
+                "created_at": datetime.now().isoformat()
+            }
+        ]
+        
+        for policy in default_policies:
+            policy_id = policy["policy_id"]
+            self.redis_client.hset(f"policies:{policy_id}", mapping=policy)
+            self.redis_client.sadd("policies:all", policy_id)
+            self.redis_client.hset(POLICY_AGENT_INDEX_KEY, policy["agent_id"], policy_id)
+        self._invalidate_policy_cache()
+    
+    # ========== Agent Operations ==========
     def _serialize_agent_data(self, data: Dict) -> Dict:
         """Prepare agent data for storage in Redis"""
         serialized = data.copy()
@@ -215,23 +450,36 @@ class IAMDatabase:
 
     def _parse_agent_data(self, agent_data: Dict) -> Dict:
         """Parse agent data retrieved from Redis"""
-        parsed = agent_data.copy()
-        if "plugins" in parsed:
-            try:
-                parsed["plugins"] = json.loads(parsed["plugins"])
-            except Exception:
-                parsed["plugins"] = []
-        return parsed
+        return AgentRecord.from_redis(agent_data).to_dict()
+
+    def _load_hashes(self, set_key: str, key_prefix: str) -> List[Tuple[str, Dict[str, str]]]:
+        """Load every hash whose id is in set_key in one round trip (Lua), ordered by id"""
+        try:
+            flat = self._load_all(keys=[set_key], args=[key_prefix])
+            rows = [
+                (flat[i], {flat[i + 1][j]: flat[i + 1][j + 1] for j in range(0, len(flat[i + 1]), 2)})
+                for i in range(0, len(flat), 2)
+            ]
+        except redis.ResponseError as exc:
+            # 스크립트를 쓸 수 없는 환경: SMEMBERS 후 배치 파이프라인
+            logger.warning("Bulk load script failed for %s, using pipeline: %s", set_key, exc)
+            ids = list(self.redis_client.smembers(set_key))
+            rows = []
+            for start in range(0, len(ids), BULK_BATCH_SIZE):
+                batch = ids[start:start + BULK_BATCH_SIZE]
+                pipe = self.redis_client.pipeline(transaction=False)
+                for item_id in batch:
+                    pipe.hgetall(f"{key_prefix}{item_id}")
+                rows.extend(zip(batch, pipe.execute()))
+        return sorted((row for row in rows if row[1]), key=lambda row: row[0])
+
+    def get_agent_records(self) -> List[AgentRecord]:
+        """Get all agents as typed records"""
+        return [AgentRecord.from_redis(raw, agent_id) for agent_id, raw in self._load_hashes("agents:all", "agents:")]
 
     def get_all_agents(self) -> List[Dict]:
         """Get all agents"""
-        agent_ids = self.redis_client.smembers("agents:all")
-        agents = []
-        for agent_id in agent_ids:
-            agent_data = self.redis_client.hgetall(f"agents:{agent_id}")
-            if agent_data:
-                agents.append(self._parse_agent_data(agent_data))
-        return agents
+        return [record.to_dict() for record in self.get_agent_records()]
 
     def get_agent(self, agent_id: str) -> Optional[Dict]:
         """Get agent by ID"""
@@ -254,61 +502,38 @@ class IAMDatabase:
         self.redis_client.hset(f"agents:{agent_id}", mapping=self._serialize_agent_data(data))
         self.redis_client.sadd("agents:all", agent_id)
         return True
-    
-    # ========== Ruleset Operations ==========
-    def get_all_rulesets(self) -> List[Dict]:
-        """Get all rulesets"""
-        ruleset_ids = self.redis_client.smembers("rulesets:all")
-        rulesets = []
-        for ruleset_id in ruleset_ids:
-            ruleset_data = self.redis_client.hgetall(f"rulesets:{ruleset_id}")
-            if ruleset_data:
-                # Parse JSON fields
-                if "rules" in ruleset_data:
-                    try:
-                        ruleset_data["rules"] = json.loads(ruleset_data["rules"])
-                    except:
-                        pass
-                if "blocked_keywords" in ruleset_data:
-                    try:
-                        ruleset_data["blocked_keywords"] = json.loads(ruleset_data["blocked_keywords"])
-                    except:
-                        pass
-                if "enabled" in ruleset_data:
-                    ruleset_data["enabled"] = ruleset_data["enabled"].lower() == "true"
-                rulesets.append(ruleset_data)
-        return rulesets
-    
-    def get_ruleset(self, ruleset_id: str) -> Optional[Dict]:
-        """Get ruleset by ID"""
-        ruleset_data = self.redis_client.hgetall(f"rulesets:{ruleset_id}")
-        if not ruleset_data:
-            return None
-        
-        # Parse JSON fields
-        if "rules" in ruleset_data:
-            try:
-                ruleset_data["rules"] = json.loads(ruleset_data["rules"])
-            except:
-                pass
-        if "blocked_keywords" in ruleset_data:
-            try:
-                ruleset_data["blocked_keywords"] = json.loads(ruleset_data["blocked_keywords"])
-            except:
-                pass
-        if "enabled" in ruleset_data:
-            ruleset_data["enabled"] = ruleset_data["enabled"].lower() == "true"
-
-        return ruleset_data
-    
-    def create_ruleset(self, data: Dict) -> bool:
-        """Create new ruleset"""
-        ruleset_id = data.get("ruleset_id")
-        if not ruleset_id:
-            return False
-        
-        data["created_at"] = datetime.now().isoformat()
-        
+    
+    # ========== Ruleset Operations ==========
+    def get_ruleset_records(self) -> List[RulesetRecord]:
+        """Get all rulesets as typed records"""
+        return [
+            RulesetRecord.from_redis(raw, ruleset_id)
+            for ruleset_id, raw in self._load_hashes("rulesets:all", "rulesets:")
+        ]
+
+    def get_all_rulesets(self) -> List[Dict]:
+        """Get all rulesets"""
+        return [record.to_dict() for record in self.get_ruleset_records()]
+    
+    def get_ruleset(self, ruleset_id: str) -> Optional[Dict]:
+        """Get ruleset by ID"""
+        ruleset_data = self.redis_client.hgetall(f"rulesets:{ruleset_id}")
+        if not ruleset_data:
+            return None
+        return self._parse_ruleset_data(ruleset_data)
+
+    def _parse_ruleset_data(self, ruleset_data: Dict) -> Dict:
+        """Parse ruleset data retrieved from Redis"""
+        return RulesetRecord.from_redis(ruleset_data).to_dict()
+    
+    def create_ruleset(self, data: Dict) -> bool:
+        """Create new ruleset"""
+        ruleset_id = data.get("ruleset_id")
+        if not ruleset_id:
+            return False
+        
+        data["created_at"] = datetime.now().isoformat()
+        
         # Convert complex types to JSON strings
         if "rules" in data and isinstance(data["rules"], dict):
             data["rules"] = json.dumps(data["rules"])
@@ -319,15 +544,16 @@ class IAMDatabase:
 
         self.redis_client.hset(f"rulesets:{ruleset_id}", mapping=data)
         self.redis_client.sadd("rulesets:all", ruleset_id)
-        return True
-    
-    def update_ruleset(self, ruleset_id: str, data: Dict) -> bool:
-        """Update ruleset"""
-        if not self.redis_client.exists(f"rulesets:{ruleset_id}"):
-            return False
-        
-        data["updated_at"] = datetime.now().isoformat()
-        
+        self._invalidate_policy_cache()
+        return True
+    
+    def update_ruleset(self, ruleset_id: str, data: Dict) -> bool:
+        """Update ruleset"""
+        if not self.redis_client.exists(f"rulesets:{ruleset_id}"):
+            return False
+        
+        data["updated_at"] = datetime.now().isoformat()
+        
         # Convert complex types to JSON strings
         if "rules" in data and isinstance(data["rules"], dict):
             data["rules"] = json.dumps(data["rules"])
@@ -337,118 +563,154 @@ class IAMDatabase:
             data["enabled"] = str(data["enabled"]).lower()
 
         self.redis_client.hset(f"rulesets:{ruleset_id}", mapping=data)
+        self._invalidate_policy_cache()
+        return True
+    
+    def delete_ruleset(self, ruleset_id: str) -> bool:
+        """Delete ruleset"""
+        if not self.redis_client.exists(f"rulesets:{ruleset_id}"):
+            return False
+        
+        self.redis_client.delete(f"rulesets:{ruleset_id}")
+        self.redis_client.srem("rulesets:all", ruleset_id)
+        self._invalidate_policy_cache()
         return True
-    
-    def delete_ruleset(self, ruleset_id: str) -> bool:
-        """Delete ruleset"""
-        if not self.redis_client.exists(f"rulesets:{ruleset_id}"):
-            return False
-        
-        self.redis_client.delete(f"rulesets:{ruleset_id}")
-        self.redis_client.srem("rulesets:all", ruleset_id)
-        return True
-    
-    # ========== Policy Operations ==========
-    def get_all_policies(self) -> List[Dict]:
-        """Get all policies"""
-        policy_ids = self.redis_client.smembers("policies:all")
-        policies = []
-        for policy_id in policy_ids:
-            policy_data = self.redis_client.hgetall(f"policies:{policy_id}")
-            if policy_data:
-                # Parse JSON fields
-                for field in ["prompt_validation_rulesets", "tool_validation_rulesets", "response_filtering_rulesets"]:
-                    if field in policy_data:
-                        try:
-                            policy_data[field] = json.loads(policy_data[field])
-                        except:
-                            policy_data[field] = []
-                if "enabled" in policy_data:
-                    policy_data["enabled"] = policy_data["enabled"].lower() == "true"
-                policies.append(policy_data)
-        return policies
-    
-    def get_policy(self, policy_id: str) -> Optional[Dict]:
-        """Get policy by ID"""
-        policy_data = self.redis_client.hgetall(f"policies:{policy_id}")
-        if not policy_data:
-            return None
-        
-        # Parse JSON fields
-        for field in ["prompt_validation_rulesets", "tool_validation_rulesets", "response_filtering_rulesets"]:
-            if field in policy_data:
-                try:
-                    policy_data[field] = json.loads(policy_data[field])
-                except:
-                    policy_data[field] = []
-        if "enabled" in policy_data:
-            policy_data["enabled"] = policy_data["enabled"].lower() == "true"
-        
-        return policy_data
-    
-    def get_policy_by_agent(self, agent_id: str) -> Optional[Dict]:
-        """Get policy by agent ID with enriched ruleset details"""
-        # Find policy by agent_id
-        policy_ids = self.redis_client.smembers("policies:all")
-        policy = None
-        
-        for policy_id in policy_ids:
-            policy_data = self.redis_client.hgetall(f"policies:{policy_id}")
-            if policy_data and policy_data.get("agent_id") == agent_id:
-                policy = policy_data
-                break
-        
-        if not policy:
-            return None
-        
-        # Parse JSON fields
-        for field in ["prompt_validation_rulesets", "tool_validation_rulesets", "response_filtering_rulesets"]:
-            if field in policy:
-                try:
-                    policy[field] = json.loads(policy[field])
-                except:
-                    policy[field] = []
-        if "enabled" in policy:
-            policy["enabled"] = policy["enabled"].lower() == "true"
-        
-        # Enrich policy with ruleset details
-        policy['prompt_validation_rules'] = []
-        policy['tool_validation_rules'] = {}
-        
-        for ruleset_id in policy.get('prompt_validation_rulesets', []):
-            ruleset = self.get_ruleset(ruleset_id)
-            if ruleset and ruleset.get('enabled'):
-                policy['prompt_validation_rules'].append({
-                    'system_prompt': ruleset.get('system_prompt', ''),
-                    'model': ruleset.get('model', 'gemini-2.0-flash-exp')
-                })
-        
-        for ruleset_id in policy.get('tool_validation_rulesets', []):
-            ruleset = self.get_ruleset(ruleset_id)
-            if ruleset and ruleset.get('enabled'):
-                tool_name = ruleset.get('tool_name')
-                if tool_name:
-                    policy['tool_validation_rules'][tool_name] = ruleset.get('rules', {})
-        
-        return policy
-    
-    def update_policy(self, policy_id: str, data: Dict) -> bool:
-        """Update policy"""
-        if not self.redis_client.exists(f"policies:{policy_id}"):
-            return False
-        
-        data["updated_at"] = datetime.now().isoformat()
-        
-        # Convert complex types to JSON strings
-        for field in ["prompt_validation_rulesets", "tool_validation_rulesets", "response_filtering_rulesets"]:
-            if field in data and isinstance(data[field], list):
-                data[field] = json.dumps(data[field])
-        if "enabled" in data:
-            data["enabled"] = str(data["enabled"]).lower()
-        
-        self.redis_client.hset(f"policies:{policy_id}", mapping=data)
-        return True
-    
+    
+    # ========== Policy Operations ==========
+    def get_policy_records(self) -> List[PolicyRecord]:
+        """Get all policies as typed records"""
+        return [
+            PolicyRecord.from_redis(raw, policy_id)
+            for policy_id, raw in self._load_hashes("policies:all", "policies:")
+        ]
+
+    def get_all_policies(self) -> List[Dict]:
+        """Get all policies"""
+        return [record.to_dict() for record in self.get_policy_records()]
+    
+    def get_policy(self, policy_id: str) -> Optional[Dict]:
+        """Get policy by ID"""
+        policy_data = self.redis_client.hgetall(f"policies:{policy_id}")
+        if not policy_data:
+            return None
+        return PolicyRecord.from_redis(policy_data, policy_id).to_dict()
+    
+    def _get_rulesets(self, ruleset_ids: List[str]) -> Dict[str, Dict]:
+        """Load several rulesets in one pipelined round trip"""
+        ruleset_ids = list(dict.fromkeys(ruleset_ids))
+        if not ruleset_ids:
+            return {}
+        pipe = self.redis_client.pipeline(transaction=False)
+        for ruleset_id in ruleset_ids:
+            pipe.hgetall(f"rulesets:{ruleset_id}")
+        return {
+            ruleset_id: self._parse_ruleset_data(data)
+            for ruleset_id, data in zip(ruleset_ids, pipe.execute())
+            if data
+        }
+
+    def _rebuild_policy_agent_index(self) -> None:
+        """Rebuild the agent_id -> policy_id index from the stored policies"""
+        policy_ids = sorted(self.redis_client.smembers("policies:all"))
+        pipe = self.redis_client.pipeline(transaction=False)
+        for policy_id in policy_ids:
+            pipe.hget(f"policies:{policy_id}", "agent_id")
+        mapping: Dict[str, str] = {}
+        for policy_id, agent_id in zip(policy_ids, pipe.execute()):
+            if agent_id:
+                mapping.setdefault(agent_id, policy_id)
+        pipe = self.redis_client.pipeline()
+        pipe.delete(POLICY_AGENT_INDEX_KEY)
+        if mapping:
+            pipe.hset(POLICY_AGENT_INDEX_KEY, mapping=mapping)
+        pipe.execute()
+
+    def _find_policy_id_by_agent(self, agent_id: str) -> Optional[str]:
+        policy_id = self.redis_client.hget(POLICY_AGENT_INDEX_KEY, agent_id)
+        if policy_id is None and not self.redis_client.exists(POLICY_AGENT_INDEX_KEY):
+            # 인덱스 도입 이전 데이터: 한 번 재구축
+            self._rebuild_policy_agent_index()
+            policy_id = self.redis_client.hget(POLICY_AGENT_INDEX_KEY, agent_id)
+        return policy_id
+
+    def _invalidate_policy_cache(self, *agent_ids: str) -> None:
+        """Drop cached enriched policies (all of them when no agent is given)"""
+        pipe = self.redis_client.pipeline()
+        pipe.incr(POLICY_CACHE_GEN_KEY)
+        if agent_ids:
+            pipe.hdel(POLICY_CACHE_KEY, *agent_ids)
+        else:
+            pipe.delete(POLICY_CACHE_KEY)
+        pipe.execute()
+
+    def get_policy_by_agent(self, agent_id: str) -> Optional[Dict]:
+        """Get policy by agent ID with enriched ruleset details"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hget(POLICY_CACHE_KEY, agent_id)
+        pipe.get(POLICY_CACHE_GEN_KEY)
+        cached, generation = pipe.execute()
+        if cached:
+            return json.loads(cached)
+
+        policy_id = self._find_policy_id_by_agent(agent_id)
+        policy = self.get_policy(policy_id) if policy_id else None
+        if not policy or policy.get("agent_id") != agent_id:
+            return None
+
+        policy = self._enrich_policy(policy)
+        self._cache_fill(
+            keys=[POLICY_CACHE_GEN_KEY, POLICY_CACHE_KEY],
+            args=[generation or "0", agent_id, json.dumps(policy)],
+        )
+        return policy
+
+    def _enrich_policy(self, policy: Dict) -> Dict:
+        """Attach enabled ruleset details to a parsed policy"""
+        rulesets = self._get_rulesets(
+            list(policy.get('prompt_validation_rulesets', [])) + list(policy.get('tool_validation_rulesets', []))
+        )
+
+        # Enrich policy with ruleset details
+        policy['prompt_validation_rules'] = []
+        policy['tool_validation_rules'] = {}
+        
+        for ruleset_id in policy.get('prompt_validation_rulesets', []):
+            ruleset = rulesets.get(ruleset_id)
+            if ruleset and ruleset.get('enabled'):
+                policy['prompt_validation_rules'].append({
+                    'system_prompt': ruleset.get('system_prompt', ''),
+                    'model': ruleset.get('model', 'gemini-2.0-flash-exp')
+                })
+        
+        for ruleset_id in policy.get('tool_validation_rulesets', []):
+            ruleset = rulesets.get(ruleset_id)
+            if ruleset and ruleset.get('enabled'):
+                tool_name = ruleset.get('tool_name')
+                if tool_name:
+                    policy['tool_validation_rules'][tool_name] = ruleset.get('rules', {})
+        
+        return policy
+    
+    def update_policy(self, policy_id: str, data: Dict) -> bool:
+        """Update policy"""
+        previous_agent_id = self.redis_client.hget(f"policies:{policy_id}", "agent_id")
+        if previous_agent_id is None and not self.redis_client.exists(f"policies:{policy_id}"):
+            return False
+        
+        data["updated_at"] = datetime.now().isoformat()
+        
+        # Convert complex types to JSON strings
+        for field_name in POLICY_RULESET_FIELDS:
+            if field_name in data and isinstance(data[field_name], list):
+                data[field_name] = json.dumps(data[field_name])
+        if "enabled" in data:
+            data["enabled"] = str(data["enabled"]).lower()
+        
+        self.redis_client.hset(f"policies:{policy_id}", mapping=data)
+        agent_id = data.get("agent_id", previous_agent_id)
+        self._index_policy(policy_id, agent_id, previous_agent_id)
+        return True
+    
     def create_policy(self, data: Dict) -> bool:
         """Create new policy"""
         policy_id = data.get("policy_id")
@@ -458,16 +720,26 @@ class IAMDatabase:
         data["created_at"] = datetime.now().isoformat()
 
         # Convert complex types to JSON strings
-        for field in ["prompt_validation_rulesets", "tool_validation_rulesets", "response_filtering_rulesets"]:
-            if field in data and isinstance(data[field], list):
-                data[field] = json.dumps(data[field])
+        for field_name in POLICY_RULESET_FIELDS:
+            if field_name in data and isinstance(data[field_name], list):
+                data[field_name] = json.dumps(data[field_name])
         if "enabled" in data:
             data["enabled"] = str(data["enabled"]).lower()
 
         self.redis_client.hset(f"policies:{policy_id}", mapping=data)
         self.redis_client.sadd("policies:all", policy_id)
+        self._index_policy(policy_id, data.get("agent_id"))
         return True
 
+    def _index_policy(self, policy_id: str, agent_id: Optional[str], previous_agent_id: Optional[str] = None) -> None:
+        """Keep the agent_id -> policy_id index and the enriched cache in sync after a policy write"""
+        if previous_agent_id and previous_agent_id != agent_id:
+            if self.redis_client.hget(POLICY_AGENT_INDEX_KEY, previous_agent_id) == policy_id:
+                self.redis_client.hdel(POLICY_AGENT_INDEX_KEY, previous_agent_id)
+        if agent_id:
+            self.redis_client.hset(POLICY_AGENT_INDEX_KEY, agent_id, policy_id)
+        self._invalidate_policy_cache(*[a for a in (agent_id, previous_agent_id) if a])
+
     def assign_rulesets_to_agent(self, agent_id: str, assignments: Dict[str, List[str]], enabled: Optional[bool] = None) -> bool:
         """Assign a set of rulesets to the agent's policy."""
         agent = self.get_agent(agent_id)
@@ -500,37 +772,80 @@ class IAMDatabase:
 
         return self.update_policy(policy_id, update_payload)
 
-    def get_agent_flow(self, limit: int = 200) -> Dict[str, Any]:
-        """Build agent flow information from recent logs"""
-        logs = self.get_logs(limit=limit)
+    @staticmethod
+    def _count_flow(pipe, log: Dict, epoch: float) -> None:
+        """Queue the flow counter increments for one log on a pipeline"""
+        source = log.get("agent_id") or log.get("source_agent") or "unknown"
+        target = (
+            log.get("target_agent")
+            or log.get("destination_agent")
+            or log.get("target")
+            or "external"
+        )
+        violation = (log.get("verdict") or "").upper() in FLOW_VIOLATION_VERDICTS
+        now = datetime.now().timestamp()
+        keys: List[Tuple[str, Optional[int]]] = [(FLOW_TOTAL_KEY, None)]
+        for size, retention in FLOW_GRANULARITIES:
+            bucket = int(epoch) // size * size
+            if bucket + size + retention > now:  # 이미 보존 기간이 지난 버킷은 건너뛴다
+                keys.append((f"{FLOW_BUCKET_PREFIX}{size}:{bucket}", bucket + size + retention))
+        for key, expire_at in keys:
+            pipe.hincrby(key, f"n|{source}|events", 1)
+            pipe.hincrby(key, f"e|{source}|{target}|count", 1)
+            if violation:
+                pipe.hincrby(key, f"n|{source}|violations", 1)
+                pipe.hincrby(key, f"e|{source}|{target}|violations", 1)
+            if expire_at:
+                pipe.expireat(key, expire_at)
+
+    def _flow_counters(self, window_seconds: Optional[int]) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """Read the counter hashes covering the window (one round trip)"""
+        if not window_seconds:
+            return [self.redis_client.hgetall(FLOW_TOTAL_KEY)], {"window_seconds": None}
+        size, retention = next(
+            ((s, r) for s, r in FLOW_GRANULARITIES if window_seconds <= min(r, s * FLOW_MAX_BUCKETS)),
+            FLOW_GRANULARITIES[-1],
+        )
+        now = int(datetime.now().timestamp())
+        last = now // size * size
+        first = max(now - min(window_seconds, retention), 0) // size * size
+        pipe = self.redis_client.pipeline(transaction=False)
+        for bucket in range(first, last + 1, size):
+            pipe.hgetall(f"{FLOW_BUCKET_PREFIX}{size}:{bucket}")
+        meta = {
+            "window_seconds": window_seconds,
+            "bucket_seconds": size,
+            "since": datetime.utcfromtimestamp(first).isoformat() + "Z",
+        }
+        return pipe.execute(), meta
+
+    def get_agent_flow(self, window_seconds: Optional[int] = None) -> Dict[str, Any]:
+        """Build agent flow information from the incremental flow counters.
+
+        window_seconds=None uses the all-time counters; otherwise the minute or hour buckets
+        overlapping the window are summed, so the cost depends on the number of edges, not logs.
+        """
+        counters, window_meta = self._flow_counters(window_seconds)
         agents = {agent["agent_id"]: agent for agent in self.get_all_agents()}
 
         node_metrics: Dict[str, Dict[str, Any]] = {}
         edge_map: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        total_events = 0
 
-        for log in logs:
-            source = log.get("agent_id") or log.get("source_agent") or "unknown"
-            target = (
-                log.get("target_agent")
-                or log.get("destination_agent")
-                or log.get("target")
-                or "external"
-            )
-
-            verdict = (log.get("verdict") or "").upper()
-
-            if source not in node_metrics:
-                node_metrics[source] = {"events": 0, "violations": 0}
-            node_metrics[source]["events"] += 1
-            if verdict in {"VIOLATION", "BLOCKED"}:
-                node_metrics[source]["violations"] += 1
-
-            key = (source, target)
-            if key not in edge_map:
-                edge_map[key] = {"source": source, "target": target, "count": 0, "violations": 0}
-            edge_map[key]["count"] += 1
-            if verdict in {"VIOLATION", "BLOCKED"}:
-                edge_map[key]["violations"] += 1
+        for counter in counters:
+            for name, value in counter.items():
+                parts = name.split("|")
+                if parts[0] == "n" and len(parts) == 3:
+                    metrics = node_metrics.setdefault(parts[1], {"events": 0, "violations": 0})
+                    metrics[parts[2]] = metrics.get(parts[2], 0) + int(value)
+                    if parts[2] == "events":
+                        total_events += int(value)
+                elif parts[0] == "e" and len(parts) == 4:
+                    edge = edge_map.setdefault(
+                        (parts[1], parts[2]),
+                        {"source": parts[1], "target": parts[2], "count": 0, "violations": 0},
+                    )
+                    edge[parts[3]] = edge.get(parts[3], 0) + int(value)
 
         nodes = []
         seen = set()
@@ -561,57 +876,251 @@ class IAMDatabase:
             "nodes": nodes,
             "edges": edges,
             "meta": {
-                "window": limit,
+                **window_meta,
                 "generated_at": datetime.utcnow().isoformat() + "Z",
-                "total_events": len(logs)
+                "total_events": total_events
             }
         }
-    
-    # ========== Log Operations ==========
-    def add_log(self, log_data: Dict) -> bool:
-        """Add log entry"""
-        log_data['timestamp'] = datetime.now().isoformat()
-        log_entry = json.dumps(log_data)
-        
-        # Store in list (newest first)
-        self.redis_client.lpush("logs:all", log_entry)
-        
-        # Keep only last 10000 logs
-        self.redis_client.ltrim("logs:all", 0, 9999)
-        
-        return True
-    
-    def get_logs(self, limit: int = 100, agent_id: Optional[str] = None) -> List[Dict]:
-        """Get logs with optional filtering"""
-        # Get logs from Redis
-        log_entries = self.redis_client.lrange("logs:all", 0, limit - 1)
-        
-        logs = []
-        for entry in log_entries:
-            try:
-                log = json.loads(entry)
-                if agent_id is None or log.get("agent_id") == agent_id:
-                    logs.append(log)
-            except:
-                continue
-        
-        return logs[:limit]
-    
-    def clear_logs(self) -> bool:
-        """Clear all logs"""
-        self.redis_client.delete("logs:all")
-        return True
-    
-    def get_stats(self) -> Dict:
-        """Get statistics"""
-        return {
-            "total_agents": self.redis_client.scard("agents:all"),
-            "total_rulesets": self.redis_client.scard("rulesets:all"),
-            "total_policies": self.redis_client.scard("policies:all"),
-            "total_logs": self.redis_client.llen("logs:all")
-        }
-
-# Global database instance
+    
+    # ========== Log Operations ==========
+    @staticmethod
+    def _log_fields(log_data: Dict) -> List[str]:
+        """Flatten a log into stream field/value pairs (filter fields + JSON document)"""
+        flat: List[str] = []
+        for name in LOG_FILTER_FIELDS:
+            flat += [name, str(log_data.get(name) or "")]
+        return flat + ["data", json.dumps(log_data)]
+
+    @staticmethod
+    def _to_stream_id(value: Optional[Any], default: str) -> str:
+        """Convert a stream ID, epoch milliseconds or ISO timestamp to a stream range bound"""
+        if value in (None, ""):
+            return default
+        text = str(value).strip()
+        if _STREAM_ID.match(text):
+            return text
+        try:
+            return str(int(datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp() * 1000))
+        except ValueError as exc:
+            raise ValueError(f"Invalid log time bound: {value}") from exc
+
+    def _migrate_legacy_logs(self) -> None:
+        """Move entries from the old logs:all list into the streams (runs once)"""
+        migrating = f"{LEGACY_LOG_LIST_KEY}:migrating"
+        try:
+            if not self.redis_client.renamenx(LEGACY_LOG_LIST_KEY, migrating):
+                return
+        except redis.ResponseError:  # logs:all 없음
+            return
+        entries = self.redis_client.lrange(migrating, 0, -1)
+        last_ms, seq = 0, 0
+        pipe = self.redis_client.pipeline(transaction=False)
+        for entry in reversed(entries):  # 리스트는 최신순
+            try:
+                log = json.loads(entry)
+                ms = int(datetime.fromisoformat(log.get("timestamp", "")).timestamp() * 1000)
+            except (TypeError, ValueError, AttributeError):
+                continue
+            if ms <= last_ms:
+                ms, seq = last_ms, seq + 1
+            else:
+                seq = 0
+            last_ms = ms
+            entry_id = f"{ms}-{seq}"
+            fields = dict(zip(*[iter(self._log_fields(log))] * 2))
+            pipe.xadd(LOG_STREAM_KEY, fields, id=entry_id)
+            if log.get("agent_id"):
+                pipe.xadd(f"{LOG_AGENT_STREAM_PREFIX}{log['agent_id']}", fields, id=entry_id)
+            self._count_flow(pipe, log, ms / 1000)
+        try:
+            pipe.execute()
+        except redis.ResponseError as exc:
+            logger.warning("Legacy log migration stopped: %s", exc)
+        self.redis_client.rename(migrating, f"{LEGACY_LOG_LIST_KEY}:migrated")
+
+    def add_log(self, log_data: Dict) -> bool:
+        """Add log entry"""
+        log_data['timestamp'] = datetime.now().isoformat()
+        agent_id = log_data.get("agent_id")
+        keys = [LOG_STREAM_KEY] + ([f"{LOG_AGENT_STREAM_PREFIX}{agent_id}"] if agent_id else [])
+        maxlens = [0, 0] if self.log_archive else [LOG_STREAM_MAXLEN, LOG_AGENT_STREAM_MAXLEN]
+        pipe = self.redis_client.pipeline(transaction=True)
+        self._log_append(keys=keys, args=[*maxlens, *self._log_fields(log_data)], client=pipe)
+        self._count_flow(pipe, log_data, datetime.now().timestamp())
+        pipe.execute()
+        return True
+
+    def query_logs(
+        self,
+        limit: int = 100,
+        agent_id: Optional[str] = None,
+        verdict: Optional[str] = None,
+        policy_type: Optional[str] = None,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Query logs newest first with server-side filters.
+
+        start/end accept stream IDs, epoch milliseconds or ISO timestamps. Pass the returned
+        next_cursor back as cursor to continue; it is None once the range is exhausted. A page may
+        hold fewer than limit entries when the scan budget ran out before enough matches were found.
+        When archiving is enabled, the query continues into the archived segments once the stream
+        is exhausted.
+        """
+        limit = max(1, int(limit))
+        if cursor and not _STREAM_ID.match(cursor):
+            raise ValueError(f"Invalid log cursor: {cursor}")
+        key = f"{LOG_AGENT_STREAM_PREFIX}{agent_id}" if agent_id else LOG_STREAM_KEY
+        high = f"({cursor}" if cursor else self._to_stream_id(end, "+")
+        low = self._to_stream_id(start, "-")
+        filters: List[str] = []
+        for name, value in (("verdict", verdict), ("policy_type", policy_type)):
+            if value:
+                filters += [name, value]
+        next_cursor, flat = self._log_query(
+            keys=[key],
+            args=[high, low, limit, max(LOG_SCAN_BUDGET, limit), min(max(limit, 100), 1000), *filters],
+        )
+        logs = []
+        for i in range(0, len(flat), 2):
+            try:
+                log = json.loads(flat[i + 1])
+            except (TypeError, ValueError):
+                continue
+            log["log_id"] = flat[i]
+            logs.append(log)
+        if next_cursor or len(logs) >= limit or self.log_archive is None:
+            return {"logs": logs, "next_cursor": next_cursor or (logs[-1]["log_id"] if len(logs) >= limit else None)}
+
+        # 스트림 범위를 다 본 경우 보관 세그먼트에서 이어서 조회 (스트림에 남은 엔트리보다 오래된 것만)
+        bounds = [(parse_stream_id(logs[-1]["log_id"]), logs[-1]["log_id"])] if logs else []
+        if cursor:
+            bounds.append((parse_stream_id(cursor), cursor))
+        oldest = self.redis_client.xrange(key, "-", "+", count=1)
+        if oldest:
+            bounds.append((parse_stream_id(oldest[0][0]), oldest[0][0]))
+        end_id = None if cursor or high == "+" else high
+        if end_id and (not bounds or parse_stream_id(end_id, upper=True) < min(bounds)[0]):
+            bounds = []
+        cold = self.log_archive.scan(
+            min(bounds)[1] if bounds else end_id,
+            None if low == "-" else low,
+            high_exclusive=bool(bounds),
+            filters={"agent_id": agent_id or "", "verdict": verdict or "", "policy_type": policy_type or ""},
+        )
+        for log in cold:
+            logs.append(log)
+            if len(logs) >= limit:
+                return {"logs": logs, "next_cursor": log["log_id"]}
+        return {"logs": logs, "next_cursor": None}
+
+    def iter_logs(self, batch_size: int = 500, **filters: Any) -> Iterator[Dict]:
+        """Yield every log matching the query_logs filters, newest first"""
+        cursor = filters.pop("cursor", None)
+        while True:
+            page = self.query_logs(limit=batch_size, cursor=cursor, **filters)
+            yield from page["logs"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+
+    def archive_logs(self, older_than: Optional[Any] = None) -> int:
+        """Move logs older than the hot retention into archive segments, then trim the streams.
+
+        Returns the number of archived entries. Segments are written before the streams are trimmed
+        (exact XTRIM MINID) and a watermark prevents re-archiving after a crash in between.
+        """
+        if self.log_archive is None:
+            return 0
+        if older_than in (None, ""):
+            cutoff_ms = int((datetime.now().timestamp() - LOG_HOT_RETENTION_HOURS * 3600) * 1000)
+        else:
+            cutoff_ms = parse_stream_id(self._to_stream_id(older_than, "0"))[0]
+        if not self.redis_client.set(LOG_ARCHIVE_LOCK_KEY, "1", nx=True, ex=600):
+            return 0
+        archived = 0
+        try:
+            while True:
+                watermark = self.redis_client.get(LOG_ARCHIVE_WATERMARK_KEY)
+                if watermark:
+                    self._trim_archived(watermark)
+                rows = self.redis_client.xrange(
+                    LOG_STREAM_KEY, f"({watermark}" if watermark else "-", str(cutoff_ms - 1), count=LOG_ARCHIVE_BATCH
+                )
+                if not rows:
+                    break
+                entries = []
+                for entry_id, fields in rows:
+                    try:
+                        entries.append((entry_id, json.loads(fields.get("data", "{}"))))
+                    except (TypeError, ValueError):
+                        entries.append((entry_id, {k: v for k, v in fields.items() if k != "data"}))
+                self.log_archive.write(entries)
+                self.redis_client.set(LOG_ARCHIVE_WATERMARK_KEY, rows[-1][0])
+                archived += len(rows)
+                if len(rows) < LOG_ARCHIVE_BATCH:
+                    self._trim_archived(rows[-1][0])
+                    break
+        finally:
+            self.redis_client.delete(LOG_ARCHIVE_LOCK_KEY)
+        return archived
+
+    def _trim_archived(self, last_id: str) -> None:
+        """Drop stream entries up to and including last_id (already archived)"""
+        ms, seq = parse_stream_id(last_id)
+        min_id = f"{ms}-{seq + 1}"
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.xtrim(LOG_STREAM_KEY, minid=min_id, approximate=False)
+        for key in self.redis_client.scan_iter(f"{LOG_AGENT_STREAM_PREFIX}*"):
+            pipe.xtrim(key, minid=min_id, approximate=False)
+        pipe.execute()
+
+    def get_logs(self, limit: int = 100, agent_id: Optional[str] = None) -> List[Dict]:
+        """Get logs with optional filtering"""
+        return self.query_logs(limit=limit, agent_id=agent_id)["logs"]
+
+    def ensure_log_consumer_group(self, group: str, start_id: str = "0") -> None:
+        """Create a consumer group on the global log stream if it does not exist"""
+        try:
+            self.redis_client.xgroup_create(LOG_STREAM_KEY, group, id=start_id, mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def read_log_group(self, group: str, consumer: str, count: int = 100, block_ms: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        """Read new logs for a consumer group member; acknowledge them with ack_logs"""
+        reply = self.redis_client.xreadgroup(group, consumer, {LOG_STREAM_KEY: ">"}, count=count, block=block_ms)
+        entries: List[Tuple[str, Dict]] = []
+        for _, rows in reply or []:
+            for entry_id, fields in rows:
+                try:
+                    entries.append((entry_id, json.loads(fields.get("data", "{}"))))
+                except (TypeError, ValueError):
+                    entries.append((entry_id, {}))
+        return entries
+
+    def ack_logs(self, group: str, *entry_ids: str) -> int:
+        return self.redis_client.xack(LOG_STREAM_KEY, group, *entry_ids) if entry_ids else 0
+    
+    def clear_logs(self) -> bool:
+        """Clear all logs"""
+        agent_streams = list(self.redis_client.scan_iter(f"{LOG_AGENT_STREAM_PREFIX}*"))
+        flow_keys = list(self.redis_client.scan_iter(f"{FLOW_BUCKET_PREFIX}*"))
+        self.redis_client.delete(LOG_STREAM_KEY, *agent_streams, *flow_keys)
+        return True
+    
+    def get_stats(self) -> Dict:
+        """Get statistics"""
+        return {
+            "total_agents": self.redis_client.scard("agents:all"),
+            "total_rulesets": self.redis_client.scard("rulesets:all"),
+            "total_policies": self.redis_client.scard("policies:all"),
+            "total_logs": self.redis_client.xlen(LOG_STREAM_KEY),
+            **({"archive": self.log_archive.stats()} if self.log_archive else {}),
+        }
+
+# Global database instance
 db = None
 
 
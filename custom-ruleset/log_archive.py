@@ -0,0 +1,176 @@
+"""
+Cold storage for IAM security logs.
+
+Entries that age out of the Redis log streams are written to time-partitioned,
+compressed NDJSON segment files::
+
+    {root}/{YYYY-MM-DD}/{first_id}_{last_id}.ndjson.zst   (or .gz)
+    {root}/index.ndjson                                   one line per segment
+
+Each index line records the id/time range, entry count, codec and the agent ids
+and verdicts present, so range and filter queries open only the segments that
+can match. Segments are written to a temp file and renamed before the index
+line is appended, so a crash never leaves an indexed but partial segment.
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import zstandard as _zstd  # type: ignore
+except Exception:  # pragma: no cover - zstandard is optional
+    _zstd = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.ndjson"
+CODECS = ("zstd", "gzip")
+_SUFFIX = {"zstd": ".ndjson.zst", "gzip": ".ndjson.gz"}
+
+
+def parse_stream_id(value: str, upper: bool = False) -> Tuple[int, int]:
+    """'1700000000000-3' -> (1700000000000, 3) for numeric ordering.
+
+    A bare millisecond value maps to its first sequence, or its last one when upper=True
+    (the same way XRANGE treats incomplete ids).
+    """
+    ms, _, seq = str(value).partition("-")
+    return int(ms), int(seq) if seq else (2**64 - 1 if upper else 0)
+
+
+class LogArchive:
+    """Append-only segment store for stream entries ordered by stream id"""
+
+    def __init__(self, root: str, codec: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        codec = (codec or "").lower() or ("zstd" if _zstd is not None else "gzip")
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported archive codec: {codec}")
+        if codec == "zstd" and _zstd is None:
+            logger.warning("zstandard is not installed; archiving with gzip")
+            codec = "gzip"
+        self.codec = codec
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    # ========== Write ==========
+    def _encode(self, payload: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            return _zstd.ZstdCompressor(level=10).compress(payload)
+        return gzip.compress(payload, compresslevel=6)
+
+    @staticmethod
+    def _decode(data: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            if _zstd is None:
+                raise RuntimeError("zstandard is required to read .zst log segments")
+            return _zstd.ZstdDecompressor().decompressobj().decompress(data)
+        return gzip.decompress(data)
+
+    def write(self, entries: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Archive (stream_id, log) pairs sorted by id; one segment per UTC day"""
+        by_day: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        for entry_id, log in entries:
+            day = datetime.fromtimestamp(parse_stream_id(entry_id)[0] / 1000, timezone.utc).strftime("%Y-%m-%d")
+            by_day.setdefault(day, []).append((entry_id, log))
+
+        written = []
+        for day, rows in sorted(by_day.items()):
+            first_id, last_id = rows[0][0], rows[-1][0]
+            rel_path = os.path.join(day, f"{first_id}_{last_id}{_SUFFIX[self.codec]}")
+            path = os.path.join(self.root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = "".join(
+                json.dumps({"log_id": entry_id, **log}, ensure_ascii=False) + "\n" for entry_id, log in rows
+            ).encode("utf-8")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self._encode(payload, self.codec))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+            meta = {
+                "path": rel_path,
+                "codec": self.codec,
+                "first_id": first_id,
+                "last_id": last_id,
+                "first_ts": datetime.fromtimestamp(parse_stream_id(first_id)[0] / 1000, timezone.utc).isoformat(),
+                "last_ts": datetime.fromtimestamp(parse_stream_id(last_id)[0] / 1000, timezone.utc).isoformat(),
+                "count": len(rows),
+                "bytes": os.path.getsize(path),
+                "agents": sorted({str(log.get("agent_id") or "") for _, log in rows}),
+                "verdicts": sorted({str(log.get("verdict") or "") for _, log in rows}),
+            }
+            with self._lock, open(os.path.join(self.root, INDEX_FILE), "a", encoding="utf-8") as f:
+                f.write(json.dumps(meta, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            written.append(meta)
+        return written
+
+    # ========== Read ==========
+    def segments(self) -> List[Dict[str, Any]]:
+        """Index entries, newest first"""
+        try:
+            with open(os.path.join(self.root, INDEX_FILE), "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        segments = []
+        for line in lines:
+            try:
+                segments.append(json.loads(line))
+            except ValueError:
+                logger.warning("Skipping malformed archive index line")
+        segments.sort(key=lambda s: parse_stream_id(s["last_id"]), reverse=True)
+        return segments
+
+    def _read_segment(self, meta: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with open(os.path.join(self.root, meta["path"]), "rb") as f:
+            text = self._decode(f.read(), meta.get("codec", "gzip")).decode("utf-8")
+        return [json.loads(line) for line in text.splitlines() if line]
+
+    def scan(
+        self,
+        high: Optional[str] = None,
+        low: Optional[str] = None,
+        *,
+        high_exclusive: bool = False,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield archived logs newest first with low <= id <= high (or < high when high_exclusive)"""
+        hi = parse_stream_id(high, upper=not high_exclusive) if high else None
+        lo = parse_stream_id(low) if low else None
+        filters = {k: v for k, v in (filters or {}).items() if v}
+        for meta in self.segments():
+            if hi is not None and parse_stream_id(meta["first_id"]) > hi:
+                continue
+            if lo is not None and parse_stream_id(meta["last_id"]) < lo:
+                continue
+            if "agent_id" in filters and filters["agent_id"] not in meta.get("agents", ()):
+                continue
+            if "verdict" in filters and filters["verdict"] not in meta.get("verdicts", ()):
+                continue
+            for log in reversed(self._read_segment(meta)):
+                entry_id = parse_stream_id(log["log_id"])
+                if hi is not None and (entry_id > hi or (high_exclusive and entry_id == hi)):
+                    continue
+                if lo is not None and entry_id < lo:
+                    break
+                if all(str(log.get(k) or "") == v for k, v in filters.items()):
+                    yield log
+
+    def stats(self) -> Dict[str, Any]:
+        segments = self.segments()
+        return {
+            "segments": len(segments),
+            "entries": sum(s.get("count", 0) for s in segments),
+            "bytes": sum(s.get("bytes", 0) for s in segments),
+            "oldest": segments[-1]["first_ts"] if segments else None,
+            "newest": segments[0]["last_ts"] if segments else None,
+        }
@@ -5,6 +5,7 @@ from __future__ import annotations
 import contextlib
 from contextvars import ContextVar
 import hashlib
+import importlib
 import json
 import os
 import re
@@ -13,9 +14,6 @@ import time
 from collections import OrderedDict
 from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
 
-import jwt
-import google.generativeai as genai
-import requests
 from google.adk.plugins.base_plugin import BasePlugin
 
 try:
@@ -31,6 +29,19 @@ GLOBAL_REQUEST_TOKEN: ContextVar[str | None] = ContextVar(
     "global_request_token", default=None
 )
 
+# 호출자 토큰의 세션 state 키. ADK는 "temp:" 키를 현재 실행(invocation) 동안만 유지하고
+# 세션 저장소(Redis 등)에는 기록하지 않는다.
+AUTH_TOKEN_STATE_KEY = "temp:auth_token"
+
+
+def _lazy_import(module_name: str):
+    """무거운 의존성(google.generativeai, jwt, requests)을 첫 사용 시점에 로드한다.
+
+    정책에 프롬프트 규칙이 없는 에이전트는 LLM 스택을 전혀 import하지 않으므로
+    콜드 스타트 시간과 메모리 사용량이 줄어든다.
+    """
+    return importlib.import_module(module_name)
+
 
 class PolicyEnforcementPlugin(BasePlugin):
     """IAM 기반 정책 집행 플러그인."""
@@ -46,6 +57,7 @@ class PolicyEnforcementPlugin(BasePlugin):
         (re.compile(r"(secret\s*[=:]\s*)([^\s]+)", re.IGNORECASE), r"\1***"),
     ]
     _PATH_PATTERN = re.compile(r"((?:[A-Za-z]:)?[\\/][^\s]+)")
+    _TOOL_PERMISSION_ALIASES = {"call_remote_agents": "call_remote_agent"}
 
     def __init__(
         self,
@@ -86,11 +98,27 @@ class PolicyEnforcementPlugin(BasePlugin):
         except ValueError:
             self._replay_ttl = self._DEFAULT_REPLAY_TTL_SECONDS
 
+        # genai.configure/GenerativeModel은 첫 LLM 검사 시점(_resolve_model)까지 미룬다.
+        self._genai_configured = False
+
         self._ingest_initial_auth(initial_auth_token, initial_context)
 
-        if gemini_api_key:
-            genai.configure(api_key=gemini_api_key)
-            self._models[self._DEFAULT_MODEL] = genai.GenerativeModel(self._DEFAULT_MODEL)
+    @classmethod
+    def from_env(cls, agent_id: str, **overrides: Any) -> "PolicyEnforcementPlugin":
+        """환경변수 기반으로 플러그인을 생성한다 (에이전트별로 agent_id만 다름)."""
+        policy_server_url = os.getenv("POLICY_SERVER_URL", "http://localhost:8005")
+        kwargs: Dict[str, Any] = {
+            "gemini_api_key": os.getenv("GOOGLE_API_KEY"),
+            "policy_server_url": policy_server_url,
+            "log_server_url": os.getenv("LOG_SERVER_URL", policy_server_url),
+            "initial_auth_token": (
+                os.getenv("IAM_BOOTSTRAP_AUTH_TOKEN")
+                or os.getenv("POLICY_BOOTSTRAP_TOKEN")
+                or os.getenv("AUTH_TOKEN")
+            ),
+        }
+        kwargs.update(overrides)
+        return cls(agent_id=agent_id, **kwargs)
 
     # ------------------------------------------------------------------
     # [안전장치] agent_executor가 호출하더라도 죽지 않게 빈 메서드 유지
@@ -202,6 +230,7 @@ class PolicyEnforcementPlugin(BasePlugin):
             
             data = None
             successful_url = None
+            requests = _lazy_import("requests")
             
             # 여러 URL을 순차적으로 시도
             for base_url in base_urls:
@@ -303,8 +332,10 @@ class PolicyEnforcementPlugin(BasePlugin):
 
         # 2. [도구 권한 확인]
         my_allowed_tools = my_rule.get("allowed_tools", [])
+        # 병렬 fan-out 도구는 단일 호출 도구와 같은 권한으로 취급 (타겟은 도구 내부에서 개별 검증)
+        permission_name = self._TOOL_PERMISSION_ALIASES.get(tool_name, tool_name)
         
-        if tool_name not in my_allowed_tools:
+        if tool_name not in my_allowed_tools and permission_name not in my_allowed_tools:
             return f"Tool '{tool_name}' is NOT allowed for agent '{self.agent_id}'."
 
         # 3. [오케스트레이터 전용] call_remote_agent 타겟 검증
@@ -324,6 +355,48 @@ class PolicyEnforcementPlugin(BasePlugin):
 
         return None
 
+    def check_remote_targets(self, tool_context: Any, agent_names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """fan-out 호출(call_remote_agents)의 각 타겟을 call_remote_agent 규칙으로 검증한다.
+
+        Returns:
+            {agent_name: None(허용) | 사용자에게 노출 가능한 차단 사유}
+        """
+        names = [str(n).strip() for n in agent_names]
+        claims = self._get_auth_claims(tool_context, {})
+        current_tenant = self._extract_tenant_from_claims(claims)
+        user_email = claims.get("sub") or claims.get("email") or claims.get("user") or ""
+
+        if not current_tenant or current_tenant.startswith("<"):
+            return {name: "유효한 테넌트 정보 없음" for name in names}
+
+        request_policy = self._get_policy_for_tenant(current_tenant, user_email=user_email)
+        results: Dict[str, Optional[str]] = {}
+        for name in names:
+            violation = self._check_allowlist_rule(
+                "call_remote_agent",
+                request_policy,
+                current_tenant,
+                {"agent_name": name},
+            )
+            log_safe = self.sanitize_error_message(violation, audience="log") if violation else ""
+            self._send_log(
+                {
+                    "source": "agent",
+                    "agent_id": self.agent_id,
+                    "policy_type": "tool_validation",
+                    "tool_name": "call_remote_agents",
+                    "verdict": "BLOCKED" if violation else "PASS",
+                    "message": (
+                        f"[{self.agent_id}] 툴 차단: {log_safe}"
+                        if violation
+                        else f"[{self.agent_id}] 툴 검증 통과: call_remote_agents -> {name}"
+                    ),
+                    "target_agent": name,
+                }
+            )
+            results[name] = log_safe or None
+        return results
+
     @staticmethod
     def _id_variants(agent_id: str) -> set[str]:
         """에이전트 식별자 매칭을 위해 가능한 별칭 집합을 만든다."""
@@ -411,9 +484,9 @@ class PolicyEnforcementPlugin(BasePlugin):
         
         if incoming_token:
             if hasattr(callback_context, "state") and isinstance(callback_context.state, dict):
-                callback_context.state["auth_token"] = incoming_token
+                callback_context.state[AUTH_TOKEN_STATE_KEY] = incoming_token
             elif hasattr(callback_context, "session") and hasattr(callback_context.session, "state"):
-                 callback_context.session.state["auth_token"] = incoming_token
+                 callback_context.session.state[AUTH_TOKEN_STATE_KEY] = incoming_token
         
         return None
 
@@ -680,6 +753,10 @@ class PolicyEnforcementPlugin(BasePlugin):
         if not self.gemini_api_key:
             return None
         try:
+            genai = _lazy_import("google.generativeai")
+            if not self._genai_configured:
+                genai.configure(api_key=self.gemini_api_key)
+                self._genai_configured = True
             model = genai.GenerativeModel(name)
             self._models[name] = model
             return model
@@ -871,6 +948,7 @@ class PolicyEnforcementPlugin(BasePlugin):
         log_url = f"{self.log_server_url}/api/logs"
         print(f"[PolicyPlugin] 📤 로그 전송 시도: {log_url}")
         print(f"[PolicyPlugin] 📦 페이로드: {payload}")
+        requests = _lazy_import("requests")
         try:
             response = requests.post(
                 log_url,
@@ -975,7 +1053,7 @@ class PolicyEnforcementPlugin(BasePlugin):
             
             # dict인 경우
             if isinstance(state, dict):
-                token = state.get("auth_token")
+                token = state.get(AUTH_TOKEN_STATE_KEY) or state.get("auth_token")
                 if token:
                     print(f"[3. Plugin] ⭕ (Dict State) 토큰: {token[:10]}...", flush=True)
                     return self._sanitize_bearer(token)
@@ -1097,6 +1175,7 @@ class PolicyEnforcementPlugin(BasePlugin):
 
         key = self._jwt_public_key or self._jwt_secret
         try:
+            jwt = _lazy_import("jwt")
             if key:
                 return jwt.decode(token, key=key, options=options, **verify_args)
             return jwt.decode(token, options={"verify_signature": False})
@@ -0,0 +1,321 @@
+"""ADK session lifecycle for the shared A2A executor.
+
+Sessions are keyed by (user, conversation id) so that follow-up messages in the
+same A2A context reuse the ADK session history. Idle sessions are evicted after
+``AGENT_SESSION_TTL`` seconds and the total number of tracked sessions is capped
+by ``AGENT_SESSION_MAX``. With ``AGENT_SESSION_BACKEND=redis`` the sessions are
+stored in Redis so that replicas behind a load balancer share conversation state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from uuid import uuid4
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[str, str]
+
+
+def _default_int(env_key: str, fallback: int) -> int:
+    raw = os.getenv(env_key)
+    if raw is None:
+        return fallback
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Invalid integer for %s: %s (fallback=%s)", env_key, raw, fallback)
+        return fallback
+
+
+class RedisSessionService(BaseSessionService):
+    """ADK 세션을 Redis에 JSON으로 저장하는 세션 서비스.
+
+    - 세션 키는 TTL을 가지며 조회/갱신할 때마다 만료 시간이 연장된다 (idle TTL).
+    - 이벤트 히스토리는 ``max_events``개까지만 보관해 긴 대화에서도 크기가 제한된다.
+    """
+
+    # SessionManager가 로컬 LRU/TTL 정리 대신 Redis 만료에 맡기도록 알리는 플래그
+    manages_expiry = True
+
+    def __init__(
+        self,
+        redis_url: str,
+        *,
+        ttl_seconds: int = 1800,
+        max_events: int = 100,
+        key_prefix: str = "adk:session",
+    ) -> None:
+        import redis.asyncio as aioredis
+
+        self.redis = aioredis.from_url(redis_url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_events = max_events
+        self.key_prefix = key_prefix
+
+    def _key(self, app_name: str, user_id: str, session_id: str) -> str:
+        return f"{self.key_prefix}:{app_name}:{user_id}:{session_id}"
+
+    def _index_key(self, app_name: str, user_id: str) -> str:
+        return f"{self.key_prefix}-index:{app_name}:{user_id}"
+
+    def _dump(self, session: Session) -> str:
+        # "temp:" state(요청 토큰 등)는 현재 실행에서만 쓰고 저장하지 않는다.
+        state = {k: v for k, v in session.state.items() if not k.startswith(State.TEMP_PREFIX)}
+        stored = session.model_copy(update={"events": session.events[-self.max_events :], "state": state})
+        return stored.model_dump_json(exclude_none=True)
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or uuid4().hex
+        session = Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=dict(state or {}),
+            last_update_time=time.time(),
+        )
+        key = self._key(app_name, user_id, session_id)
+        created = await self.redis.set(key, self._dump(session), ex=self.ttl_seconds, nx=True)
+        if not created:
+            raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+        index_key = self._index_key(app_name, user_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(index_key, session_id)
+            pipe.expire(index_key, self.ttl_seconds)
+            await pipe.execute()
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = self._key(app_name, user_id, session_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.expire(key, self.ttl_seconds)
+            raw, _ = await pipe.execute()
+        if raw is None:
+            return None
+        session = Session.model_validate_json(raw)
+        if config is not None:
+            events = session.events
+            if config.after_timestamp:
+                events = [e for e in events if e.timestamp >= config.after_timestamp]
+            if config.num_recent_events:
+                events = events[-config.num_recent_events :]
+            session.events = events
+        return session
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        if user_id is None:
+            # 전체 조회는 운영 점검용으로만 사용 (SCAN)
+            keys = [k async for k in self.redis.scan_iter(match=f"{self.key_prefix}:{app_name}:*")]
+        else:
+            session_ids = await self.redis.smembers(self._index_key(app_name, user_id))
+            keys = [self._key(app_name, user_id, sid) for sid in sorted(session_ids)]
+        if not keys:
+            return ListSessionsResponse(sessions=[])
+        sessions = []
+        for raw in await self.redis.mget(keys):
+            if raw is None:
+                continue
+            session = Session.model_validate_json(raw)
+            session.events = []
+            sessions.append(session)
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(self._key(app_name, user_id, session_id))
+            pipe.srem(self._index_key(app_name, user_id), session_id)
+            await pipe.execute()
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        await self.redis.set(
+            self._key(session.app_name, session.user_id, session.id),
+            self._dump(session),
+            ex=self.ttl_seconds,
+        )
+        return event
+
+    async def aclose(self) -> None:
+        await self.redis.aclose()
+
+
+def build_session_service(ttl_seconds: Optional[int] = None) -> BaseSessionService:
+    """환경변수(AGENT_SESSION_BACKEND)에 따라 세션 서비스를 생성한다."""
+    backend = os.getenv("AGENT_SESSION_BACKEND", "memory").strip().lower()
+    if backend == "redis":
+        redis_url = os.getenv("AGENT_SESSION_REDIS_URL") or os.getenv("REDIS_URL")
+        if not redis_url:
+            host = os.getenv("AGENT_REDIS_HOST") or os.getenv("REDIS_HOST", "localhost")
+            port = os.getenv("AGENT_REDIS_PORT") or os.getenv("REDIS_PORT", "6379")
+            redis_url = f"redis://{host}:{port}/{_default_int('AGENT_SESSION_REDIS_DB', 1)}"
+        try:
+            return RedisSessionService(
+                redis_url,
+                ttl_seconds=ttl_seconds or _default_int("AGENT_SESSION_TTL", 1800),
+                max_events=_default_int("AGENT_SESSION_MAX_EVENTS", 100),
+            )
+        except ImportError:
+            logger.warning("redis 패키지가 없어 InMemorySessionService를 사용합니다.")
+    elif backend != "memory":
+        logger.warning("알 수 없는 AGENT_SESSION_BACKEND=%s - memory 사용", backend)
+    return InMemorySessionService()
+
+
+class SessionManager:
+    """(사용자, 대화 ID)별 ADK 세션을 재사용하고 유휴/초과 세션을 정리한다.
+
+    같은 대화의 요청은 키별 잠금으로 직렬화해 세션 이벤트가 섞이지 않게 한다.
+    대화 ID가 없는 요청은 일회성 세션을 만들고 실행이 끝나면 바로 삭제한다.
+    """
+
+    def __init__(
+        self,
+        session_service: Optional[BaseSessionService] = None,
+        *,
+        app_name: str,
+        ttl_seconds: Optional[int] = None,
+        max_sessions: Optional[int] = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds or _default_int("AGENT_SESSION_TTL", 1800)
+        self.max_sessions = max_sessions or _default_int("AGENT_SESSION_MAX", 1000)
+        self.session_service = session_service or build_session_service(self.ttl_seconds)
+        self.app_name = app_name
+        self._last_used: "OrderedDict[SessionKey, float]" = OrderedDict()
+        self._locks: Dict[SessionKey, asyncio.Lock] = {}
+
+    @property
+    def _external_expiry(self) -> bool:
+        return bool(getattr(self.session_service, "manages_expiry", False))
+
+    def _touch(self, key: SessionKey) -> None:
+        self._last_used[key] = time.monotonic()
+        self._last_used.move_to_end(key)
+
+    async def _ensure(self, user_id: str, session_id: str, state: Dict[str, Any]) -> None:
+        state = {k: v for k, v in state.items() if not k.startswith(State.TEMP_PREFIX)}
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        if session is None:
+            try:
+                await self.session_service.create_session(
+                    app_name=self.app_name, user_id=user_id, session_id=session_id, state=state
+                )
+                return
+            except AlreadyExistsError:
+                # 다른 레플리카가 먼저 만든 경우 (Redis 백엔드)
+                session = await self.session_service.get_session(
+                    app_name=self.app_name, user_id=user_id, session_id=session_id
+                )
+                if session is None:
+                    raise
+        # 기존 대화 세션: 값이 바뀐 키만 state_delta 로 기록해 히스토리가 매 턴 불어나지 않게 한다.
+        delta = {k: v for k, v in state.items() if session.state.get(k) != v}
+        if delta:
+            await self.session_service.append_event(
+                session,
+                Event(
+                    author="user",
+                    invocation_id=f"state-{uuid4().hex}",
+                    actions=EventActions(state_delta=delta),
+                ),
+            )
+
+    @asynccontextmanager
+    async def session(
+        self, user_id: str, conversation_id: Optional[str], state: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """세션을 확보하고 session_id를 돌려준다. 블록을 벗어나면 사용 시각을 갱신한다."""
+        ephemeral = not conversation_id
+        session_id = conversation_id or uuid4().hex
+        key = (user_id, session_id)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            await self._ensure(user_id, session_id, state or {})
+            self._touch(key)
+            try:
+                yield session_id
+            finally:
+                if ephemeral:
+                    await self._delete(key)
+                else:
+                    self._touch(key)
+        if ephemeral:
+            self._locks.pop(key, None)
+        await self.evict()
+
+    async def _delete(self, key: SessionKey) -> None:
+        self._last_used.pop(key, None)
+        try:
+            await self.session_service.delete_session(
+                app_name=self.app_name, user_id=key[0], session_id=key[1]
+            )
+        except Exception:
+            logger.debug("세션 삭제 실패: %s", key, exc_info=True)
+
+    async def evict(self) -> int:
+        """유휴 TTL을 넘었거나 최대 개수를 초과한 세션을 오래된 순으로 정리한다."""
+        deadline = time.monotonic() - self.ttl_seconds
+        victims = []
+        overflow = len(self._last_used) - self.max_sessions
+        for key, last_used in self._last_used.items():
+            if last_used >= deadline and overflow <= 0:
+                break
+            lock = self._locks.get(key)
+            if lock is not None and lock.locked():
+                continue
+            victims.append(key)
+            overflow -= 1
+        for key in victims:
+            self._locks.pop(key, None)
+            if self._external_expiry:
+                # Redis 키는 자체 TTL로 만료되므로 로컬 기록만 정리한다.
+                self._last_used.pop(key, None)
+            else:
+                await self._delete(key)
+        if victims:
+            logger.debug("세션 %d개 정리 (남은 세션 %d개)", len(victims), len(self._last_used))
+        return len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.session_service).__name__,
+            "tracked_sessions": len(self._last_used),
+            "ttl_seconds": self.ttl_seconds,
+            "max_sessions": self.max_sessions,
+        }
+
+
+__all__ = ["SessionManager", "RedisSessionService", "build_session_service"]
@@ -0,0 +1,112 @@
+"""Signatures (and verifications) per second: single-item vs batch JWS endpoints.
+
+For ``N`` synthetic agent cards the script measures
+
+* ``single``          - one ``POST /sign`` (``/verify``) per card
+* ``batch``           - ``POST /sign/batch`` (``/verify/batch``) with ``parallel=false``
+* ``batch-parallel``  - the same with ``parallel=true`` (split across ``JWS_BATCH_WORKERS`` threads)
+
+and checks that every batch result verifies against its card hash.
+
+By default the app runs in-process through FastAPI's ``TestClient`` (no network, so
+the single-item numbers understate real round-trip cost). Pass ``--url`` to measure a
+running server instead.
+
+Usage::
+
+    python jws-server/benchmarks/sign_batch.py [--cards 2000] [--batch-size 500]
+        [--url http://127.0.0.1:8001]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def make_card(i: int) -> dict:
+    return {
+        "protocolVersion": "0.3.0",
+        "name": f"bench-agent-{i:05d}",
+        "description": "Benchmark agent card",
+        "url": f"http://localhost:{9000 + i}/",
+        "version": "1.0.0",
+        "provider": {"organization": "bench", "url": "http://localhost"},
+        "capabilities": {"extensions": [{"uri": "http://localhost/ext/trace", "params": {"i": i}}]},
+        "skills": [
+            {"id": f"skill-{n}", "name": f"Skill {n}", "description": "bench", "tags": ["bench"]}
+            for n in range(5)
+        ],
+    }
+
+
+def _client(url: str | None):
+    if url:
+        import requests
+
+        session = requests.Session()
+        base = url.rstrip("/")
+        return lambda path, body: session.post(base + path, json=body, timeout=60).json()
+
+    from fastapi.testclient import TestClient
+
+    import jws
+
+    client = TestClient(jws.app)
+    return lambda path, body: client.post(path, json=body).json()
+
+
+def _rate(label: str, count: int, elapsed: float) -> None:
+    print(f"{label:<22} {count / elapsed:10.1f} /s  ({elapsed * 1000:8.1f} ms total)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--url", default=None, help="running jws-server (default: in-process)")
+    args = parser.parse_args()
+
+    post = _client(args.url)
+    items = [
+        {"sub": f"bench#agent:bench-agent-{i:05d}.v1.0.0", "card": make_card(i)} for i in range(args.cards)
+    ]
+    chunks = [items[i:i + args.batch_size] for i in range(0, len(items), args.batch_size)]
+    print(f"cards={args.cards} batch_size={args.batch_size} target={args.url or 'in-process'}")
+
+    started = time.perf_counter()
+    for item in items:
+        post("/sign", item)
+    _rate("sign single", len(items), time.perf_counter() - started)
+
+    tokens: list[str] = []
+    for parallel in (False, True):
+        started = time.perf_counter()
+        results = [r for chunk in chunks for r in post("/sign/batch", {"items": chunk, "parallel": parallel})["results"]]
+        _rate(f"sign batch{'-parallel' if parallel else ''}", len(items), time.perf_counter() - started)
+        assert all(r["ok"] for r in results), "batch signing failed"
+        tokens = [r["jws"] for r in results]
+
+    checks = [{"jws": token, "card": item["card"]} for token, item in zip(tokens, items)]
+    started = time.perf_counter()
+    for check in checks:
+        post("/verify", check)
+    _rate("verify single", len(checks), time.perf_counter() - started)
+
+    for parallel in (False, True):
+        started = time.perf_counter()
+        results = [
+            r
+            for i in range(0, len(checks), args.batch_size)
+            for r in post("/verify/batch", {"items": checks[i:i + args.batch_size], "parallel": parallel})["results"]
+        ]
+        _rate(f"verify batch{'-parallel' if parallel else ''}", len(checks), time.perf_counter() - started)
+        assert all(r["ok"] and r["hash_verified"] for r in results), "batch verification failed"
+
+
+if __name__ == "__main__":
+    main()
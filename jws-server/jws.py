@@ -1,20 +1,44 @@
-from fastapi import FastAPI, HTTPException, Request
-from jose import jwt, JWTError
+from fastapi import FastAPI, HTTPException, Request, Response
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+import asyncio
 import os
 import uvicorn
 import uuid
 import json
 import hashlib
 import secrets
-import copy
-
-# 샘플용 비밀키 (실제 서비스에서는 .pem 또는 환경변수 사용)
+
+import jwt
+
+from keyset import KeySet, SUPPORTED_ALGS
+
+# 서명 알고리즘: ES256 / EdDSA 는 키 집합(JWS_KEY_DIR)으로 서명, HS256 은 레거시 공유 비밀키(JWS_SECRET)
+ALGORITHM = os.environ.get("JWS_ALG", "ES256")
+# 레거시 HS256 비밀키 (ALGORITHM=HS256 이거나 전환 기간에 이전 토큰을 검증할 때만 사용)
 SECRET_KEY = os.environ.get("JWS_SECRET", "mysecretkey")
-ALGORITHM = "HS256"
-
-app = FastAPI()
-
+ACCEPT_HS256 = os.environ.get("JWS_ACCEPT_HS256", "true").strip().lower() in ("1", "true", "yes")
+# JWKS 응답의 Cache-Control max-age (초). 키 교체 주기보다 충분히 짧아야 한다.
+JWKS_MAX_AGE = int(os.environ.get("JWS_JWKS_MAX_AGE", "300"))
+# 설정 시 POST /keys/rotate 를 X-Admin-Token 헤더로 허용
+ADMIN_TOKEN = os.environ.get("JWS_ADMIN_TOKEN", "")
+
+KEYS = KeySet(
+    os.environ.get("JWS_KEY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "keys")),
+    ALGORITHM,
+    rotate_seconds=int(os.environ.get("JWS_KEY_ROTATE_SECONDS", str(30 * 24 * 3600))),
+    retention_seconds=int(os.environ.get("JWS_KEY_RETENTION_SECONDS", str(90 * 24 * 3600))),
+) if ALGORITHM in SUPPORTED_ALGS else None
+# /sign/batch, /verify/batch 한 번에 받을 수 있는 최대 항목 수
+MAX_BATCH_ITEMS = int(os.environ.get("JWS_MAX_BATCH_ITEMS", "1000"))
+# 이 건수 이상이면 (parallel 미지정 시) 배치를 작업자 스레드에 나눠 처리
+BATCH_PARALLEL_THRESHOLD = int(os.environ.get("JWS_BATCH_PARALLEL_THRESHOLD", "64"))
+BATCH_WORKERS = int(os.environ.get("JWS_BATCH_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+_batch_pool = ThreadPoolExecutor(max_workers=max(BATCH_WORKERS, 1), thread_name_prefix="jws-batch")
+
+app = FastAPI()
+
 def _canonical_bytes(obj) -> bytes:
     """JCS 유사 정준화(JSON sort+no spaces)로 직렬화한 바이트."""
     return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
@@ -25,17 +49,16 @@ def _sha256_prefixed(data: bytes) -> str:
 
 
 def _card_material_for_hash(card: dict) -> dict:
-    """해시 계산 시 시그니처 필드 제거한 카드 사본을 반환."""
-    material = copy.deepcopy(card)
-    if isinstance(material, dict):
-        material.pop("signatures", None)
-    return material
+    """해시 계산 시 시그니처 필드 제거한 카드 사본을 반환 (직렬화만 하므로 얕은 사본으로 충분)."""
+    if not isinstance(card, dict):
+        return card
+    return {k: v for k, v in card.items() if k != "signatures"}
 
 
-# JWS 생성 (JWT 형태로) — 표준 페이로드 스키마 구성
-@app.post("/sign")
-async def sign_payload(request: Request):
-    body = await request.json()
+def _sign_one(body) -> dict:
+    """서명 요청 한 건 처리. 입력 오류는 HTTPException(422) 로 알린다."""
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=422, detail="request body must be an object")
 
     # 입력 파라미터 (기본값 포함)
     iss = body.get("iss") or os.environ.get("JWS_ISS", "ans-registry.example")
@@ -46,6 +69,7 @@ async def sign_payload(request: Request):
 
     # card_hash 계산: card 객체가 오면 정준화 → SHA-256, 없으면 body.card_hash 사용
     card_hash = None
+    material = None
     if isinstance(body.get("card"), dict):
         material = _card_material_for_hash(body["card"])  # signatures 제외
         card_hash = _sha256_prefixed(_canonical_bytes(material))
@@ -78,23 +102,110 @@ async def sign_payload(request: Request):
         "policy_version": policy_version,
     }
 
-    # 헤더에 kid 포함(요청 body 또는 환경변수)
-    kid = body.get("kid") or os.environ.get("JWS_KID", "registry-hs256-key-1")
+    # 헤더에 kid 포함: 키 집합 사용 시 활성 키의 kid, 레거시 HS256 은 요청 body 또는 환경변수
+    if KEYS is not None:
+        key = KEYS.active()
+        signing_key, alg, kid = key.private_key, key.alg, key.kid
+    else:
+        signing_key, alg = SECRET_KEY, "HS256"
+        kid = body.get("kid") or os.environ.get("JWS_KID", "registry-hs256-key-1")
     headers = {"kid": kid}
 
-    token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM, headers=headers)
-    return {"jws": token, "payload": payload}
-
-# JWS 검증 (+ 선택적으로 에이전트 카드/해시 일치 여부 확인)
-@app.post("/verify")
-async def verify_token(request: Request):
-    data = await request.json()
+    token = jwt.encode(payload, signing_key, algorithm=alg, headers=headers)
+    result = {"jws": token, "payload": payload, "kid": kid}
+
+    # 카드 자체(signatures 제외 정준화 JSON)에 대한 detached JWS(RFC 7797) — 카드에 그대로 붙이면
+    # 검증자가 JWKS 공개키만으로 오프라인 검증할 수 있다
+    if material is not None:
+        detached = jwt.api_jws.encode(
+            _canonical_bytes(material), signing_key, algorithm=alg,
+            headers={"kid": kid, "iss": iss, "iat": iat}, is_payload_detached=True,
+        )
+        protected_b64, _, signature_b64 = detached.split(".")
+        result["card_signature"] = {"protected": protected_b64, "signature": signature_b64, "header": {"kid": kid}}
+    return result
+
+
+# JWS 생성 (JWT 형태로) — 표준 페이로드 스키마 구성
+@app.post("/sign")
+async def sign_payload(request: Request):
+    body = await request.json()
+    return _sign_one(body)
+
+
+def _run_chunk(handler, start: int, items: list) -> list:
+    """배치 일부를 처리해 항목별 결과(요청 내 index 포함)를 반환. 항목 오류는 결과로 남기고 계속 진행."""
+    results = []
+    for offset, item in enumerate(items):
+        try:
+            results.append({"index": start + offset, "ok": True, **handler(item)})
+        except HTTPException as e:
+            results.append({"index": start + offset, "ok": False, "status": e.status_code, "error": e.detail})
+    return results
+
+
+async def _run_batch(request: Request, handler) -> dict:
+    """{"items": [...], "parallel": bool?} (또는 배열) 본문을 handler 로 처리.
+
+    작은 배치는 스레드 하나에서, 큰 배치(또는 parallel=true)는 작업자 스레드에 균등 분할해 처리하며
+    어느 쪽이든 이벤트 루프는 막지 않는다. 결과는 항상 요청 순서대로 반환한다.
+    """
+    body = await request.json()
+    items = body.get("items") if isinstance(body, dict) else body
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail="'items' must be an array")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"batch exceeds {MAX_BATCH_ITEMS} items")
+    parallel = body.get("parallel") if isinstance(body, dict) else None
+    if not isinstance(parallel, bool):
+        parallel = len(items) >= BATCH_PARALLEL_THRESHOLD
+
+    loop = asyncio.get_running_loop()
+    workers = max(1, min(BATCH_WORKERS, len(items))) if parallel else 1
+    size = -(-len(items) // workers) if items else 1
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(_batch_pool, _run_chunk, handler, start, items[start:start + size])
+        for start in range(0, len(items), size)
+    ))
+    results = [result for part in parts for result in part]
+    succeeded = sum(1 for result in results if result["ok"])
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
+
+# 여러 건을 한 번의 요청으로 서명 — 항목별 결과를 요청 순서대로 반환
+@app.post("/sign/batch")
+async def sign_batch(request: Request):
+    return await _run_batch(request, _sign_one)
+
+
+def _verification_key(header: dict):
+    """토큰 헤더(kid, alg) -> (검증 키, 알고리즘). 알 수 없는 kid / 허용하지 않는 alg 는 400."""
+    alg = header.get("alg")
+    if alg == "HS256":
+        if KEYS is not None and not ACCEPT_HS256:
+            raise HTTPException(status_code=400, detail="HS256 tokens are no longer accepted")
+        return SECRET_KEY, alg
+    key = KEYS.get(header.get("kid")) if KEYS is not None else None
+    if key is None or key.alg != alg:
+        raise HTTPException(status_code=400, detail={
+            "code": "UNKNOWN_SIGNING_KEY",
+            "message": "token is not signed by a published registry key",
+            "kid": header.get("kid"),
+        })
+    return key.private_key.public_key(), alg
+
+
+def _verify_one(data) -> dict:
+    """검증 요청 한 건 처리. 입력/토큰/해시 오류는 HTTPException 으로 알린다."""
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=422, detail="request body must be an object")
     token = data.get("jws")
     if not isinstance(token, str) or not token:
         raise HTTPException(status_code=422, detail="'jws' is required")
     try:
-        decoded = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-    except JWTError as e:
+        key, alg = _verification_key(jwt.get_unverified_header(token))
+        decoded = jwt.decode(token, key, algorithms=[alg])
+    except jwt.InvalidTokenError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     expected_hash = decoded.get("card_hash")
@@ -124,9 +235,59 @@ async def verify_token(request: Request):
         hash_verified = True
 
     return {"valid": True, "payload": decoded, "hash_verified": hash_verified}
-
-
-if __name__ == "__main__":
-    # 환경변수 PORT로 오버라이드 가능, 기본 8001
-    port = int(os.environ.get("PORT", "8001"))
-    uvicorn.run(app, host="0.0.0.0", port=port, reload=True)
+
+
+# JWS 검증 (+ 선택적으로 에이전트 카드/해시 일치 여부 확인)
+@app.post("/verify")
+async def verify_token(request: Request):
+    data = await request.json()
+    return _verify_one(data)
+
+
+# 여러 토큰을 한 번의 요청으로 검증 — 실패한 항목은 status/error 로 표시
+@app.post("/verify/batch")
+async def verify_batch(request: Request):
+    return await _run_batch(request, _verify_one)
+
+
+# 공개키 집합 (next / active / retention 안의 retired 키). 검증자는 max-age 동안 캐시해 오프라인 검증한다.
+@app.get("/.well-known/jwks.json")
+async def jwks(request: Request):
+    cache_headers = {"Cache-Control": f"public, max-age={JWKS_MAX_AGE}"}
+    if KEYS is None:
+        return Response(content='{"keys":[]}', media_type="application/json", headers=cache_headers)
+    published = KEYS.jwks()
+    headers = {**cache_headers, "ETag": published["etag"]}
+    if request.headers.get("if-none-match") == published["etag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=json.dumps(published["body"], separators=(",", ":")),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+# 키 상태 목록 (공개 정보만). 레지스트리가 retired 키로 서명된 카드를 찾아 다시 서명할 때 쓴다.
+@app.get("/keys")
+async def list_keys():
+    if KEYS is None:
+        return {"alg": ALGORITHM, "keys": []}
+    return {"alg": ALGORITHM, "retention_seconds": KEYS.retention_seconds, "keys": KEYS.describe()}
+
+
+# 수동 키 교체 (JWS_ADMIN_TOKEN 설정 시에만 허용)
+@app.post("/keys/rotate")
+async def rotate_keys(request: Request):
+    if KEYS is None:
+        raise HTTPException(status_code=409, detail=f"key rotation requires JWS_ALG in {SUPPORTED_ALGS}")
+    token = request.headers.get("x-admin-token") or ""
+    if not ADMIN_TOKEN or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="admin token required")
+    key = await asyncio.to_thread(KEYS.rotate)
+    return {"active_kid": key.kid, "alg": key.alg, "keys": [k["kid"] for k in KEYS.jwks()["body"]["keys"]]}
+
+
+if __name__ == "__main__":
+    # 환경변수 PORT로 오버라이드 가능, 기본 8001
+    port = int(os.environ.get("PORT", "8001"))
+    uvicorn.run(app, host="0.0.0.0", port=port, reload=True)
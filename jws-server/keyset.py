@@ -0,0 +1,234 @@
+"""레지스트리 서명 키 집합 (ES256 / EdDSA) 과 키 교체.
+
+키는 JWS_KEY_DIR 아래에 보관한다::
+
+    {dir}/keyset.json   [{kid, alg, created_at, activated_at, retired_at}, ...]
+    {dir}/{kid}.pem     PKCS#8 개인키 (0600)
+
+키 상태는 세 가지다.
+
+- next:    JWKS 에는 공개되지만 아직 서명에 쓰지 않는 다음 키 (activated_at 없음)
+- active:  현재 서명 키 (하나뿐)
+- retired: 교체된 이전 키. JWKS 에 retention 기간 동안 남아 이미 발급한 서명을 계속 검증할 수 있다.
+
+교체(rotate)는 next -> active, active -> retired 로 옮기고 새 next 키를 만든다. 다음 키를 미리 공개해
+두므로, JWKS 를 max-age 동안 캐시한 검증자도 교체 직후의 서명을 바로 검증할 수 있다.
+retired 키는 retention 이 지나면 공개 목록에서 빠지므로, 레지스트리는 ``GET /keys`` 로 retired 키를 확인해
+그 키로 서명된 저장 카드를 retention 안에 다시 서명한다.
+"""
+import hashlib
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_ALGS = ("ES256", "EdDSA")
+_METADATA_FILE = "keyset.json"
+
+
+def _generate(alg: str):
+    if alg == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if alg == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unsupported signing algorithm: {alg}")
+
+
+@dataclass
+class SigningKey:
+    kid: str
+    alg: str
+    private_key: Any
+    created_at: int
+    activated_at: Optional[int] = None
+    retired_at: Optional[int] = None
+
+    @property
+    def state(self) -> str:
+        if self.retired_at is not None:
+            return "retired"
+        return "active" if self.activated_at is not None else "next"
+
+    def public_jwk(self) -> Dict[str, Any]:
+        algorithm = ECAlgorithm if self.alg == "ES256" else OKPAlgorithm
+        jwk = json.loads(algorithm.to_jwk(self.private_key.public_key()))
+        jwk.update({"kid": self.kid, "alg": self.alg, "use": "sig"})
+        return jwk
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "kid": self.kid,
+            "alg": self.alg,
+            "created_at": self.created_at,
+            "activated_at": self.activated_at,
+            "retired_at": self.retired_at,
+        }
+
+
+class KeySet:
+    """서명/검증 키 목록. 파일 저장소를 쓸 수 없으면 프로세스 메모리에만 보관한다."""
+
+    def __init__(self, directory: Optional[str], alg: str, rotate_seconds: int, retention_seconds: int):
+        if alg not in SUPPORTED_ALGS:
+            raise ValueError(f"Unsupported signing algorithm: {alg}")
+        self.directory = os.path.abspath(directory) if directory else None
+        self.alg = alg
+        self.rotate_seconds = rotate_seconds
+        self.retention_seconds = retention_seconds
+        self._keys: List[SigningKey] = []
+        self._lock = threading.RLock()
+        self._jwks_cache: Optional[Dict[str, Any]] = None
+        self._load()
+        active = self._active()
+        if active is None or active.alg != self.alg:
+            self.rotate()
+
+    # ========== Storage ==========
+    def _load(self) -> None:
+        if not self.directory:
+            return
+        try:
+            with open(os.path.join(self.directory, _METADATA_FILE), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable key set metadata: %s", e)
+            return
+        for entry in entries:
+            try:
+                with open(os.path.join(self.directory, f"{entry['kid']}.pem"), "rb") as f:
+                    private_key = serialization.load_pem_private_key(f.read(), password=None)
+            except (OSError, KeyError, ValueError) as e:
+                logger.warning("Skipping signing key %s: %s", entry.get("kid"), e)
+                continue
+            self._keys.append(SigningKey(
+                kid=entry["kid"],
+                alg=entry["alg"],
+                private_key=private_key,
+                created_at=int(entry["created_at"]),
+                activated_at=entry.get("activated_at"),
+                retired_at=entry.get("retired_at"),
+            ))
+
+    def _save(self) -> None:
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for key in self._keys:
+                path = os.path.join(self.directory, f"{key.kid}.pem")
+                if os.path.exists(path):
+                    continue
+                pem = key.private_key.private_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PrivateFormat.PKCS8,
+                    serialization.NoEncryption(),
+                )
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(pem)
+            tmp_path = os.path.join(self.directory, f"{_METADATA_FILE}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump([key.metadata() for key in self._keys], f, indent=2)
+            os.replace(tmp_path, os.path.join(self.directory, _METADATA_FILE))
+            # retention 이 지나 목록에서 빠진 키 파일 정리
+            live = {f"{key.kid}.pem" for key in self._keys}
+            for name in os.listdir(self.directory):
+                if name.endswith(".pem") and name not in live:
+                    os.remove(os.path.join(self.directory, name))
+        except OSError as e:
+            logger.warning("Key set not persisted (%s); keys are kept in memory only", e)
+
+    # ========== Keys ==========
+    def _new_key(self, now: int) -> SigningKey:
+        stamp = time.strftime("%Y%m%d%H%M%S", time.gmtime(now))
+        kid = f"registry-{self.alg.lower()}-{stamp}-{secrets.token_hex(2)}"
+        return SigningKey(kid=kid, alg=self.alg, private_key=_generate(self.alg), created_at=now)
+
+    def _active(self) -> Optional[SigningKey]:
+        return next((key for key in reversed(self._keys) if key.state == "active"), None)
+
+    def rotate(self) -> SigningKey:
+        """next 키를 활성화하고(없으면 새로 생성) 새 next 키를 만든다. 활성화된 키를 반환."""
+        with self._lock:
+            now = int(time.time())
+            current = self._active()
+            if current is not None:
+                current.retired_at = now
+            upcoming = next((key for key in self._keys if key.state == "next" and key.alg == self.alg), None)
+            if upcoming is None:
+                upcoming = self._new_key(now)
+                self._keys.append(upcoming)
+            upcoming.activated_at = now
+            self._keys.append(self._new_key(now))
+            self._keys = [
+                key for key in self._keys
+                if (key.retired_at is None or key.retired_at + self.retention_seconds > now)
+                and not (key.state == "next" and key.alg != self.alg)
+            ]
+            self._jwks_cache = None
+            self._save()
+            logger.info("Signing key rotated: active=%s", upcoming.kid)
+            return upcoming
+
+    def active(self) -> SigningKey:
+        """현재 서명 키. 교체 주기가 지났으면 먼저 교체한다."""
+        with self._lock:
+            key = self._active()
+            if key is None or (self.rotate_seconds > 0 and key.activated_at + self.rotate_seconds <= time.time()):
+                key = self.rotate()
+            return key
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        """검증용 키 조회 (retention 이 지난 retired 키는 None)."""
+        if not kid:
+            return None
+        with self._lock:
+            for key in self._keys:
+                if key.kid == kid:
+                    if key.retired_at is not None and key.retired_at + self.retention_seconds <= time.time():
+                        return None
+                    return key
+        return None
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """공개 중인 키의 메타데이터와 상태 (retired 키는 공개가 끝나는 expires_at 포함)."""
+        with self._lock:
+            now = time.time()
+            described = []
+            for key in self._keys:
+                expires_at = key.retired_at + self.retention_seconds if key.retired_at is not None else None
+                if expires_at is not None and expires_at <= now:
+                    continue
+                described.append({**key.metadata(), "state": key.state, "expires_at": expires_at})
+            return described
+
+    def jwks(self) -> Dict[str, Any]:
+        """{"keys": [...], "etag": ...} - 공개 중인 모든 키 (next, active, retention 안의 retired)."""
+        with self._lock:
+            now = time.time()
+            expired = any(
+                key.retired_at is not None and key.retired_at + self.retention_seconds <= now for key in self._keys
+            )
+            if self._jwks_cache is None or expired:
+                if expired:
+                    self._keys = [
+                        key for key in self._keys
+                        if key.retired_at is None or key.retired_at + self.retention_seconds > now
+                    ]
+                    self._save()
+                body = {"keys": [key.public_jwk() for key in self._keys]}
+                raw = json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+                self._jwks_cache = {"body": body, "etag": '"' + hashlib.sha256(raw).hexdigest()[:32] + '"'}
+            return self._jwks_cache
@@ -4,7 +4,7 @@ import uuid
 import logging
 import httpx
 import asyncio
-from typing import List
+from typing import List, Optional
 from urllib.parse import urlsplit, urlunsplit
 
 from google.adk.agents import LlmAgent
@@ -17,12 +17,17 @@ from google.genai.types import Content, Part as GenaiPart
 
 from a2a.types import (
     AgentCard,
+    JSONRPCErrorResponse,
     Message,
     Role,
     Part,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
     TextPart,
     MessageSendParams,
     SendMessageRequest,
+    SendStreamingMessageRequest,
 )
 
 # 프로젝트 루트 디렉토리를 PYTHONPATH에 추가
@@ -30,7 +35,8 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 from utils.model_config import get_model_with_fallback
-from iam.policy_enforcement import GLOBAL_REQUEST_TOKEN, PolicyEnforcementPlugin
+from iam.agent_executor import RESPONSE_ARTIFACT, current_task_stream
+from iam.policy_enforcement import AUTH_TOKEN_STATE_KEY, GLOBAL_REQUEST_TOKEN, PolicyEnforcementPlugin
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -84,8 +90,16 @@ def _rewrite_card_url_if_needed(card: AgentCard) -> AgentCard:
     card.url = rewritten_url
     return card
 
+from .card_cache import agent_card_cache
+from .http_pool import http_client_pool
 from .jwt_client import jwt_token_manager
 
+def _state_auth_token(tool_context) -> str:
+    """실행 범위("temp:") state의 호출자 토큰 (이전 세션 호환을 위해 auth_token 도 확인)."""
+    state = tool_context.state
+    return state.get(AUTH_TOKEN_STATE_KEY) or state.get("auth_token") or ""
+
+
 def _build_auth_headers(tool_context=None) -> dict[str, str]:
     """
     여러 소스에서 JWT 토큰을 찾아 Authorization 헤더를 구성
@@ -97,7 +111,7 @@ def _build_auth_headers(tool_context=None) -> dict[str, str]:
     
     # 1. tool_context.state에서 토큰 확인
     if tool_context and hasattr(tool_context, 'state'):
-        token = tool_context.state.get("auth_token", "")
+        token = _state_auth_token(tool_context)
         if token:
             token_source = "tool_context.state"
     
@@ -122,12 +136,7 @@ def _build_auth_headers(tool_context=None) -> dict[str, str]:
     
     return headers
 
-def load_agent_cards(tool_context) -> List[str]:
-    """
-    레지스트리 서버에서 에이전트 카드 목록을 조회해서 state에 저장,
-    에이전트 이름 리스트 반환
-    Docker 환경을 고려하여 여러 URL을 시도
-    """
+def _registry_base_urls() -> List[str]:
     # Docker 환경을 고려한 URL 리스트 (우선순위 순)
     base_urls = [
         os.getenv("AGENT_REGISTRY_URL", "").rstrip("/"),  # 환경 변수 우선
@@ -143,34 +152,40 @@ def load_agent_cards(tool_context) -> List[str]:
         if url and url not in seen:
             seen.add(url)
             unique_urls.append(url)
-    base_urls = unique_urls
-    
-    headers = _build_auth_headers(tool_context)
+    return unique_urls
+
+
+async def _fetch_registry_cards(headers: dict, etag: str | None = None):
+    """레지스트리 /api/agents/search 호출. (status, etag, json_body)를 반환한다.
+
+    etag가 있으면 If-None-Match로 재검증하며, 304면 json_body는 None이다.
+    """
+    base_urls = _registry_base_urls()
+    request_headers = dict(headers or {})
+    if etag:
+        request_headers["If-None-Match"] = etag
     print(f"[load_agent_cards] 시작 - 시도할 URL 목록: {base_urls}")
     print(f"[load_agent_cards] Authorization 헤더 존재: {bool(headers.get('Authorization'))}")
-    
-    json_body = None
-    successful_url = None
+
     last_error = None
-    
+
     # 여러 URL 순차 시도
     for base_url in base_urls:
         url = f"{base_url}/api/agents/search"
         try:
             print(f"[load_agent_cards] 시도 중: {url}")
-            with httpx.Client(timeout=10.0, headers=headers or None) as client:
-                resp = client.get(url)
-            
+            client = http_client_pool.get_client(url, timeout=10.0)
+            resp = await client.get(url, headers=request_headers or None)
+
             print(f"[load_agent_cards] HTTP {resp.status_code} from {url}")
-            
+
+            if resp.status_code == 304:
+                return 304, etag, None
             if resp.status_code == 200:
-                json_body = resp.json()
-                successful_url = url
                 print(f"[load_agent_cards] ✓ 성공: {url}")
-                break
-            else:
-                print(f"[load_agent_cards] ✗ 실패 (HTTP {resp.status_code}): {url}")
-                
+                return 200, resp.headers.get("ETag"), resp.json()
+            print(f"[load_agent_cards] ✗ 실패 (HTTP {resp.status_code}): {url}")
+
         except httpx.ConnectError as e:
             print(f"[load_agent_cards] ✗ 연결 실패: {url} - {e}")
             last_error = e
@@ -183,54 +198,77 @@ def load_agent_cards(tool_context) -> List[str]:
             print(f"[load_agent_cards] ✗ 오류: {url} - {type(e).__name__}: {e}")
             last_error = e
             continue
-    
+
     # 모든 URL 실패 시
-    if json_body is None:
-        error_msg = f"모든 Agent Registry URL 연결 실패. 마지막 오류: {last_error}"
-        print(f"[load_agent_cards] ❌ {error_msg}")
-        logger.error(error_msg)
-        tool_context.state["cards"] = {}
-        return []
-    
-    # 응답 파싱
-    print(f"[load_agent_cards] 응답 타입: {type(json_body)}, 키: {json_body.keys() if isinstance(json_body, dict) else 'N/A'}")
-    
-    if isinstance(json_body, dict):
-        if "agents" in json_body:
-            agents_data = json_body["agents"]
-        elif "items" in json_body:
-            agents_data = json_body["items"]
-        else:
-            agents_data = []
-    elif isinstance(json_body, list):
-        agents_data = json_body
-    else:
-        agents_data = []
-    
-    print(f"[load_agent_cards] 에이전트 데이터 수: {len(agents_data)}")
+    error_msg = f"모든 Agent Registry URL 연결 실패. 마지막 오류: {last_error}"
+    print(f"[load_agent_cards] ❌ {error_msg}")
+    logger.error(error_msg)
+    return 0, None, None
+
+
+def _parse_agent_card(card_payload: dict) -> AgentCard:
+    if hasattr(AgentCard, "model_validate"):   # pydantic v2
+        card = AgentCard.model_validate(card_payload)
+    else:  # pydantic v1
+        card = AgentCard.parse_obj(card_payload)
+    return _rewrite_card_url_if_needed(card)
+
+
+def _dump_cards(cards: dict) -> dict[str, dict]:
+    """세션 state 저장용 카드 dict. state는 JSON으로 저장되므로(Redis 세션) AgentCard 객체를 넣지 않는다."""
+    return {
+        name: card.model_dump(mode="json", by_alias=True, exclude_none=True) if isinstance(card, AgentCard) else card
+        for name, card in cards.items()
+    }
+
+
+def _card_from_state(value) -> Optional[AgentCard]:
+    """state의 카드(dict)를 AgentCard로 복원 (URL 보정은 저장 전에 이미 적용됨)."""
+    if value is None or isinstance(value, AgentCard):
+        return value
+    return AgentCard.model_validate(value)
+
+
+async def get_agent_cards(headers: dict) -> dict[str, AgentCard]:
+    """호출자 토큰 단위 캐시를 거쳐 에이전트 카드를 반환한다."""
+    auth = (headers or {}).get("Authorization", "")
+    token = auth[7:].strip() if auth.lower().startswith("bearer ") else auth
+    return await agent_card_cache.get(
+        token,
+        lambda etag: _fetch_registry_cards(headers, etag),
+        _parse_agent_card,
+    )
+
+
+async def prefetch_agent_cards(auth_token: str, context=None) -> dict:
+    """세션 생성 전에 카드를 미리 state에 주입한다 (ADKAgentExecutor state_initializer)."""
+    headers = {"Authorization": f"Bearer {auth_token}"} if auth_token else _build_auth_headers()
+    try:
+        cards = await get_agent_cards(headers)
+    except Exception as exc:
+        logger.warning("에이전트 카드 사전 로드 실패: %s", exc)
+        return {}
+    return {"cards": _dump_cards(cards)} if cards else {}
 
-    cards = {}
-    for idx, data in enumerate(agents_data):
-        try:
-            card_payload = data.get("card") if isinstance(data, dict) else data
-            if not card_payload:
-                print(f"[load_agent_cards] ⚠ 인덱스 {idx}: card 페이로드 없음")
-                continue
-            if hasattr(AgentCard, "model_validate"):   # pydantic v2
-                card = AgentCard.model_validate(card_payload)
-            else:  # pydantic v1
-                card = AgentCard.parse_obj(card_payload)
-
-            card = _rewrite_card_url_if_needed(card)
-            name = getattr(card, "name", None) or card.url or "unknown_agent"
-            cards[name] = card
-            print(f"[load_agent_cards] ✓ 에이전트 로드됨: {name} -> {card.url}")
-        except Exception as e:
-            print(f"[load_agent_cards] ⚠ 인덱스 {idx} 파싱 실패: {e}")
-            continue
 
-    # state에 저장
-    tool_context.state["cards"] = cards
+async def load_agent_cards(tool_context) -> List[str]:
+    """
+    레지스트리 서버에서 에이전트 카드 목록을 조회해서 state에 저장,
+    에이전트 이름 리스트 반환
+    세션 생성 시 카드가 이미 주입되어 있으면 레지스트리를 호출하지 않고 state에서 읽는다.
+    """
+    cards = tool_context.state.get("cards")
+    if cards:
+        print(f"[load_agent_cards] ✓ state에 주입된 카드 사용: {list(cards.keys())}")
+        return list(cards.keys())
+
+    headers = _build_auth_headers(tool_context)
+    cards = await get_agent_cards(headers)
+    for name, card in cards.items():
+        print(f"[load_agent_cards] ✓ 에이전트 로드됨: {name} -> {card.url}")
+
+    # state에 저장 (JSON 호환 dict)
+    tool_context.state["cards"] = _dump_cards(cards)
     print(f"[load_agent_cards] 완료 - 총 {len(cards)}개 에이전트 로드: {list(cards.keys())}")
     return list(cards.keys())
 
@@ -238,38 +276,30 @@ def load_agent_cards(tool_context) -> List[str]:
 
 # agent_executor.py (또는 tools.py)
 
-async def call_remote_agent(tool_context, agent_name: str, task: str):
-    """
-    A2A SDK 기반 리모트 에이전트 호출 (토큰 전파 기능 추가됨)
-    """
-    # 1. 에이전트 카드 조회
-    cards: dict[str, AgentCard] = tool_context.state.get("cards", {})
-    
+def _find_card(cards: dict, agent_name: str):
     # [Strict Mode 대응] 대소문자 유연성 확보 (선택사항)
     # 만약 cards 키가 소문자인데 요청이 대문자로 오면 못 찾을 수 있음
     target_card = cards.get(agent_name)
     if not target_card:
         # 혹시 모르니 소문자로도 한번 찾아봄
         for k, v in cards.items():
-            if k.lower() == agent_name.lower():
+            if k.lower() == str(agent_name).lower():
                 target_card = v
                 break
-    
-    if not target_card:
-        return {"error": f"Agent '{agent_name}' not found in registry."}
+    return target_card
+
 
+def _propagated_auth_headers(tool_context, agent_name: str) -> dict | None:
     # ------------------------------------------------------------------
-    # 2. [핵심 수정] 토큰 전파 (Token Propagation)
+    # [핵심 수정] 토큰 전파 (Token Propagation)
     # ------------------------------------------------------------------
     auth_token = ""
     if hasattr(tool_context, "state"):
-        auth_token = tool_context.state.get("auth_token", "") or ""
+        auth_token = _state_auth_token(tool_context)
 
     if not auth_token:
         auth_token = GLOBAL_REQUEST_TOKEN.get("")
 
-    default_headers = {"Authorization": f"Bearer {auth_token}"} if auth_token else None
-
     # ==================================================================
     # [검증] 여기서 로그가 안 찍히거나 None이면, 오케스트레이터도 토큰을 못 잡은 겁니다.
     # ==================================================================
@@ -280,30 +310,204 @@ async def call_remote_agent(tool_context, agent_name: str, task: str):
         print(f"[Orchestrator 발신 체크] ⚠️ 경고: 토큰 없이 요청을 보냅니다")
     # ==================================================================
 
-    try:
-        async with httpx.AsyncClient(timeout=60.0, headers=default_headers) as httpx_client:
-            from a2a.client import A2AClient
-            client = A2AClient(httpx_client=httpx_client, agent_card=target_card)
-
-            # 3. 요청 메시지 생성
-            message = Message(
-                role=Role.user,
-                parts=[Part(root=TextPart(text=task))],
-                messageId=uuid.uuid4().hex,
-            )
-            send_params = MessageSendParams(message=message)
-            request = SendMessageRequest(id=str(uuid.uuid4()), params=send_params)
-
-            # 4. 서버 호출
-            print(f"[Tool:call_remote_agent] Sending request to {target_card.url}...")
-            resp = await client.send_message(request)
-
-            # 5. 결과 반환
+    return {"Authorization": f"Bearer {auth_token}"} if auth_token else None
+
+
+def _parts_text(parts) -> str:
+    texts = []
+    for part in parts or []:
+        text = getattr(getattr(part, "root", part), "text", None)
+        if text:
+            texts.append(text)
+    return "".join(texts)
+
+
+async def _send_to_agent(target_card: AgentCard, task: str, headers: dict | None) -> dict:
+    # 카드 URL별로 캐시된 A2AClient(keep-alive 커넥션 풀 공유)를 사용하고,
+    # 사용자별 토큰은 요청 단위 헤더로만 전달한다.
+    client = http_client_pool.get_a2a_client(target_card)
+    http_kwargs = {"headers": headers} if headers else None
+
+    # 요청 메시지 생성. 오케스트레이터 대화 ID를 그대로 넘겨 하위 에이전트도
+    # 같은 대화의 세션(이전 턴 히스토리)을 이어 쓰게 한다.
+    upstream = current_task_stream()
+    message = Message(
+        role=Role.user,
+        parts=[Part(root=TextPart(text=task))],
+        messageId=uuid.uuid4().hex,
+        contextId=upstream.updater.context_id if upstream is not None else None,
+    )
+    send_params = MessageSendParams(message=message)
+
+    capabilities = getattr(target_card, "capabilities", None)
+    if not getattr(capabilities, "streaming", False):
+        request = SendMessageRequest(id=str(uuid.uuid4()), params=send_params)
+        print(f"[Tool:call_remote_agent] Sending request to {target_card.url}...")
+        resp = await client.send_message(request, http_kwargs=http_kwargs)
+        return resp.model_dump(mode="json", exclude_none=True)
+
+    # 스트리밍 지원 에이전트: message/stream으로 호출하고, 하위 에이전트의 토큰을
+    # 현재 오케스트레이터 태스크에 그대로 중계한다.
+    request = SendStreamingMessageRequest(id=str(uuid.uuid4()), params=send_params)
+    print(f"[Tool:call_remote_agent] Streaming request to {target_card.url}...")
+    agent_name = getattr(target_card, "name", "") or target_card.url
+    state = None
+    final_text = ""
+    status_text = ""
+    async for resp in client.send_message_streaming(request, http_kwargs=http_kwargs):
+        root = resp.root
+        if isinstance(root, JSONRPCErrorResponse):
             return resp.model_dump(mode="json", exclude_none=True)
-            
+        event = root.result
+        if isinstance(event, TaskArtifactUpdateEvent):
+            text = _parts_text(event.artifact.parts)
+            if event.artifact.name == RESPONSE_ARTIFACT:
+                final_text = text
+            elif upstream is not None and text:
+                await upstream.text(text, key=f"agent:{agent_name}", metadata={"source_agent": agent_name})
+        elif isinstance(event, TaskStatusUpdateEvent):
+            state = event.status.state
+            if event.status.message is not None:
+                status_text = _parts_text(event.status.message.parts)
+        elif isinstance(event, Task):
+            state = event.status.state
+        elif isinstance(event, Message):
+            # 메시지로 바로 응답하는 (비태스크형) 에이전트
+            final_text = _parts_text(event.parts)
+
+    return {
+        "agent": agent_name,
+        "state": getattr(state, "value", state) or "completed",
+        "result": final_text or status_text,
+    }
+
+
+async def call_remote_agent(tool_context, agent_name: str, task: str):
+    """
+    A2A SDK 기반 리모트 에이전트 호출 (토큰 전파 기능 추가됨)
+    """
+    # 1. 에이전트 카드 조회
+    cards: dict[str, dict] = tool_context.state.get("cards", {})
+    target_card = _card_from_state(_find_card(cards, agent_name))
+
+    if not target_card:
+        return {"error": f"Agent '{agent_name}' not found in registry."}
+
+    # 2. 토큰 전파
+    default_headers = _propagated_auth_headers(tool_context, agent_name)
+
+    try:
+        # 3~5. 요청 생성 → 서버 호출 → 결과 반환
+        return await _send_to_agent(target_card, task, default_headers)
+
     except Exception as exc:
         logger.error("원격 에이전트 호출 실패 (%s): %s", agent_name, exc)
         return {"error": f"Failed to call agent {agent_name}: {exc}"}
+
+
+FANOUT_DEADLINE_SECONDS = float(os.getenv("ORCHESTRATOR_FANOUT_DEADLINE", "60"))
+FANOUT_MAX_CALLS = int(os.getenv("ORCHESTRATOR_FANOUT_MAX_CALLS", "8"))
+
+
+async def call_remote_agents(tool_context, calls: list[dict], timeout_seconds: float = FANOUT_DEADLINE_SECONDS) -> dict:
+    """
+    여러 에이전트를 동시에 호출하는 병렬 fan-out 도구.
+    calls: [{"agent_name": "<에이전트 이름>", "task": "<위임할 작업>"}, ...]
+    모든 호출은 하나의 공유 데드라인(timeout_seconds) 안에서 동시에 실행되고,
+    끝난 순서대로 결과를 모은다. 데드라인을 넘긴 호출은 취소되고 timeout으로 표시되며
+    나머지 완료된 결과(부분 결과)는 그대로 반환된다.
+    """
+    cards: dict[str, dict] = tool_context.state.get("cards", {})
+    deadline = min(max(float(timeout_seconds or FANOUT_DEADLINE_SECONDS), 1.0), FANOUT_DEADLINE_SECONDS)
+
+    results: list[dict] = []
+    planned: list[tuple[dict, AgentCard]] = []
+    if not isinstance(calls, list):
+        # LLM이 배열 대신 문자열 등을 넘긴 경우 (한 글자씩 호출하지 않도록 전체를 하나의 오류로 처리)
+        calls = [calls] if calls else []
+    for idx, call in enumerate(calls[:FANOUT_MAX_CALLS]):
+        if not isinstance(call, dict):
+            # 잘못된 항목 하나 때문에 나머지 호출이 중단되지 않도록 해당 순번만 오류로 기록
+            results.append({
+                "index": idx, "agent_name": "", "task": "", "status": "error",
+                "error": f"Invalid call at index {idx}: expected an object with agent_name and task.",
+            })
+            continue
+        agent_name = str(call.get("agent_name") or "").strip()
+        task = str(call.get("task") or "")
+        entry = {"index": idx, "agent_name": agent_name, "task": task}
+        target_card = _card_from_state(_find_card(cards, agent_name)) if agent_name else None
+        if not target_card:
+            entry.update(status="error", error=f"Agent '{agent_name}' not found in registry.")
+            results.append(entry)
+            continue
+        planned.append((entry, target_card))
+
+    if len(calls) > FANOUT_MAX_CALLS:
+        logger.warning("call_remote_agents: 최대 %d개까지만 호출 (요청 %d개)", FANOUT_MAX_CALLS, len(calls))
+
+    # 1. 타겟별 정책 검증 (call_remote_agent와 동일한 allowlist 규칙)
+    if planned:
+        verdicts = await asyncio.to_thread(
+            plugin.check_remote_targets, tool_context, [e["agent_name"] for e, _ in planned]
+        )
+        allowed = []
+        for entry, card in planned:
+            violation = verdicts.get(entry["agent_name"])
+            if violation:
+                entry.update(status="denied", error=plugin.sanitize_error_message(violation))
+                results.append(entry)
+            else:
+                allowed.append((entry, card))
+        planned = allowed
+
+    # 2. 허용된 호출을 공유 데드라인 안에서 동시 실행
+    pending: dict[asyncio.Task, dict] = {}
+    for entry, card in planned:
+        headers = _propagated_auth_headers(tool_context, entry["agent_name"])
+        task = asyncio.create_task(_send_to_agent(card, entry["task"], headers))
+        pending[task] = entry
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    # 같은 에이전트를 여러 번 호출할 수 있으므로 에이전트 이름이 아닌 호출 순번(index)으로 기록
+    completed: dict[str, dict] = {}
+    while pending:
+        remaining = deadline - (loop.time() - started)
+        if remaining <= 0:
+            break
+        done, _ = await asyncio.wait(pending.keys(), timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            entry = pending.pop(task)
+            entry["elapsed_ms"] = int((loop.time() - started) * 1000)
+            exc = task.exception()
+            if exc is not None:
+                logger.error("원격 에이전트 호출 실패 (%s): %s", entry["agent_name"], exc)
+                entry.update(status="error", error=f"Failed to call agent {entry['agent_name']}: {exc}")
+            else:
+                entry.update(status="ok", response=task.result())
+            results.append(entry)
+            # 끝난 결과부터 state에 기록해 데드라인 초과 시에도 부분 결과를 활용할 수 있게 한다.
+            completed[str(entry["index"])] = entry
+            print(f"[Tool:call_remote_agents] ✓ {entry['agent_name']} 완료 ({entry['status']}, {entry['elapsed_ms']}ms)")
+
+    for task, entry in pending.items():
+        task.cancel()
+        entry.update(status="timeout", error=f"Agent '{entry['agent_name']}' did not respond within {deadline:.0f}s.")
+        results.append(entry)
+    if pending:
+        # 취소된 호출이 연결 반납 등 정리를 마칠 때까지 기다린다 (취소/예외는 결과에 반영하지 않음)
+        await asyncio.gather(*pending, return_exceptions=True)
+    tool_context.state["remote_results"] = completed
+
+    results.sort(key=lambda item: item["index"])
+    return {
+        "results": results,
+        "completed": sum(1 for r in results if r["status"] == "ok"),
+        "total": len(results),
+        "partial": any(r["status"] != "ok" for r in results),
+    }
+
 # --- 3. 응답 집계 ---
 
 def return_result(tool_context: ToolContext, result: str) -> str:
@@ -338,31 +542,28 @@ root_agent = LlmAgent(
         "'load_agent_cards'는 에이전트 카드를 불러오는 도구이다\n"
         "'call_remote_agent'는 에이전트를 호출하는 도구이다\n"
         "   (에이전트 카드에서 agent_name과 task를 파라미터로 넣어 호출해야 한다)\n"
+        "'call_remote_agents'는 여러 에이전트를 동시에 호출하는 도구이다\n"
+        "   (여러 에이전트의 데이터가 필요하면 calls=[{agent_name, task}, ...]로 한 번에 호출해라)\n"
         "'return_result'에는 너가 사용자에게 응답할 내용을 적고 사용자에게 반환해\n"
     ),
     description="LLM 기반 Root Orchestrator Agent (multi-agent coordination) - Gemini/Local LLM hybrid",
-    tools=[FunctionTool(load_agent_cards), FunctionTool(call_remote_agent), FunctionTool(return_result)],
+    tools=[
+        FunctionTool(load_agent_cards),
+        FunctionTool(call_remote_agent),
+        FunctionTool(call_remote_agents),
+        FunctionTool(return_result),
+    ],
 )
 
 # --- 5. IAM 기반 정책 플러그인 및 Runner 설정 ---
 
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # model_config.py와 동일한 환경변수 사용
-# 정책 초기 요청 시 사용할 토큰 부트스트랩 (클라이언트가 세션/환경변수로 전달)
-BOOTSTRAP_AUTH_TOKEN = (
-    os.getenv("IAM_BOOTSTRAP_AUTH_TOKEN")
-    or os.getenv("POLICY_BOOTSTRAP_TOKEN")
-    or os.getenv("AUTH_TOKEN")
-)
-
 # Orchestrator의 고유 agent_id
 AGENT_ID = "Orchestrator"
 
-plugin = PolicyEnforcementPlugin(
-    agent_id=AGENT_ID,
-    gemini_api_key=GOOGLE_API_KEY,
+plugin = PolicyEnforcementPlugin.from_env(
+    AGENT_ID,
     policy_server_url=POLICY_SERVER_URL,
     log_server_url=LOG_SERVER_URL,
-    initial_auth_token=BOOTSTRAP_AUTH_TOKEN,
 )
 
 session_service = InMemorySessionService()
@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from .card_signatures import card_signature_verifier
+
+logger = logging.getLogger(__name__)
+
+# fetch(etag) -> (status, etag, json_body). status 304이면 json_body는 None.
+FetchFn = Callable[[Optional[str]], Awaitable[Tuple[int, Optional[str], Any]]]
+ParseFn = Callable[[Dict[str, Any]], Any]
+
+
+def _default_float(env_key: str, fallback: float) -> float:
+    raw = os.getenv(env_key)
+    if raw is None:
+        return fallback
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning("Invalid float for %s: %s (fallback=%s)", env_key, raw, fallback)
+        return fallback
+
+
+def _card_digest(card_payload: Dict[str, Any]) -> str:
+    canonical = json.dumps(card_payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _extract_agents(json_body: Any) -> list:
+    if isinstance(json_body, dict):
+        if "agents" in json_body:
+            return json_body["agents"] or []
+        if "items" in json_body:
+            return json_body["items"] or []
+        return []
+    if isinstance(json_body, list):
+        return json_body
+    return []
+
+
+class _Entry:
+    __slots__ = ("cards", "etag", "fetched_at")
+
+    def __init__(self, cards: Dict[str, Any], etag: Optional[str]) -> None:
+        self.cards = cards
+        self.etag = etag
+        self.fetched_at = time.monotonic()
+
+
+class AgentCardCache:
+    """호출자 토큰별 에이전트 카드 캐시.
+
+    - TTL 안에서는 레지스트리를 호출하지 않는다.
+    - TTL이 지나면 If-None-Match(ETag)로 재검증하고, 304면 기존 카드를 그대로 쓴다.
+    - 파싱된 AgentCard는 카드 본문 해시 기준으로 재사용해 model_validate/URL 보정/서명 검증을 생략한다.
+    """
+
+    def __init__(self) -> None:
+        self.ttl_seconds = _default_float("ORCHESTRATOR_CARD_CACHE_TTL", 60.0)
+        self.max_entries = int(_default_float("ORCHESTRATOR_CARD_CACHE_MAX_ENTRIES", 256))
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._parsed: Dict[str, Any] = {}
+        # 엔트리가 있거나 조회 중인 키의 락만 남긴다 (엔트리를 남기지 못한 조회의 락은 바로 정리)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+
+    @staticmethod
+    def cache_key(token: Optional[str]) -> str:
+        """토큰 전체의 SHA-256으로 캐시 키를 만든다.
+
+        서명 검증 없이 읽은 sub/tenants 클레임으로 키를 만들면 위조 토큰이 다른 사용자의
+        캐시를 그대로 받아 갈 수 있으므로, 레지스트리가 검증한 바로 그 토큰 단위로만 공유한다.
+        """
+        if not token:
+            return "anonymous"
+        return "token:" + hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _parse_cards(self, agents_data: Iterable[Any], parse: ParseFn) -> Dict[str, Any]:
+        cards: Dict[str, Any] = {}
+        for idx, data in enumerate(agents_data):
+            card_payload = data.get("card") if isinstance(data, dict) else data
+            if not card_payload or not isinstance(card_payload, dict):
+                print(f"[load_agent_cards] ⚠ 인덱스 {idx}: card 페이로드 없음")
+                continue
+            digest = _card_digest(card_payload)
+            card = self._parsed.get(digest)
+            if card is None:
+                # 레지스트리 서명 검증 (ORCHESTRATOR_VERIFY_CARD_SIGNATURES=enforce 면 실패 카드 제외)
+                if not card_signature_verifier.accept(card_payload):
+                    continue
+                try:
+                    card = parse(card_payload)
+                except Exception as e:
+                    print(f"[load_agent_cards] ⚠ 인덱스 {idx} 파싱 실패: {e}")
+                    continue
+                self._parsed[digest] = card
+            name = getattr(card, "name", None) or getattr(card, "url", None) or "unknown_agent"
+            cards[name] = card
+        return cards
+
+    def _store(self, key, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._drop_lock(evicted)
+        # 더 이상 어떤 엔트리에서도 참조하지 않는 파싱 결과는 정리
+        live = {id(card) for e in self._entries.values() for card in e.cards.values()}
+        if len(self._parsed) > len(live):
+            self._parsed = {d: c for d, c in self._parsed.items() if id(c) in live}
+
+    async def get(self, token: Optional[str], fetch: FetchFn, parse: ParseFn) -> Dict[str, Any]:
+        key = self.cache_key(token)
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry.fetched_at < self.ttl_seconds:
+            return dict(entry.cards)
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+        try:
+            async with lock:
+                return await self._refresh(key, fetch, parse)
+        finally:
+            self._lock_users[key] -= 1
+            if not self._lock_users[key]:
+                del self._lock_users[key]
+                # 위조 토큰 등으로 엔트리가 남지 않았다면 락도 남기지 않는다
+                if key not in self._entries:
+                    self._locks.pop(key, None)
+
+    def _drop_lock(self, key: str) -> None:
+        if key not in self._lock_users:
+            self._locks.pop(key, None)
+
+    async def _refresh(self, key: str, fetch: FetchFn, parse: ParseFn) -> Dict[str, Any]:
+        # 다른 코루틴이 먼저 갱신했을 수 있으므로 다시 확인
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry.fetched_at < self.ttl_seconds:
+            return dict(entry.cards)
+
+        status, etag, json_body = await fetch(entry.etag if entry else None)
+        if status == 304 and entry is not None:
+            entry.fetched_at = time.monotonic()
+            self._entries.move_to_end(key)
+            print(f"[load_agent_cards] ✓ 304 Not Modified - 캐시된 카드 {len(entry.cards)}개 재사용")
+            return dict(entry.cards)
+        if status != 200:
+            if entry is not None:
+                # 레지스트리 장애 시에는 만료된 카드라도 그대로 사용 (stale-if-error)
+                logger.warning("레지스트리 조회 실패 - 만료된 카드 캐시 사용 (%s)", key)
+                return dict(entry.cards)
+            return {}
+
+        agents_data = _extract_agents(json_body)
+        if card_signature_verifier.enabled:
+            # 서명 검증은 PyJWKClient 의 동기 JWKS 요청을 포함하므로 이벤트 루프를 막지 않게 스레드에서 실행
+            cards = await asyncio.to_thread(self._parse_cards, agents_data, parse)
+        else:
+            cards = self._parse_cards(agents_data, parse)
+        self._store(key, _Entry(cards, etag))
+        return dict(cards)
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        if token is None:
+            self._entries.clear()
+            self._parsed.clear()
+            for key in list(self._locks):
+                self._drop_lock(key)
+            return
+        key = self.cache_key(token)
+        self._entries.pop(key, None)
+        self._drop_lock(key)
+
+
+agent_card_cache = AgentCardCache()
@@ -0,0 +1,128 @@
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from jwt import PyJWKClient
+from jwt.exceptions import PyJWKClientConnectionError, PyJWKClientError
+
+logger = logging.getLogger(__name__)
+
+# 레지스트리(jws-server)가 카드 본문에 붙이는 detached 서명의 알고리즘
+_REGISTRY_ALGS = ("ES256", "EdDSA")
+
+
+def _b64url_json(segment: str) -> Dict[str, Any]:
+    try:
+        padding = "=" * (-len(segment) % 4)
+        value = json.loads(base64.urlsafe_b64decode(segment + padding).decode("utf-8"))
+        return value if isinstance(value, dict) else {}
+    except Exception:
+        return {}
+
+
+def _card_material(card_payload: Dict[str, Any]) -> bytes:
+    """jws-server 와 같은 정준화: signatures 제외, 키 정렬, 공백 없는 UTF-8 JSON."""
+    material = {k: v for k, v in card_payload.items() if k != "signatures"}
+    return json.dumps(material, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class CardSignatureVerifier:
+    """레지스트리 카드 서명을 JWKS 공개키로 로컬 검증.
+
+    - 공개키는 PyJWKClient 가 lifespan 동안 캐시하며, 처음 보는 kid(키 교체 직후)면 다시 받아 온다.
+      처음 보는 kid 로 다시 받는 것은 REGISTRY_JWKS_MIN_REFRESH_SECONDS 간격에 한 번뿐이다
+      (지어낸 kid 를 단 카드가 로드될 때마다 JWKS 를 받지 않도록).
+    - JWKS 를 받을 수 없으면 마지막으로 받은 키로 계속 검증한다 (오프라인).
+    - 모드(ORCHESTRATOR_VERIFY_CARD_SIGNATURES): off(기본) / warn(경고만) / enforce(검증 실패 카드 제외)
+    """
+
+    def __init__(self) -> None:
+        self.mode = os.getenv("ORCHESTRATOR_VERIFY_CARD_SIGNATURES", "off").strip().lower()
+        self.jwks_url = os.getenv("REGISTRY_JWKS_URL", "http://jws-server:8001/.well-known/jwks.json")
+        lifespan = int(os.getenv("REGISTRY_JWKS_LIFESPAN", "300"))
+        self._client = PyJWKClient(self.jwks_url, lifespan=lifespan, timeout=2)
+        self.min_refresh_seconds = float(os.getenv("REGISTRY_JWKS_MIN_REFRESH_SECONDS", "30"))
+        self._known: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._last_unknown_fetch = float("-inf")
+
+    def _may_refresh(self) -> bool:
+        """처음 보는 kid 로 JWKS 를 다시 받아도 되는지 (REGISTRY_JWKS_MIN_REFRESH_SECONDS 간격)."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_unknown_fetch < self.min_refresh_seconds:
+                return False
+            self._last_unknown_fetch = now
+            return True
+
+    def _key(self, kid: Optional[str]):
+        if not kid:
+            return None
+        try:
+            # lifespan 동안 캐시된 키 집합에서 먼저 찾고, 없을 때만 간격을 두고 다시 받는다
+            key = PyJWKClient.match_kid(self._client.get_signing_keys(), kid)
+            if key is None and self._may_refresh():
+                key = PyJWKClient.match_kid(self._client.get_signing_keys(refresh=True), kid)
+        except PyJWKClientConnectionError as e:
+            if kid not in self._known:
+                logger.warning("JWKS 조회 실패 (%s): %s", self.jwks_url, e)
+            return self._known.get(kid)
+        except PyJWKClientError:
+            return None
+        if key is not None:
+            self._known[kid] = key
+        return key
+
+    def verify(self, card_payload: Dict[str, Any]) -> Tuple[Optional[bool], str]:
+        """(True, kid) 검증 성공 / (False, 사유) 서명 불일치 / (None, 사유) 검증할 레지스트리 서명 없음."""
+        sigs = card_payload.get("signatures")
+        if not isinstance(sigs, list) or not sigs:
+            return None, "signatures missing"
+        payload = _card_material(card_payload)
+        failure = None
+        for sig in sigs:
+            if not isinstance(sig, dict) or not isinstance(sig.get("protected"), str) or not isinstance(sig.get("signature"), str):
+                continue
+            header = _b64url_json(sig["protected"])
+            if header.get("b64") is not False or header.get("alg") not in _REGISTRY_ALGS:
+                continue
+            key = self._key(header.get("kid"))
+            if key is None:
+                continue
+            try:
+                jwt.PyJWS().decode_complete(
+                    f"{sig['protected']}..{sig['signature']}",
+                    key.key,
+                    algorithms=[header["alg"]],
+                    detached_payload=payload,
+                )
+            except jwt.InvalidTokenError as e:
+                failure = str(e)
+                continue
+            return True, header.get("kid")
+        if failure:
+            return False, failure
+        return None, "no registry signature"
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("warn", "enforce")
+
+    def accept(self, card_payload: Dict[str, Any]) -> bool:
+        """모드에 따라 카드 사용 여부를 결정 (JWKS 를 동기 HTTP 로 받을 수 있으므로 이벤트 루프 밖에서 호출)."""
+        if not self.enabled:
+            return True
+        ok, detail = self.verify(card_payload)
+        if ok:
+            return True
+        name = card_payload.get("name") or card_payload.get("url") or "unknown_agent"
+        print(f"[load_agent_cards] ⚠ {name}: 카드 서명 검증 실패 ({detail})")
+        return self.mode != "enforce"
+
+
+card_signature_verifier = CardSignatureVerifier()
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _default_int(env_key: str, fallback: int) -> int:
+    raw = os.getenv(env_key)
+    if raw is None:
+        return fallback
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Invalid integer for %s: %s (fallback=%s)", env_key, raw, fallback)
+        return fallback
+
+
+def _default_float(env_key: str, fallback: float) -> float:
+    raw = os.getenv(env_key)
+    if raw is None:
+        return fallback
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning("Invalid float for %s: %s (fallback=%s)", env_key, raw, fallback)
+        return fallback
+
+
+def _parse_host_timeouts(raw: Optional[str]) -> Dict[str, float]:
+    """``"delivery-agent=30,item-agent:8080=15"`` 형태의 호스트별 타임아웃을 파싱한다."""
+    timeouts: Dict[str, float] = {}
+    for entry in (raw or "").split(","):
+        host, sep, value = entry.strip().rpartition("=")
+        if not sep or not host:
+            continue
+        try:
+            timeouts[host.strip().lower()] = float(value)
+        except ValueError:
+            logger.warning("Invalid host timeout entry: %s", entry)
+    return timeouts
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPClientPool:
+    """다운스트림 호스트별로 keep-alive AsyncClient와 A2AClient를 재사용하는 풀.
+
+    요청마다 달라지는 Authorization 헤더는 클라이언트에 고정하지 않고 호출 시점에
+    전달하므로 하나의 커넥션 풀을 여러 사용자 요청이 공유할 수 있다.
+    """
+
+    def __init__(self) -> None:
+        self.default_timeout = _default_float("ORCHESTRATOR_HTTP_TIMEOUT", 60.0)
+        self.connect_timeout = _default_float("ORCHESTRATOR_HTTP_CONNECT_TIMEOUT", 5.0)
+        self.host_timeouts = _parse_host_timeouts(os.getenv("ORCHESTRATOR_HTTP_HOST_TIMEOUTS"))
+        self.limits = httpx.Limits(
+            max_connections=_default_int("ORCHESTRATOR_HTTP_MAX_CONNECTIONS", 100),
+            max_keepalive_connections=_default_int("ORCHESTRATOR_HTTP_MAX_KEEPALIVE", 20),
+            keepalive_expiry=_default_float("ORCHESTRATOR_HTTP_KEEPALIVE_EXPIRY", 30.0),
+        )
+        self.http2 = os.getenv("ORCHESTRATOR_HTTP2", "false").lower() == "true"
+        if self.http2 and not _http2_available():
+            logger.warning("ORCHESTRATOR_HTTP2=true 이지만 h2 패키지가 없어 HTTP/1.1을 사용합니다.")
+            self.http2 = False
+        # (origin, 타임아웃) -> AsyncClient. 타임아웃은 클라이언트 생성 시 고정되므로 키에 포함한다.
+        self._clients: Dict[Tuple[str, Optional[float]], httpx.AsyncClient] = {}
+        self._a2a_clients: Dict[str, Tuple[httpx.AsyncClient, object]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _origin(url: str) -> Tuple[str, str]:
+        parsed = urlsplit(url)
+        host = (parsed.hostname or "").lower()
+        netloc = f"{host}:{parsed.port}" if parsed.port else host
+        return f"{parsed.scheme or 'http'}://{netloc}", netloc
+
+    def timeout_for(self, url: str, default: Optional[float] = None) -> httpx.Timeout:
+        _, netloc = self._origin(url)
+        host = netloc.split(":", 1)[0]
+        seconds = self.host_timeouts.get(netloc, self.host_timeouts.get(host))
+        if seconds is None:
+            seconds = default if default is not None else self.default_timeout
+        return httpx.Timeout(seconds, connect=min(self.connect_timeout, seconds))
+
+    def _ensure_loop(self) -> None:
+        # AsyncClient의 커넥션은 생성된 이벤트 루프에 묶이므로 루프가 바뀌면 풀을 새로 만든다.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._loop is not None:
+                logger.info("이벤트 루프 변경 감지 - HTTP 클라이언트 풀 재생성")
+                self._close_stale(self._loop, list(self._clients.values()))
+            self._clients.clear()
+            self._a2a_clients.clear()
+            self._loop = loop
+
+    def get_client(self, url: str, *, timeout: Optional[float] = None) -> httpx.AsyncClient:
+        """url의 origin(scheme://host:port)과 timeout 조합별로 공유되는 AsyncClient를 반환한다."""
+        self._ensure_loop()
+        origin, _ = self._origin(url)
+        key = (origin, timeout)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self.timeout_for(url, timeout),
+                limits=self.limits,
+                http2=self.http2,
+            )
+            self._clients[key] = client
+            logger.debug("HTTP 클라이언트 생성: %s (timeout=%s, http2=%s)", origin, timeout, self.http2)
+        return client
+
+    def get_a2a_client(self, agent_card):
+        """카드 URL별로 A2AClient를 캐시해 재사용한다."""
+        from a2a.client import A2AClient
+
+        self._ensure_loop()
+        card_url = agent_card.url
+        httpx_client = self.get_client(card_url)
+        cached = self._a2a_clients.get(card_url)
+        # 카드 URL은 같아도 하위 httpx 클라이언트가 재생성되었다면 A2AClient도 다시 만든다.
+        if cached is not None and cached[0] is httpx_client:
+            return cached[1]
+        client = A2AClient(httpx_client=httpx_client, agent_card=agent_card)
+        self._a2a_clients[card_url] = (httpx_client, client)
+        return client
+
+    @staticmethod
+    async def _close_clients(clients: Iterable[httpx.AsyncClient]) -> None:
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as exc:  # pragma: no cover - shutdown best effort
+                logger.debug("HTTP 클라이언트 종료 실패: %s", exc)
+
+    def _close_stale(self, loop: asyncio.AbstractEventLoop, clients: list) -> None:
+        """이전 루프의 클라이언트를 닫는다. 그 루프가 아직 돌고 있으면 그 루프에서, 아니면 현재 루프에서 닫는다."""
+        if not clients:
+            return
+        if loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._close_clients(clients), loop)
+            return
+        task = asyncio.get_running_loop().create_task(self._close_clients(clients))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def aclose(self) -> None:
+        """서버 종료(lifespan shutdown) 시 풀의 커넥션을 모두 닫는다."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._a2a_clients.clear()
+        await self._close_clients(clients)
+
+
+http_client_pool = HTTPClientPool()
@@ -10,9 +10,12 @@ from pathlib import Path
 parent_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_dir))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional
+import asyncio
+import json
 import uvicorn
 
 # Import database module from IAM package
@@ -27,6 +30,9 @@ REDIS_DB = int(os.getenv("REDIS_DB", 0))
 
 # Initialize database
 db = get_db(redis_host=REDIS_HOST, redis_port=REDIS_PORT, redis_db=REDIS_DB)
+
+# 보존 기간이 지난 로그를 보관 세그먼트로 옮기는 주기 (IAM_LOG_ARCHIVE_DIR 설정 시)
+LOG_ARCHIVE_INTERVAL = int(os.getenv("IAM_LOG_ARCHIVE_INTERVAL", 300))
 
 # ========== Models ==========
 class LogPayload(BaseModel):
@@ -113,17 +119,86 @@ async def log_event(payload: LogPayload):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/logs")
-async def get_logs(limit: int = 100, agent_id: Optional[str] = None):
+async def get_logs(
+    response: Response,
+    limit: int = 100,
+    agent_id: Optional[str] = None,
+    verdict: Optional[str] = None,
+    policy_type: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    cursor: Optional[str] = None,
+):
     """
-    Get logs with optional filtering
+    Get logs with optional filtering (newest first)
+    start/end: stream ID, epoch ms or ISO timestamp
+    Next page: pass the X-Next-Cursor response header back as cursor
     """
     try:
-        logs = db.get_logs(limit=limit, agent_id=agent_id)
-        return logs
+        page = db.query_logs(
+            limit=limit, agent_id=agent_id, verdict=verdict, policy_type=policy_type,
+            start=start, end=end, cursor=cursor,
+        )
+        if page["next_cursor"]:
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
+        return page["logs"]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"[PolicyServer] Error fetching logs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/logs/export")
+async def export_logs(
+    agent_id: Optional[str] = None,
+    verdict: Optional[str] = None,
+    policy_type: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+):
+    """
+    Stream every matching log as NDJSON (one JSON object per line)
+    """
+    filters = dict(agent_id=agent_id, verdict=verdict, policy_type=policy_type, start=start, end=end)
+    try:
+        db.query_logs(limit=1, **filters)  # 잘못된 범위는 스트리밍 전에 400으로 응답
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def _lines():
+        for log in db.iter_logs(**filters):
+            yield json.dumps(log, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+@app.post("/api/logs/archive")
+async def archive_logs(older_than: Optional[str] = None):
+    """
+    Archive logs older than the hot retention (or older_than) into compressed segments
+    """
+    if db.log_archive is None:
+        raise HTTPException(status_code=409, detail="Log archiving is disabled (IAM_LOG_ARCHIVE_DIR)")
+    try:
+        archived = await asyncio.to_thread(db.archive_logs, older_than)
+        return {"archived": archived, "archive": db.log_archive.stats()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _archive_loop():
+    while True:
+        try:
+            archived = await asyncio.to_thread(db.archive_logs)
+            if archived:
+                print(f"[PolicyServer] Archived {archived} log entries")
+        except Exception as e:
+            print(f"[PolicyServer] Error archiving logs: {e}")
+        await asyncio.sleep(LOG_ARCHIVE_INTERVAL)
+
+@app.on_event("startup")
+async def start_log_archiver():
+    if db.log_archive is not None:
+        asyncio.create_task(_archive_loop())
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -1,7 +1,17 @@
 import os
+import sys
+from pathlib import Path
 import redis
 from datetime import datetime, timedelta
 import random
+
+try:
+    from utils.redis_geo import PLACES
+    from utils.redis_index import rebuild_indexes
+except ImportError:  # multi-agents/agentDB 에서 직접 실행한 경우
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from utils.redis_geo import PLACES
+    from utils.redis_index import rebuild_indexes
 
 
 def _get_redis_client() -> redis.Redis:
@@ -69,16 +79,20 @@ def seed_large_data(n=800):
 
         # 🚗 차량 데이터
         vehicle_status = random.choice(["available", "on_delivery", "maintenance", "out_of_service"])
+        depot_lon, depot_lat = PLACES[random.choice(list(PLACES))]
         redis_client.hset(f"vehicle:{vehicle_id}", mapping={
             "id": vehicle_id,
             "vehicle_no": f"{random.randint(10,99)}가{random.randint(1000,9999)}",
             "status": vehicle_status,
             "driver": random.choice(["김철수", "이영희", "박민수", "최지훈"]),
             "capacity": str(random.randint(100, 1000)),
-            "delivery_id": delivery_id
+            "delivery_id": delivery_id,
+            "lon": f"{depot_lon + random.uniform(-0.1, 0.1):.4f}",
+            "lat": f"{depot_lat + random.uniform(-0.1, 0.1):.4f}"
         })
 
-    print(f"✅ {n}개의 데이터 입력 완료")
+    rebuild_indexes(redis_client)
+    print(f"✅ {n}개의 데이터 입력 완료 (보조 인덱스 포함)")
 
 if __name__ == "__main__":
     seed_large_data(800)
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import os
 import shlex
+import sys
 import time
 from pathlib import Path
 from typing import Iterable, List
@@ -10,6 +11,12 @@ from typing import Iterable, List
 import redis
 from redis import exceptions as redis_exceptions
 
+try:
+    from utils.redis_index import ensure_indexes, rebuild_indexes
+except ImportError:  # 로컬 실행: multi-agents/agentDB 에서 직접 실행한 경우
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from utils.redis_index import ensure_indexes, rebuild_indexes
+
 
 def _resolve_seed_file() -> Path:
     seed_override = os.getenv("AGENT_REDIS_SEED_FILE")
@@ -88,6 +95,8 @@ def seed_agent_redis(seed_version: str = "1") -> None:
         client.flushdb()
     elif client.exists("agent_seed:version"):
         print("Agent Redis already seeded; skipping.")
+        # 이전 버전으로 시드된 데이터라면 보조 인덱스만 만들어 둔다.
+        ensure_indexes(client)
         return
 
     seed_file = _resolve_seed_file()
@@ -118,6 +127,9 @@ def seed_agent_redis(seed_version: str = "1") -> None:
     pipe.execute()
     print(f"Seeded agent Redis with {applied} commands from {seed_file}.")
 
+    totals = rebuild_indexes(client)
+    print(f"Built agent Redis secondary indexes: {totals}")
+
 
 if __name__ == "__main__":
     version = os.getenv("AGENT_REDIS_SEED_VERSION", "1")
@@ -72,6 +72,7 @@ root_agent = LlmAgent(
     instruction="""너는 배송 관리 에이전트다.
     - 사용자가 주문번호를 말하면 반드시 get_delivery_data 툴을 호출해야 한다.
     - '모든 배송 데이터'를 원하면 get_all_deliveries 툴을 호출해야 한다.
+      건수·상태별 현황은 aggregate("count", "count_by:status")로 조회하고, 목록은 limit/next_cursor 로 필요한 만큼만 페이지 단위로 읽는다.
     - '완료된 배송 수'를 물어보면 get_completed_deliveries 툴을 호출해야 한다.
     """,
         tools=[
@@ -82,26 +83,11 @@ root_agent = LlmAgent(
 )
 
 # --- 2. IAM 기반 정책 플러그인 설정 ---
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # model_config.py와 동일한 환경변수 사용
-# Docker 환경에서는 host.docker.internal, 로컬에서는 localhost
-POLICY_SERVER_URL = os.getenv("POLICY_SERVER_URL", "http://localhost:8005")
-LOG_SERVER_URL = os.getenv("LOG_SERVER_URL", "http://localhost:8005")
-BOOTSTRAP_AUTH_TOKEN = (
-    os.getenv("IAM_BOOTSTRAP_AUTH_TOKEN")
-    or os.getenv("POLICY_BOOTSTRAP_TOKEN")
-    or os.getenv("AUTH_TOKEN")
-)
-
+# GOOGLE_API_KEY / POLICY_SERVER_URL / LOG_SERVER_URL / IAM_BOOTSTRAP_AUTH_TOKEN 환경변수 사용
 # DeliveryAgent의 고유 agent_id (Orchestrator와 다른 정책 적용)
 AGENT_ID = "DeliveryAgent"
 
-plugin = PolicyEnforcementPlugin(
-    agent_id=AGENT_ID,
-    gemini_api_key=GOOGLE_API_KEY,
-    policy_server_url=POLICY_SERVER_URL,
-    log_server_url=LOG_SERVER_URL,
-    initial_auth_token=BOOTSTRAP_AUTH_TOKEN,
-)
+plugin = PolicyEnforcementPlugin.from_env(AGENT_ID)
 
 # --- 3. Runner + 세션 서비스 (플러그인 포함) ---
 APP_NAME = "simple_delivery_app"
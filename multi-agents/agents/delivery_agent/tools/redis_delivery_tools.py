@@ -3,6 +3,11 @@ import os
 import redis
 from typing import Dict, Any, Optional, List, Tuple
 
+from utils.redis_bulk import scan_hashes
+from utils.redis_graph import resolve_context
+from utils.redis_index import INDEXED_FIELDS, find_ids, load_entities
+from utils.list_query import list_entities
+
 # Redis 연결
 REDIS_HOST = os.getenv("AGENT_REDIS_HOST", os.getenv("REDIS_HOST", "localhost"))
 REDIS_PORT = int(os.getenv("AGENT_REDIS_PORT", os.getenv("REDIS_PORT", "6379")))
@@ -25,12 +30,25 @@ def _exists_key(prefix: str, ident: str) -> bool:
 def _get_hash(prefix: str, ident: str) -> Dict[str, str]:
     return redis_client.hgetall(f"{prefix}:{ident}")
 
+def _indexed_lookup(prefix: str, field: str, value: str) -> Optional[List[Dict[str, str]]]:
+    """
+    id 필드 또는 보조 인덱스가 있는 필드면 스캔 없이 결과를 반환 (지원하지 않으면 None).
+    """
+    if field == "id":
+        data = _get_hash(prefix, value)
+        return [data] if data else []
+    if field in INDEXED_FIELDS.get(prefix, ()):
+        return load_entities(redis_client, prefix, find_ids(redis_client, prefix, (field, value)))
+    return None
+
 def _scan_first(prefix: str, field: str, value: str) -> Optional[Dict[str, str]]:
     """
     지정 prefix:*, field==value 인 해시 1개를 찾아 반환 (없으면 None).
     """
-    for key in redis_client.scan_iter(f"{prefix}:*"):
-        data = redis_client.hgetall(key)
+    indexed = _indexed_lookup(prefix, field, value)
+    if indexed is not None:
+        return indexed[0] if indexed else None
+    for _, data in scan_hashes(redis_client, f"{prefix}:*"):
         if data.get(field) == value:
             return data
     return None
@@ -39,12 +57,10 @@ def _scan_all(prefix: str, field: str, value: str) -> List[Dict[str, str]]:
     """
     지정 prefix:*, field==value 인 해시 전부를 리스트로 반환.
     """
-    out = []
-    for key in redis_client.scan_iter(f"{prefix}:*"):
-        data = redis_client.hgetall(key)
-        if data.get(field) == value:
-            out.append(data)
-    return out
+    indexed = _indexed_lookup(prefix, field, value)
+    if indexed is not None:
+        return indexed
+    return [data for _, data in scan_hashes(redis_client, f"{prefix}:*") if data.get(field) == value]
 
 def _infer_type_and_load(ident: str) -> Tuple[Optional[str], Optional[Dict[str, str]]]:
     """
@@ -159,6 +175,12 @@ def get_delivery_data(identifier: str) -> dict:
     - 입력: identifier (예: "Q001", "D001", "V001", "I001")
     - 출력: { status, data: {quality?, delivery?, vehicle?, items?} }
     """
+    # 관계 인덱스로 한 번에 탐색 (idx:type 에 없는 식별자는 아래 스캔 경로로 대체)
+    resolved = resolve_context(redis_client, identifier)
+    if resolved is not None:
+        start_type, context = resolved
+        return {"status": "success", "data": context, "start_type": start_type}
+
     start_type, start_data = _infer_type_and_load(identifier)
     if not start_type or not start_data:
         return {"status": "error", "message": f"No entity found for '{identifier}'"}
@@ -169,24 +191,24 @@ def get_delivery_data(identifier: str) -> dict:
 
     return {"status": "success", "data": context, "start_type": start_type}
 
-def get_all_deliveries() -> dict:
+def get_all_deliveries(limit: int = 20, cursor: str = "", fields: str = "", aggregate: str = "") -> dict:
     """
-    모든 배송 해시 반환 (delivery:*)
+    배송 목록 조회 (delivery:*, ID 순 페이지 단위)
+    - limit: 한 번에 반환할 건수 (기본 20, 최대 100)
+    - cursor: 이전 응답의 next_cursor 값 (다음 페이지 조회 시)
+    - fields: 필요한 필드만 쉼표로 지정 (예: "status,quality_id")
+    - aggregate: 목록 대신 집계만 반환 - "count", "count_by:status", "top:<숫자필드>:<n>"
+    전체 현황은 목록을 모두 읽지 말고 aggregate 를 사용할 것
     """
-    deliveries = []
-    for key in redis_client.scan_iter("delivery:*"):
-        data = redis_client.hgetall(key)
-        if data:
-            deliveries.append(data)
-    return {"status": "success", "count": len(deliveries), "data": deliveries}
+    return list_entities(
+        redis_client, "delivery", limit=limit, cursor=cursor, fields=fields, aggregate=aggregate
+    )
 
 def get_completed_deliveries() -> dict:
     """
     상태가 delivered 인 배송 건수/목록
     """
-    completed = []
-    for key in redis_client.scan_iter("delivery:*"):
-        data = redis_client.hgetall(key)
-        if data.get("status") == "delivered":
-            completed.append(data)
+    completed = load_entities(
+        redis_client, "delivery", find_ids(redis_client, "delivery", ("status", "delivered"))
+    )
     return {"status": "success", "completed_count": len(completed), "data": completed}
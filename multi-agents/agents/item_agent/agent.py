@@ -26,6 +26,8 @@ try:
         get_item_details,
         track_item_inventory,
         get_all_warehouse_inventories_for_item,
+        get_items,
+        get_warehouse_inventory,
     )
 except ImportError:
     # 로컬 환경 (agents/item_agent/)
@@ -33,6 +35,8 @@ except ImportError:
         get_item_details,
         track_item_inventory,
         get_all_warehouse_inventories_for_item,
+        get_items,
+        get_warehouse_inventory,
     )
 
 from iam.policy_enforcement import PolicyEnforcementPlugin
@@ -73,35 +77,24 @@ root_agent = LlmAgent(
     - 사용자가 상품 ID를 말하면 반드시 get_item_details 툴을 호출해야 한다.
     - '재고 수량'을 물어보면 track_item_inventory 툴을 호출해야 한다.
     - 만약 지정한 warehouse_id에 상품이 없으면, get_all_warehouse_inventories_for_item을 호출해서 다른 창고에 있는지 확인하라.
+    - 여러 상품을 한꺼번에 물어보면 상품마다 따로 호출하지 말고 get_items 툴에 ID 목록을 한 번에 넘겨라.
+    - '특정 창고의 재고 목록'을 물어보면 get_warehouse_inventory 툴을 호출해야 한다.
     """,
         tools=[
         FunctionTool(get_item_details),
         FunctionTool(track_item_inventory),
         FunctionTool(get_all_warehouse_inventories_for_item),
+        FunctionTool(get_items),
+        FunctionTool(get_warehouse_inventory),
     ],
 )
 
 # --- 2. IAM 기반 정책 플러그인 설정 ---
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # model_config.py와 동일한 환경변수 사용
-# Docker 환경에서는 host.docker.internal, 로컬에서는 localhost
-POLICY_SERVER_URL = os.getenv("POLICY_SERVER_URL", "http://localhost:8005")
-LOG_SERVER_URL = os.getenv("LOG_SERVER_URL", "http://localhost:8005")
-BOOTSTRAP_AUTH_TOKEN = (
-    os.getenv("IAM_BOOTSTRAP_AUTH_TOKEN")
-    or os.getenv("POLICY_BOOTSTRAP_TOKEN")
-    or os.getenv("AUTH_TOKEN")
-)
-
+# GOOGLE_API_KEY / POLICY_SERVER_URL / LOG_SERVER_URL / IAM_BOOTSTRAP_AUTH_TOKEN 환경변수 사용
 # ItemAgent의 고유 agent_id (Orchestrator와 다른 정책 적용)
 AGENT_ID = "ItemAgent"
 
-plugin = PolicyEnforcementPlugin(
-    agent_id=AGENT_ID,
-    gemini_api_key=GOOGLE_API_KEY,
-    policy_server_url=POLICY_SERVER_URL,
-    log_server_url=LOG_SERVER_URL,
-    initial_auth_token=BOOTSTRAP_AUTH_TOKEN,
-)
+plugin = PolicyEnforcementPlugin.from_env(AGENT_ID)
 
 # --- 3. Runner + 세션 서비스 (플러그인 포함) ---
 APP_NAME = "simple_item_app"
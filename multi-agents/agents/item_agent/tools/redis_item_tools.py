@@ -1,8 +1,13 @@
 # /home/agents/tools/redis_item_tools.py
 import os
 import redis
+from collections import OrderedDict
 from typing import Optional
 
+from utils.list_query import list_hashes
+from utils.redis_bulk import fetch_hashes
+from utils.redis_index import ensure_indexes, inventory_key, item_warehouses_key, warehouse_items_key
+
 # Redis ??
 REDIS_HOST = os.getenv("AGENT_REDIS_HOST", os.getenv("REDIS_HOST", "localhost"))
 REDIS_PORT = int(os.getenv("AGENT_REDIS_PORT", os.getenv("REDIS_PORT", "6379")))
@@ -16,6 +21,20 @@ redis_client = redis.Redis(
 )
 
 
+_ID_CACHE_MAX = int(os.getenv("AGENT_ITEM_ID_CACHE_MAX", "2048"))
+_MAX_BULK_ITEMS = 100
+
+# 입력 문자열(ITEM003, i3 등) → 실제 Redis 키의 품목 ID. 존재가 확인된 결과만 저장한다.
+_resolved_ids: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _remember(raw: str, item_id: str) -> None:
+    _resolved_ids[raw] = item_id
+    _resolved_ids.move_to_end(raw)
+    while len(_resolved_ids) > _ID_CACHE_MAX:
+        _resolved_ids.popitem(last=False)
+
+
 def _item_id_candidates(item_id: str) -> list[str]:
     """Generate normalized item ids that match the Redis keys."""
     raw = item_id.strip().upper()
@@ -33,20 +52,62 @@ def _item_id_candidates(item_id: str) -> list[str]:
         digits = "".join(ch for ch in raw if ch.isdigit())
 
     if digits:
-        padded = f"I{int(digits):04d}"
-        if padded not in candidates:
-            candidates.append(padded)
+        # 시드 데이터는 I001, 대량 생성 데이터는 I0001 형식을 쓴다
+        for width in (3, 4):
+            padded = f"I{int(digits):0{width}d}"
+            if padded not in candidates:
+                candidates.append(padded)
 
     return candidates
 
 
+def _lookup_items(item_ids: list[str]) -> dict[str, tuple[str | None, dict]]:
+    """여러 입력 ID를 한 번의 파이프라인으로 정규화/조회한다: 입력 → (정규화 ID, 해시)."""
+    candidates_by_raw: dict[str, list[str]] = {}
+    for raw in dict.fromkeys(item_ids):
+        cached = _resolved_ids.get(raw)
+        candidates_by_raw[raw] = [cached] if cached else _item_id_candidates(raw)
+
+    unique = list(dict.fromkeys(c for cands in candidates_by_raw.values() for c in cands))
+    pipe = redis_client.pipeline(transaction=False)
+    for candidate in unique:
+        pipe.hgetall(f"item:{candidate}")
+    rows = dict(zip(unique, pipe.execute()))
+
+    results: dict[str, tuple[str | None, dict]] = {}
+    stale: list[str] = []
+    for raw, candidates in candidates_by_raw.items():
+        found = next((c for c in candidates if rows.get(c)), None)
+        if found:
+            _remember(raw, found)
+            results[raw] = (found, rows[found])
+        elif raw in _resolved_ids:
+            # 캐시된 키가 삭제된 경우: 캐시를 비우고 후보 전체로 다시 조회
+            _resolved_ids.pop(raw, None)
+            stale.append(raw)
+        else:
+            results[raw] = (None, {})
+    if stale:
+        results.update(_lookup_items(stale))
+    return results
+
+
 def _lookup_item_data(item_id: str) -> tuple[str | None, dict]:
-    for candidate in _item_id_candidates(item_id):
-        key = f"item:{candidate}"
-        data = redis_client.hgetall(key)
+    return _lookup_items([item_id])[item_id]
+
+
+def get_items(item_ids: list[str]) -> dict:
+    """Return several items at once (최대 100개, ITEM003 / I003 / 3 형식 모두 허용)."""
+    requested = [str(item_id) for item_id in item_ids][:_MAX_BULK_ITEMS]
+    resolved = _lookup_items(requested)
+    items, missing = [], []
+    for raw in dict.fromkeys(requested):
+        normalized_id, data = resolved[raw]
         if data:
-            return candidate, data
-    return None, {}
+            items.append({"item_id": normalized_id, "data": data})
+        else:
+            missing.append(raw)
+    return {"status": "success", "count": len(items), "items": items, "missing": missing}
 
 
 def get_item_details(item_id: str) -> dict:
@@ -57,6 +118,12 @@ def get_item_details(item_id: str) -> dict:
     return {"status": "success", "item_id": normalized_id, "data": data}
 
 
+def _warehouse_inventories(item_id: str) -> list[dict]:
+    warehouse_ids = sorted(redis_client.smembers(item_warehouses_key(item_id)))
+    keys = [inventory_key(warehouse_id, item_id) for warehouse_id in warehouse_ids]
+    return [row for _, row in fetch_hashes(redis_client, keys)]
+
+
 def track_item_inventory(item_id: str, warehouse_id: Optional[str] = None) -> dict:
     """Track inventory for the item, optionally filtering by warehouse."""
     normalized_id, data = _lookup_item_data(item_id)
@@ -64,12 +131,14 @@ def track_item_inventory(item_id: str, warehouse_id: Optional[str] = None) -> di
         return {"status": "error", "message": f"No item found for {item_id}"}
 
     if warehouse_id:
-        if data.get("warehouse_id") == warehouse_id:
+        warehouse_id = warehouse_id.strip().upper()
+        stock = redis_client.hgetall(inventory_key(warehouse_id, normalized_id))
+        if stock or data.get("warehouse_id") == warehouse_id:
             return {
                 "status": "success",
                 "item_id": normalized_id,
                 "warehouse_id": warehouse_id,
-                "quantity": data.get("quantity"),
+                "quantity": stock.get("inventory", data.get("quantity")),
             }
         return {
             "status": "error",
@@ -80,8 +149,28 @@ def track_item_inventory(item_id: str, warehouse_id: Optional[str] = None) -> di
 
 
 def get_all_warehouse_inventories_for_item(item_id: str) -> dict:
-    """Return the stored inventory summary for the item."""
+    """Return the stored inventory summary for the item, with per-warehouse stock."""
     normalized_id, data = _lookup_item_data(item_id)
     if not data:
         return {"status": "error", "message": f"No item found for {item_id}"}
-    return {"status": "success", "item_id": normalized_id, "data": data}
+    ensure_indexes(redis_client)
+    inventories = _warehouse_inventories(normalized_id)
+    return {
+        "status": "success",
+        "item_id": normalized_id,
+        "data": data,
+        "warehouses": inventories,
+        "total_inventory": sum(int(row.get("inventory", 0) or 0) for row in inventories),
+    }
+
+
+def get_warehouse_inventory(warehouse_id: str, limit: int = 20, cursor: str = "", aggregate: str = "") -> dict:
+    """List items stocked in a warehouse (limit/cursor 페이지, aggregate: count | top:inventory:<n>)."""
+    warehouse_id = warehouse_id.strip().upper()
+    ensure_indexes(redis_client)
+    item_ids = redis_client.smembers(warehouse_items_key(warehouse_id))
+    if not item_ids:
+        return {"status": "error", "message": f"No inventory found for warehouse {warehouse_id}"}
+    keys = [inventory_key(warehouse_id, item_id) for item_id in item_ids]
+    result = list_hashes(redis_client, keys, limit=limit, cursor=cursor, aggregate=aggregate)
+    return {**result, "warehouse_id": warehouse_id}
@@ -1,22 +1,10 @@
-import click
-import uvicorn
-from starlette.requests import Request # 타입 힌트용
-from starlette.responses import JSONResponse
-from starlette.routing import Route
-
 from a2a.types import (
     AgentCapabilities,
     AgentCard,
     AgentSkill,
 )
-from a2a.server.apps import A2AStarletteApplication
-from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from agent import root_agent as quality_agent, plugin
-
-# [수정] agent_executor에서 정의한 변수를 import
-from agent_executor import ADKAgentExecutor
-from iam.policy_enforcement import GLOBAL_REQUEST_TOKEN
+from iam.agent_server import serve_agent
 
 def main(inhost, inport):
     # Agent card (metadata)
@@ -44,95 +32,15 @@ def main(inhost, inport):
         ],
     )
 
-    request_handler = DefaultRequestHandler(
-        agent_executor=ADKAgentExecutor(
-            agent=quality_agent,
-            plugins=[plugin]
-        ),
-        task_store=InMemoryTaskStore(),
-    )
-
-    # 1. A2A 앱 생성
-    server_app = A2AStarletteApplication(
+    # 공용 부트스트랩: A2A 핸들러 + 정책 캐시 라우트 + 토큰 캡처 미들웨어
+    serve_agent(
+        host=inhost,
+        port=inport,
         agent_card=agent_card,
-        http_handler=request_handler,
+        agent=quality_agent,
+        plugins=[plugin],
     )
 
-    # 2. [수정] .build()를 먼저 호출하여 Starlette 앱 객체를 얻습니다.
-    app = server_app.build()
-
-    # ------------------------------------------------------------------
-    # 정책 캐시 새로고침 API 엔드포인트
-    # ------------------------------------------------------------------
-    async def refresh_policy_handler(request: Request):
-        """정책 캐시를 비우고 새로고침합니다."""
-        try:
-            body = {}
-            try:
-                body = await request.json()
-            except Exception:
-                pass
-            
-            tenant = body.get("tenant") if body else None
-            result = plugin.clear_policy_cache(tenant=tenant)
-            
-            return JSONResponse({
-                "success": True,
-                "message": "정책 캐시가 새로고침되었습니다.",
-                "details": result,
-            })
-        except Exception as e:
-            return JSONResponse({
-                "success": False,
-                "error": str(e),
-            }, status_code=500)
-
-    async def get_cache_status_handler(request: Request):
-        """현재 정책 캐시 상태를 반환합니다."""
-        try:
-            status = plugin.get_cache_status()
-            return JSONResponse({
-                "success": True,
-                "cache": status,
-            })
-        except Exception as e:
-            return JSONResponse({
-                "success": False,
-                "error": str(e),
-            }, status_code=500)
-
-    # 기존 라우트에 추가
-    app.routes.append(Route("/api/refresh-policy", refresh_policy_handler, methods=["POST"]))
-    app.routes.append(Route("/api/cache-status", get_cache_status_handler, methods=["GET"]))
-
-    # 3. [수정] 미들웨어 추가: 헤더를 낚아채서 ContextVar에 저장
-    @app.middleware("http")
-    async def token_capture_middleware(request, call_next):
-        auth_header = request.headers.get("Authorization") or request.headers.get("authorization")
-        
-        token_reset_token = None
-        if auth_header:
-            token_val = auth_header
-            if token_val.lower().startswith("bearer "):
-                token_val = token_val[7:].strip()
-            
-            # [여기!] 플러그인이 볼 수 있는 변수에 저장
-            token_reset_token = GLOBAL_REQUEST_TOKEN.set(token_val)
-            print(f"[1. Middleware] 토큰을 GLOBAL_VAR에 저장함: {token_val[:10]}...", flush=True)
-        else:
-            print(f"[1. Middleware] 헤더 없음", flush=True)
-
-        try:
-            response = await call_next(request)
-            return response
-        finally:
-            # (선택사항) 요청 처리가 끝나면 변수 초기화 (메모리 누수 방지)
-            if token_reset_token:
-                GLOBAL_REQUEST_TOKEN.reset(token_reset_token)
-
-    print(f"Quality Agent Running on {inhost}:{inport}", flush=True)
-    uvicorn.run(app, host=inhost, port=inport)
-
 
 if __name__ == "__main__":
     main("0.0.0.0", 10003)
\ No newline at end of file
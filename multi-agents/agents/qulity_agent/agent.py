@@ -85,26 +85,11 @@ root_agent = LlmAgent(
 )
 
 # --- 2. IAM 기반 정책 플러그인 설정 ---
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # model_config.py와 동일한 환경변수 사용
-# Docker 환경에서는 host.docker.internal, 로컬에서는 localhost
-POLICY_SERVER_URL = os.getenv("POLICY_SERVER_URL", "http://localhost:8005")
-LOG_SERVER_URL = os.getenv("LOG_SERVER_URL", "http://localhost:8005")
-BOOTSTRAP_AUTH_TOKEN = (
-    os.getenv("IAM_BOOTSTRAP_AUTH_TOKEN")
-    or os.getenv("POLICY_BOOTSTRAP_TOKEN")
-    or os.getenv("AUTH_TOKEN")
-)
-
+# GOOGLE_API_KEY / POLICY_SERVER_URL / LOG_SERVER_URL / IAM_BOOTSTRAP_AUTH_TOKEN 환경변수 사용
 # QualityAgent의 고유 agent_id (Orchestrator와 다른 정책 적용)
 AGENT_ID = "QualityAgent"
 
-plugin = PolicyEnforcementPlugin(
-    agent_id=AGENT_ID,
-    gemini_api_key=GOOGLE_API_KEY,
-    policy_server_url=POLICY_SERVER_URL,
-    log_server_url=LOG_SERVER_URL,
-    initial_auth_token=BOOTSTRAP_AUTH_TOKEN,
-)
+plugin = PolicyEnforcementPlugin.from_env(AGENT_ID)
 
 # --- 3. Runner + 세션 서비스 (플러그인 포함) ---
 APP_NAME = "simple_quality_app"
@@ -2,6 +2,9 @@
 import redis
 import os
 
+from utils.list_query import list_hashes
+from utils.redis_index import EntityNotFound, find_ids, load_entities, save_entity
+
 # Redis 연결
 REDIS_HOST = os.getenv("AGENT_REDIS_HOST", os.getenv("REDIS_HOST", "localhost"))
 REDIS_PORT = int(os.getenv("AGENT_REDIS_PORT", os.getenv("REDIS_PORT", "6379")))
@@ -14,6 +17,8 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+INSPECTION_RESULTS = ("passed", "failed", "pending")
+
 
 def _normalize_item_id(item_id: str) -> str:
     """Normalize item_id values like ITEM003 to the key suffix stored under item:."""
@@ -30,34 +35,45 @@ def get_quality_data(quality_id: str) -> dict:
         return {"status": "error", "message": f"No quality info found for {quality_id}"}
     return {"status": "success", "data": data}
 
-def get_all_quality_checks() -> dict:
-    """모든 품질 검사 결과 조회"""
-    results = []
-    for key in redis_client.scan_iter("quality:*"):
-        data = redis_client.hgetall(key)
-        if data:
-            results.append(data)
-    return {"status": "success", "count": len(results), "data": results}
+def get_all_quality_checks(limit: int = 20, cursor: str = "", fields: str = "", aggregate: str = "") -> dict:
+    """품질 검사 결과 목록 조회 (limit/cursor 페이지, fields 필드 선택, aggregate 집계: count | count_by:inspection)"""
+    # quality:return:*, quality:recall:* 등 하위 해시도 포함하므로 키 목록은 스캔으로 구한다
+    keys = list(redis_client.scan_iter("quality:*", count=1000))
+    return list_hashes(
+        redis_client, keys, limit=limit, cursor=cursor, fields=fields, aggregate=aggregate
+    )
 
 def get_failed_quality_checks() -> dict:
     """불합격(inspection=failed) 품질 검사 건수 및 목록"""
-    results = []
-    for key in redis_client.scan_iter("quality:*"):
-        data = redis_client.hgetall(key)
-        if data.get("inspection") == "failed":
-            results.append(data)
+    results = load_entities(
+        redis_client, "quality", find_ids(redis_client, "quality", ("inspection", "failed"))
+    )
     return {"status": "success", "failed_count": len(results), "data": results}
 
 def update_quality_result(quality_id: str, inspection: str, defects: int) -> dict:
-    """품질 검사 결과 업데이트"""
-    key = f"quality:{quality_id}"
-    if not redis_client.exists(key):
+    """품질 검사 결과 업데이트 (inspection: passed | failed | pending, defects: 0 이상)"""
+    if inspection not in INSPECTION_RESULTS:
+        return {"status": "error", "message": f"Unknown inspection result: {inspection}"}
+    try:
+        defects = int(defects)
+    except (TypeError, ValueError):
+        return {"status": "error", "message": f"defects must be an integer: {defects}"}
+    if defects < 0:
+        return {"status": "error", "message": f"defects must be >= 0: {defects}"}
+    try:
+        previous = save_entity(redis_client, "quality", quality_id, {
+            "inspection": inspection,
+            "defects": defects
+        }, must_exist=True)
+    except EntityNotFound:
         return {"status": "error", "message": f"Quality {quality_id} does not exist."}
-    redis_client.hset(key, mapping={
+    return {
+        "status": "success",
+        "quality_id": quality_id,
         "inspection": inspection,
-        "defects": defects
-    })
-    return {"status": "success", "quality_id": quality_id, "inspection": inspection, "defects": defects}
+        "defects": defects,
+        "previous_inspection": previous.get("inspection"),
+    }
 
 def record_defect_details(quality_id: str, defect_code: str, metric_value: str) -> dict:
     """품질 검사 항목에 결함 코드 및 측정값 기록"""
@@ -70,11 +86,7 @@ def record_defect_details(quality_id: str, defect_code: str, metric_value: str)
 
 def get_items_for_return_qc() -> dict:
     """품질 검사가 필요한 반품 상품 ID 리스트 조회"""
-    items = []
-    for key in redis_client.scan_iter("quality:*"):
-        data = redis_client.hgetall(key)
-        if data.get("qc_result") == "pending":
-            items.append(data.get("id", key.split(":")[-1]))
+    items = find_ids(redis_client, "quality", ("qc_result", "pending"))
     return {"status": "success", "count": len(items), "items": items}
 
 def get_return_item_disposition(item_id: str) -> dict:
@@ -85,6 +85,7 @@ root_agent = LlmAgent(
     - '리콜에 배정된 차량 리스트'를 요청하면 get_assigned_recall_vehicles 툴을 호출해야 한다.
     - '차량 적재 용량'을 조회하려면 get_vehicle_capacity 툴을 호출해야 한다.
     - '최적 차량 추천'을 요청하면 recommend_optimal_vehicles 툴을 호출해야 한다.
+      origin/destination 에는 도시 이름(서울, 부산 등)이나 "위도,경도"를 넣는다.
     """,
         tools=[
         FunctionTool(get_fleet_availability),
@@ -98,26 +99,11 @@ root_agent = LlmAgent(
 )
 
 # --- 2. IAM 기반 정책 플러그인 설정 ---
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # model_config.py와 동일한 환경변수 사용
-# Docker 환경에서는 host.docker.internal, 로컬에서는 localhost
-POLICY_SERVER_URL = os.getenv("POLICY_SERVER_URL", "http://localhost:8005")
-LOG_SERVER_URL = os.getenv("LOG_SERVER_URL", "http://localhost:8005")
-BOOTSTRAP_AUTH_TOKEN = (
-    os.getenv("IAM_BOOTSTRAP_AUTH_TOKEN")
-    or os.getenv("POLICY_BOOTSTRAP_TOKEN")
-    or os.getenv("AUTH_TOKEN")
-)
-
+# GOOGLE_API_KEY / POLICY_SERVER_URL / LOG_SERVER_URL / IAM_BOOTSTRAP_AUTH_TOKEN 환경변수 사용
 # VehicleAgent의 고유 agent_id (Orchestrator와 다른 정책 적용)
 AGENT_ID = "VehicleAgent"
 
-plugin = PolicyEnforcementPlugin(
-    agent_id=AGENT_ID,
-    gemini_api_key=GOOGLE_API_KEY,
-    policy_server_url=POLICY_SERVER_URL,
-    log_server_url=LOG_SERVER_URL,
-    initial_auth_token=BOOTSTRAP_AUTH_TOKEN,
-)
+plugin = PolicyEnforcementPlugin.from_env(AGENT_ID)
 
 # --- 3. Runner + 세션 서비스 (플러그인 포함) ---
 APP_NAME = "simple_vehicle_app"
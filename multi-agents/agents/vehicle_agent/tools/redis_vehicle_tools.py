@@ -1,7 +1,18 @@
-import redis
-import os
-
-# Redis 연결
+import redis
+import os
+
+from utils.list_query import list_entities
+from utils.redis_geo import PLACES, distance_km, resolve_place, search_vehicles
+from utils.redis_index import (
+    EntityNotFound,
+    TransitionError,
+    field_counts,
+    find_ids,
+    load_entities,
+    save_entity,
+)
+
+# Redis 연결
 REDIS_HOST = os.getenv("AGENT_REDIS_HOST", os.getenv("REDIS_HOST", "localhost"))
 REDIS_PORT = int(os.getenv("AGENT_REDIS_PORT", os.getenv("REDIS_PORT", "6379")))
 REDIS_DB = int(os.getenv("AGENT_REDIS_DB", os.getenv("REDIS_DB", "0")))
@@ -12,150 +23,195 @@ redis_client = redis.Redis(
     db=REDIS_DB,
     decode_responses=True
 )
-
-def get_vehicle_data(vehicle_id: str) -> dict:
-    """차량 ID로 차량 상세 조회"""
-    key = f"vehicle:{vehicle_id}"
-    data = redis_client.hgetall(key)
-    if not data:
-        return {"status": "error", "message": f"No vehicle info found for {vehicle_id}"}
-    return {"status": "success", "data": data}
-
-# === agent.py에서 요구하는 함수 시그니처에 맞춘 wrapper/추가 ===
-
-def get_vehicle_status(vehicle_id: str) -> dict:
-    """단일 차량 상태 조회 (get_vehicle_data를 래핑)"""
-    return get_vehicle_data(vehicle_id)
-
-
-def filter_available_vehicles() -> dict:
-    """가용 상태(available) 차량 조회 (get_available_vehicles를 래핑)"""
-    return get_available_vehicles()
-
-
-def get_vehicles_on_maintenance() -> dict:
-    """현재 정비 중인 차량 리스트 조회"""
-    vehicles = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data.get("status") == "maintenance":
-            vehicles.append(data)
-    return {"status": "success", "count": len(vehicles), "vehicles": vehicles}
-
-
-def get_assigned_recall_vehicles(recall_id: str) -> dict:
-    """특정 recall_id에 배정된 차량 리스트 조회"""
-    vehicles = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data.get("status") == "assigned_for_recall" and data.get("recall_id") == recall_id:
-            vehicles.append(data)
-    return {"status": "success", "recall_id": recall_id, "vehicles": vehicles}
-
-
-def get_vehicle_capacity(vehicle_id: str) -> dict:
-    """차량 적재 용량 조회"""
-    key = f"vehicle:{vehicle_id}"
-    capacity = redis_client.hget(key, "capacity")
-    if capacity is None:
-        return {"status": "error", "message": f"Capacity info not found for {vehicle_id}"}
-    return {"status": "success", "vehicle_id": vehicle_id, "capacity": int(capacity)}
-
-
-def recommend_optimal_vehicles(origin: str, destination: str, required_capacity: int) -> dict:
-    """출발지/목적지/필요 용량 기반 차량 추천 (간단 버전)"""
-    candidates = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data.get("status") == "available":
-            try:
-                capacity = int(data.get("capacity", 0))
-            except ValueError:
-                continue
-            if capacity >= required_capacity:
-                vehicle_id = key.split(":")[-1]
-                # 간단한 distance 계산 (placeholder)
-                distance = abs(hash(origin) - hash(destination)) % 1000
-                candidates.append({
-                    "vehicle_id": vehicle_id,
-                    "capacity": capacity,
-                    "distance_to_destination": distance
-                })
-    candidates.sort(key=lambda x: x["distance_to_destination"])
-    return {
-        "status": "success",
-        "origin": origin,
-        "destination": destination,
-        "required_capacity": required_capacity,
-        "recommended_vehicles": candidates
-    }
-
-# === 기존 함수들 유지 ===
-
-def get_all_vehicles() -> dict:
-    """Redis에 저장된 모든 차량 조회"""
-    vehicles = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data:
-            vehicles.append(data)
-    return {"status": "success", "count": len(vehicles), "data": vehicles}
-
-def get_vehicles_by_delivery(delivery_id: str) -> dict:
-    """특정 배송에 할당된 차량 조회"""
-    vehicles = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data.get("delivery_id") == delivery_id:
-            vehicles.append(data)
-    return {"status": "success", "delivery_id": delivery_id, "vehicles": vehicles}
-
-def update_vehicle_status(vehicle_id: str, new_status: str) -> dict:
-    """차량 상태 업데이트"""
-    key = f"vehicle:{vehicle_id}"
-    if not redis_client.exists(key):
-        return {"status": "error", "message": f"Vehicle {vehicle_id} does not exist."}
-    redis_client.hset(key, "status", new_status)
-    return {"status": "success", "vehicle_id": vehicle_id, "new_status": new_status}
-
-def assign_vehicle_to_delivery(vehicle_id: str, delivery_id: str) -> dict:
-    """차량을 특정 배송에 배정"""
-    key = f"vehicle:{vehicle_id}"
-    if not redis_client.exists(key):
-        return {"status": "error", "message": f"Vehicle {vehicle_id} does not exist."}
-    redis_client.hset(key, "delivery_id", delivery_id)
-    redis_client.hset(key, "status", "on_delivery")
-    return {"status": "success", "vehicle_id": vehicle_id, "assigned_delivery_id": delivery_id}
-
-def release_vehicle(vehicle_id: str) -> dict:
-    """배송 종료 후 차량 배정 해제"""
-    key = f"vehicle:{vehicle_id}"
-    if not redis_client.exists(key):
-        return {"status": "error", "message": f"Vehicle {vehicle_id} does not exist."}
-    redis_client.hdel(key, "delivery_id")
-    redis_client.hset(key, "status", "available")
-    return {"status": "success", "vehicle_id": vehicle_id, "new_status": "available"}
-
-def get_available_vehicles() -> dict:
-    """가용 상태 차량 조회"""
-    available = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data.get("status") == "available":
-            available.append(data)
-    return {"status": "success", "count": len(available), "vehicles": available}
-
-def get_fleet_availability() -> dict:
-    """상태별 차량 수 요약"""
-    status_summary = {
-        "available": 0,
-        "on_delivery": 0,
-        "maintenance": 0,
-        "out_of_service": 0
-    }
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        status = data.get("status")
-        if status in status_summary:
-            status_summary[status] += 1
-    return {"status": "success", "data": status_summary}
+
+# 차량 상태 전이 규칙: 현재 상태 -> 변경 가능한 상태 (같은 상태로의 갱신은 항상 허용)
+VEHICLE_TRANSITIONS = {
+    "available": {"on_delivery", "maintenance", "out_of_service", "assigned_for_recall"},
+    "on_delivery": {"available", "maintenance"},
+    "maintenance": {"available", "out_of_service"},
+    "out_of_service": {"maintenance"},
+    "assigned_for_recall": {"available", "maintenance"},
+}
+# 전이 표에 없는 (이전 데이터의) 상태에서도 되돌릴 수 있는 상태
+RECOVERY_STATUSES = {"available", "maintenance"}
+
+
+class _AllowedStatuses(frozenset):
+    """허용 상태 집합에 더해, 전이 표에 없는 현재 상태도 허용한다 (RECOVERY_STATUSES 전이용)"""
+
+    def __contains__(self, status) -> bool:
+        return super().__contains__(status) or status not in VEHICLE_TRANSITIONS
+
+
+def _allowed_from(target_status: str) -> set:
+    """target_status 로 전이할 수 있는 현재 상태 집합"""
+    allowed = {target_status} | {src for src, dsts in VEHICLE_TRANSITIONS.items() if target_status in dsts}
+    return _AllowedStatuses(allowed) if target_status in RECOVERY_STATUSES else allowed
+
+def _save_vehicle(vehicle_id: str, changes: dict, allowed_from: set, remove=()) -> dict:
+    """상태 검증 + 해시/인덱스 갱신을 한 트랜잭션으로 수행하고 오류는 도구 응답으로 변환"""
+    try:
+        previous = save_entity(
+            redis_client, "vehicle", vehicle_id, changes,
+            remove=remove, must_exist=True, expect={"status": allowed_from},
+        )
+    except EntityNotFound:
+        return {"status": "error", "message": f"Vehicle {vehicle_id} does not exist."}
+    except TransitionError as exc:
+        return {"status": "error", "message": str(exc), "current_status": exc.current}
+    return {"status": "success", "previous_status": previous.get("status")}
+
+def get_vehicle_data(vehicle_id: str) -> dict:
+    """차량 ID로 차량 상세 조회"""
+    key = f"vehicle:{vehicle_id}"
+    data = redis_client.hgetall(key)
+    if not data:
+        return {"status": "error", "message": f"No vehicle info found for {vehicle_id}"}
+    return {"status": "success", "data": data}
+
+# === agent.py에서 요구하는 함수 시그니처에 맞춘 wrapper/추가 ===
+
+def get_vehicle_status(vehicle_id: str) -> dict:
+    """단일 차량 상태 조회 (get_vehicle_data를 래핑)"""
+    return get_vehicle_data(vehicle_id)
+
+
+def filter_available_vehicles() -> dict:
+    """가용 상태(available) 차량 조회 (get_available_vehicles를 래핑)"""
+    return get_available_vehicles()
+
+
+def get_vehicles_on_maintenance() -> dict:
+    """현재 정비 중인 차량 리스트 조회"""
+    vehicles = load_entities(
+        redis_client, "vehicle", find_ids(redis_client, "vehicle", ("status", "maintenance"))
+    )
+    return {"status": "success", "count": len(vehicles), "vehicles": vehicles}
+
+
+def get_assigned_recall_vehicles(recall_id: str) -> dict:
+    """특정 recall_id에 배정된 차량 리스트 조회"""
+    vehicle_ids = find_ids(
+        redis_client, "vehicle", ("status", "assigned_for_recall"), ("recall_id", recall_id)
+    )
+    vehicles = load_entities(redis_client, "vehicle", vehicle_ids)
+    return {"status": "success", "recall_id": recall_id, "vehicles": vehicles}
+
+
+def get_vehicle_capacity(vehicle_id: str) -> dict:
+    """차량 적재 용량 조회"""
+    key = f"vehicle:{vehicle_id}"
+    capacity = redis_client.hget(key, "capacity")
+    if capacity is None:
+        return {"status": "error", "message": f"Capacity info not found for {vehicle_id}"}
+    return {"status": "success", "vehicle_id": vehicle_id, "capacity": int(capacity)}
+
+
+def recommend_optimal_vehicles(
+    origin: str, destination: str, required_capacity: int, top_k: int = 5, max_capacity: int = 0
+) -> dict:
+    """출발지/목적지/필요 용량 기반 차량 추천
+    - origin/destination: 지명(서울, 부산 등) 또는 "위도,경도"
+    - required_capacity 이상 (max_capacity > 0 이면 그 이하) 용량의 가용 차량을
+      출발지와 가까운 순으로 최대 top_k 대 반환
+    """
+    origin_point = resolve_place(origin)
+    destination_point = resolve_place(destination)
+    unknown = [name for name, point in ((origin, origin_point), (destination, destination_point)) if point is None]
+    if unknown:
+        return {
+            "status": "error",
+            "message": f"Unknown location: {', '.join(unknown)} (지원 지명: {', '.join(PLACES)} 또는 '위도,경도')",
+        }
+    radius, candidates = search_vehicles(
+        redis_client,
+        origin_point,
+        min_capacity=required_capacity,
+        max_capacity=max_capacity if max_capacity > 0 else None,
+        k=max(1, min(top_k, 20)),
+    )
+    route_km = distance_km(origin_point, destination_point)
+    for candidate in candidates:
+        candidate["distance_to_origin_km"] = candidate.pop("distance_km")
+        candidate["total_distance_km"] = round(candidate["distance_to_origin_km"] + route_km, 2)
+    return {
+        "status": "success",
+        "origin": origin,
+        "destination": destination,
+        "required_capacity": required_capacity,
+        "route_distance_km": round(route_km, 2),
+        "search_radius_km": radius,
+        "recommended_vehicles": candidates
+    }
+
+# === 기존 함수들 유지 ===
+
+def get_all_vehicles(limit: int = 20, cursor: str = "", fields: str = "", aggregate: str = "") -> dict:
+    """Redis에 저장된 차량 목록 조회 (limit/cursor 페이지, fields 필드 선택, aggregate 집계: count | count_by:status | top:capacity:5)"""
+    return list_entities(
+        redis_client, "vehicle", limit=limit, cursor=cursor, fields=fields, aggregate=aggregate
+    )
+
+def get_vehicles_by_delivery(delivery_id: str) -> dict:
+    """특정 배송에 할당된 차량 조회"""
+    vehicles = load_entities(
+        redis_client, "vehicle", find_ids(redis_client, "vehicle", ("delivery_id", delivery_id))
+    )
+    return {"status": "success", "delivery_id": delivery_id, "vehicles": vehicles}
+
+def update_vehicle_status(vehicle_id: str, new_status: str) -> dict:
+    """차량 상태 업데이트 (VEHICLE_TRANSITIONS 에 정의된 전이만 허용)"""
+    if new_status not in VEHICLE_TRANSITIONS:
+        return {"status": "error", "message": f"Unknown vehicle status: {new_status}"}
+    result = _save_vehicle(vehicle_id, {"status": new_status}, _allowed_from(new_status))
+    if result["status"] != "success":
+        return result
+    return {**result, "vehicle_id": vehicle_id, "new_status": new_status}
+
+def assign_vehicle_to_delivery(vehicle_id: str, delivery_id: str) -> dict:
+    """차량을 특정 배송에 배정 (available 상태 차량만 배정 가능)"""
+    result = _save_vehicle(
+        vehicle_id, {"delivery_id": delivery_id, "status": "on_delivery"}, {"available"}
+    )
+    if result["status"] != "success":
+        return result
+    return {**result, "vehicle_id": vehicle_id, "assigned_delivery_id": delivery_id}
+
+def assign_vehicle_to_recall(vehicle_id: str, recall_id: str) -> dict:
+    """차량을 리콜 회수에 배정 (available 상태 차량만 배정 가능)"""
+    result = _save_vehicle(
+        vehicle_id, {"recall_id": recall_id, "status": "assigned_for_recall"}, {"available"}
+    )
+    if result["status"] != "success":
+        return result
+    return {**result, "vehicle_id": vehicle_id, "assigned_recall_id": recall_id}
+
+def release_vehicle(vehicle_id: str) -> dict:
+    """배송 종료 후 차량 배정 해제 (on_delivery 상태 차량만 해제 가능)"""
+    result = _save_vehicle(
+        vehicle_id, {"status": "available"}, {"on_delivery"}, remove=("delivery_id",)
+    )
+    if result["status"] != "success":
+        return result
+    return {**result, "vehicle_id": vehicle_id, "new_status": "available"}
+
+def get_available_vehicles() -> dict:
+    """가용 상태 차량 조회"""
+    available = load_entities(
+        redis_client, "vehicle", find_ids(redis_client, "vehicle", ("status", "available"))
+    )
+    return {"status": "success", "count": len(available), "vehicles": available}
+
+def get_fleet_availability() -> dict:
+    """상태별 차량 수 요약"""
+    status_summary = {
+        "available": 0,
+        "on_delivery": 0,
+        "maintenance": 0,
+        "out_of_service": 0,
+        "assigned_for_recall": 0
+    }
+    counts = field_counts(redis_client, "vehicle", "status")
+    for status in status_summary:
+        status_summary[status] = max(counts.get(status, 0), 0)
+    return {"status": "success", "data": status_summary}
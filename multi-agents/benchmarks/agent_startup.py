@@ -0,0 +1,105 @@
+"""Measure cold-start time of each agent's ``__main__`` module.
+
+Each agent is imported in a fresh interpreter laid out like its Docker image
+(``/app`` with ``iam/``, ``utils/`` and the agent files side by side), without
+calling ``main()``. The script reports wall-clock import time, peak RSS and
+whether the LLM stack (``google.generativeai``) was pulled in at startup.
+
+Usage::
+
+    python multi-agents/benchmarks/agent_startup.py [--runs 5] [--agent vehicle_agent ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+AGENTS_DIR = REPO_ROOT / "multi-agents" / "agents"
+ORCHESTRATOR = "Orchestrator_plugin"
+
+_PROBE = r"""
+import json, resource, runpy, sys, time
+start = time.perf_counter()
+target = sys.argv[1]
+if target.endswith(".py"):
+    runpy.run_path(target, run_name="__startup_bench__")
+else:
+    runpy.run_module(target, run_name="__startup_bench__")
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "genai_loaded": "google.generativeai" in sys.modules,
+    "requests_loaded": "requests" in sys.modules,
+}))
+"""
+
+
+def _stage(agent: str, root: Path) -> str:
+    """Docker 이미지와 같은 /app 레이아웃을 심볼릭 링크로 구성하고 실행 대상을 반환한다."""
+    (root / "iam").symlink_to(REPO_ROOT / "custom-ruleset", target_is_directory=True)
+    (root / "utils").symlink_to(REPO_ROOT / "multi-agents" / "utils", target_is_directory=True)
+    if agent == ORCHESTRATOR:
+        (root / ORCHESTRATOR).symlink_to(
+            REPO_ROOT / "multi-agents" / ORCHESTRATOR, target_is_directory=True
+        )
+        return f"{ORCHESTRATOR}.__main__"
+    for entry in (AGENTS_DIR / agent).iterdir():
+        if entry.name.startswith((".", "__pycache__")):
+            continue
+        (root / entry.name).symlink_to(entry, target_is_directory=entry.is_dir())
+    return str(root / "__main__.py")
+
+
+def measure(agent: str, runs: int) -> dict:
+    samples = []
+    last = {}
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            module = _stage(agent, root)
+            env = dict(os.environ, PYTHONPATH=str(root), PYTHONDONTWRITEBYTECODE="1")
+            proc = subprocess.run(
+                [sys.executable, "-c", _PROBE, module],
+                cwd=root,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+        if proc.returncode != 0:
+            tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:]
+            return {"agent": agent, "error": tail[0] if tail else f"exit {proc.returncode}"}
+        last = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.append(last["seconds"])
+    return {
+        "agent": agent,
+        "runs": runs,
+        "median_s": round(statistics.median(samples), 3),
+        "min_s": round(min(samples), 3),
+        "max_rss_mb": round(last["max_rss_kb"] / 1024, 1),
+        "genai_loaded": last["genai_loaded"],
+        "requests_loaded": last["requests_loaded"],
+    }
+
+
+def main() -> None:
+    default_agents = sorted(p.name for p in AGENTS_DIR.iterdir() if (p / "__main__.py").exists())
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--agent", action="append", dest="agents")
+    args = parser.parse_args()
+
+    for agent in args.agents or [ORCHESTRATOR, *default_agents]:
+        print(json.dumps(measure(agent, args.runs), ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
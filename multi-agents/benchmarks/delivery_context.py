@@ -0,0 +1,126 @@
+"""Measure ``get_delivery_data`` context resolution as the dataset grows.
+
+For each size ``N`` the script flushes the target database, seeds ``N`` linked
+quality/delivery/vehicle/item chains, builds the secondary indexes and resolves a
+sample of identifiers (a mix of Q/D/V/I ids) with
+
+* ``scan``  - the original per-prefix ``scan_iter`` walk (indexes disabled)
+* ``index`` - the same walk using the secondary indexes (``_scan_first``/``_scan_all``)
+* ``graph`` - ``utils.redis_graph.resolve_context`` (single Lua round trip)
+
+and reports mean latency and round trips per lookup.
+
+The target database is FLUSHED. Point ``--redis-url`` at a scratch DB or use
+``--fake`` (fakeredis + lupa) to check round-trip counts without a server.
+
+Usage::
+
+    python multi-agents/benchmarks/delivery_context.py [--sizes 1000 10000 100000]
+        [--lookups 50] [--redis-url redis://localhost:6379/15] [--fake]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import redis
+
+MULTI_AGENTS = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(MULTI_AGENTS))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from redis_bulk_reads import RoundTripCounter, _connect  # noqa: E402
+from utils.redis_index import rebuild_indexes  # noqa: E402
+
+TOOLS_PATH = MULTI_AGENTS / "agents" / "delivery_agent" / "tools" / "redis_delivery_tools.py"
+
+
+def _load_tools(client: redis.Redis):
+    spec = importlib.util.spec_from_file_location("bench_delivery_tools", TOOLS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.redis_client = client
+    return module
+
+
+def _seed(client: redis.Redis, n: int) -> None:
+    client.flushdb()
+    pipe = client.pipeline(transaction=False)
+    for i in range(1, n + 1):
+        qid, did, vid, iid = f"Q{i:06d}", f"D{i:06d}", f"V{i:06d}", f"I{i:06d}"
+        pipe.hset(f"quality:{qid}", mapping={"id": qid, "inspection": "passed", "defects": "0"})
+        pipe.hset(f"delivery:{did}", mapping={"id": did, "quality_id": qid, "status": "ready"})
+        pipe.hset(f"vehicle:{vid}", mapping={"id": vid, "delivery_id": did, "status": "available"})
+        pipe.hset(f"item:{iid}", mapping={"id": iid, "vehicle_id": vid, "quantity": "10"})
+        if i % 500 == 0:
+            pipe.execute()
+    pipe.execute()
+    rebuild_indexes(client)
+
+
+def _walk(tools, identifier: str) -> dict:
+    start_type, start_data = tools._infer_type_and_load(identifier)
+    return tools._build_context_from(start_type, start_data)
+
+
+def _measure(client: redis.Redis, n: int, method: str, fn, identifiers) -> dict:
+    latencies, trips = [], []
+    for identifier in identifiers:
+        with RoundTripCounter(client) as counter:
+            start = time.perf_counter()
+            context = fn(identifier)
+            latencies.append(time.perf_counter() - start)
+        trips.append(counter.count)
+        if not context:
+            return {"records": n, "method": method, "error": f"empty context for {identifier}"}
+    return {
+        "records": n,
+        "method": method,
+        "lookups": len(identifiers),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "p95_ms": round(sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000, 3),
+        "round_trips_per_lookup": round(statistics.mean(trips), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--lookups", type=int, default=50)
+    parser.add_argument("--redis-url", default=None, help="기본값: AGENT_REDIS_HOST/PORT 의 DB 15 (FLUSH 됨)")
+    parser.add_argument("--fake", action="store_true", help="fakeredis로 왕복 수만 확인")
+    parser.add_argument("--skip-scan-above", type=int, default=10000)
+    args = parser.parse_args()
+
+    client = _connect(args)
+    tools = _load_tools(client)
+    from utils.redis_graph import resolve_context
+
+    rng = random.Random(7)
+    for n in args.sizes:
+        _seed(client, n)
+        identifiers = [f"{rng.choice('QDVI')}{rng.randint(1, n):06d}" for _ in range(args.lookups)]
+        client.ping()
+        results = []
+        if n <= args.skip_scan_above:
+            indexed_fields = tools.INDEXED_FIELDS
+            tools.INDEXED_FIELDS = {}
+            try:
+                results.append(_measure(client, n, "scan", lambda i: _walk(tools, i), identifiers))
+            finally:
+                tools.INDEXED_FIELDS = indexed_fields
+        results.append(_measure(client, n, "index", lambda i: _walk(tools, i), identifiers))
+        results.append(_measure(client, n, "graph", lambda i: resolve_context(client, i)[1], identifiers))
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
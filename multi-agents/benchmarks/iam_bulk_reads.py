@@ -0,0 +1,161 @@
+"""Compare the IAMDatabase ``get_all_*`` readers against per-member HGETALL.
+
+For each size ``N`` the script flushes the target database, creates ``N``
+rulesets (and one policy per 10 rulesets) through ``IAMDatabase`` and reads
+them back with
+
+* ``naive``    - SMEMBERS + one ``HGETALL`` per id + JSON decode (the old readers)
+* ``lua``      - ``get_all_rulesets`` / ``get_all_policies`` (one scripted round trip)
+* ``pipeline`` - the same readers with the script disabled (batched pipeline fallback)
+
+and reports round trips and wall time.
+
+The target database is FLUSHED. Point ``--redis-url`` at a scratch DB or use
+``--fake`` (fakeredis + lupa) to check round-trip counts without a server.
+
+Usage::
+
+    python multi-agents/benchmarks/iam_bulk_reads.py [--sizes 1000 10000]
+        [--redis-url redis://localhost:6380/15] [--fake]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+import redis
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from redis_bulk_reads import RoundTripCounter, _connect  # noqa: E402
+
+IAM_PACKAGE_PATH = Path(__file__).resolve().parents[2] / "custom-ruleset"
+
+
+def _load_database_module():
+    # custom-ruleset 은 컨테이너에서 iam 패키지로 복사되므로 패키지로 불러온다 (상대 import)
+    spec = importlib.util.spec_from_file_location(
+        "bench_iam", IAM_PACKAGE_PATH / "__init__.py", submodule_search_locations=[str(IAM_PACKAGE_PATH)]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = package
+    spec.loader.exec_module(package)
+    return importlib.import_module("bench_iam.database")
+
+
+def _make_db(module, client: redis.Redis):
+    original = module.redis.Redis
+    module.redis.Redis = lambda **_: client
+    try:
+        return module.IAMDatabase()
+    finally:
+        module.redis.Redis = original
+
+
+def _seed(db, n: int) -> None:
+    db.redis_client.flushdb()
+    pipe = db.redis_client.pipeline(transaction=False)
+    for i in range(n):
+        ruleset_id = f"bench_ruleset_{i:06d}"
+        pipe.hset(
+            f"rulesets:{ruleset_id}",
+            mapping={
+                "ruleset_id": ruleset_id,
+                "name": f"Bench ruleset {i}",
+                "type": "tool_validation",
+                "tool_name": f"tool_{i % 50}",
+                "rules": json.dumps({"max_task_length": 500, "rate_limit": i % 20}),
+                "blocked_keywords": json.dumps(["drop", "delete", f"kw{i}"]),
+                "enabled": "true",
+            },
+        )
+        pipe.sadd("rulesets:all", ruleset_id)
+        if i % 10 == 0:
+            policy_id = f"bench_policy_{i:06d}"
+            pipe.hset(
+                f"policies:{policy_id}",
+                mapping={
+                    "policy_id": policy_id,
+                    "agent_id": f"bench_agent_{i:06d}",
+                    "tool_validation_rulesets": json.dumps([ruleset_id]),
+                    "enabled": "true",
+                },
+            )
+            pipe.sadd("policies:all", policy_id)
+        if i % 1000 == 999:
+            pipe.execute()
+    pipe.execute()
+
+
+def _naive(client: redis.Redis, set_key: str, prefix: str) -> int:
+    rows = 0
+    for item_id in client.smembers(set_key):
+        data = client.hgetall(f"{prefix}{item_id}")
+        for name, value in data.items():
+            if value.startswith(("[", "{")):
+                json.loads(value)
+        rows += bool(data)
+    return rows
+
+
+def _measure(client: redis.Redis, n: int, method: str, fn) -> dict:
+    client.ping()
+    with RoundTripCounter(client) as counter:
+        start = time.perf_counter()
+        rows = fn()
+        elapsed = time.perf_counter() - start
+    return {
+        "rulesets": n,
+        "method": method,
+        "rows": rows,
+        "round_trips": counter.count,
+        "seconds": round(elapsed, 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--redis-url", default=None, help="기본값: AGENT_REDIS_HOST/PORT 의 DB 15 (FLUSH 됨)")
+    parser.add_argument("--fake", action="store_true", help="fakeredis로 왕복 수만 확인")
+    args = parser.parse_args()
+
+    client = _connect(args)
+    module = _load_database_module()
+    db = _make_db(module, client)
+    scripted = db._load_all
+
+    def _disabled(*_args, **_kwargs):
+        raise redis.ResponseError("script disabled for benchmark")
+
+    for n in args.sizes:
+        _seed(db, n)
+
+        def _readers() -> int:
+            return len(db.get_all_rulesets()) + len(db.get_all_policies())
+
+        results = [
+            _measure(
+                client,
+                n,
+                "naive",
+                lambda: _naive(client, "rulesets:all", "rulesets:") + _naive(client, "policies:all", "policies:"),
+            ),
+            _measure(client, n, "lua", _readers),
+        ]
+        db._load_all = _disabled
+        try:
+            results.append(_measure(client, n, "pipeline", _readers))
+        finally:
+            db._load_all = scripted
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Compare per-key HGETALL against the batched readers in ``utils.redis_bulk``.
+
+For each dataset size the script writes ``N`` vehicle-shaped hashes under a
+throwaway ``bench:vehicle:*`` prefix, then reads them back with
+
+* ``naive``    - ``scan_iter`` + one ``HGETALL`` per key (the old tool pattern)
+* ``pipeline`` - ``scan_hashes(mode="pipeline")`` for each ``--batch`` size
+* ``lua``      - ``scan_hashes(mode="lua")`` for each ``--batch`` size
+
+and reports network round trips (packed commands sent to the server) and wall
+time. The benchmark keys are deleted afterwards.
+
+Usage::
+
+    python multi-agents/benchmarks/redis_bulk_reads.py [--sizes 1000 10000 100000]
+        [--batch 100 500 1000] [--redis-url redis://localhost:6379/15] [--fake]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import redis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.redis_bulk import scan_hashes  # noqa: E402
+
+PATTERN = "bench:vehicle:*"
+
+
+class RoundTripCounter:
+    """연결 클래스의 send_packed_command 호출 수(= 서버 왕복 수)를 센다."""
+
+    def __init__(self, client: redis.Redis) -> None:
+        self.count = 0
+        self._cls = client.connection_pool.connection_class
+        self._original = self._cls.send_packed_command
+
+    def __enter__(self) -> "RoundTripCounter":
+        counter = self
+        original = self._original
+
+        def _counting(conn, *args, **kwargs):
+            counter.count += 1
+            return original(conn, *args, **kwargs)
+
+        self._cls.send_packed_command = _counting
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._cls.send_packed_command = self._original
+
+
+def _connect(args: argparse.Namespace) -> redis.Redis:
+    if args.fake:
+        import fakeredis
+
+        return fakeredis.FakeRedis(decode_responses=True)
+    url = args.redis_url
+    if not url:
+        host = os.getenv("AGENT_REDIS_HOST", os.getenv("REDIS_HOST", "localhost"))
+        port = os.getenv("AGENT_REDIS_PORT", os.getenv("REDIS_PORT", "6379"))
+        url = f"redis://{host}:{port}/15"
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+def _clear(client: redis.Redis) -> None:
+    batch = []
+    for key in client.scan_iter(PATTERN, count=1000):
+        batch.append(key)
+        if len(batch) >= 1000:
+            client.delete(*batch)
+            batch = []
+    if batch:
+        client.delete(*batch)
+
+
+def _seed(client: redis.Redis, n: int) -> None:
+    _clear(client)
+    pipe = client.pipeline(transaction=False)
+    for i in range(1, n + 1):
+        vehicle_id = f"V{i:06d}"
+        pipe.hset(
+            f"bench:vehicle:{vehicle_id}",
+            mapping={
+                "id": vehicle_id,
+                "delivery_id": f"D{i:06d}",
+                "vehicle_no": f"{10 + i % 90}가{1000 + i % 9000}",
+                "driver": "김철수",
+                "status": ("available", "on_delivery", "maintenance")[i % 3],
+                "capacity": str(100 + i % 900),
+            },
+        )
+        if i % 1000 == 0:
+            pipe.execute()
+    pipe.execute()
+
+
+def _naive(client: redis.Redis) -> int:
+    rows = 0
+    for key in client.scan_iter(PATTERN):
+        if client.hgetall(key):
+            rows += 1
+    return rows
+
+
+def _measure(client: redis.Redis, n: int, method: str, batch_size: int | None, fn) -> dict:
+    client.ping()  # 연결 핸드셰이크를 측정에서 제외
+    with RoundTripCounter(client) as counter:
+        start = time.perf_counter()
+        try:
+            rows = fn()
+        except redis.RedisError as exc:
+            return {"records": n, "method": method, "batch_size": batch_size, "error": str(exc)}
+        elapsed = time.perf_counter() - start
+    return {
+        "records": n,
+        "method": method,
+        "batch_size": batch_size,
+        "rows": rows,
+        "round_trips": counter.count,
+        "seconds": round(elapsed, 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--batch", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--redis-url", default=None, help="기본값: AGENT_REDIS_HOST/PORT 의 DB 15")
+    parser.add_argument("--fake", action="store_true", help="fakeredis로 왕복 수만 확인")
+    parser.add_argument("--skip-naive-above", type=int, default=100000)
+    args = parser.parse_args()
+
+    client = _connect(args)
+    try:
+        for n in args.sizes:
+            _seed(client, n)
+            results = []
+            if n <= args.skip_naive_above:
+                results.append(_measure(client, n, "naive", None, lambda: _naive(client)))
+            for batch_size in args.batch:
+                for mode in ("pipeline", "lua"):
+                    results.append(
+                        _measure(
+                            client,
+                            n,
+                            mode,
+                            batch_size,
+                            lambda: sum(1 for _ in scan_hashes(client, PATTERN, batch_size=batch_size, mode=mode)),
+                        )
+                    )
+            for result in results:
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+    finally:
+        _clear(client)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Measure ``recommend_optimal_vehicles`` as the fleet grows.
+
+For each fleet size ``N`` the script flushes the target database, seeds ``N``
+vehicles spread around the depots in ``utils.redis_geo.PLACES``, builds the
+secondary indexes and compares
+
+* ``naive`` - read every available vehicle (index + pipelined HGETALL) and rank
+  by haversine distance in Python
+* ``geo``   - ``search_vehicles`` (GEOSEARCH + status/capacity filter in one Lua call)
+
+reporting mean latency and round trips per recommendation.
+
+The target database is FLUSHED. Point ``--redis-url`` at a scratch DB or use
+``--fake`` (fakeredis + lupa) to check round-trip counts without a server.
+
+Usage::
+
+    python multi-agents/benchmarks/vehicle_recommend.py [--sizes 1000 10000 50000]
+        [--queries 30] [--redis-url redis://localhost:6379/15] [--fake]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import redis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from redis_bulk_reads import RoundTripCounter, _connect  # noqa: E402
+from utils.redis_geo import PLACES, distance_km, search_vehicles  # noqa: E402
+from utils.redis_index import find_ids, load_entities, rebuild_indexes  # noqa: E402
+
+STATUSES = ("available", "on_delivery", "maintenance", "out_of_service")
+
+
+def _seed(client: redis.Redis, n: int, rng: random.Random) -> None:
+    client.flushdb()
+    depots = list(PLACES.values())
+    pipe = client.pipeline(transaction=False)
+    for i in range(1, n + 1):
+        lon, lat = rng.choice(depots)
+        pipe.hset(
+            f"vehicle:V{i:06d}",
+            mapping={
+                "id": f"V{i:06d}",
+                "status": rng.choice(STATUSES),
+                "capacity": str(rng.randint(100, 1000)),
+                "lon": f"{lon + rng.uniform(-0.3, 0.3):.4f}",
+                "lat": f"{lat + rng.uniform(-0.3, 0.3):.4f}",
+            },
+        )
+        if i % 1000 == 0:
+            pipe.execute()
+    pipe.execute()
+    rebuild_indexes(client)
+
+
+def _naive(client: redis.Redis, origin, required: int, k: int) -> list:
+    vehicles = load_entities(client, "vehicle", find_ids(client, "vehicle", ("status", "available")))
+    ranked = sorted(
+        (round(distance_km(origin, (float(v["lon"]), float(v["lat"]))), 2), v["id"])
+        for v in vehicles
+        if int(v["capacity"]) >= required
+    )
+    return ranked[:k]
+
+
+def _measure(client: redis.Redis, n: int, method: str, fn, queries) -> dict:
+    latencies, trips = [], []
+    for origin, required in queries:
+        with RoundTripCounter(client) as counter:
+            start = time.perf_counter()
+            fn(origin, required)
+            latencies.append(time.perf_counter() - start)
+        trips.append(counter.count)
+    return {
+        "vehicles": n,
+        "method": method,
+        "queries": len(queries),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "round_trips_per_query": round(statistics.mean(trips), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--redis-url", default=None, help="기본값: AGENT_REDIS_HOST/PORT 의 DB 15 (FLUSH 됨)")
+    parser.add_argument("--fake", action="store_true", help="fakeredis로 왕복 수만 확인")
+    args = parser.parse_args()
+
+    client = _connect(args)
+    rng = random.Random(7)
+    for n in args.sizes:
+        _seed(client, n, rng)
+        queries = [(rng.choice(list(PLACES.values())), rng.randint(100, 900)) for _ in range(args.queries)]
+        search_vehicles(client, queries[0][0], k=1)  # 스크립트 등록/인덱스 확인을 측정에서 제외
+        results = [
+            _measure(client, n, "naive", lambda o, r: _naive(client, o, r, args.top_k), queries),
+            _measure(
+                client, n, "geo", lambda o, r: search_vehicles(client, o, min_capacity=r, k=args.top_k), queries
+            ),
+        ]
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""multi-agents 테스트 공용 준비: import 경로, iam 패키지 별칭, 에이전트 도구 모듈 로더."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def import_iam():
+    # 컨테이너에서는 custom-ruleset/ 이 iam 패키지로 복사된다.
+    if "iam" in sys.modules:
+        return sys.modules["iam"]
+    package_dir = ROOT.parent / "custom-ruleset"
+    spec = importlib.util.spec_from_file_location(
+        "iam", package_dir / "__init__.py", submodule_search_locations=[str(package_dir)]
+    )
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules["iam"] = module
+    spec.loader.exec_module(module)  # type: ignore[attr-defined]
+    return module
+
+
+def load_tools(relative_path, name):
+    # 에이전트 패키지 __init__ 은 ADK 런너를 만들므로 도구 모듈만 직접 불러온다
+    spec = importlib.util.spec_from_file_location(name, ROOT / relative_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(module)  # type: ignore[attr-defined]
+    return module
+
+
+import_iam()
@@ -0,0 +1,82 @@
+import unittest
+
+from a2a.types import AgentCapabilities, AgentCard
+from conftest import import_iam
+from google.adk.agents import LlmAgent
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import_iam()
+
+from iam.agent_server import build_agent_app  # noqa: E402
+from iam.policy_enforcement import GLOBAL_REQUEST_TOKEN  # noqa: E402
+
+
+class _PolicyPlugin:
+    def __init__(self) -> None:
+        self.cleared = []
+
+    def clear_policy_cache(self, tenant=None):
+        self.cleared.append(tenant)
+        return {"cleared": tenant or "all"}
+
+    def get_cache_status(self):
+        return {"entries": len(self.cleared)}
+
+
+def _card() -> AgentCard:
+    return AgentCard(
+        name="Test Agent",
+        description="test",
+        url="http://test-agent:10009",
+        version="1.0.0",
+        defaultInputModes=["text"],
+        defaultOutputModes=["text"],
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[],
+    )
+
+
+class BuildAgentAppTests(unittest.TestCase):
+    def setUp(self):
+        self.plugin = _PolicyPlugin()
+        self.shutdowns = []
+
+        async def on_shutdown():
+            self.shutdowns.append("closed")
+
+        self.app = build_agent_app(
+            agent_card=_card(),
+            agent=LlmAgent(name="test_agent", model="gemini-2.0-flash"),
+            policy_plugin=self.plugin,
+            on_shutdown=[on_shutdown],
+        )
+
+        async def whoami(request):
+            return JSONResponse({"token": GLOBAL_REQUEST_TOKEN.get()})
+
+        self.app.routes.append(Route("/whoami", whoami))
+
+    def test_card_and_policy_routes(self):
+        with TestClient(self.app) as client:
+            card = client.get("/.well-known/agent-card.json")
+            refreshed = client.post("/api/refresh-policy", json={"tenant": "acme"})
+            status = client.get("/api/cache-status")
+        self.assertEqual(card.json()["name"], "Test Agent")
+        self.assertEqual(refreshed.json()["details"], {"cleared": "acme"})
+        self.assertEqual(status.json(), {"success": True, "cache": {"entries": 1}})
+        self.assertEqual(self.plugin.cleared, ["acme"])
+        self.assertEqual(self.shutdowns, ["closed"])
+
+    def test_middleware_scopes_the_bearer_token_to_the_request(self):
+        with TestClient(self.app) as client:
+            with_token = client.get("/whoami", headers={"Authorization": "Bearer abc.def.ghi"})
+            without = client.get("/whoami")
+        self.assertEqual(with_token.json(), {"token": "abc.def.ghi"})
+        self.assertIsNone(without.json()["token"])
+        self.assertIsNone(GLOBAL_REQUEST_TOKEN.get())
+
+
+if __name__ == "__main__":
+    unittest.main()
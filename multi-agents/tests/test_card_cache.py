@@ -0,0 +1,95 @@
+import asyncio
+import base64
+import json
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from Orchestrator_plugin.card_cache import AgentCardCache  # noqa: E402
+from Orchestrator_plugin.card_signatures import card_signature_verifier  # noqa: E402
+
+
+def _token(claims: dict, signature: str) -> str:
+    def b64(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    return f"{b64({'alg': 'HS256'})}.{b64(claims)}.{signature}"
+
+
+class _Card:
+    def __init__(self, payload: dict) -> None:
+        self.name = payload["name"]
+
+
+class AgentCardCacheKeyTests(unittest.TestCase):
+    def test_forged_token_with_same_claims_does_not_share_entry(self):
+        claims = {"sub": "alice", "tenants": ["t1"]}
+        genuine, forged = _token(claims, "sig-a"), _token(claims, "forged")
+        calls = []
+
+        async def fetch(etag):
+            calls.append(etag)
+            return 200, '"v1"', {"agents": [{"card": {"name": "secret_agent"}}]}
+
+        async def run():
+            cache = AgentCardCache()
+            first = await cache.get(genuine, fetch, _Card)
+            second = await cache.get(forged, fetch, _Card)
+            again = await cache.get(genuine, fetch, _Card)
+            return first, second, again
+
+        first, second, again = asyncio.run(run())
+        self.assertEqual(list(first), ["secret_agent"])
+        self.assertEqual(list(again), ["secret_agent"])
+        # 위조 토큰은 캐시를 받지 못하고 레지스트리로 다시 간다.
+        self.assertEqual(len(calls), 2)
+        self.assertNotEqual(AgentCardCache.cache_key(genuine), AgentCardCache.cache_key(forged))
+
+    def test_failed_fetches_leave_no_locks_behind(self):
+        async def fail(etag):
+            return 401, None, None
+
+        async def ok(etag):
+            return 200, None, {"agents": [{"card": {"name": "agent"}}]}
+
+        async def run():
+            cache = AgentCardCache()
+            results = await asyncio.gather(*(cache.get(f"bogus-{i % 3}", fail, _Card) for i in range(9)))
+            await cache.get("valid", ok, _Card)
+            return cache, results
+
+        cache, results = asyncio.run(run())
+        self.assertEqual(results, [{}] * 9)
+        self.assertEqual(list(cache._locks), [AgentCardCache.cache_key("valid")])
+        self.assertEqual(cache._lock_users, {})
+
+
+class AgentCardCacheVerificationTests(unittest.TestCase):
+    def test_signature_verification_runs_off_the_event_loop(self):
+        threads = []
+
+        def accept(card_payload):
+            threads.append(threading.get_ident())
+            return card_payload["name"] != "tampered_agent"
+
+        async def fetch(etag):
+            return 200, None, {"agents": [{"card": {"name": "signed_agent"}}, {"card": {"name": "tampered_agent"}}]}
+
+        async def run():
+            return await AgentCardCache().get("token", fetch, _Card), threading.get_ident()
+
+        with mock.patch.object(card_signature_verifier, "mode", "enforce"), \
+                mock.patch.object(card_signature_verifier, "accept", accept):
+            cards, loop_thread = asyncio.run(run())
+
+        self.assertEqual(list(cards), ["signed_agent"])
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
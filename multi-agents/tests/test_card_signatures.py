@@ -0,0 +1,50 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from cryptography.hazmat.primitives.asymmetric import ec
+from jwt.algorithms import ECAlgorithm
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from Orchestrator_plugin.card_signatures import CardSignatureVerifier  # noqa: E402
+
+
+def _jwks(*kids):
+    keys = []
+    for kid in kids:
+        jwk = json.loads(ECAlgorithm.to_jwk(ec.generate_private_key(ec.SECP256R1()).public_key()))
+        keys.append({**jwk, "kid": kid, "alg": "ES256", "use": "sig"})
+    return {"keys": keys}
+
+
+class CardSignatureKeyLookupTests(unittest.TestCase):
+    def setUp(self):
+        self.verifier = CardSignatureVerifier()
+        self.jwks = _jwks("k1", "k2")
+        patch = mock.patch.object(self.verifier._client, "fetch_data", side_effect=lambda: self.jwks)
+        self.fetch = patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_unknown_kids_refetch_at_most_once_per_interval(self):
+        self.assertIsNotNone(self.verifier._key("k1"))
+        self.assertIsNotNone(self.verifier._key("k2"))
+        self.assertEqual(self.fetch.call_count, 1)
+
+        for i in range(5):
+            self.assertIsNone(self.verifier._key(f"made-up-{i}"))
+        # 처음 보는 kid 로는 간격당 한 번만 다시 받는다
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_rotated_key_is_picked_up_after_the_interval(self):
+        self.verifier._key("k1")
+        self.jwks = _jwks("k1", "k3")
+        self.verifier.min_refresh_seconds = 0
+        self.assertIsNotNone(self.verifier._key("k3"))
+        self.assertEqual(self.fetch.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
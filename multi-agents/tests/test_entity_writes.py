@@ -0,0 +1,85 @@
+import threading
+import unittest
+from unittest import mock
+
+import fakeredis
+from conftest import load_tools
+
+from utils.redis_index import field_counts, find_ids, rebuild_indexes
+
+vehicle_tools = load_tools("agents/vehicle_agent/tools/redis_vehicle_tools.py", "redis_vehicle_tools")
+quality_tools = load_tools("agents/qulity_agent/tools/redis_quality_tools.py", "redis_quality_tools")
+
+
+class EntityWriteTests(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        self.client.hset("vehicle:V1", mapping={"id": "V1", "status": "available", "capacity": "300"})
+        self.client.hset("quality:Q1", mapping={"id": "Q1", "inspection": "pending", "defects": "0"})
+        rebuild_indexes(self.client)
+        for module in (vehicle_tools, quality_tools):
+            patch = mock.patch.object(module, "redis_client", self.client)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_concurrent_assignments_let_exactly_one_win(self):
+        results = [None] * 8
+
+        def assign(i):
+            results[i] = vehicle_tools.assign_vehicle_to_delivery("V1", f"D{i}")
+
+        threads = [threading.Thread(target=assign, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        winners = [r for r in results if r["status"] == "success"]
+        self.assertEqual(len(winners), 1)
+        self.assertTrue(all(r["current_status"] == "on_delivery" for r in results if r["status"] == "error"))
+        delivery_id = winners[0]["assigned_delivery_id"]
+        self.assertEqual(self.client.hget("vehicle:V1", "delivery_id"), delivery_id)
+        self.assertEqual(field_counts(self.client, "vehicle", "status"), {"available": 0, "on_delivery": 1})
+        self.assertEqual(find_ids(self.client, "vehicle", ("delivery_id", delivery_id)), ["V1"])
+
+    def test_transition_rules_and_missing_vehicle_write_nothing(self):
+        vehicle_tools.assign_vehicle_to_delivery("V1", "D1")
+        self.assertEqual(vehicle_tools.release_vehicle("V1")["previous_status"], "on_delivery")
+        self.assertFalse(self.client.hexists("vehicle:V1", "delivery_id"))
+        self.assertEqual(find_ids(self.client, "vehicle", ("delivery_id", "D1")), [])
+
+        second = vehicle_tools.release_vehicle("V1")
+        self.assertEqual((second["status"], second["current_status"]), ("error", "available"))
+        self.assertEqual(vehicle_tools.update_vehicle_status("V1", "flying")["status"], "error")
+
+        self.assertEqual(vehicle_tools.update_vehicle_status("V404", "maintenance")["status"], "error")
+        self.assertFalse(self.client.exists("vehicle:V404"))
+        self.assertNotIn("V404", find_ids(self.client, "vehicle"))
+
+    def test_recall_assignment_and_legacy_status_recovery(self):
+        self.assertEqual(vehicle_tools.assign_vehicle_to_recall("V1", "R1")["status"], "success")
+        recalled = vehicle_tools.get_assigned_recall_vehicles("R1")["vehicles"]
+        self.assertEqual([v["id"] for v in recalled], ["V1"])
+        self.assertEqual(vehicle_tools.assign_vehicle_to_delivery("V1", "D1")["current_status"], "assigned_for_recall")
+        self.assertEqual(vehicle_tools.update_vehicle_status("V1", "available")["previous_status"], "assigned_for_recall")
+        self.assertEqual(vehicle_tools.update_vehicle_status("V1", "assigned_for_recall")["status"], "success")
+        self.assertEqual(vehicle_tools.get_fleet_availability()["data"]["assigned_for_recall"], 1)
+
+        # 전이 표에 없는 이전 상태는 available / maintenance 로만 되돌린다
+        self.client.hset("vehicle:V1", "status", "in_transit")
+        self.assertEqual(vehicle_tools.update_vehicle_status("V1", "out_of_service")["status"], "error")
+        self.assertEqual(vehicle_tools.update_vehicle_status("V1", "maintenance")["previous_status"], "in_transit")
+
+    def test_quality_update_validates_and_moves_counters(self):
+        self.assertEqual(quality_tools.update_quality_result("Q1", "passed", -1)["status"], "error")
+        self.assertEqual(quality_tools.update_quality_result("Q1", "great", 0)["status"], "error")
+        self.assertEqual(quality_tools.update_quality_result("Q404", "passed", 0)["status"], "error")
+
+        result = quality_tools.update_quality_result("Q1", "failed", "2")
+        self.assertEqual((result["previous_inspection"], result["defects"]), ("pending", 2))
+        self.assertEqual(field_counts(self.client, "quality", "inspection"), {"pending": 0, "failed": 1})
+        self.assertEqual(quality_tools.get_failed_quality_checks()["failed_count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from conftest import import_iam
+
+import_iam()
+
+from Orchestrator_plugin import agent as orchestrator  # noqa: E402
+
+
+class _ToolContext:
+    def __init__(self) -> None:
+        self.state = {"cards": {}}
+
+
+class CallRemoteAgentsTests(unittest.TestCase):
+    def test_results_keyed_by_index_and_timed_out_calls_are_awaited(self):
+        cleaned_up = []
+
+        async def fake_send(card, task, headers):
+            if task == "slow":
+                try:
+                    await asyncio.sleep(30)
+                finally:
+                    cleaned_up.append(task)
+            return f"{card}:{task}"
+
+        calls = [
+            {"agent_name": "delivery_agent", "task": "first"},
+            {"agent_name": "delivery_agent", "task": "second"},
+            {"agent_name": "vehicle_agent", "task": "slow"},
+        ]
+        context = _ToolContext()
+
+        async def run():
+            result = await orchestrator.call_remote_agents(context, calls, timeout_seconds=1)
+            # 도구가 반환한 시점에 취소된 호출의 정리가 이미 끝나 있어야 한다
+            return result, list(cleaned_up)
+
+        with mock.patch.object(orchestrator, "_send_to_agent", fake_send), \
+                mock.patch.object(orchestrator, "_find_card", lambda cards, name: name), \
+                mock.patch.object(orchestrator, "_card_from_state", lambda value: value), \
+                mock.patch.object(orchestrator, "_propagated_auth_headers", lambda ctx, name: {}), \
+                mock.patch.object(orchestrator.plugin, "check_remote_targets", lambda ctx, names: {}):
+            result, cleaned_at_return = asyncio.run(run())
+
+        self.assertEqual([r["status"] for r in result["results"]], ["ok", "ok", "timeout"])
+        self.assertEqual(sorted(context.state["remote_results"]), ["0", "1"])
+        self.assertEqual(context.state["remote_results"]["1"]["response"], "delivery_agent:second")
+        self.assertEqual(cleaned_at_return, ["slow"])
+
+    def test_malformed_call_is_reported_without_aborting_the_fan_out(self):
+        async def fake_send(card, task, headers):
+            return f"{card}:{task}"
+
+        context = _ToolContext()
+        calls = ["delivery_agent", None, {"agent_name": "delivery_agent", "task": "first"}]
+        with mock.patch.object(orchestrator, "_send_to_agent", fake_send), \
+                mock.patch.object(orchestrator, "_find_card", lambda cards, name: name), \
+                mock.patch.object(orchestrator, "_card_from_state", lambda value: value), \
+                mock.patch.object(orchestrator, "_propagated_auth_headers", lambda ctx, name: {}), \
+                mock.patch.object(orchestrator.plugin, "check_remote_targets", lambda ctx, names: {}):
+            result = asyncio.run(orchestrator.call_remote_agents(context, calls, timeout_seconds=1))
+            single = asyncio.run(orchestrator.call_remote_agents(context, "delivery_agent", timeout_seconds=1))
+
+        self.assertEqual([(r["index"], r["status"]) for r in result["results"]], [(0, "error"), (1, "error"), (2, "ok")])
+        self.assertEqual(result["results"][2]["response"], "delivery_agent:first")
+        self.assertEqual([r["status"] for r in single["results"]], ["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from Orchestrator_plugin.http_pool import HTTPClientPool  # noqa: E402
+
+
+class HTTPClientPoolTests(unittest.TestCase):
+    def test_clients_from_a_previous_loop_are_closed(self):
+        pool = HTTPClientPool()
+
+        async def get():
+            return pool.get_client("http://delivery-agent:10001/")
+
+        old_loop = asyncio.new_event_loop()
+        try:
+            old_client = old_loop.run_until_complete(get())
+        finally:
+            old_loop.close()
+
+        async def switch():
+            client = await get()
+            await asyncio.gather(*pool._closing)
+            return client
+
+        new_client = asyncio.run(switch())
+        self.assertIsNot(new_client, old_client)
+        self.assertTrue(old_client.is_closed)
+        self.assertFalse(new_client.is_closed)
+
+    def test_timeout_is_part_of_the_pool_key(self):
+        pool = HTTPClientPool()
+
+        async def run():
+            default = pool.get_client("http://registry:8000/api/agents/search")
+            short = pool.get_client("http://registry:8000/api/agents/search", timeout=10.0)
+            again = pool.get_client("http://registry:8000/.well-known/agent.json")
+            await pool.aclose()
+            return default, short, again
+
+        default, short, again = asyncio.run(run())
+        self.assertIs(again, default)
+        self.assertIsNot(short, default)
+        self.assertEqual(default.timeout.read, pool.default_timeout)
+        self.assertEqual(short.timeout.read, 10.0)
+
+    def test_aclose_closes_pooled_clients(self):
+        pool = HTTPClientPool()
+
+        async def run():
+            client = pool.get_client("http://vehicle-agent:10002/")
+            await pool.aclose()
+            return client
+
+        self.assertTrue(asyncio.run(run()).is_closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+import json
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import fakeredis
+from conftest import import_iam
+
+import_iam()
+
+from iam import database  # noqa: E402
+
+
+class _IAMDatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        with mock.patch.object(database.redis, "Redis", lambda **kwargs: self.client):
+            self.db = database.IAMDatabase()
+
+
+class PolicyIndexCacheTests(_IAMDatabaseTestCase):
+    def test_enriched_policy_is_cached_until_a_write(self):
+        policy = self.db.get_policy_by_agent("orchestrator")
+        self.assertEqual(policy["policy_id"], "policy_orchestrator")
+        self.assertTrue(policy["prompt_validation_rules"])
+        self.assertIn("orchestrator", self.client.hkeys(database.POLICY_CACHE_KEY))
+
+        # 캐시 적중 시 원본 해시는 읽지 않는다
+        with mock.patch.object(self.db, "get_policy", side_effect=AssertionError("cache miss")):
+            self.assertEqual(self.db.get_policy_by_agent("orchestrator"), policy)
+
+        self.db.update_ruleset("ruleset_prompt_orchestrator", {"system_prompt": "updated"})
+        refreshed = self.db.get_policy_by_agent("orchestrator")
+        self.assertEqual(refreshed["prompt_validation_rules"][0]["system_prompt"], "updated")
+
+    def test_write_during_enrichment_does_not_fill_a_stale_cache(self):
+        enrich = self.db._enrich_policy
+
+        def enrich_then_write(policy):
+            enriched = enrich(policy)
+            self.db.update_policy("policy_delivery", {"enabled": False})
+            return enriched
+
+        with mock.patch.object(self.db, "_enrich_policy", enrich_then_write):
+            self.db.get_policy_by_agent("delivery_agent")
+        self.assertNotIn("delivery_agent", self.client.hkeys(database.POLICY_CACHE_KEY))
+        self.assertFalse(self.db.get_policy_by_agent("delivery_agent")["enabled"])
+
+    def test_agent_index_follows_policy_moves(self):
+        self.db.update_policy("policy_item", {"agent_id": "new_item_agent"})
+        self.assertIsNone(self.db.get_policy_by_agent("item_agent"))
+        self.assertEqual(self.db.get_policy_by_agent("new_item_agent")["policy_id"], "policy_item")
+
+        self.db.create_policy({"policy_id": "policy_extra", "agent_id": "extra_agent", "enabled": True})
+        self.assertEqual(self.client.hget(database.POLICY_AGENT_INDEX_KEY, "extra_agent"), "policy_extra")
+
+    def test_missing_index_is_rebuilt_from_policies(self):
+        self.client.delete(database.POLICY_AGENT_INDEX_KEY, database.POLICY_CACHE_KEY)
+        self.assertEqual(self.db.get_policy_by_agent("vehicle_agent")["policy_id"], "policy_vehicle")
+        self.assertEqual(self.client.hlen(database.POLICY_AGENT_INDEX_KEY), 5)
+
+
+class BulkRecordLoadTests(_IAMDatabaseTestCase):
+    def test_bulk_loads_are_typed_and_ordered(self):
+        agents = self.db.get_agent_records()
+        self.assertEqual([a.agent_id for a in agents], sorted(a.agent_id for a in agents))
+        self.assertTrue(all(isinstance(a.plugins, list) for a in agents))
+
+        rulesets = {r.ruleset_id: r for r in self.db.get_ruleset_records()}
+        self.assertIsInstance(rulesets["ruleset_tool_call_remote_agent"].rules, dict)
+        self.assertIs(rulesets["ruleset_prompt_orchestrator"].enabled, True)
+
+        policy = next(p for p in self.db.get_policy_records() if p.policy_id == "policy_orchestrator")
+        self.assertEqual(policy.agent_id, "orchestrator")
+        self.assertEqual(self.db.get_policy("policy_orchestrator"), policy.to_dict())
+
+    def test_pipeline_fallback_matches_script(self):
+        expected = (self.db.get_all_agents(), self.db.get_all_rulesets(), self.db.get_all_policies())
+        failing = mock.Mock(side_effect=database.redis.ResponseError("NOSCRIPT"))
+        with mock.patch.object(self.db, "_load_all", failing), mock.patch.object(database, "BULK_BATCH_SIZE", 2):
+            fallback = (self.db.get_all_agents(), self.db.get_all_rulesets(), self.db.get_all_policies())
+        self.assertEqual(fallback, expected)
+        self.assertEqual(failing.call_count, 3)
+
+    def test_broken_json_fields_fall_back_and_dangling_ids_are_skipped(self):
+        self.client.hset("agents:orchestrator", "plugins", "{not json")
+        self.client.hset("rulesets:ruleset_tool_call_remote_agent", "rules", "{not json")
+        self.client.sadd("policies:all", "policy_deleted")
+        with self.assertLogs(database.logger, "WARNING"):
+            agent = self.db.get_agent("orchestrator")
+            ruleset = self.db.get_ruleset("ruleset_tool_call_remote_agent")
+        self.assertEqual(agent["plugins"], [])
+        self.assertEqual(ruleset["rules"], "{not json")
+        self.assertNotIn("policy_deleted", [p["policy_id"] for p in self.db.get_all_policies()])
+
+
+class LogStreamTests(_IAMDatabaseTestCase):
+    def _add(self, n):
+        for i in range(n):
+            self.db.add_log({
+                "agent_id": "delivery_agent" if i % 2 else "vehicle_agent",
+                "verdict": "VIOLATION" if i % 3 == 0 else "SAFE",
+                "policy_type": "prompt_validation",
+                "message": f"log-{i}",
+            })
+
+    def test_filters_and_cursor_pages(self):
+        self._add(12)
+        delivery = self.db.query_logs(limit=100, agent_id="delivery_agent")["logs"]
+        self.assertEqual([log["message"] for log in delivery], [f"log-{i}" for i in (11, 9, 7, 5, 3, 1)])
+        self.assertEqual(
+            [log["log_id"] for log in delivery],
+            [log["log_id"] for log in self.db.query_logs(limit=100)["logs"] if log["agent_id"] == "delivery_agent"],
+        )
+
+        pages, cursor = [], None
+        while True:
+            page = self.db.query_logs(limit=2, verdict="VIOLATION", cursor=cursor)
+            pages.append([log["message"] for log in page["logs"]])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(sum(pages, []), ["log-9", "log-6", "log-3", "log-0"])
+        for bad in ("abc", "1-2-3", "+", "1) 0"):
+            with self.assertRaises(ValueError):
+                self.db.query_logs(cursor=bad)
+        self.assertEqual([log["message"] for log in self.db.iter_logs(batch_size=5)], [f"log-{i}" for i in range(11, -1, -1)])
+
+    def test_scan_budget_returns_a_partial_page_with_cursor(self):
+        self._add(12)
+        with mock.patch.object(database, "LOG_SCAN_BUDGET", 2):
+            page = self.db.query_logs(limit=1, agent_id="vehicle_agent", verdict="VIOLATION")
+        # log-10, log-8 만 검사하고 멈춘다
+        self.assertEqual(page["logs"], [])
+        self.assertIsNotNone(page["next_cursor"])
+        rest = self.db.query_logs(limit=10, agent_id="vehicle_agent", verdict="VIOLATION", cursor=page["next_cursor"])
+        self.assertEqual([log["message"] for log in rest["logs"]], ["log-6", "log-0"])
+
+    def test_time_bounds_accept_iso_and_reject_garbage(self):
+        self._add(3)
+        newest = self.db.query_logs(limit=1)["logs"][0]
+        self.assertEqual(self.db.query_logs(start=newest["timestamp"])["logs"][0]["log_id"], newest["log_id"])
+        self.assertEqual(self.db.query_logs(end="1000")["logs"], [])
+        with self.assertRaises(ValueError):
+            self.db.query_logs(start="yesterday")
+
+    def test_legacy_list_is_migrated_once(self):
+        client = fakeredis.FakeRedis(decode_responses=True)
+        legacy = [
+            {"agent_id": "item_agent", "verdict": "SAFE", "timestamp": "2026-01-01T00:00:02", "message": "new"},
+            {"agent_id": "item_agent", "verdict": "BLOCKED", "timestamp": "2026-01-01T00:00:01", "message": "old"},
+            {"agent_id": "item_agent", "verdict": "SAFE", "timestamp": "2026-01-01T00:00:01", "message": "same-ms"},
+        ]
+        client.rpush(database.LEGACY_LOG_LIST_KEY, *[json.dumps(entry) for entry in legacy])
+        with mock.patch.object(database.redis, "Redis", lambda **kwargs: client):
+            db = database.IAMDatabase()
+            database.IAMDatabase()
+
+        self.assertEqual(client.xlen(database.LOG_STREAM_KEY), 3)
+        self.assertEqual([log["message"] for log in db.query_logs(agent_id="item_agent")["logs"]], ["new", "old", "same-ms"])
+        self.assertTrue(client.exists(f"{database.LEGACY_LOG_LIST_KEY}:migrated"))
+
+    def test_consumer_group_reads_new_logs_once(self):
+        self.db.ensure_log_consumer_group("audit", "$")
+        self.db.ensure_log_consumer_group("audit", "$")
+        self._add(2)
+        entries = self.db.read_log_group("audit", "worker-1")
+        self.assertEqual([log["message"] for _, log in entries], ["log-0", "log-1"])
+        self.assertEqual(self.db.read_log_group("audit", "worker-2"), [])
+        self.assertEqual(self.db.ack_logs("audit", *[entry_id for entry_id, _ in entries]), 2)
+
+
+class AgentFlowCounterTests(_IAMDatabaseTestCase):
+    def _edges(self, flow):
+        return {(e["source"], e["target"]): (e["count"], e["violations"]) for e in flow["edges"]}
+
+    def test_counters_follow_ingest(self):
+        for target, verdict in (("delivery_agent", "SAFE"), ("delivery_agent", "BLOCKED"), ("item_agent", "SAFE")):
+            self.db.add_log({"agent_id": "orchestrator", "target_agent": target, "verdict": verdict})
+        self.db.add_log({"agent_id": "mystery_agent", "verdict": "violation"})
+
+        flow = self.db.get_agent_flow()
+        self.assertEqual(self._edges(flow), {
+            ("orchestrator", "delivery_agent"): (2, 1),
+            ("orchestrator", "item_agent"): (1, 0),
+            ("mystery_agent", "external"): (1, 1),
+        })
+        nodes = {node["id"]: node for node in flow["nodes"]}
+        self.assertEqual(nodes["orchestrator"]["metrics"], {"events": 3, "violations": 1})
+        self.assertEqual(nodes["delivery_agent"]["metrics"], {"events": 0, "violations": 0})
+        self.assertEqual(nodes["mystery_agent"]["status"], "unknown")
+        self.assertEqual(flow["meta"]["total_events"], 4)
+
+        windowed = self.db.get_agent_flow(window_seconds=600)
+        self.assertEqual(windowed["meta"]["bucket_seconds"], 60)
+        self.assertEqual(self._edges(windowed), self._edges(flow))
+        self.assertEqual(self.db.get_agent_flow(window_seconds=2 * 24 * 3600)["meta"]["bucket_seconds"], 3600)
+
+    def test_old_logs_count_toward_totals_only(self):
+        client = fakeredis.FakeRedis(decode_responses=True)
+        old = {"agent_id": "item_agent", "target_agent": "vehicle_agent", "verdict": "SAFE", "timestamp": "2026-01-01T00:00:00"}
+        client.rpush(database.LEGACY_LOG_LIST_KEY, json.dumps(old))
+        with mock.patch.object(database.redis, "Redis", lambda **kwargs: client):
+            db = database.IAMDatabase()
+
+        self.assertEqual(self._edges(db.get_agent_flow()), {("item_agent", "vehicle_agent"): (1, 0)})
+        self.assertEqual(db.get_agent_flow(window_seconds=3600)["edges"], [])
+        self.assertEqual(list(client.scan_iter(f"{database.FLOW_BUCKET_PREFIX}60:*")), [])
+
+    def test_clear_logs_resets_counters(self):
+        self.db.add_log({"agent_id": "orchestrator", "target_agent": "item_agent", "verdict": "SAFE"})
+        self.db.clear_logs()
+        self.assertEqual(self.db.get_agent_flow()["meta"]["total_events"], 0)
+
+
+class LogArchiveTests(_IAMDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db.log_archive = database.LogArchive(tempfile.mkdtemp(prefix="iam-archive-"), "gzip")
+        patch = mock.patch.object(database, "LOG_ARCHIVE_BATCH", 3)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def _add(self, start, stop):
+        for i in range(start, stop):
+            self.db.add_log({"agent_id": "item_agent" if i % 2 else "vehicle_agent", "verdict": "SAFE", "message": f"log-{i}"})
+
+    def test_archived_logs_leave_the_streams_once_and_stay_queryable(self):
+        self._add(0, 7)
+        cutoff = str(int(time.time() * 1000) + 1000)
+        self.assertEqual(self.db.archive_logs(older_than=cutoff), 7)
+        self.assertEqual(self.db.archive_logs(older_than=cutoff), 0)
+        self.assertEqual(self.client.xlen(database.LOG_STREAM_KEY), 0)
+        self.assertEqual(self.client.xlen(f"{database.LOG_AGENT_STREAM_PREFIX}item_agent"), 0)
+        self.assertIsNone(self.client.get(database.LOG_ARCHIVE_LOCK_KEY))
+        self.assertEqual(self.db.get_stats()["archive"]["entries"], 7)
+
+        time.sleep(0.002)
+        self._add(7, 9)
+        messages = [log["message"] for log in self.db.iter_logs(batch_size=3)]
+        self.assertEqual(messages, [f"log-{i}" for i in range(8, -1, -1)])
+        item = [log["message"] for log in self.db.iter_logs(batch_size=2, agent_id="item_agent")]
+        self.assertEqual(item, ["log-7", "log-5", "log-3", "log-1"])
+
+    def test_watermark_skips_entries_archived_before_a_crash(self):
+        self._add(0, 4)
+        cutoff = str(int(time.time() * 1000) + 1000)
+        with mock.patch.object(self.db, "_trim_archived", side_effect=RuntimeError("crash")):
+            with self.assertRaises(RuntimeError):
+                self.db.archive_logs(older_than=cutoff)
+        self.assertIsNone(self.client.get(database.LOG_ARCHIVE_LOCK_KEY))
+
+        self.db.archive_logs(older_than=cutoff)
+        self.assertEqual(self.db.get_stats()["archive"]["entries"], 4)
+        self.assertEqual(self.client.xlen(database.LOG_STREAM_KEY), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from unittest import mock
+
+import fakeredis
+from conftest import load_tools
+
+item_tools = load_tools("agents/item_agent/tools/redis_item_tools.py", "redis_item_tools")
+
+
+class ItemToolsTests(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        self.client.hset("item:I001", mapping={"id": "I001", "item_name": "의류", "quantity": "312"})
+        self.client.hset("item:I0002", mapping={"id": "I0002", "item_name": "가전", "quantity": "5"})
+        for warehouse, stock in (("W1", "296"), ("W2", "162"), ("W3", "4")):
+            self.client.hset(f"item:{warehouse}:I001", mapping={"id": "I001", "warehouse_id": warehouse, "inventory": stock})
+        self.client.hset("item:W1:I0002", mapping={"id": "I0002", "warehouse_id": "W1", "inventory": "40"})
+        self._patches = [
+            mock.patch.object(item_tools, "redis_client", self.client),
+            mock.patch.object(item_tools, "_resolved_ids", item_tools.OrderedDict()),
+        ]
+        for patch in self._patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_get_items_resolves_every_id_in_one_pipeline(self):
+        with mock.patch.object(self.client, "pipeline", wraps=self.client.pipeline) as pipeline:
+            result = item_tools.get_items(["ITEM001", "i2", "I999", "ITEM001"])
+        self.assertEqual(pipeline.call_count, 1)
+        self.assertEqual([item["item_id"] for item in result["items"]], ["I001", "I0002"])
+        self.assertEqual(result["missing"], ["I999"])
+
+    def test_memoized_id_is_re_resolved_after_its_key_disappears(self):
+        self.assertEqual(item_tools.get_item_details("2")["item_id"], "I0002")
+        self.assertEqual(item_tools._resolved_ids["2"], "I0002")
+
+        self.client.rename("item:I0002", "item:I002")
+        self.assertEqual(item_tools.get_item_details("2")["item_id"], "I002")
+        self.client.delete("item:I002")
+        self.assertEqual(item_tools.get_item_details("2")["status"], "error")
+        self.assertNotIn("2", item_tools._resolved_ids)
+
+    def test_warehouse_inventory_index(self):
+        summary = item_tools.get_all_warehouse_inventories_for_item("I001")
+        self.assertEqual([row["warehouse_id"] for row in summary["warehouses"]], ["W1", "W2", "W3"])
+        self.assertEqual(summary["total_inventory"], 462)
+        self.assertEqual(item_tools.track_item_inventory("I001", "w2")["quantity"], "162")
+        self.assertEqual(item_tools.track_item_inventory("I001", "W9")["status"], "error")
+
+        page = item_tools.get_warehouse_inventory("w1", limit=1)
+        self.assertEqual((page["count"], page["returned"]), (2, 1))
+        top = item_tools.get_warehouse_inventory("W1", aggregate="top:inventory:1")
+        self.assertEqual(top["data"][0]["inventory"], "296")
+        self.assertEqual(item_tools.get_warehouse_inventory("W9")["status"], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
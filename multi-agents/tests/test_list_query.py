@@ -0,0 +1,52 @@
+import sys
+import unittest
+from pathlib import Path
+
+import fakeredis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.list_query import list_entities, list_hashes  # noqa: E402
+from utils.redis_index import rebuild_indexes  # noqa: E402
+
+
+class ListQueryTests(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        statuses = ["available", "in_transit", "available", "maintenance", "available"]
+        for i, status in enumerate(statuses):
+            self.client.hset(f"vehicle:V{i}", mapping={
+                "id": f"V{i}", "status": status, "capacity": str(100 * (i + 1)), "model": "truck",
+            })
+        rebuild_indexes(self.client)
+
+    def test_cursor_pages_cover_every_key_once(self):
+        seen, cursor = [], ""
+        while True:
+            page = list_entities(self.client, "vehicle", limit=2, cursor=cursor, fields="status")
+            self.assertEqual(page["count"], 5)
+            seen += [row["id"] for row in page["data"]]
+            self.assertTrue(all(set(row) == {"id", "status"} for row in page["data"]))
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, ["V0", "V1", "V2", "V3", "V4"])
+
+    def test_aggregates(self):
+        counted = list_entities(self.client, "vehicle", aggregate="count_by:status")
+        self.assertEqual(counted["counts"], {"available": 3, "in_transit": 1, "maintenance": 1})
+        # 카운터가 없는 필드는 HMGET 으로 직접 센다
+        self.assertEqual(list_entities(self.client, "vehicle", aggregate="count_by:model")["counts"], {"truck": 5})
+
+        top = list_entities(self.client, "vehicle", aggregate="top:capacity:2", fields="capacity")
+        self.assertEqual(top["data"], [{"id": "V4", "capacity": "500"}, {"id": "V3", "capacity": "400"}])
+        self.assertEqual(list_entities(self.client, "vehicle", aggregate="count")["total"], 5)
+
+    def test_bad_aggregate_and_limit_clamping(self):
+        self.assertEqual(list_hashes(self.client, [], aggregate="median:capacity")["status"], "error")
+        page = list_hashes(self.client, ["vehicle:V0", "vehicle:V1"], limit=0)
+        self.assertEqual((page["returned"], page["next_cursor"]), (1, "vehicle:V0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
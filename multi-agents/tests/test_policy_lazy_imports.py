@@ -0,0 +1,59 @@
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from conftest import import_iam
+
+import_iam()
+
+from iam import policy_enforcement  # noqa: E402
+
+_PROBE = """
+import json, sys
+import conftest
+conftest.import_iam()
+from iam.policy_enforcement import PolicyEnforcementPlugin
+PolicyEnforcementPlugin(agent_id="probe", gemini_api_key="key", policy_server_url="http://p", log_server_url="http://l")
+print(json.dumps({name: name in sys.modules for name in ("google.generativeai", "requests")}))
+"""
+
+
+def _plugin(**overrides):
+    kwargs = dict(agent_id="test", gemini_api_key="key", policy_server_url="http://p", log_server_url="http://l")
+    kwargs.update(overrides)
+    return policy_enforcement.PolicyEnforcementPlugin(**kwargs)
+
+
+class LazyImportTests(unittest.TestCase):
+    def test_construction_does_not_load_genai_or_requests(self):
+        # 다른 테스트가 이미 로드했을 수 있으므로 새 인터프리터에서 확인한다
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, timeout=120, check=True,
+        )
+        self.assertEqual(json.loads(out.stdout.strip().splitlines()[-1]), {"google.generativeai": False, "requests": False})
+
+    def test_genai_is_configured_once_on_first_model_use(self):
+        genai = mock.Mock()
+        with mock.patch.object(policy_enforcement, "_lazy_import", return_value=genai) as lazy:
+            plugin = _plugin()
+            lazy.assert_not_called()
+            first = plugin._resolve_model("model-a")
+            plugin._resolve_model("model-a")
+            plugin._resolve_model("model-b")
+        genai.configure.assert_called_once_with(api_key="key")
+        self.assertEqual(genai.GenerativeModel.call_count, 2)
+        self.assertIs(first, genai.GenerativeModel.return_value)
+
+    def test_no_api_key_never_loads_genai(self):
+        with mock.patch.object(policy_enforcement, "_lazy_import") as lazy:
+            self.assertIsNone(_plugin(gemini_api_key=None)._resolve_model(None))
+        lazy.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import sys
+import unittest
+from pathlib import Path
+
+import fakeredis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.redis_bulk import fetch_hashes, scan_hashes  # noqa: E402
+
+
+class RedisBulkReadTests(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        for i in range(7):
+            self.client.hset(f"vehicle:V{i}", mapping={"status": "available", "capacity": str(100 * i)})
+        self.client.set("vehicle:not-a-hash", "x")
+        self.client.hset("delivery:D1", mapping={"status": "pending"})
+
+    def test_fetch_hashes_skips_missing_and_wrong_type_keys_across_batches(self):
+        keys = ["vehicle:V0", "vehicle:missing", "vehicle:not-a-hash", "vehicle:V1", "vehicle:V2", "vehicle:V3"]
+        rows = list(fetch_hashes(self.client, keys, batch_size=2))
+        self.assertEqual([key for key, _ in rows], ["vehicle:V0", "vehicle:V1", "vehicle:V2", "vehicle:V3"])
+        self.assertEqual(rows[1][1], {"status": "available", "capacity": "100"})
+
+    def test_pipeline_and_lua_scans_agree(self):
+        key_filter = lambda key: key != "vehicle:V6"  # noqa: E731
+        expected = {f"vehicle:V{i}": {"status": "available", "capacity": str(100 * i)} for i in range(6)}
+        for mode in ("pipeline", "lua"):
+            with self.subTest(mode=mode):
+                rows = dict(scan_hashes(self.client, "vehicle:*", batch_size=3, key_filter=key_filter, mode=mode))
+                self.assertEqual(rows, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
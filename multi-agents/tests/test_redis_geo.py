@@ -0,0 +1,61 @@
+import sys
+import unittest
+from pathlib import Path
+
+import fakeredis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.redis_geo import PLACES, resolve_place, search_vehicles  # noqa: E402
+from utils.redis_index import rebuild_indexes, save_entity  # noqa: E402
+
+
+def _vehicle(client, vehicle_id, place, capacity, status="available"):
+    lon, lat = PLACES[place]
+    client.hset(f"vehicle:{vehicle_id}", mapping={
+        "id": vehicle_id, "status": status, "capacity": str(capacity), "lon": str(lon), "lat": str(lat),
+    })
+
+
+class VehicleSearchTests(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        _vehicle(self.client, "V-SEOUL", "서울", 300)
+        _vehicle(self.client, "V-SEOUL-SMALL", "서울", 100)
+        _vehicle(self.client, "V-SEOUL-BUSY", "서울", 900, status="on_delivery")
+        _vehicle(self.client, "V-SUWON", "수원", 500)
+        _vehicle(self.client, "V-BUSAN", "부산", 800)
+        rebuild_indexes(self.client)
+
+    def test_nearest_available_vehicles_with_capacity(self):
+        radius, results = search_vehicles(self.client, PLACES["서울"], min_capacity=200, k=2)
+        self.assertEqual([r["vehicle_id"] for r in results], ["V-SEOUL", "V-SUWON"])
+        self.assertEqual(results[0]["distance_km"], 0.0)
+        self.assertEqual(results[1]["capacity"], 500)
+        self.assertEqual(radius, 50.0)
+
+    def test_radius_widens_until_k_is_filled(self):
+        radius, results = search_vehicles(self.client, PLACES["서울"], min_capacity=200, k=3)
+        self.assertEqual([r["vehicle_id"] for r in results], ["V-SEOUL", "V-SUWON", "V-BUSAN"])
+        self.assertGreater(radius, 200)
+
+        _, capped = search_vehicles(self.client, PLACES["서울"], min_capacity=200, max_capacity=400, k=3)
+        self.assertEqual([r["vehicle_id"] for r in capped], ["V-SEOUL"])
+
+    def test_writes_keep_geo_and_capacity_indexes_in_sync(self):
+        save_entity(self.client, "vehicle", "V-SEOUL", {"status": "on_delivery"})
+        save_entity(self.client, "vehicle", "V-SEOUL-SMALL", {"capacity": 1000})
+        save_entity(self.client, "vehicle", "V-SUWON", {"lon": PLACES["부산"][0], "lat": PLACES["부산"][1]})
+        _, results = search_vehicles(self.client, PLACES["서울"], min_capacity=200, k=2, radius_km=10)
+        self.assertEqual([r["vehicle_id"] for r in results], ["V-SEOUL-SMALL", "V-BUSAN"])
+
+    def test_resolve_place(self):
+        self.assertEqual(resolve_place("부산광역시"), PLACES["부산"])
+        self.assertEqual(resolve_place("Busan"), PLACES["부산"])
+        self.assertEqual(resolve_place("37.5, 127.0"), (127.0, 37.5))
+        self.assertEqual(resolve_place("127.0, 37.5"), (127.0, 37.5))
+        self.assertIsNone(resolve_place("아틀란티스"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import sys
+import unittest
+from pathlib import Path
+
+import fakeredis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.redis_graph import resolve_context  # noqa: E402
+from utils.redis_index import rebuild_indexes  # noqa: E402
+
+
+class ResolveContextTests(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        self.client.hset("quality:Q1", mapping={"id": "Q1", "inspection": "passed"})
+        self.client.hset("delivery:D1", mapping={"id": "D1", "quality_id": "Q1", "status": "in_transit"})
+        self.client.hset("vehicle:V1", mapping={"id": "V1", "delivery_id": "D1", "status": "in_transit"})
+        self.client.hset("item:I2", mapping={"id": "I2", "vehicle_id": "V1"})
+        self.client.hset("item:I1", mapping={"id": "I1", "vehicle_id": "V1"})
+        self.client.hset("delivery:D2", mapping={"id": "D2", "status": "pending"})
+        rebuild_indexes(self.client)
+
+    def test_any_entity_resolves_the_whole_chain(self):
+        for identifier, start_type in (("Q1", "quality"), ("D1", "delivery"), ("V1", "vehicle"), ("I2", "item")):
+            with self.subTest(identifier=identifier):
+                resolved_type, context = resolve_context(self.client, identifier)
+                self.assertEqual(resolved_type, start_type)
+                self.assertEqual(context["quality"]["id"], "Q1")
+                self.assertEqual(context["delivery"]["id"], "D1")
+                self.assertEqual(context["vehicle"]["id"], "V1")
+                expected_items = ["I2"] if start_type == "item" else ["I1", "I2"]
+                self.assertEqual([item["id"] for item in context["items"]], expected_items)
+
+    def test_unlinked_and_unknown_identifiers(self):
+        self.assertEqual(resolve_context(self.client, "D2"), ("delivery", {"delivery": {"id": "D2", "status": "pending"}}))
+        self.assertIsNone(resolve_context(self.client, "X404"))
+
+
+if __name__ == "__main__":
+    unittest.main()
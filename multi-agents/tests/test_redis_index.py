@@ -0,0 +1,113 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import fakeredis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils import redis_index  # noqa: E402
+from utils.redis_index import (  # noqa: E402
+    INDEX_LOCK_KEY,
+    INDEX_VERSION,
+    INDEX_VERSION_KEY,
+    IndexLockLost,
+    count_key,
+    ensure_indexes,
+    field_counts,
+    find_ids,
+    rebuild_indexes,
+    save_entity,
+)
+
+
+def _seed(client):
+    client.hset("vehicle:V1", mapping={"status": "available", "capacity": "300", "lon": "127.0", "lat": "37.5"})
+    client.hset("vehicle:V2", mapping={"status": "in_transit", "capacity": "500"})
+    client.hset("delivery:D1", mapping={"status": "pending"})
+    client.hset("item:W1:I1", mapping={"qty": "3"})
+
+
+class RedisIndexRebuildTests(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        _seed(self.client)
+
+    def test_repeated_rebuild_does_not_double_count(self):
+        rebuild_indexes(self.client)
+        rebuild_indexes(self.client)
+
+        self.assertEqual(field_counts(self.client, "vehicle", "status"), {"available": 1, "in_transit": 1})
+        self.assertEqual(find_ids(self.client, "vehicle", ("status", "available")), ["V1"])
+        self.assertEqual(self.client.get(INDEX_VERSION_KEY), INDEX_VERSION)
+        self.assertIsNone(self.client.get(INDEX_LOCK_KEY))
+        self.assertEqual(list(self.client.scan_iter("idx-build:*")), [])
+
+    def test_rebuild_drops_stale_index_keys(self):
+        rebuild_indexes(self.client)
+        self.client.delete("vehicle:V2")
+        rebuild_indexes(self.client)
+
+        self.assertEqual(field_counts(self.client, "vehicle", "status"), {"available": 1})
+        self.assertFalse(self.client.exists("idx:vehicle:status:in_transit"))
+
+    def test_build_with_lost_lock_keeps_live_indexes(self):
+        rebuild_indexes(self.client)
+        self.client.hset("vehicle:V3", mapping={"status": "available"})
+        self.client.set(INDEX_LOCK_KEY, "someone-else")
+
+        with self.assertRaises(IndexLockLost):
+            redis_index._build_and_swap(self.client, "expired-token", 500, 60)
+
+        self.assertEqual(self.client.hgetall(count_key("vehicle", "status")), {"available": "1", "in_transit": "1"})
+        self.assertEqual(list(self.client.scan_iter("idx-build:*")), [])
+
+    def test_writes_during_rebuild_survive_the_swap(self):
+        rebuild_indexes(self.client)
+        extend = self.client.eval
+        writes = []
+
+        def eval_and_write(script, *args):
+            # 첫 배치를 임시 키에 쓴 직후(락 연장 시점)에 다른 클라이언트가 쓴 것처럼 갱신한다
+            if not writes:
+                writes.append(save_entity(self.client, "vehicle", "V1", {"status": "on_delivery"}))
+                save_entity(self.client, "vehicle", "V3", {"status": "available", "capacity": 700})
+            return extend(script, *args)
+
+        self.client.set(INDEX_LOCK_KEY, "token", ex=60)
+        with mock.patch.object(self.client, "eval", eval_and_write):
+            redis_index._build_and_swap(self.client, "token", 1, 60)
+
+        self.assertEqual(field_counts(self.client, "vehicle", "status"), {"available": 1, "in_transit": 1, "on_delivery": 1})
+        self.assertEqual(find_ids(self.client, "vehicle", ("status", "available")), ["V3"])
+        self.assertEqual(find_ids(self.client, "vehicle"), ["V1", "V2", "V3"])
+        self.assertEqual(self.client.zscore("idx:vehicle:score:capacity", "V3"), 700)
+        self.assertFalse(self.client.exists(redis_index.INDEX_DIRTY_KEY))
+
+
+class EnsureIndexesTests(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        _seed(self.client)
+
+    def test_waiter_without_lock_never_rebuilds(self):
+        self.client.set(INDEX_LOCK_KEY, "other-process", ex=60)
+
+        with self.assertLogs("utils.redis_index", level="WARNING"):
+            ensure_indexes(self.client, wait_seconds=0.3)
+
+        self.assertEqual(list(self.client.scan_iter("idx:*")), [INDEX_LOCK_KEY])
+        self.assertEqual(self.client.get(INDEX_LOCK_KEY), "other-process")
+
+    def test_readiness_is_rechecked_after_flush(self):
+        with mock.patch.object(redis_index, "READY_RECHECK_SECONDS", 0.0):
+            ensure_indexes(self.client)
+            self.client.flushdb()
+            self.client.hset("vehicle:V9", mapping={"status": "available"})
+            ensure_indexes(self.client)
+        self.assertEqual(find_ids(self.client, "vehicle"), ["V9"])
+
+
+if __name__ == "__main__":
+    unittest.main()
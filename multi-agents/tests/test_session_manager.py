@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+import fakeredis
+from a2a.types import AgentCard
+from conftest import import_iam
+from google.adk.events import Event, EventActions
+
+import_iam()
+
+from iam.session_manager import RedisSessionService, SessionManager  # noqa: E402
+
+CARD = {
+    "name": "delivery_agent",
+    "description": "배송 에이전트",
+    "url": "http://delivery-agent:10001/",
+    "version": "1.0.0",
+    "capabilities": {"streaming": True},
+    "defaultInputModes": ["text/plain"],
+    "defaultOutputModes": ["text/plain"],
+    "skills": [],
+}
+
+
+def _redis_manager():
+    service = RedisSessionService("redis://localhost:6379/1", ttl_seconds=60, max_events=10)
+    service.redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    return SessionManager(service, app_name="test", ttl_seconds=60, max_sessions=10)
+
+
+class RedisSessionRoundTripTests(unittest.TestCase):
+    def test_cards_survive_redis_round_trip(self):
+        async def run():
+            manager = _redis_manager()
+            cards = {CARD["name"]: AgentCard.model_validate(CARD).model_dump(mode="json", by_alias=True, exclude_none=True)}
+            async with manager.session("alice", "conv-1", {"cards": cards}):
+                pass
+            session = await manager.session_service.get_session(app_name="test", user_id="alice", session_id="conv-1")
+            restored = AgentCard.model_validate(session.state["cards"][CARD["name"]])
+            return restored.url
+
+        self.assertEqual(asyncio.run(run()), CARD["url"])
+
+    def test_unchanged_state_does_not_append_events(self):
+        async def run():
+            manager = _redis_manager()
+            state = {"cards": {"a": {"url": "http://a"}}}
+            for _ in range(3):
+                async with manager.session("alice", "conv-1", state):
+                    pass
+            async with manager.session("alice", "conv-1", {"cards": {"a": {"url": "http://b"}}}):
+                pass
+            session = await manager.session_service.get_session(app_name="test", user_id="alice", session_id="conv-1")
+            return len(session.events), session.state["cards"]["a"]["url"]
+
+        self.assertEqual(asyncio.run(run()), (1, "http://b"))
+
+    def test_temp_state_is_not_persisted(self):
+        async def run():
+            manager = _redis_manager()
+            service = manager.session_service
+            async with manager.session("alice", "conv-1", {"temp:auth_token": "secret-token"}):
+                session = await service.get_session(app_name="test", user_id="alice", session_id="conv-1")
+                await service.append_event(
+                    session,
+                    Event(author="user", invocation_id="inv-1", actions=EventActions(state_delta={"temp:auth_token": "secret-token"})),
+                )
+                in_memory = session.state.get("temp:auth_token")
+            raw = await service.redis.get(service._key("test", "alice", "conv-1"))
+            return in_memory, raw
+
+        in_memory, raw = asyncio.run(run())
+        self.assertEqual(in_memory, "secret-token")
+        self.assertNotIn("secret-token", raw)
+
+
+if __name__ == "__main__":
+    unittest.main()
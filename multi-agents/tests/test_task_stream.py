@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import TaskArtifactUpdateEvent
+from conftest import import_iam
+
+import_iam()
+
+from iam.agent_executor import STREAM_ARTIFACT, TaskStream  # noqa: E402
+
+
+async def _drain(queue: EventQueue) -> list:
+    events = []
+    while not queue.queue.empty():
+        events.append(await queue.dequeue_event(no_wait=True))
+    return events
+
+
+class TaskStreamTests(unittest.TestCase):
+    def test_close_sends_one_last_chunk_per_open_artifact(self):
+        async def run():
+            queue = EventQueue()
+            stream = TaskStream(TaskUpdater(queue, "task-1", "ctx-1"))
+            await stream.text("안녕")
+            await stream.text("하세요")
+            await stream.text("생각 중", key="thought")
+            await stream.close()
+            await stream.close()
+            return await _drain(queue)
+
+        events = [e for e in asyncio.run(run()) if isinstance(e, TaskArtifactUpdateEvent)]
+        chunks = [(e.artifact.artifact_id, e.append, e.last_chunk) for e in events]
+        self.assertEqual(chunks, [
+            (f"task-1-{STREAM_ARTIFACT}", False, False),
+            (f"task-1-{STREAM_ARTIFACT}", True, False),
+            ("task-1-thought", False, False),
+            (f"task-1-{STREAM_ARTIFACT}", True, True),
+            ("task-1-thought", True, True),
+        ])
+        self.assertEqual(events[3].artifact.parts, [])
+        self.assertEqual(events[4].artifact.name, "thought")
+
+    def test_close_without_chunks_sends_nothing(self):
+        async def run():
+            queue = EventQueue()
+            await TaskStream(TaskUpdater(queue, "task-1", "ctx-1")).close()
+            return await _drain(queue)
+
+        self.assertEqual(asyncio.run(run()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
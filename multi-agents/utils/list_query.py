@@ -0,0 +1,181 @@
+"""
+목록형 도구 결과의 페이지네이션 / 필드 선택 / 집계
+
+LLM에 전달되는 도구 결과가 데이터 규모와 무관하게 작게 유지되도록 한다.
+
+- ``limit`` / ``cursor`` : 정렬된 키 기준 keyset 페이지네이션. ``next_cursor`` 를 다음 호출에 전달
+- ``fields``             : "status,quality_id" 처럼 필요한 필드만 HMGET으로 읽는다
+- ``aggregate``          : 레코드 대신 집계 결과만 반환
+    * ``count``              전체 건수
+    * ``count_by:<field>``   필드 값별 건수 (예: count_by:status)
+    * ``top:<field>:<n>``    숫자 필드 내림차순 상위 N건 (예: top:capacity:5)
+"""
+import bisect
+import heapq
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import redis
+
+from .redis_bulk import BULK_BATCH_SIZE, fetch_hashes
+from .redis_index import COUNTED_FIELDS, entity_key, field_counts, find_ids
+
+logger = logging.getLogger(__name__)
+
+
+def _default_int(env_key: str, fallback: int) -> int:
+    raw = os.getenv(env_key)
+    if raw is None:
+        return fallback
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Invalid integer for %s: %s (fallback=%s)", env_key, raw, fallback)
+        return fallback
+
+
+DEFAULT_LIMIT = _default_int("AGENT_LIST_DEFAULT_LIMIT", 20)
+MAX_LIMIT = _default_int("AGENT_LIST_MAX_LIMIT", 100)
+MAX_TOP_N = 20
+
+# 인덱스 카운터 등으로 count_by를 빠르게 계산할 수 있을 때 쓰는 훅: field -> {value: count} | None
+CountsHook = Callable[[str], Optional[Dict[str, int]]]
+
+
+def parse_fields(fields: str) -> List[str]:
+    return [f.strip() for f in (fields or "").split(",") if f.strip()]
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    try:
+        limit = int(limit) if limit is not None else DEFAULT_LIMIT
+    except (TypeError, ValueError):
+        limit = DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _fetch_fields(client: redis.Redis, keys: Sequence[str], fields: Sequence[str]) -> List[Tuple[str, Dict[str, str]]]:
+    """필드 일부만 배치 파이프라인(HMGET)으로 읽는다."""
+    rows: List[Tuple[str, Dict[str, str]]] = []
+    for start in range(0, len(keys), BULK_BATCH_SIZE):
+        batch = keys[start : start + BULK_BATCH_SIZE]
+        pipe = client.pipeline(transaction=False)
+        for key in batch:
+            pipe.hmget(key, list(fields))
+        for key, values in zip(batch, pipe.execute(raise_on_error=False)):
+            if isinstance(values, Exception):
+                continue
+            row = {f: v for f, v in zip(fields, values) if v is not None}
+            if row:
+                rows.append((key, row))
+    return rows
+
+
+def _load_rows(client: redis.Redis, keys: Sequence[str], fields: Sequence[str]) -> List[Tuple[str, Dict[str, str]]]:
+    if fields:
+        return _fetch_fields(client, keys, list(dict.fromkeys(["id", *fields])))
+    return list(fetch_hashes(client, keys))
+
+
+def _aggregate(
+    client: redis.Redis,
+    keys: Sequence[str],
+    aggregate: str,
+    fields: Sequence[str],
+    counts_hook: Optional[CountsHook],
+) -> Dict[str, object]:
+    mode, _, arg = aggregate.partition(":")
+    mode = mode.strip().lower()
+    if mode == "count":
+        return {"aggregate": "count", "total": len(keys)}
+
+    if mode == "count_by":
+        field = arg.strip()
+        if not field:
+            raise ValueError("count_by:<field> 형식이어야 합니다 (예: count_by:status)")
+        counts = counts_hook(field) if counts_hook else None
+        if counts is None:
+            counts = {}
+            for _, row in _fetch_fields(client, keys, [field]):
+                value = row[field]
+                counts[value] = counts.get(value, 0) + 1
+        counts = {k: v for k, v in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])) if v > 0}
+        return {"aggregate": f"count_by:{field}", "total": len(keys), "counts": counts}
+
+    if mode == "top":
+        field, _, n_raw = arg.partition(":")
+        field = field.strip()
+        if not field:
+            raise ValueError("top:<field>:<n> 형식이어야 합니다 (예: top:capacity:5)")
+        try:
+            n = max(1, min(int(n_raw or 5), MAX_TOP_N))
+        except ValueError:
+            n = 5
+        scored = []
+        for key, row in _fetch_fields(client, keys, [field]):
+            try:
+                scored.append((float(row[field]), key))
+            except ValueError:
+                continue
+        top_keys = [key for _, key in heapq.nlargest(n, scored)]
+        rows = dict(_load_rows(client, top_keys, fields))
+        data = [rows[key] for key in top_keys if key in rows]
+        return {"aggregate": f"top:{field}:{n}", "total": len(keys), "data": data}
+
+    raise ValueError(f"지원하지 않는 aggregate: {aggregate} (count | count_by:<field> | top:<field>:<n>)")
+
+
+def list_hashes(
+    client: redis.Redis,
+    keys: Sequence[str],
+    *,
+    limit: Optional[int] = None,
+    cursor: str = "",
+    fields: str = "",
+    aggregate: str = "",
+    counts_hook: Optional[CountsHook] = None,
+) -> Dict[str, object]:
+    """정렬된 키 목록에 페이지네이션/필드 선택/집계를 적용한 도구 응답을 만든다."""
+    keys = sorted(keys)
+    selected = parse_fields(fields)
+    if aggregate:
+        try:
+            return {"status": "success", **_aggregate(client, keys, aggregate, selected, counts_hook)}
+        except ValueError as exc:
+            return {"status": "error", "message": str(exc)}
+
+    limit = clamp_limit(limit)
+    start = bisect.bisect_right(keys, cursor) if cursor else 0
+    page = keys[start : start + limit]
+    data = [row for _, row in _load_rows(client, page, selected)]
+    has_more = start + limit < len(keys)
+    return {
+        "status": "success",
+        "count": len(keys),
+        "returned": len(data),
+        "next_cursor": page[-1] if has_more and page else "",
+        "data": data,
+    }
+
+
+def list_entities(
+    client: redis.Redis,
+    entity_type: str,
+    *,
+    limit: Optional[int] = None,
+    cursor: str = "",
+    fields: str = "",
+    aggregate: str = "",
+) -> Dict[str, object]:
+    """보조 인덱스의 ID 집합으로 ``list_hashes`` 를 수행한다 (count_by는 건수 카운터를 우선 사용)."""
+    keys = [entity_key(entity_type, entity_id) for entity_id in find_ids(client, entity_type)]
+
+    def _counts(field: str) -> Optional[Dict[str, int]]:
+        if field in COUNTED_FIELDS.get(entity_type, ()):
+            return field_counts(client, entity_type, field)
+        return None
+
+    return list_hashes(
+        client, keys, limit=limit, cursor=cursor, fields=fields, aggregate=aggregate, counts_hook=_counts
+    )
@@ -0,0 +1,119 @@
+"""
+에이전트 Redis 해시 일괄 조회 헬퍼
+
+목록형 도구가 키마다 ``HGETALL`` 왕복을 하지 않도록 키를 배치로 묶어 읽는다.
+
+- ``pipeline`` 모드: SCAN 한 번(또는 키 목록 한 배치)마다 ``HGETALL`` 을 파이프라인으로 전송
+- ``lua`` 모드   : SCAN + HGETALL 을 서버 측 Lua 스크립트 한 번으로 처리 (배치당 1 왕복)
+
+환경변수
+- ``AGENT_REDIS_BULK_BATCH`` : 배치 크기 (기본 500)
+- ``AGENT_REDIS_BULK_MODE``  : pipeline | lua (기본 pipeline)
+"""
+import logging
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+def _default_int(env_key: str, fallback: int) -> int:
+    raw = os.getenv(env_key)
+    if raw is None:
+        return fallback
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Invalid integer for %s: %s (fallback=%s)", env_key, raw, fallback)
+        return fallback
+
+
+BULK_BATCH_SIZE = max(_default_int("AGENT_REDIS_BULK_BATCH", 500), 1)
+BULK_MODE = os.getenv("AGENT_REDIS_BULK_MODE", "pipeline").strip().lower()
+
+# SCAN 한 번과 그 결과 키들의 HGETALL을 서버에서 함께 수행한다.
+# 반환: [next_cursor, key1, {field, value, ...}, key2, {...}, ...]
+_SCAN_HGETALL_LUA = """
+local page = redis.call('SCAN', ARGV[1], 'MATCH', ARGV[2], 'COUNT', ARGV[3])
+local out = {page[1]}
+for _, key in ipairs(page[2]) do
+  if redis.call('TYPE', key)['ok'] == 'hash' then
+    out[#out + 1] = key
+    out[#out + 1] = redis.call('HGETALL', key)
+  end
+end
+return out
+"""
+
+KeyFilter = Optional[Callable[[str], bool]]
+
+
+def _pairs_to_dict(flat: List[str]) -> Dict[str, str]:
+    return {flat[i]: flat[i + 1] for i in range(0, len(flat), 2)}
+
+
+def fetch_hashes(
+    client: redis.Redis, keys: Iterable[str], *, batch_size: Optional[int] = None
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """키 목록의 해시를 배치 파이프라인으로 읽는다. 비어 있거나 해시가 아닌 키는 건너뛴다."""
+    batch_size = batch_size or BULK_BATCH_SIZE
+    batch: List[str] = []
+
+    def _flush() -> Iterator[Tuple[str, Dict[str, str]]]:
+        pipe = client.pipeline(transaction=False)
+        for key in batch:
+            pipe.hgetall(key)
+        for key, row in zip(batch, pipe.execute(raise_on_error=False)):
+            if row and not isinstance(row, Exception):
+                yield key, row
+
+    for key in keys:
+        batch.append(key)
+        if len(batch) >= batch_size:
+            yield from _flush()
+            batch = []
+    if batch:
+        yield from _flush()
+
+
+def scan_hashes(
+    client: redis.Redis,
+    pattern: str,
+    *,
+    batch_size: Optional[int] = None,
+    key_filter: KeyFilter = None,
+    mode: Optional[str] = None,
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """pattern에 맞는 모든 해시를 (key, data)로 순회한다."""
+    batch_size = batch_size or BULK_BATCH_SIZE
+    if (mode or BULK_MODE) == "lua":
+        yield from _scan_hashes_lua(client, pattern, batch_size, key_filter)
+        return
+
+    cursor = 0
+    while True:
+        cursor, keys = client.scan(cursor=cursor, match=pattern, count=batch_size)
+        if key_filter is not None:
+            keys = [k for k in keys if key_filter(k)]
+        if keys:
+            yield from fetch_hashes(client, keys, batch_size=batch_size)
+        if int(cursor) == 0:
+            break
+
+
+def _scan_hashes_lua(
+    client: redis.Redis, pattern: str, batch_size: int, key_filter: KeyFilter
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    script = client.register_script(_SCAN_HGETALL_LUA)
+    cursor = "0"
+    while True:
+        reply = script(args=[cursor, pattern, batch_size])
+        cursor = reply[0]
+        for i in range(1, len(reply), 2):
+            key, flat = reply[i], reply[i + 1]
+            if flat and (key_filter is None or key_filter(key)):
+                yield key, _pairs_to_dict(flat)
+        if str(cursor) == "0":
+            break
@@ -0,0 +1,164 @@
+"""
+차량 위치 기반 추천
+
+차량 해시의 ``lon``/``lat`` 는 ``idx:vehicle:geo`` (GEO), ``capacity`` 는
+``idx:vehicle:score:capacity`` (ZSET)에 ``redis_index`` 가 쓰기 시점에 함께 반영한다.
+``search_vehicles`` 는 반경 검색 + 가용 상태 + 용량 범위 필터를 Lua 스크립트 한 번으로
+서버에서 수행하고 (거리, 차량 ID) 순으로 정렬한 상위 K건을 반환한다.
+"""
+import logging
+import math
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+
+from .redis_index import ensure_indexes, geo_key, score_key, value_key
+
+logger = logging.getLogger(__name__)
+
+
+def _default_float(env_key: str, fallback: float) -> float:
+    raw = os.getenv(env_key)
+    if raw is None:
+        return fallback
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning("Invalid number for %s: %s (fallback=%s)", env_key, raw, fallback)
+        return fallback
+
+
+SEARCH_RADIUS_KM = _default_float("AGENT_VEHICLE_SEARCH_RADIUS_KM", 50.0)
+MAX_SEARCH_RADIUS_KM = _default_float("AGENT_VEHICLE_MAX_RADIUS_KM", 600.0)
+
+# 주요 거점 좌표 (경도, 위도). 출발지/목적지 이름 해석과 시드 데이터의 차량 배치에 쓴다.
+PLACES: Dict[str, Tuple[float, float]] = {
+    "서울": (126.9780, 37.5665),
+    "인천": (126.7052, 37.4563),
+    "수원": (127.0286, 37.2636),
+    "춘천": (127.7298, 37.8813),
+    "강릉": (128.8761, 37.7519),
+    "청주": (127.4890, 36.6424),
+    "세종": (127.2890, 36.4800),
+    "대전": (127.3845, 36.3504),
+    "전주": (127.1480, 35.8242),
+    "광주": (126.8526, 35.1595),
+    "대구": (128.6014, 35.8714),
+    "포항": (129.3435, 36.0190),
+    "울산": (129.3114, 35.5384),
+    "창원": (128.6811, 35.2281),
+    "부산": (129.0756, 35.1796),
+    "제주": (126.5312, 33.4996),
+}
+
+_ALIASES = {
+    "seoul": "서울", "incheon": "인천", "suwon": "수원", "chuncheon": "춘천",
+    "gangneung": "강릉", "cheongju": "청주", "sejong": "세종", "daejeon": "대전",
+    "jeonju": "전주", "gwangju": "광주", "daegu": "대구", "pohang": "포항",
+    "ulsan": "울산", "changwon": "창원", "busan": "부산", "jeju": "제주",
+}
+
+_SUFFIX = re.compile(r"(특별자치시|특별자치도|특별시|광역시|시)$")
+_COORDS = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+# KEYS[1] = GEO, KEYS[2] = available 상태 집합, KEYS[3] = capacity ZSET
+# ARGV = lon, lat, radius_km, min_capacity, max_capacity(-1 = 제한 없음), k
+# 반환: {vehicle_id, distance_km, capacity, ...} 평탄화 목록
+_SEARCH_LUA = """
+local hits = redis.call('GEOSEARCH', KEYS[1], 'FROMLONLAT', ARGV[1], ARGV[2],
+                        'BYRADIUS', ARGV[3], 'km', 'ASC', 'WITHDIST')
+local min_cap = tonumber(ARGV[4])
+local max_cap = tonumber(ARGV[5])
+local k = tonumber(ARGV[6])
+local picked = {}
+for _, hit in ipairs(hits) do
+  local id = hit[1]
+  if redis.call('SISMEMBER', KEYS[2], id) == 1 then
+    local cap = tonumber(redis.call('ZSCORE', KEYS[3], id))
+    if cap and cap >= min_cap and (max_cap < 0 or cap <= max_cap) then
+      picked[#picked + 1] = {id, tonumber(hit[2]), cap}
+    end
+  end
+end
+table.sort(picked, function(a, b)
+  if a[2] ~= b[2] then return a[2] < b[2] end
+  return a[1] < b[1]
+end)
+local out = {}
+for i = 1, math.min(k, #picked) do
+  out[#out + 1] = picked[i][1]
+  out[#out + 1] = tostring(picked[i][2])
+  out[#out + 1] = tostring(picked[i][3])
+end
+return out
+"""
+
+_scripts: Dict[int, Any] = {}
+
+
+def resolve_place(text: str) -> Optional[Tuple[float, float]]:
+    """지명(서울, 부산광역시, Busan) 또는 "위도,경도" 문자열을 (경도, 위도)로 변환한다."""
+    if not text:
+        return None
+    match = _COORDS.match(text)
+    if match:
+        lat, lon = float(match.group(1)), float(match.group(2))
+        if abs(lat) > 90:  # "경도,위도" 순서로 준 경우
+            lat, lon = lon, lat
+        return (lon, lat) if -180 <= lon <= 180 and -85.05 <= lat <= 85.05 else None
+    name = text.strip()
+    name = _ALIASES.get(name.lower(), name)
+    if name in PLACES:
+        return PLACES[name]
+    name = _SUFFIX.sub("", name)
+    return PLACES.get(name)
+
+
+def distance_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """두 (경도, 위도) 사이 대원 거리(km)."""
+    lon1, lat1, lon2, lat2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6372.7976 * 2 * math.asin(math.sqrt(h))
+
+
+def search_vehicles(
+    client: redis.Redis,
+    origin: Tuple[float, float],
+    *,
+    min_capacity: float = 0,
+    max_capacity: Optional[float] = None,
+    k: int = 5,
+    radius_km: Optional[float] = None,
+) -> Tuple[float, List[Dict[str, Any]]]:
+    """origin 근처의 가용 차량 중 용량 조건을 만족하는 상위 k대를 (사용 반경, 결과)로 반환.
+
+    k대를 채우지 못하면 반경을 4배씩 넓혀 ``MAX_SEARCH_RADIUS_KM`` 까지 다시 찾는다.
+    """
+    ensure_indexes(client)
+    script = _scripts.get(id(client))
+    if script is None:
+        script = _scripts[id(client)] = client.register_script(_SEARCH_LUA)
+    keys = [
+        geo_key("vehicle"),
+        value_key("vehicle", "status", "available"),
+        score_key("vehicle", "capacity"),
+    ]
+    radius = min(radius_km or SEARCH_RADIUS_KM, MAX_SEARCH_RADIUS_KM)
+    while True:
+        flat = script(
+            keys=keys,
+            args=[origin[0], origin[1], radius, min_capacity, -1 if max_capacity is None else max_capacity, k],
+        )
+        results = [
+            {
+                "vehicle_id": flat[i],
+                "distance_km": round(float(flat[i + 1]), 2),
+                "capacity": int(float(flat[i + 2])),
+            }
+            for i in range(0, len(flat), 3)
+        ]
+        if len(results) >= k or radius >= MAX_SEARCH_RADIUS_KM:
+            return radius, results
+        radius = min(radius * 4, MAX_SEARCH_RADIUS_KM)
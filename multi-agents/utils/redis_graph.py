@@ -0,0 +1,132 @@
+"""
+배송 컨텍스트 관계 탐색
+
+엔티티 관계는 하나의 사슬이다.
+
+    quality ◀─(delivery.quality_id)─ delivery ◀─(vehicle.delivery_id)─ vehicle ◀─(item.vehicle_id)─ item
+
+정방향 간선은 자식 해시의 FK 필드, 역방향 간선은 ``redis_index``의
+``idx:{child}:{fk}:{parent_id}`` 집합, 시작 타입은 ``idx:type`` 맵으로 찾는다.
+``resolve_context`` 는 이 탐색 전체를 Lua 스크립트 한 번(1 왕복)으로 수행한다.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+
+from .redis_index import TYPE_MAP_KEY, ensure_indexes
+
+logger = logging.getLogger(__name__)
+
+# ARGV[1] = 식별자, ARGV[2] = idx:type 키
+# 반환: {start_type, quality, delivery, vehicle, {item, ...}} (없는 엔티티는 빈 배열)
+_RESOLVE_CONTEXT_LUA = """
+local ident = ARGV[1]
+local start_type = redis.call('HGET', ARGV[2], ident)
+if not start_type then
+  return false
+end
+
+local function load(kind, id)
+  if not id or id == '' then return nil end
+  local h = redis.call('HGETALL', kind .. ':' .. id)
+  if #h == 0 then return nil end
+  return h
+end
+
+local function field(h, name)
+  if not h then return nil end
+  for i = 1, #h, 2 do
+    if h[i] == name then return h[i + 1] end
+  end
+  return nil
+end
+
+local function children(child, fk, parent_id)
+  if not parent_id or parent_id == '' then return {} end
+  local ids = redis.call('SMEMBERS', 'idx:' .. child .. ':' .. fk .. ':' .. parent_id)
+  table.sort(ids)
+  return ids
+end
+
+local quality, delivery, vehicle
+local items = {}
+local start = load(start_type, ident)
+if not start then
+  return false
+end
+if start_type == 'quality' then quality = start
+elseif start_type == 'delivery' then delivery = start
+elseif start_type == 'vehicle' then vehicle = start
+elseif start_type == 'item' then items = {start}
+end
+
+-- 1) delivery: quality 역방향 / vehicle·item 정방향
+if not delivery and quality then
+  delivery = load('delivery', children('delivery', 'quality_id', field(quality, 'id') or ident)[1])
+end
+if not delivery and vehicle then
+  delivery = load('delivery', field(vehicle, 'delivery_id'))
+end
+if not delivery and #items > 0 then
+  local v = load('vehicle', field(items[1], 'vehicle_id'))
+  if v then
+    vehicle = vehicle or v
+    delivery = load('delivery', field(v, 'delivery_id'))
+  end
+end
+-- 2) quality: delivery 정방향
+if not quality and delivery then
+  quality = load('quality', field(delivery, 'quality_id'))
+end
+-- 3) vehicle: delivery 역방향
+if not vehicle and delivery then
+  vehicle = load('vehicle', children('vehicle', 'delivery_id', field(delivery, 'id'))[1])
+end
+-- 4) items: vehicle 역방향 (여러 개)
+if #items == 0 and vehicle then
+  for _, item_id in ipairs(children('item', 'vehicle_id', field(vehicle, 'id'))) do
+    local h = load('item', item_id)
+    if h then items[#items + 1] = h end
+  end
+end
+
+return {start_type, quality or {}, delivery or {}, vehicle or {}, items}
+"""
+
+_scripts: Dict[int, Any] = {}
+
+
+def _pairs_to_dict(flat: List[str]) -> Dict[str, str]:
+    return {flat[i]: flat[i + 1] for i in range(0, len(flat), 2)}
+
+
+def resolve_context(client: redis.Redis, identifier: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """식별자(Q/D/V/I ID)에서 출발해 quality/delivery/vehicle/items 컨텍스트를 구성한다.
+
+    ``idx:type`` 에 없는 식별자이거나 스크립트를 쓸 수 없으면 None을 반환하므로
+    호출 측은 기존 스캔 경로로 대체할 수 있다.
+    """
+    ensure_indexes(client)
+    script = _scripts.get(id(client))
+    if script is None:
+        script = _scripts[id(client)] = client.register_script(_RESOLVE_CONTEXT_LUA)
+    try:
+        reply = script(args=[identifier, TYPE_MAP_KEY])
+    except redis.ResponseError as exc:
+        logger.warning("관계 탐색 스크립트 실행 실패 - 스캔 경로로 대체: %s", exc)
+        return None
+    if not reply:
+        return None
+
+    start_type, quality, delivery, vehicle, items = reply
+    context: Dict[str, Any] = {}
+    if quality:
+        context["quality"] = _pairs_to_dict(quality)
+    if delivery:
+        context["delivery"] = _pairs_to_dict(delivery)
+    if vehicle:
+        context["vehicle"] = _pairs_to_dict(vehicle)
+    if items:
+        context["items"] = [_pairs_to_dict(item) for item in items]
+    return start_type, context
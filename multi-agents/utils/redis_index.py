@@ -0,0 +1,481 @@
+"""
+에이전트 Redis 데이터용 보조 인덱스
+
+엔티티 해시(``delivery:D001``, ``vehicle:V001`` 등)를 쓸 때 함께 갱신되는 인덱스를
+관리한다. 도구 함수는 ``scan_iter("prefix:*")`` 대신 이 인덱스로 결과 ID만 바로 얻는다.
+
+키 구조 (엔티티 prefix와 겹치지 않도록 모두 ``idx:`` 아래에 둔다)
+- ``idx:{type}:ids``                 : 해당 타입 전체 ID (SET)
+- ``idx:{type}:{field}:{value}``     : 필드 값별 ID 집합 (상태 집합 / FK 역참조, SET)
+- ``idx:{type}:count:{field}``       : 필드 값별 건수 (HASH, HINCRBY)
+- ``idx:{type}:score:{field}``       : 숫자 필드 값 (ZSET, 범위 조회용 예: 차량 적재 용량)
+- ``idx:{type}:geo``                 : 경도/위도 필드 위치 (GEO, 반경 검색용)
+- ``idx:type``                       : 엔티티 ID → 타입 (HASH, 관계 탐색 시작점 판별용)
+- ``idx:inventory:warehouse:{wid}``  : 창고별 재고 품목 ID (SET, ``item:{wid}:{item_id}`` 하위 해시 기준)
+- ``idx:inventory:item:{item_id}``   : 품목별 재고 보유 창고 ID (SET)
+- ``idx:version``                    : 인덱스 스키마 버전 (없거나 다르면 재구축)
+- ``idx:rebuild_dirty``              : 재구축 중 갱신된 엔티티 키 (SET, 바꿔 끼우기 전에 다시 인덱싱)
+
+재구축은 ``idx-build:{token}:`` 아래 임시 키에 만든 뒤 락을 쥔 채 한 트랜잭션으로 바꿔 끼운다.
+재구축 중 ``save_entity`` 로 바뀐 엔티티는 ``idx:rebuild_dirty`` 에 남겨 두었다가 임시 키에
+다시 반영하므로, 먼저 읽어 둔 스냅샷이 최신 쓰기를 덮어쓰지 않는다.
+"""
+import logging
+import time
+import uuid
+import weakref
+from typing import Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import redis
+
+from .redis_bulk import fetch_hashes
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = "4"
+INDEX_VERSION_KEY = "idx:version"
+INDEX_LOCK_KEY = "idx:rebuild_lock"
+INDEX_DIRTY_KEY = "idx:rebuild_dirty"
+INDEX_BUILD_PREFIX = "idx-build:"
+TYPE_MAP_KEY = "idx:type"
+# 준비된 인덱스를 다시 확인하기까지의 시간 (FLUSHDB·버전 변경 후 재구축되도록)
+READY_RECHECK_SECONDS = 30.0
+
+# 타입별 인덱싱 필드: 상태 필드는 상태 집합, *_id 필드는 FK 역참조로 쓰인다.
+#   delivery.quality_id  → quality → delivery
+#   vehicle.delivery_id  → delivery → vehicle
+#   item.vehicle_id      → vehicle → items
+# 순서는 같은 ID가 여러 타입에 있을 때 idx:type 에 기록할 우선순위이기도 하다.
+INDEXED_FIELDS: Dict[str, Sequence[str]] = {
+    "delivery": ("status", "quality_id"),
+    "vehicle": ("status", "delivery_id", "recall_id"),
+    "item": ("vehicle_id", "warehouse_id"),
+    "quality": ("inspection", "qc_result"),
+}
+
+# 건수 카운터를 유지할 필드 (get_fleet_availability 등 집계용)
+COUNTED_FIELDS: Dict[str, Sequence[str]] = {
+    "delivery": ("status",),
+    "vehicle": ("status",),
+    "quality": ("inspection", "qc_result"),
+}
+
+# 숫자 값을 sorted set 점수로 유지할 필드
+SCORED_FIELDS: Dict[str, Sequence[str]] = {
+    "vehicle": ("capacity",),
+}
+
+# GEO 인덱스로 유지할 (경도 필드, 위도 필드)
+GEO_FIELDS: Dict[str, Tuple[str, str]] = {
+    "vehicle": ("lon", "lat"),
+}
+
+ENTITY_TYPES = tuple(INDEXED_FIELDS)
+
+_ready_until: "weakref.WeakKeyDictionary[redis.Redis, float]" = weakref.WeakKeyDictionary()
+
+# 락 값(토큰)이 자기 것일 때만 만료 연장 / 해제
+_EXTEND_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def entity_key(entity_type: str, entity_id: str) -> str:
+    return f"{entity_type}:{entity_id}"
+
+
+def ids_key(entity_type: str) -> str:
+    return f"idx:{entity_type}:ids"
+
+
+def value_key(entity_type: str, field: str, value: str) -> str:
+    return f"idx:{entity_type}:{field}:{value}"
+
+
+def count_key(entity_type: str, field: str) -> str:
+    return f"idx:{entity_type}:count:{field}"
+
+
+def score_key(entity_type: str, field: str) -> str:
+    return f"idx:{entity_type}:score:{field}"
+
+
+def geo_key(entity_type: str) -> str:
+    return f"idx:{entity_type}:geo"
+
+
+def inventory_key(warehouse_id: str, item_id: str) -> str:
+    return f"item:{warehouse_id}:{item_id}"
+
+
+def warehouse_items_key(warehouse_id: str) -> str:
+    return f"idx:inventory:warehouse:{warehouse_id}"
+
+
+def item_warehouses_key(item_id: str) -> str:
+    return f"idx:inventory:item:{item_id}"
+
+
+def index_inventory(pipe, warehouse_id: str, item_id: str) -> None:
+    """창고별 재고 해시(``item:{wid}:{item_id}``)를 양방향 재고 인덱스에 등록한다."""
+    pipe.sadd(warehouse_items_key(warehouse_id), item_id)
+    pipe.sadd(item_warehouses_key(item_id), warehouse_id)
+
+
+def tracked_fields(entity_type: str) -> List[str]:
+    """인덱스 갱신 판단에 필요한 해시 필드 목록."""
+    fields = list(INDEXED_FIELDS.get(entity_type, ()))
+    fields += [f for f in SCORED_FIELDS.get(entity_type, ()) if f not in fields]
+    fields += [f for f in GEO_FIELDS.get(entity_type, ()) if f not in fields]
+    return fields
+
+
+def _as_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+
+def is_entity_key(key: str) -> bool:
+    """``item:W1:I001``, ``quality:return:I001`` 같은 하위 키를 제외한 엔티티 키인지 확인."""
+    prefix, sep, rest = key.partition(":")
+    return bool(sep and rest) and prefix in INDEXED_FIELDS and ":" not in rest
+
+
+class EntityNotFound(LookupError):
+    """``must_exist=True`` 로 갱신하려는 엔티티 해시가 없을 때."""
+
+
+class TransitionError(ValueError):
+    """갱신 시점의 필드 값이 허용된 이전 상태가 아닐 때 (동시 갱신으로 상태가 바뀐 경우 포함)."""
+
+    def __init__(self, entity_type: str, entity_id: str, field: str, current: Optional[str], allowed: Collection[str]):
+        self.field = field
+        self.current = current
+        self.allowed = sorted(allowed)
+        super().__init__(
+            f"{entity_type} {entity_id}: {field}={current!r} 상태에서는 변경할 수 없습니다 (허용되는 현재 상태: {', '.join(self.allowed)})"
+        )
+
+
+def apply_index_diff(
+    pipe,
+    entity_type: str,
+    entity_id: str,
+    old: Mapping[str, Optional[str]],
+    new: Mapping[str, Optional[str]],
+) -> None:
+    """old → new 필드 값 변화를 인덱스에 반영하는 명령을 pipe에 쌓는다."""
+    counted = COUNTED_FIELDS.get(entity_type, ())
+    for field in INDEXED_FIELDS.get(entity_type, ()):
+        before, after = old.get(field), new.get(field)
+        if before == after:
+            continue
+        if before:
+            pipe.srem(value_key(entity_type, field, before), entity_id)
+        if after:
+            pipe.sadd(value_key(entity_type, field, after), entity_id)
+        if field in counted:
+            if before:
+                pipe.hincrby(count_key(entity_type, field), before, -1)
+            if after:
+                pipe.hincrby(count_key(entity_type, field), after, 1)
+    for field in SCORED_FIELDS.get(entity_type, ()):
+        if old.get(field) == new.get(field):
+            continue
+        score = _as_float(new.get(field))
+        if score is None:
+            pipe.zrem(score_key(entity_type, field), entity_id)
+        else:
+            pipe.zadd(score_key(entity_type, field), {entity_id: score})
+    if entity_type in GEO_FIELDS:
+        lon_field, lat_field = GEO_FIELDS[entity_type]
+        if (old.get(lon_field), old.get(lat_field)) != (new.get(lon_field), new.get(lat_field)):
+            lon, lat = _as_float(new.get(lon_field)), _as_float(new.get(lat_field))
+            if lon is None or lat is None or not (-180 <= lon <= 180 and -85.05 <= lat <= 85.05):
+                pipe.zrem(geo_key(entity_type), entity_id)
+            else:
+                pipe.geoadd(geo_key(entity_type), (lon, lat, entity_id))
+
+
+def save_entity(
+    client: redis.Redis,
+    entity_type: str,
+    entity_id: str,
+    changes: Mapping[str, object],
+    *,
+    remove: Iterable[str] = (),
+    must_exist: bool = False,
+    expect: Optional[Mapping[str, Collection[str]]] = None,
+) -> Dict[str, str]:
+    """엔티티 해시를 갱신하면서 인덱스도 같은 트랜잭션(WATCH/MULTI)으로 갱신한다.
+
+    ``must_exist`` 이면 해시가 없을 때 ``EntityNotFound``, ``expect`` 의 필드 값이
+    허용 목록에 없으면 ``TransitionError`` 를 던지며 아무것도 쓰지 않는다.
+    검사와 쓰기 사이에 다른 클라이언트가 키를 바꾸면 WATCH로 재시도하므로
+    동시 요청 중 하나만 전이에 성공한다. 재구축 락이 잡혀 있으면 키를 ``INDEX_DIRTY_KEY`` 에
+    남겨 재구축이 바꿔 끼우기 전에 다시 인덱싱하게 한다. 갱신 전 해시 값을 반환한다.
+    """
+    key = entity_key(entity_type, entity_id)
+    fields = tracked_fields(entity_type)
+    removed = [f for f in remove if f not in changes]
+    expect = expect or {}
+
+    def _update(pipe) -> Dict[str, str]:
+        current = pipe.hgetall(key)
+        if must_exist and not current:
+            raise EntityNotFound(f"{entity_type} {entity_id} does not exist.")
+        for field, allowed in expect.items():
+            if current.get(field) not in allowed:
+                raise TransitionError(entity_type, entity_id, field, current.get(field), allowed)
+        rebuilding = pipe.get(INDEX_LOCK_KEY) is not None
+        old = {field: current.get(field) for field in fields}
+        new = dict(old)
+        for field in fields:
+            if field in changes:
+                new[field] = str(changes[field])
+            elif field in removed:
+                new[field] = None
+        pipe.multi()
+        if changes:
+            pipe.hset(key, mapping={k: str(v) for k, v in changes.items()})
+        if removed:
+            pipe.hdel(key, *removed)
+        pipe.sadd(ids_key(entity_type), entity_id)
+        pipe.hsetnx(TYPE_MAP_KEY, entity_id, entity_type)
+        apply_index_diff(pipe, entity_type, entity_id, old, new)
+        if rebuilding:
+            pipe.sadd(INDEX_DIRTY_KEY, key)
+        return current
+
+    # 재구축 락도 WATCH 해서, 확인 직후 시작된 재구축이 이 쓰기를 놓치지 않게 한다
+    return client.transaction(_update, key, INDEX_LOCK_KEY, value_from_callable=True)
+
+
+class IndexLockLost(RuntimeError):
+    """재구축 도중 락이 만료되어 다른 프로세스에 넘어갔을 때 (만든 인덱스는 버린다)."""
+
+
+class _DirtyBeforeSwap(Exception):
+    """바꿔 끼우기 직전에 재구축 중 갱신된 엔티티가 남아 있을 때 (다시 인덱싱 후 재시도)."""
+
+
+class _StagedPipeline:
+    """인덱스 명령의 키(첫 인자)를 빌드 전용 임시 키로 바꿔 쌓는 파이프라인 래퍼."""
+
+    def __init__(self, pipe, prefix: str):
+        self._pipe = pipe
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        command = getattr(self._pipe, name)
+
+        def _staged(key, *args, **kwargs):
+            return command(self._prefix + key, *args, **kwargs)
+
+        return _staged
+
+
+def _try_lock(client: redis.Redis, ttl: int) -> Optional[str]:
+    token = uuid.uuid4().hex
+    return token if client.set(INDEX_LOCK_KEY, token, nx=True, ex=ttl) else None
+
+
+def _wait_for_lock(client: redis.Redis, wait_seconds: float) -> str:
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        token = _try_lock(client, max(int(wait_seconds), 1))
+        if token:
+            return token
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{INDEX_LOCK_KEY} 를 {wait_seconds:.0f}초 안에 얻지 못했습니다.")
+        time.sleep(0.2)
+
+
+def _release_lock(client: redis.Redis, token: str) -> None:
+    client.eval(_RELEASE_LOCK_LUA, 1, INDEX_LOCK_KEY, token)
+
+
+def _reindex_dirty(
+    client: redis.Redis, prefix: str, snapshot: Dict[str, Dict[str, Optional[str]]], batch_size: int
+) -> None:
+    """재구축 중 갱신된 엔티티를 다시 읽어, 스냅샷과의 차이만큼 임시 키를 고친다."""
+    while True:
+        keys = client.spop(INDEX_DIRTY_KEY, batch_size)
+        if not keys:
+            return
+        read = client.pipeline(transaction=False)
+        for key in keys:
+            read.hmget(key, tracked_fields(key.split(":", 1)[0]))
+        rows = read.execute()
+        write = client.pipeline(transaction=False)
+        staged = _StagedPipeline(write, prefix)
+        for key, values in zip(keys, rows):
+            entity_type, entity_id = key.split(":", 1)
+            current = dict(zip(tracked_fields(entity_type), values))
+            if key not in snapshot:
+                # 스캔 이후에 생긴 엔티티
+                staged.sadd(ids_key(entity_type), entity_id)
+                staged.hsetnx(TYPE_MAP_KEY, entity_id, entity_type)
+            apply_index_diff(staged, entity_type, entity_id, snapshot.get(key, {}), current)
+            snapshot[key] = current
+        write.execute()
+
+
+def _build_and_swap(client: redis.Redis, token: str, batch_size: int, lock_ttl: int) -> Dict[str, int]:
+    """락(token)을 쥔 상태에서 임시 키에 인덱스를 만들고, 락이 그대로일 때만 live 키와 바꾼다."""
+    prefix = f"{INDEX_BUILD_PREFIX}{token}:"
+    # 임시 키에 넣은 엔티티별 필드 값 (재구축 중 갱신된 엔티티를 고칠 때 이전 값으로 쓴다)
+    snapshot: Dict[str, Dict[str, Optional[str]]] = {}
+    # 이전 재구축이 남긴 표시는 버린다 (그 쓰기는 아래 스캔이 그대로 읽는다)
+    client.delete(INDEX_DIRTY_KEY)
+
+    def _write_batch(fill) -> None:
+        write = client.pipeline(transaction=False)
+        fill(_StagedPipeline(write, prefix))
+        write.execute()
+        # 긴 재구축 중 락이 만료되어 다른 프로세스가 끼어들지 않도록 연장
+        client.eval(_EXTEND_LOCK_LUA, 1, INDEX_LOCK_KEY, token, lock_ttl)
+
+    try:
+        totals: Dict[str, int] = {}
+        for entity_type in INDEXED_FIELDS:
+            fields = tracked_fields(entity_type)
+            keys = [k for k in client.scan_iter(f"{entity_type}:*", count=1000) if is_entity_key(k)]
+            for start in range(0, len(keys), batch_size):
+                batch = keys[start : start + batch_size]
+                read = client.pipeline(transaction=False)
+                for key in batch:
+                    read.hmget(key, list(fields))
+                rows = read.execute()
+
+                def _fill(staged, entity_type=entity_type, batch=batch, rows=rows, fields=fields):
+                    for key, values in zip(batch, rows):
+                        entity_id = key.split(":", 1)[1]
+                        snapshot[key] = dict(zip(fields, values))
+                        staged.sadd(ids_key(entity_type), entity_id)
+                        staged.hsetnx(TYPE_MAP_KEY, entity_id, entity_type)
+                        apply_index_diff(staged, entity_type, entity_id, {}, snapshot[key])
+
+                _write_batch(_fill)
+            totals[entity_type] = len(keys)
+
+        inventory = [k for k in client.scan_iter("item:*:*", count=1000) if k.count(":") == 2]
+        for start in range(0, len(inventory), batch_size):
+
+            def _fill_inventory(staged, batch=inventory[start : start + batch_size]):
+                for key in batch:
+                    _, warehouse_id, item_id = key.split(":")
+                    index_inventory(staged, warehouse_id, item_id)
+
+            _write_batch(_fill_inventory)
+        totals["inventory"] = len(inventory)
+
+        def _swap(pipe) -> None:
+            if pipe.get(INDEX_LOCK_KEY) != token:
+                raise IndexLockLost(f"{INDEX_LOCK_KEY} 를 잃어 재구축 결과를 적용하지 않습니다.")
+            if pipe.exists(INDEX_DIRTY_KEY):
+                raise _DirtyBeforeSwap()
+            stale = [
+                k for k in pipe.scan_iter("idx:*", count=1000)
+                if k not in built and k not in (INDEX_LOCK_KEY, INDEX_VERSION_KEY, INDEX_DIRTY_KEY)
+            ]
+            pipe.multi()
+            if stale:
+                pipe.delete(*stale)
+            for live, staged_key in built.items():
+                pipe.rename(staged_key, live)
+            pipe.set(INDEX_VERSION_KEY, INDEX_VERSION)
+
+        # 바꿔 끼우는 트랜잭션은 INDEX_DIRTY_KEY 도 WATCH 하므로 그사이 쓰기가 있으면 다시 고친다
+        while True:
+            _reindex_dirty(client, prefix, snapshot, batch_size)
+            built = {key[len(prefix):]: key for key in client.scan_iter(f"{prefix}*", count=1000)}
+            try:
+                client.transaction(_swap, INDEX_LOCK_KEY, INDEX_DIRTY_KEY)
+                break
+            except _DirtyBeforeSwap:
+                continue
+    finally:
+        # 실패했거나 락을 잃은 빌드의 임시 키 정리 (성공했다면 남은 키가 없다)
+        leftovers = list(client.scan_iter(f"{prefix}*", count=1000))
+        for start in range(0, len(leftovers), batch_size):
+            client.delete(*leftovers[start : start + batch_size])
+
+    logger.info("에이전트 Redis 인덱스 재구축 완료: %s", totals)
+    return totals
+
+
+def rebuild_indexes(client: redis.Redis, batch_size: int = 500, wait_seconds: float = 60.0) -> Dict[str, int]:
+    """엔티티 해시 전체를 읽어 인덱스를 처음부터 다시 만든다.
+
+    재구축 락을 잡은 뒤 임시 키에 채우고 기존 ``idx:*`` 키와 한 트랜잭션으로 바꿔 끼우므로,
+    재구축 중에도 조회는 이전 인덱스 전체를 본다. 다른 프로세스가 재구축 중이면 최대
+    ``wait_seconds`` 동안 락을 기다리고, 끝내 얻지 못하면 ``TimeoutError``.
+    """
+    token = _wait_for_lock(client, wait_seconds)
+    try:
+        return _build_and_swap(client, token, batch_size, max(int(wait_seconds), 1))
+    finally:
+        _release_lock(client, token)
+
+
+def ensure_indexes(client: redis.Redis, wait_seconds: float = 60.0) -> None:
+    """인덱스가 없거나 버전이 다르면 락을 잡은 한 프로세스만 재구축하고 나머지는 완료를 기다린다.
+
+    락을 얻지 못한 프로세스는 재구축하지 않는다. 기다리다 시간이 지나면 경고만 남기고 기존 인덱스로
+    조회한다. 준비 여부는 ``READY_RECHECK_SECONDS`` 동안만 기억한다.
+    """
+    now = time.monotonic()
+    if _ready_until.get(client, 0.0) > now:
+        return
+    deadline = now + wait_seconds
+    while client.get(INDEX_VERSION_KEY) != INDEX_VERSION:
+        # 재구축하던 프로세스가 죽어 락이 만료되었다면 여기서 이어받는다
+        token = _try_lock(client, max(int(wait_seconds), 1))
+        if token:
+            try:
+                if client.get(INDEX_VERSION_KEY) != INDEX_VERSION:
+                    _build_and_swap(client, token, 500, max(int(wait_seconds), 1))
+            finally:
+                _release_lock(client, token)
+            continue
+        if time.monotonic() >= deadline:
+            logger.warning("인덱스 재구축 대기 시간(%.0fs) 초과: 기존 인덱스로 조회합니다.", wait_seconds)
+            return
+        time.sleep(0.2)
+    _ready_until[client] = time.monotonic() + READY_RECHECK_SECONDS
+
+
+def find_ids(client: redis.Redis, entity_type: str, *conditions: tuple) -> List[str]:
+    """(field, value) 조건을 모두 만족하는 ID 목록 (정렬됨). 조건이 없으면 전체 ID."""
+    ensure_indexes(client)
+    keys = [value_key(entity_type, field, str(value)) for field, value in conditions]
+    if not keys:
+        members = client.smembers(ids_key(entity_type))
+    elif len(keys) == 1:
+        members = client.smembers(keys[0])
+    else:
+        members = client.sinter(keys)
+    return sorted(members)
+
+
+def load_entities(client: redis.Redis, entity_type: str, entity_ids: Iterable[str]) -> List[Dict[str, str]]:
+    """ID 목록의 해시를 배치 파이프라인으로 읽는다 (없는 키는 건너뜀)."""
+    keys = (entity_key(entity_type, entity_id) for entity_id in entity_ids)
+    return [row for _, row in fetch_hashes(client, keys)]
+
+
+def field_counts(client: redis.Redis, entity_type: str, field: str) -> Dict[str, int]:
+    ensure_indexes(client)
+    return {value: int(count) for value, count in client.hgetall(count_key(entity_type, field)).items()}
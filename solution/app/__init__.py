@@ -2,7 +2,7 @@ import os
 
 from flask import Flask, redirect, request, send_from_directory, url_for
 
-from .core import repo
+from .core import metrics, repo
 
 BASEDIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
@@ -10,6 +10,8 @@ BASEDIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 def ensure_files() -> None:
     """Ensure repository seed files exist before serving requests."""
     repo.ensure_seed()
+    # rollup 이전 로그는 첫 /api/stats 요청이 아니라 시작 시점에 반영
+    metrics.ensure_backfill()
 
 
 def create_app() -> Flask:
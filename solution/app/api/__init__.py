@@ -6,7 +6,9 @@ api_bp = Blueprint('api_bp', __name__, url_prefix='/api')
 # Blueprint 등록을 위해 라우트 모듈 임포트
 from . import verify_jwt  # noqa: E402,F401
 from . import create_agent  # noqa: E402,F401
+from . import bulk_import  # noqa: E402,F401
 from . import verify_jws  # noqa: E402,F401
+from . import resign_cards  # noqa: E402,F401
 from . import update_agent  # noqa: E402,F401
 from . import delete_agent  # noqa: E402,F401
 from . import search_agents  # noqa: E402,F401
@@ -0,0 +1,283 @@
+"""에이전트 카드 일괄 등록 (/api/agents/bulk-import).
+
+JSON 배열(또는 {"cards": [...], "tenants": [...]}) 이나 NDJSON(줄마다 카드 하나) 으로 받은 카드를
+
+1. 인증/관리자 권한을 한 번만 확인하고
+2. 카드별 검증(스키마, 퍼블리셔 서명, 기본 필드, 화이트리스트/extension)을 스레드 풀에서 병렬로 수행한 뒤
+3. 서명이 없는 카드는 jws-server ``/sign/batch`` 로 묶어서 서명하고
+4. 중복 name/url 검사를 통과한 레코드를 ``repo.update_agents`` 로 한 번에 저장한다.
+
+각 항목은 /api/create-agent 와 같은 본문 형태({"card": ..., "tenants": ...} 또는 카드 자체)이며,
+항목별 결과의 status/error 도 create-agent 의 응답 코드와 같다.
+"""
+
+import json
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+
+import requests
+from flask import g, request, jsonify
+
+from . import api_bp
+from .create_agent import (
+    AGENT_CARD_SCHEMA,
+    JWS_SERVER_URL,
+    JWS_SIGN_URL,
+    _derive_agent_id,
+    _sign_payload_for,
+    _signature_entry,
+)
+from ..core.auth import require_jwt, require_admin
+from ..core.logging import append_log
+from ..core import repo
+from ..core.validators import DEFAULT_MAX_AGENT_CARD_BYTES, cached_policy_checks
+from ..core.signatures import verify_jws
+from ..core.policy import PolicyEvaluator, _to_key
+from ..core.tenants import extract_tenants
+
+# --- 일괄 등록 제한 / 병렬도 ---
+BULK_IMPORT_MAX_CARDS = int(os.environ.get('BULK_IMPORT_MAX_CARDS', '500'))
+BULK_IMPORT_WORKERS = int(os.environ.get('BULK_IMPORT_WORKERS', '8'))
+# jws-server /sign/batch 한 번에 보낼 카드 수
+JWS_SIGN_BATCH_SIZE = int(os.environ.get('JWS_SIGN_BATCH_SIZE', '200'))
+JWS_SIGN_BATCH_URL = f"{JWS_SERVER_URL.rstrip('/')}/sign/batch"
+
+_BAD_JSON = object()  # NDJSON 에서 파싱에 실패한 줄
+
+
+def _reject(status: int, error: str, **detail) -> dict:
+    return {"status": status, "error": error, **detail}
+
+
+def _parse_items(raw: str, content_type: str):
+    """요청 본문 -> (항목 목록, 기본 tenants). JSON 문법 오류는 ValueError."""
+    if 'ndjson' in content_type or 'jsonlines' in content_type:
+        items = []
+        for line in raw.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(_BAD_JSON)
+        return items, []
+    body = json.loads(raw)
+    if isinstance(body, list):
+        return body, []
+    if isinstance(body, dict) and isinstance(body.get('cards'), list):
+        return body['cards'], extract_tenants(body.get('tenants'))
+    raise ValueError('expected an array of cards or {"cards": [...]}')
+
+
+def _validate_item(item, default_tenants, evaluator):
+    """항목 하나를 create-agent 와 같은 순서로 검증. 통과 시 등록 후보, 실패 시 _reject 결과."""
+    if item is _BAD_JSON:
+        return _reject(400, 'BAD_JSON', message='Invalid JSON')
+    if not isinstance(item, dict):
+        return _reject(422, 'REQUIRED_FIELDS_MISSING', errors=['card is required'])
+    card = item.get('card') if isinstance(item.get('card'), dict) else item
+    try:
+        size = len(json.dumps(card, ensure_ascii=False).encode('utf-8'))
+    except (TypeError, ValueError):
+        size = 0
+    if size > DEFAULT_MAX_AGENT_CARD_BYTES:
+        return _reject(413, 'PAYLOAD_TOO_LARGE', message=f"card exceeds {DEFAULT_MAX_AGENT_CARD_BYTES} bytes")
+
+    # 서명 없는 카드도 받아 레지스트리가 일괄 서명하므로 signatures 필수 검사는 서명 후 verify_jws 로 대신한다
+    checked = AGENT_CARD_SCHEMA.check(card, mode="import")
+    if checked.schema_errors:
+        return _reject(422, 'SCHEMA_VALIDATION_FAILED', message=checked.schema_message, errors=list(checked.schema_errors))
+    original_sigs = card.get('signatures') if isinstance(card.get('signatures'), list) else []
+    if original_sigs and checked.jws_error:
+        return _reject(498, 'INVALID_TOKEN', message=checked.jws_error)
+    if checked.basic_errors:
+        return _reject(422, 'REQUIRED_FIELDS_MISSING', errors=list(checked.basic_errors))
+
+    if evaluator is not None:
+        capabilities = card.get('capabilities') or {}
+        wle, extension_error = cached_policy_checks(evaluator, card, capabilities.get('extensions'))
+        if isinstance(wle, str) and wle:
+            return _reject(400, 'WHITELIST_REJECTED', message=wle)
+        if isinstance(extension_error, str) and extension_error:
+            return _reject(400, 'EXTENSION_LIMIT_EXCEEDED', message=extension_error)
+
+    publisher_jws = None
+    tenants = default_tenants
+    if item is not card:
+        publisher_jws = item.get('publisher_jws') or item.get('publisherJws') or item.get('jws')
+        if 'tenants' in item:
+            tenants = extract_tenants(item.get('tenants'))
+    if not isinstance(publisher_jws, str):
+        publisher_jws = None
+    return {
+        "card": card,
+        "tenants": tenants,
+        "original_sigs": original_sigs,
+        "publisher_jws": publisher_jws or (original_sigs or None),
+    }
+
+
+def _sign_cards(cards: list) -> list:
+    """서명이 없는 카드들을 jws-server 로 서명하고 카드별 서명 응답(실패 시 None)을 반환.
+
+    /sign/batch 가 없는 서버(404/405)면 카드별 /sign 호출로 대체한다.
+    """
+    signed = [None] * len(cards)
+    for offset in range(0, len(cards), max(JWS_SIGN_BATCH_SIZE, 1)):
+        chunk = cards[offset:offset + max(JWS_SIGN_BATCH_SIZE, 1)]
+        payloads = [_sign_payload_for(card) for card in chunk]
+        try:
+            r = requests.post(JWS_SIGN_BATCH_URL, json={"items": payloads}, timeout=5 + len(chunk) * 0.05)
+        except Exception:
+            continue
+        if r.ok:
+            try:
+                results = r.json().get('results') or []
+            except Exception:
+                results = []
+            for res in results:
+                index = res.get('index') if isinstance(res, dict) else None
+                if isinstance(index, int) and 0 <= index < len(chunk) and res.get('ok'):
+                    signed[offset + index] = res
+            continue
+        if r.status_code not in (404, 405):
+            continue
+        for index, payload in enumerate(payloads):
+            try:
+                single = requests.post(JWS_SIGN_URL, json=payload, timeout=5)
+                if single.ok:
+                    signed[offset + index] = single.json()
+            except Exception:
+                pass
+    return signed
+
+
+def _commit(candidates: list):
+    """중복 name/url 검사(기존 레지스트리 + 같은 배치 내 앞선 카드) 후 통과한 레코드를 붙인 목록을 만든다.
+
+    repo.update_agents 에 넘기는 mutate 함수 - 충돌 시 재호출되므로 입력 목록을 바꾸지 않는다.
+    """
+    def _mutate(agents):
+        names, urls = set(), set()
+        for agent in agents:
+            if not isinstance(agent, dict) or str(agent.get('status') or '').strip().lower() == 'deleted':
+                continue
+            existing = agent.get('card') if isinstance(agent.get('card'), dict) else agent
+            if isinstance(existing, dict):
+                names.add(_to_key(existing.get('name')))
+                urls.add(_to_key(existing.get('url')))
+        names.discard('')
+        urls.discard('')
+
+        accepted, conflicts = [], {}
+        for index, record in candidates:
+            name, url = _to_key(record['card'].get('name')), _to_key(record['card'].get('url'))
+            if name and name in names:
+                conflicts[index] = "동일한 name을 가진 에이전트 카드가 이미 존재합니다."
+                continue
+            if url and url in urls:
+                conflicts[index] = "동일한 url을 가진 에이전트 카드가 이미 존재합니다."
+                continue
+            names.add(name)
+            urls.add(url)
+            accepted.append((index, record))
+        return list(agents) + [record for _, record in accepted], (accepted, conflicts)
+
+    return _mutate
+
+
+@api_bp.post('/agents/bulk-import')
+def bulk_import_agents():
+    """에이전트 카드 일괄 등록 (JWT + 관리자 권한 필요)."""
+    # --- 인증 및 권한 확인 (요청당 1회) ---
+    err = require_jwt()
+    if err:
+        status = err[1] if isinstance(err, tuple) and len(err) > 1 else 500
+        append_log(f'에이전트 일괄 등록 거부: 토큰 누락/유효하지 않음 ({status})', False, status=status)
+        return err
+    err2 = require_admin()
+    if err2:
+        append_log('에이전트 일괄 등록 거부: 관리자 권한 아님 (403 Forbidden)', False, status=403)
+        return err2
+
+    # --- 본문 파싱 ---
+    raw = request.get_data(as_text=True) or ''
+    try:
+        items, default_tenants = _parse_items(raw, (request.content_type or '').lower())
+    except ValueError as exc:
+        append_log('스키마 검증 실패 : 잘못된 JSON 문법 (400 Bad Request)', False, status=400)
+        return jsonify({"error": 'BAD_JSON', "message": str(exc)}), 400
+    if not items:
+        return jsonify({"error": 'REQUIRED_FIELDS_MISSING', "errors": ['cards is required']}), 422
+    if len(items) > BULK_IMPORT_MAX_CARDS:
+        append_log('스키마 검증 실패 : 일괄 등록 최대 건수 초과 (413 Payload Too Large)', False, status=413)
+        return jsonify({"error": 'PAYLOAD_TOO_LARGE', "message": f"at most {BULK_IMPORT_MAX_CARDS} cards per request"}), 413
+
+    # --- 카드별 검증 (병렬) ---
+    try:
+        evaluator = PolicyEvaluator()  # 환경변수(AGENT_DOMAIN_WHITELIST, AGENT_IP_WHITELIST)에서 값 읽기
+    except Exception:
+        evaluator = None
+    workers = max(1, min(BULK_IMPORT_WORKERS, len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(lambda item: _validate_item(item, default_tenants, evaluator), items))
+
+    results: dict[int, dict] = {}
+    candidates = []
+    for index, outcome in enumerate(outcomes):
+        if 'error' in outcome:
+            results[index] = outcome
+        else:
+            candidates.append((index, outcome))
+
+    # --- 서명이 없는 카드 일괄 서명 ---
+    unsigned = [(index, c) for index, c in candidates if not c['original_sigs']]
+    signed = _sign_cards([c['card'] for _, c in unsigned]) if unsigned else []
+    for (index, candidate), data in zip(unsigned, signed):
+        sig_entry = _signature_entry(data)
+        if sig_entry:
+            candidate['card']['signatures'] = [sig_entry]
+        sig_ok, sig_reason = verify_jws(candidate['card'])
+        if not sig_ok:
+            results[index] = _reject(498, 'INVALID_TOKEN', message=sig_reason or 'Invalid JWS signature')
+    candidates = [(index, c) for index, c in candidates if index not in results]
+
+    # --- 레코드 구성 후 한 번에 저장 ---
+    now_local = datetime.now(timezone(timedelta(hours=9))).isoformat()
+    registrant = getattr(g, 'jwt', {}).get('sub') if isinstance(getattr(g, 'jwt', None), dict) else None
+    records = []
+    for index, candidate in candidates:
+        card = candidate['card']
+        records.append((index, {
+            "agent_id": _derive_agent_id(card),
+            "etag": f"W/\"1-{secrets.token_hex(3)}\"",
+            "versionID": 1,
+            "card": card,
+            "status": 'Active',
+            "tenants": candidate['tenants'],
+            "create_ts": now_local,
+            "update_ts": now_local,
+            "delete_ts": None,
+            "publisher_jws": candidate['publisher_jws'],
+            "registrant": registrant,
+        }))
+    accepted, conflicts = repo.update_agents(_commit(records)) if records else ([], {})
+    for index, message in conflicts.items():
+        results[index] = _reject(409, 'CONFLICT', message=message)
+    for index, record in accepted:
+        results[index] = {"status": 201, "agent_id": record['agent_id'], "name": record['card'].get('name')}
+
+    rejected = len(items) - len(accepted)
+    append_log(
+        f"에이전트 일괄 등록 ({201 if not rejected else 207}): {len(accepted)}건 성공, {rejected}건 실패",
+        rejected == 0,
+        status=201 if not rejected else 207,
+    )
+    return jsonify({
+        "total": len(items),
+        "accepted": len(accepted),
+        "rejected": rejected,
+        "results": [{"index": index, **results[index]} for index in range(len(items))],
+    }), 201 if not rejected else 207
@@ -9,12 +9,11 @@ from ..core.auth import require_jwt, require_admin
 from ..core.logging import append_log
 from ..core import repo
 from ..core.validators import (
-    validate_card_basic,
     DEFAULT_MAX_AGENT_CARD_BYTES,
-    AgentCardSchemaError,
-    AgentCardSchema
+    AgentCardSchema,
+    cached_policy_checks,
 )
-from ..core.signatures import verify_jws, validate_signatures_jws_like
+from ..core.signatures import verify_jws, validate_signatures_jws_like, unverified_header
 from ..core.policy import check_duplicate_card, PolicyEvaluator
 from ..core.tenants import extract_tenants
 import requests
@@ -26,6 +25,63 @@ DEFAULT_JWS_KID = os.environ.get('JWS_KID', 'registry-hs256-key-1')
 
 AGENT_CARD_SCHEMA = AgentCardSchema()
 
+
+def _derive_agent_id(c: dict) -> str:
+    """organization/name/version 조합으로 agent_id (서명 sub) 생성."""
+    try:
+        org = ''
+        if isinstance(c.get('provider'), dict):
+            org = str(c['provider'].get('organization') or '').strip()
+        name_v = str(c.get('name') or '').strip()
+        ver_v = str(c.get('version') or '').strip()
+        if org and name_v and ver_v:
+            return f"{org}#agent:{name_v}.v{ver_v}"
+        if name_v and ver_v:
+            return f"agent:{name_v}.v{ver_v}"
+        return name_v or 'agent:unknown'
+    except Exception:
+        return 'agent:unknown'
+
+
+def _sign_payload_for(card: dict) -> dict:
+    """jws-server /sign 요청 본문 구성."""
+    return {
+        'sub': _derive_agent_id(card),
+        'version_id': 1,
+        'policy_version': os.environ.get('POLICY_VERSION', 'registry.policy.v3'),
+        'iss': os.environ.get('JWS_ISS', 'ans-registry.example'),
+        'kid': DEFAULT_JWS_KID,
+        'card': card,
+    }
+
+
+def _signature_entry(data) -> dict | None:
+    """서명 서버의 /sign 응답을 카드 signatures 항목으로 변환 (형식 오류 시 None).
+
+    카드 본문에 대한 detached 서명(card_signature)이 있으면 그것을 쓰고 - JWKS 공개키로 로컬 검증 가능 -
+    없는 (레거시 HS256) 서버면 compact JWS 의 protected/signature 를 쓴다. 응답이 문자열이면 compact JWS 로 본다.
+    """
+    if isinstance(data, dict):
+        card_sig = data.get('card_signature')
+        if isinstance(card_sig, dict) and card_sig.get('protected') and card_sig.get('signature'):
+            return {
+                'protected': card_sig['protected'],
+                'signature': card_sig['signature'],
+                'header': dict(card_sig.get('header') or {'kid': data.get('kid') or DEFAULT_JWS_KID}),
+            }
+        token, kid = data.get('jws'), data.get('kid')
+    else:
+        token, kid = data, None
+    parts = token.split('.') if isinstance(token, str) else []
+    if len(parts) != 3:
+        return None
+    protected_b64, _payload_b64, signature_b64 = parts
+    return {
+        'protected': protected_b64,
+        'signature': signature_b64,
+        'header': {'kid': kid or unverified_header(token).get('kid') or DEFAULT_JWS_KID},
+    }
+
 # --- 에이전트 등록 ---
 @api_bp.post('/create-agent')
 def create_agent():
@@ -77,30 +133,27 @@ def create_agent():
     if isinstance(body, dict):
         tenants = extract_tenants(body.get('tenants'))
 
-    # --- A2A JSON Schema (a2a.json) 검증 ---
-    try :
-        AGENT_CARD_SCHEMA.validate(card)
-    except AgentCardSchemaError as exc:
+    # --- A2A JSON Schema (a2a.json) + 기본 필드 + 퍼블리셔 서명 검증 (카드 해시 기준 캐시) ---
+    checked = AGENT_CARD_SCHEMA.check(card, mode="create")
+    if checked.schema_errors:
         try :
             append_log('스키마 검증 실패 : Agent Card JSON Schema 불일치 (422 Unprocessable Entity)', False, status=422)
         except Exception:
             pass
-        return jsonify({"error" : "SCHEMA_VALIDATION_FAILED", "message" : str(exc),}), 422
+        return jsonify({"error" : "SCHEMA_VALIDATION_FAILED", "message" : checked.schema_message, "errors": list(checked.schema_errors)}), 422
 
     # --- 퍼블리셔 서명 보존 ---
     original_sigs = card.get('signatures') if isinstance(card.get('signatures'), list) else []
-    if original_sigs:
-        sig_ok, sig_reason = verify_jws(card)
-        if not sig_ok:
-            try:
-                append_log('스키마 검증 실패 : 시그니처 필드의 JWS 불일치 (498 Invalid Token)', False, status=498)
-            except Exception:
-                pass
-            return jsonify({"error": 'INVALID_TOKEN', "message": sig_reason or 'Invalid JWS signature'}), 498
+    if original_sigs and checked.jws_error:
+        try:
+            append_log('스키마 검증 실패 : 시그니처 필드의 JWS 불일치 (498 Invalid Token)', False, status=498)
+        except Exception:
+            pass
+        return jsonify({"error": 'INVALID_TOKEN', "message": checked.jws_error}), 498
 
     # Basic field-level validation
-    ok, errors = validate_card_basic(card)
-    if not ok:
+    errors = list(checked.basic_errors)
+    if errors:
         try:
             append_log('스키마 검증 실패 : 필수 필드 누락 (422 Unprocessable Entity)', False, status=422)
         except Exception:
@@ -109,42 +162,13 @@ def create_agent():
 
     if not original_sigs:
         try:
-            def _derive_sub_from_card(c: dict) -> str:
-                try:
-                    org = ''
-                    if isinstance(c.get('provider'), dict):
-                        org = str(c['provider'].get('organization') or '').strip()
-                    name_v = str(c.get('name') or '').strip()
-                    ver_v = str(c.get('version') or '').strip()
-                    if org and name_v and ver_v:
-                        return f"{org}#agent:{name_v}.v{ver_v}"
-                    if name_v and ver_v:
-                        return f"agent:{name_v}.v{ver_v}"
-                    return name_v or 'agent:unknown'
-                except Exception:
-                    return 'agent:unknown'
-
-            sign_payload = {
-                'sub': _derive_sub_from_card(card),
-                'version_id': 1,
-                'policy_version': os.environ.get('POLICY_VERSION', 'registry.policy.v3'),
-                'iss': os.environ.get('JWS_ISS', 'ans-registry.example'),
-                'kid': DEFAULT_JWS_KID,
-                'card': card,
-            }
+            sign_payload = _sign_payload_for(card)
             try:
                 r = requests.post(JWS_SIGN_URL, json=sign_payload, timeout=5)
                 if r.ok:
                     data = r.json()
-                    token = data.get('jws')
-                    parts = token.split('.') if isinstance(token, str) else []
-                    if len(parts) == 3:
-                        protected_b64, _payload_b64, signature_b64 = parts
-                        sig_entry = {
-                            'protected': protected_b64,
-                            'signature': signature_b64,
-                            'header': {'kid': DEFAULT_JWS_KID},
-                        }
+                    sig_entry = _signature_entry(data)
+                    if sig_entry:
                         # 카드에 있던 퍼블리셔 서명은 레지스트리 서명으로 교체
                         card['signatures'] = [sig_entry]
             except Exception:
@@ -177,9 +201,11 @@ def create_agent():
 
     # 도메인 / IP 화이트리스트 검사 (.env 기반) + extension 제한
     evaluator: PolicyEvaluator | None = None
+    extension_error = None
     try:
         evaluator = PolicyEvaluator()  # 환경변수(AGENT_DOMAIN_WHITELIST, AGENT_IP_WHITELIST)에서 값 읽기
-        wle = evaluator._check_whitelist(card)
+        capabilities = card.get("capabilities") or {}
+        wle, extension_error = cached_policy_checks(evaluator, card, capabilities.get("extensions"))
     except Exception:
         wle = None
     if isinstance(wle, str) and wle:
@@ -189,12 +215,6 @@ def create_agent():
             pass
         return jsonify({"error": 'WHITELIST_REJECTED', "message": wle}), 400
     if evaluator:
-        try:
-            capabilities = card.get("capabilities") or {}
-            extensions = capabilities.get("extensions")
-            extension_error = evaluator._check_extension_limits(extensions)
-        except Exception:
-            extension_error = None
         if isinstance(extension_error, str) and extension_error:
             try:
                 append_log('정책 검사 실패 : extension 제한 초과 (400 Bad Request)', False, status=400)
@@ -205,22 +225,6 @@ def create_agent():
     name = str(card.get('name', ''))
 
     # --- 메타데이터 구성 및 저장 ---
-    def _derive_agent_id(c: dict) -> str:
-        """organization/name/version 조합으로 agent_id 생성."""
-        try:
-            org = ''
-            if isinstance(c.get('provider'), dict):
-                org = str(c['provider'].get('organization') or '').strip()
-            name_v = str(c.get('name') or '').strip()
-            ver_v = str(c.get('version') or '').strip()
-            if org and name_v and ver_v:
-                return f"{org}#agent:{name_v}.v{ver_v}"
-            if name_v and ver_v:
-                return f"agent:{name_v}.v{ver_v}"
-            return name_v or 'agent:unknown'
-        except Exception:
-            return 'agent:unknown'
-
     # 레지스트리 표준 시간(UTC+9)으로 타임스탬프 기록
     jst = timezone(timedelta(hours=9))
     now_local = datetime.now(jst).isoformat()
@@ -1,31 +1,30 @@
 """레지스트리 로그 및 통계 API."""
 
+from datetime import datetime, timezone
+
 from flask import jsonify, request
 
 from . import api_bp
-from ..core import repo
+from ..core import metrics, repo
 from ..core.tenants import TENANT_CHOICES
 
 
-def _get_group_count() -> int:
-    """UI와 동일한 로직으로 그룹 개수를 계산한다."""
-    try:
-        from .rulesets_api import _load_tenant_rulesets  # 지연 import로 순환 참조 회피
-    except Exception:
-        return 0
+def _gauge(name: str, compute) -> int:
+    """저장 시점에 갱신된 gauge를 읽고, 아직 없으면 한 번 계산해 채운다."""
+    value = metrics.get_gauge(name)
+    if value is None:
+        value = compute()
+        metrics.set_gauge(name, value)
+    return value
 
-    try:
-        _, groups = _load_tenant_rulesets()
-        if groups is not None:
-            return len(groups)
-    except Exception:
-        pass
 
-    # 테넌트 API 실패 시 rulesets_api와 동일하게 TENANT_CHOICES를 fallback으로 사용
-    try:
-        return len(TENANT_CHOICES)
-    except Exception:
-        return 0
+def _get_group_count() -> int:
+    """그룹 개수 gauge (룰셋 화면이 테넌트 API에서 그룹을 읽을 때 갱신된다).
+
+    gauge가 없으면 테넌트 API를 호출하지 않고 TENANT_CHOICES 개수를 사용한다.
+    """
+    value = metrics.get_gauge('total_groups')
+    return value if value is not None else len(TENANT_CHOICES)
 
 
 def _normalize_log_entry(entry):
@@ -77,11 +76,39 @@ def _parse_limit():
         return None
 
 
+def _parse_time_arg(name):
+    """ISO 8601 또는 epoch 초 쿼리 값을 epoch 밀리초로 변환 (없으면 None, 잘못된 값은 ValueError)."""
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        return int(float(raw) * 1000)
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(raw.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'invalid {name}: {raw}')
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
 @api_bp.get('/logs')
 def get_logs():
-    """정규화된 로그 배열을 반환하며 limit 쿼리를 지원합니다."""
+    """정규화된 로그 배열을 반환하며 limit 쿼리를 지원합니다.
+
+    start/end(ISO 8601 또는 epoch 초)를 주면 보관 세그먼트까지 포함해 해당 구간을 조회합니다.
+    """
     limit = _parse_limit()
-    logs = repo.load_logs()
+    try:
+        start_ms, end_ms = _parse_time_arg('start'), _parse_time_arg('end')
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if start_ms is not None or end_ms is not None:
+        logs = repo.query_registry_logs(start_ms, end_ms, limit)
+    else:
+        logs = repo.load_logs()
     normalized = [_normalize_log_entry(entry) for entry in logs]
     normalized.sort(
         key=lambda item: item.get('timestamp') or '',
@@ -120,23 +147,25 @@ def append_log_entry():
 
 @api_bp.get('/stats')
 def get_stats():
-    """대시보드용 간단한 통계 정보를 반환합니다."""
-    agents = repo.load_agents()
-    rulesets = repo.load_rulesets()
-    logs = repo.load_logs()
-    normalized_logs = [_normalize_log_entry(entry) for entry in logs]
-    violation_verdicts = {'violation', 'blocked'}
-    recent_violations = sum(
-        1
-        for entry in normalized_logs
-        if (entry.get('verdict') or '').lower() in violation_verdicts
-    )
+    """대시보드용 통계. 적재 시점에 갱신된 rollup 카운터만 읽는다.
+
+    start/end(ISO 8601 또는 epoch 초)를 주면 해당 구간, 없으면 전체 누적 값을 반환한다.
+    """
+    try:
+        summary = metrics.summarize(request.args.get('start'), request.args.get('end'))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     return jsonify(
         {
-            "total_agents": len(agents),
-            "total_rulesets": len(rulesets),
+            "total_agents": _gauge('total_agents', lambda: len(repo.load_agents())),
+            "total_rulesets": _gauge('total_rulesets', lambda: len(repo.load_rulesets())),
             "total_groups": _get_group_count(),
-            "total_events": len(logs),
-            "recent_violations": recent_violations,
+            "total_events": summary['events'],
+            "recent_violations": summary['violations'],
+            "by_verdict": summary['by_verdict'],
+            "by_method": summary['by_method'],
+            "by_fail_stage": summary['by_fail_stage'],
+            "by_agent": summary['by_agent'],
+            "range": summary['range'],
         }
     )
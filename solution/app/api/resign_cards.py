@@ -0,0 +1,136 @@
+"""교체된(retired) 서명 키로 서명된 저장 카드를 다시 서명 (/api/jws/resign-cards).
+
+jws-server 는 retired 키를 JWS_KEY_RETENTION_SECONDS 동안만 JWKS 에 공개하므로, 그 뒤에는 이전 키로
+서명된 카드를 검증할 수 없다. 키 교체를 감지하면(JWKS 키 목록 변경) 백그라운드에서,
+또는 관리자 요청 시
+
+1. jws-server ``GET /keys`` 로 retired 키 목록을 받고
+2. 레지스트리 서명의 kid 가 retired 인 카드만 골라 ``/sign/batch`` 로 다시 서명한 뒤
+3. ``repo.update_agents`` 로 그 서명만 새 서명으로 바꾼다 (서명 이후 카드가 바뀌었으면 건너뜀).
+"""
+
+import logging
+import threading
+
+import requests
+from flask import jsonify
+
+from . import api_bp
+from .bulk_import import _sign_cards
+from .create_agent import JWS_SERVER_URL, _signature_entry
+from ..core import repo
+from ..core.auth import require_jwt, require_admin
+from ..core.jwks import JWKS_CACHE
+from ..core.logging import append_log
+from ..core.signatures import unverified_header
+from ..core.validators import card_hash
+
+logger = logging.getLogger(__name__)
+
+JWS_KEYS_URL = f"{JWS_SERVER_URL.rstrip('/')}/keys"
+
+_resign_lock = threading.Lock()
+
+
+def _retired_kids() -> set:
+    """jws-server 에서 retired 상태인 kid 목록 (조회 실패 시 requests 예외)."""
+    r = requests.get(JWS_KEYS_URL, timeout=5)
+    r.raise_for_status()
+    keys = r.json().get('keys') or []
+    return {key['kid'] for key in keys if isinstance(key, dict) and key.get('state') == 'retired' and key.get('kid')}
+
+
+def _signature_kid(sig) -> str | None:
+    if not isinstance(sig, dict):
+        return None
+    kid = unverified_header(sig.get('protected') or '').get('kid')
+    if not kid and isinstance(sig.get('header'), dict):
+        kid = sig['header'].get('kid')
+    return kid if isinstance(kid, str) else None
+
+
+def _uses_retired_key(card, retired: set) -> bool:
+    sigs = card.get('signatures') if isinstance(card, dict) else None
+    return isinstance(sigs, list) and any(_signature_kid(sig) in retired for sig in sigs)
+
+
+def _replace_signatures(resigned: dict, retired: set):
+    """repo.update_agents 용 mutate: retired 서명을 새 서명으로 바꾼다 (충돌 시 재호출되므로 입력을 바꾸지 않음)."""
+    def _mutate(agents):
+        updated, replaced = [], []
+        for agent in agents:
+            card = agent.get('card') if isinstance(agent, dict) else None
+            pending = resigned.get(agent.get('agent_id')) if isinstance(agent, dict) else None
+            # 서명하는 사이 카드가 수정되었거나 이미 다른 작업이 다시 서명했으면 그대로 둔다
+            if pending is None or card_hash(card) != pending[0] or not _uses_retired_key(card, retired):
+                updated.append(agent)
+                continue
+            kept = [sig for sig in card['signatures'] if _signature_kid(sig) not in retired]
+            updated.append({**agent, 'card': {**card, 'signatures': kept + [pending[1]]}})
+            replaced.append(agent['agent_id'])
+        return updated, replaced
+
+    return _mutate
+
+
+def resign_cards() -> dict:
+    """retired 키로 서명된 저장 카드를 다시 서명하고 {checked, resigned, failed} 를 반환."""
+    with _resign_lock:
+        retired = _retired_kids()
+        targets = [
+            agent for agent in repo.load_agents()
+            if isinstance(agent, dict) and agent.get('agent_id') and _uses_retired_key(agent.get('card'), retired)
+        ]
+        if not targets:
+            return {"retired_kids": sorted(retired), "checked": 0, "resigned": [], "failed": []}
+
+        resigned, failed = {}, []
+        cards = [agent['card'] for agent in targets]
+        for agent, data in zip(targets, _sign_cards(cards)):
+            entry = _signature_entry(data) if data else None
+            if entry is None:
+                failed.append(agent['agent_id'])
+                continue
+            resigned[agent['agent_id']] = (card_hash(agent['card']), entry)
+        replaced = repo.update_agents(_replace_signatures(resigned, retired)) if resigned else []
+        return {"retired_kids": sorted(retired), "checked": len(targets), "resigned": replaced, "failed": failed}
+
+
+def _resign_in_background(_kids=None) -> None:
+    """JWKS 키 목록이 바뀌면(키 교체) 저장 카드를 백그라운드에서 다시 서명."""
+    def _run():
+        try:
+            summary = resign_cards()
+        except Exception as exc:
+            logger.warning("Card re-signing after key rotation failed: %s", exc)
+            return
+        if summary['resigned'] or summary['failed']:
+            append_log(
+                f"키 교체 후 카드 재서명: {len(summary['resigned'])}건 성공, {len(summary['failed'])}건 실패",
+                not summary['failed'],
+            )
+
+    threading.Thread(target=_run, name='card-resign', daemon=True).start()
+
+
+JWKS_CACHE.add_listener(_resign_in_background)
+
+
+@api_bp.post('/jws/resign-cards')
+def jws_resign_cards():
+    """관리자 전용: retired 키로 서명된 저장 카드를 즉시 다시 서명."""
+    err = require_jwt() or require_admin()
+    if err:
+        return err
+    try:
+        summary = resign_cards()
+    except requests.RequestException as exc:
+        append_log(f'카드 재서명 실패 : 서명 서버 오류({exc})', False, status=502)
+        return jsonify({"error": 'JWS_KEYS_UNAVAILABLE', "message": str(exc)}), 502
+    status = 200 if not summary['failed'] else 207
+    append_log(
+        f"카드 재서명 ({status}): {len(summary['resigned'])}건 성공, {len(summary['failed'])}건 실패",
+        status == 200,
+        status=status,
+    )
+    return jsonify(summary), status
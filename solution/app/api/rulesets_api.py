@@ -11,7 +11,7 @@ from typing import Any
 from flask import jsonify, request, Response
 
 from . import api_bp
-from ..core import repo
+from ..core import metrics, repo
 from ..core.tenants import TENANT_CHOICES
 from ..core.auth import require_jwt
 from ..core.user import list_users
@@ -224,6 +224,8 @@ def _load_tenant_rulesets():
                     )
                 )
 
+    # 대시보드 통계(/api/stats)가 테넌트 API를 호출하지 않도록 그룹 수를 gauge로 보관
+    metrics.set_gauge("total_groups", len(all_groups))
     return all_rulesets, all_groups
 
 
@@ -559,6 +561,7 @@ def create_group():
         return jsonify({"error": f"failed to create group: {e}"}), 502
 
     created["tenant_id"] = tenant_id
+    metrics.adjust_gauge("total_groups", 1)
     return jsonify(created), 201
 
 
@@ -602,6 +605,7 @@ def delete_group(tenant_id: str, group_id: str):
             ),
             502,
         )
+    metrics.adjust_gauge("total_groups", -1)
     return jsonify(resp)
 
 
@@ -1,7 +1,8 @@
+import hashlib
 import json
 import os
 import urllib.request
-from flask import jsonify, request, g
+from flask import jsonify, make_response, request, g
 
 from . import api_bp
 from ..core import repo
@@ -202,4 +203,19 @@ def search_agents():
         "limit": limit,
         "offset": slice_start,
     }
-    return jsonify(resp)
+    # 결과 본문 기준 ETag: 오케스트레이터 카드 캐시가 If-None-Match로 재검증하면
+    # 변경이 없을 때 본문 없이 304를 돌려준다.
+    etag = _search_etag(resp)
+    if etag in request.if_none_match:
+        response = make_response("", 304)
+    else:
+        response = jsonify(resp)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _search_etag(payload: dict) -> str:
+    """검색 결과를 정규화(JSON sort_keys)한 SHA-256 해시로 ETag를 만든다."""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
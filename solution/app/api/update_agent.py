@@ -10,12 +10,15 @@ from ..core.auth import require_jwt, require_admin
 from ..core.logging import append_log
 from ..core import repo
 from ..core.validators import (
-    validate_card_basic_update,
     DEFAULT_MAX_AGENT_CARD_BYTES,
+    AgentCardSchema,
+    cached_policy_checks,
 )
 from ..core.policy import PolicyEvaluator
 from ..core.tenants import extract_tenants
-from ..core.signatures import verify_jws
+from .create_agent import _signature_entry
+
+AGENT_CARD_SCHEMA = AgentCardSchema()
 
 
 # --- 외부 서명 서버 설정 (재서명) ---
@@ -85,35 +88,28 @@ def update_agent():
         append_log('리소스 없음 : 대상 에이전트를 찾을 수 없음 (404 Not Found)', False, status=404)
         return jsonify({"error": 'NOT_FOUND', "message": 'agent not found'}), 404
 
-    # --- 기본 스키마 검증 ---
-    ok, errors = validate_card_basic_update(card)
-    if not ok:
+    # --- 기본 스키마 + signatures 구조 검증 (카드 해시 기준 캐시) ---
+    checked = AGENT_CARD_SCHEMA.check(card, mode="update")
+    if checked.basic_errors:
         append_log('스키마 검증 실패 : 필수 필드 누락 (422 Unprocessable Entity)', False, status=422)
-        return jsonify({"error": 'REQUIRED_FIELDS_MISSING', "errors": errors}), 422
+        return jsonify({"error": 'REQUIRED_FIELDS_MISSING', "errors": list(checked.basic_errors)}), 422
 
-    # --- signatures 구조 검증 (필요 시) ---
-    sigs = card.get('signatures')
-    if isinstance(sigs, list) and sigs:
-        sig_ok, sig_reason = verify_jws(card)
-        if not sig_ok:
-            append_log('스키마 검증 실패 : 시그니처 필드의 JWS 불일치 (498 Invalid Token)', False, status=498)
-            return jsonify({"error": 'INVALID_TOKEN', "message": sig_reason or 'Invalid JWS signature'}), 498
+    if checked.jws_error:
+        append_log('스키마 검증 실패 : 시그니처 필드의 JWS 불일치 (498 Invalid Token)', False, status=498)
+        return jsonify({"error": 'INVALID_TOKEN', "message": checked.jws_error}), 498
 
     # --- 화이트리스트 및 중복 name/url 검증 ---
     evaluator: PolicyEvaluator | None = None
+    extension_error = None
     try:
         evaluator = PolicyEvaluator()
-        wle = evaluator._check_whitelist(card)
+        wle, extension_error = cached_policy_checks(evaluator, card, card.get('extension'))
     except Exception:
         wle = None
     if isinstance(wle, str) and wle:
         append_log('정책 검사 실패 : 도메인/IP 화이트리스트 불일치 (400 Bad Request)', False, status=400)
         return jsonify({"error": 'WHITELIST_REJECTED', "message": wle}), 400
     if evaluator:
-        try:
-            extension_error = evaluator._check_extension_limits(card.get('extension'))
-        except Exception:
-            extension_error = None
         if isinstance(extension_error, str) and extension_error:
             append_log('정책 검사 실패 : extension 제한 초과 (400 Bad Request)', False, status=400)
             return jsonify({"error": 'EXTENSION_LIMIT_EXCEEDED', "message": extension_error}), 400
@@ -148,16 +144,8 @@ def update_agent():
     try:
         r = requests.post(JWS_SIGN_URL, json=sign_payload, timeout=5)
         if r.ok:
-            data = r.json()
-            token = data.get('jws')
-            parts = token.split('.') if isinstance(token, str) else []
-            if len(parts) == 3:
-                protected_b64, _payload_b64, signature_b64 = parts
-                sig_entry = {
-                    'protected': protected_b64,
-                    'signature': signature_b64,
-                    'header': {'kid': DEFAULT_JWS_KID},
-                }
+            sig_entry = _signature_entry(r.json())
+            if sig_entry:
                 card['signatures'] = [sig_entry]
                 append_log('JWS 재서명 성공 : 시그니처 교체', True)
         else:
@@ -4,7 +4,10 @@ from . import api_bp
 from ..core.auth import require_jwt, require_admin
 from ..core.logging import append_log
 from ..core.validators import validate_card_basic
+from ..core.signatures import CardHashMismatch, verify_card_signatures, verify_token_locally
+from .create_agent import _signature_entry
 import os
+import jwt
 import requests
 
 
@@ -75,21 +78,12 @@ def jws_sign_card():
         append_log('JWS 서명 실패 : 응답 토큰 없음', False, status=502)
         return jsonify({"error": 'JWS_SIGN_FAILED', "message": 'missing token'}), 502
 
-    # compact JWS 를 AgentCard signatures 형식으로 변환
-    try:
-        parts = token.split('.')
-        protected_b64, _payload_b64, signature_b64 = parts[0], parts[1], parts[2]
-    except Exception:
+    # 서명 응답(card_signature 또는 compact JWS)을 AgentCard signatures 형식으로 변환
+    sig_entry = _signature_entry(data)
+    if sig_entry is None:
         append_log('JWS 서명 실패 : 토큰 형식 오류', False, status=502)
         return jsonify({"error": 'JWS_SIGN_FAILED', "message": 'invalid token format'}), 502
 
-    kid = sign_payload['kid']
-    sig_entry = {
-        'protected': protected_b64,
-        'signature': signature_b64,
-        'header': {'kid': kid},
-    }
-
     signatures = card.get('signatures') if isinstance(card.get('signatures'), list) else []
     signatures.append(sig_entry)
     card['signatures'] = signatures
@@ -101,14 +95,38 @@ def jws_sign_card():
 # --- JWS 검증 API ---
 @api_bp.post('/jws/verify')
 def jws_verify():
-    """jws-server /verify 프록시 (일관된 로그 메시지)."""
+    """JWS 검증 (일관된 로그 메시지).
+
+    - 레지스트리 비대칭 키(ES256/EdDSA)로 서명된 토큰은 캐시된 JWKS 공개키로 로컬 검증
+    - jws 없이 card 만 오면 카드 signatures 의 레지스트리 서명을 로컬 검증
+    - 그 밖(HS256, 모르는 kid)은 jws-server /verify 프록시
+    """
     err = require_jwt() or require_admin()
     if err:
         return err
     body = request.get_json(silent=True) or {}
     token = body.get('jws')
+    if token is None and isinstance(body.get('card'), dict):
+        return _verify_card_locally(body['card'])
     if not isinstance(token, str) or not token:
         return jsonify({"error": 'BAD_REQUEST', "message": 'jws is required'}), 400
+
+    try:
+        local = verify_token_locally(
+            token,
+            card=body.get('card') if isinstance(body.get('card'), dict) else None,
+            card_hash=body.get('card_hash') if isinstance(body.get('card_hash'), str) else None,
+        )
+    except CardHashMismatch as exc:
+        append_log('JWS 검증 실패 : 카드 해시 불일치 (400 Bad Request)', False, status=400)
+        return jsonify({"detail": exc.detail}), 400
+    except jwt.InvalidTokenError as exc:
+        append_log('JWS 검증 실패 : 토큰 무효 (400 Bad Request)', False, status=400)
+        return jsonify({"detail": str(exc)}), 400
+    if local is not None:
+        append_log('JWS 검증 성공 : 카드 해시 일치' if local['hash_verified'] else 'JWS 검증 성공', True)
+        return jsonify(local), 200
+
     payload = {'jws': token}
     # 카드 전체 또는 해시를 전달하면 서버 측에서 해시 검증 가능
     if isinstance(body.get('card'), dict):
@@ -152,6 +170,18 @@ def jws_verify():
     return jsonify({"error": 'JWS_VERIFY_FAILED', "status": status, "detail": detail}), 502
 
 
+def _verify_card_locally(card: dict):
+    ok, detail = verify_card_signatures(card)
+    if ok:
+        append_log('JWS 검증 성공 : 카드 서명 일치', True)
+        return jsonify({'valid': True, 'kid': detail, 'verified_locally': True}), 200
+    if ok is False:
+        append_log('JWS 검증 실패 : 카드 서명 불일치 (400 Bad Request)', False, status=400)
+        return jsonify({"detail": {'code': 'CARD_SIGNATURE_MISMATCH', 'message': detail}}), 400
+    append_log('JWS 검증 실패 : 레지스트리 서명 없음 (400 Bad Request)', False, status=400)
+    return jsonify({"detail": {'code': 'NO_REGISTRY_SIGNATURE', 'message': detail}}), 400
+
+
 # --- 카드 재서명 API ---
 @api_bp.post('/jws/resign-card')
 def jws_resign_card():
@@ -199,20 +229,12 @@ def jws_resign_card():
         append_log('JWS 재서명 실패 : 응답 토큰 없음', False, status=502)
         return jsonify({"error": 'JWS_SIGN_FAILED', "message": 'missing token'}), 502
 
-    # compact JWS 를 AgentCard signatures[0] 형태로 변환
-    try:
-        protected_b64, _payload_b64, signature_b64 = token.split('.')
-    except Exception:
+    # 서명 응답(card_signature 또는 compact JWS)을 AgentCard signatures[0] 형태로 변환
+    sig_entry = _signature_entry(data)
+    if sig_entry is None:
         append_log('JWS 재서명 실패 : 토큰 형식 오류', False, status=502)
         return jsonify({"error": 'JWS_SIGN_FAILED', "message": 'invalid token format'}), 502
 
-    kid = sign_payload['kid']
-    sig_entry = {
-        'protected': protected_b64,
-        'signature': signature_b64,
-        'header': {'kid': kid},
-    }
-
     card['signatures'] = [sig_entry]
 
     append_log('JWS 재서명 성공 : 시그니처 교체', True)
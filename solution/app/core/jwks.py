@@ -0,0 +1,166 @@
+"""
+jws-server 공개키(JWKS) 캐시.
+
+레지스트리 서명을 로컬에서 검증하기 위해 `/.well-known/jwks.json` 을 받아 두고,
+- 응답의 Cache-Control max-age 동안은 다시 요청하지 않으며 (만료 후엔 ETag 로 조건부 요청)
+- 처음 보는 kid 는 키 교체 직후일 수 있으므로 최소 간격(JWKS_MIN_REFRESH_SECONDS)을 두고 한 번 더 받아 보고
+- 받은 키 집합은 데이터 디렉터리에 저장해 서명 서버가 내려가 있어도(오프라인) 검증을 이어간다.
+- 키 목록이 바뀌면(키 교체) 등록된 리스너를 부른다 (retired 키로 서명된 카드 재서명 등).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from jwt import PyJWK
+from jwt.exceptions import PyJWKError
+
+from .repo import _DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+JWS_SERVER_URL = os.environ.get('JWS_SERVER_URL', 'http://127.0.0.1:8001')
+JWKS_URL = os.environ.get('JWS_JWKS_URL') or f"{JWS_SERVER_URL.rstrip('/')}/.well-known/jwks.json"
+JWKS_CACHE_FILE = os.environ.get('JWS_JWKS_CACHE_FILE', os.path.join(_DATA_DIR, 'jwks-cache.json'))
+# 서버가 max-age 를 주지 않을 때의 캐시 시간, 알 수 없는 kid 로 재요청하는 최소 간격, 요청 타임아웃(초)
+JWKS_DEFAULT_MAX_AGE = int(os.environ.get('JWS_JWKS_DEFAULT_MAX_AGE', '300'))
+JWKS_MIN_REFRESH_SECONDS = int(os.environ.get('JWS_JWKS_MIN_REFRESH_SECONDS', '30'))
+JWKS_TIMEOUT = float(os.environ.get('JWS_JWKS_TIMEOUT', '2'))
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class JWKSCache:
+    """kid -> 공개키 조회. 네트워크 오류 시 마지막으로 받은 키 집합을 그대로 쓴다."""
+
+    def __init__(self, url: str, cache_file: Optional[str] = None):
+        self.url = url
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Any] = {}
+        self._etag: Optional[str] = None
+        self._expires_at = 0.0
+        self._last_attempt = 0.0
+        self._loaded = False
+        self._listeners: List[Callable[[set], None]] = []
+
+    # ========== 디스크 캐시 ==========
+    def _load_file(self) -> None:
+        self._loaded = True
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable JWKS cache %s: %s", self.cache_file, e)
+            return
+        self._set_keys(saved.get('jwks') or {})
+        self._etag = saved.get('etag')
+        # 저장된 만료 시각이 지났어도 키는 유지하고, 다음 조회 때 조건부 요청으로 갱신
+        self._expires_at = float(saved.get('expires_at') or 0)
+
+    def _save_file(self, jwks: Dict[str, Any]) -> None:
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            tmp_path = f"{self.cache_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'jwks': jwks, 'etag': self._etag, 'expires_at': self._expires_at}, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            logger.warning("JWKS cache not persisted: %s", e)
+
+    # ========== 키 집합 ==========
+    def _set_keys(self, jwks: Dict[str, Any]) -> None:
+        keys = {}
+        for jwk in jwks.get('keys') or []:
+            if not isinstance(jwk, dict) or not jwk.get('kid'):
+                continue
+            try:
+                keys[jwk['kid']] = PyJWK.from_dict(jwk)
+            except (PyJWKError, ValueError, TypeError) as e:
+                logger.warning("Skipping JWK %s: %s", jwk.get('kid'), e)
+        self._keys = keys
+
+    def _refresh(self) -> None:
+        self._last_attempt = time.time()
+        headers = {'If-None-Match': self._etag} if self._etag else {}
+        try:
+            r = requests.get(self.url, headers=headers, timeout=JWKS_TIMEOUT)
+        except requests.RequestException as e:
+            logger.warning("JWKS fetch failed (%s); using %d cached keys", e, len(self._keys))
+            return
+        match = _MAX_AGE_RE.search(r.headers.get('Cache-Control', ''))
+        max_age = int(match.group(1)) if match else JWKS_DEFAULT_MAX_AGE
+        if r.status_code == 304:
+            self._expires_at = time.time() + max_age
+            return
+        if not r.ok:
+            logger.warning("JWKS fetch failed (%s); using %d cached keys", r.status_code, len(self._keys))
+            return
+        try:
+            jwks = r.json()
+        except ValueError:
+            logger.warning("JWKS response is not JSON; using %d cached keys", len(self._keys))
+            return
+        previous = set(self._keys)
+        self._set_keys(jwks)
+        self._etag = r.headers.get('ETag')
+        self._expires_at = time.time() + max_age
+        self._save_file(jwks)
+        if previous and set(self._keys) != previous:
+            self._notify(set(self._keys))
+
+    def _notify(self, kids: set) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(kids)
+            except Exception as e:
+                logger.warning("JWKS change listener failed: %s", e)
+
+    def add_listener(self, listener: Callable[[set], None]) -> None:
+        """키 목록이 바뀔 때 새 kid 집합으로 호출할 함수 등록 (조회 락 안에서 호출되므로 오래 걸리면 스레드로)."""
+        self._listeners.append(listener)
+
+    def get(self, kid: Optional[str]):
+        """kid 의 공개키(PyJWK) 또는 None. 필요할 때만 jws-server 에 요청한다."""
+        if not kid:
+            return None
+        with self._lock:
+            if not self._loaded:
+                self._load_file()
+            now = time.time()
+            stale = now >= self._expires_at
+            unknown = kid not in self._keys
+            if (stale or unknown) and now - self._last_attempt >= JWKS_MIN_REFRESH_SECONDS:
+                self._refresh()
+            return self._keys.get(kid)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = {}
+            self._etag = None
+            self._expires_at = 0.0
+            self._last_attempt = 0.0
+            self._loaded = True
+
+
+JWKS_CACHE = JWKSCache(JWKS_URL, JWKS_CACHE_FILE)
+
+
+__all__ = [
+    'JWKSCache',
+    'JWKS_CACHE',
+    'JWKS_URL',
+]
@@ -0,0 +1,147 @@
+"""레지스트리 로그 보관(cold) 세그먼트.
+
+``REGISTRY_MAX_LOG_ENTRIES`` 를 넘어 잘려 나가는 로그를 버리지 않고 날짜별 압축 NDJSON 세그먼트로 옮긴다::
+
+    {root}/{YYYY-MM-DD}/{first_ms}_{last_ms}.ndjson.zst   (zstandard 미설치 시 .ndjson.gz)
+    {root}/index.ndjson                                   세그먼트당 한 줄 (시간 범위/건수/코덱)
+
+세그먼트는 임시 파일에 쓴 뒤 rename 하고 나서 인덱스에 추가하므로, 인덱스에 있는 세그먼트는 항상 완전하다.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+try:
+    import zstandard as _zstd  # type: ignore
+except Exception:  # pragma: no cover - zstandard is optional
+    _zstd = None
+
+INDEX_FILE = 'index.ndjson'
+_SUFFIX = {'zstd': '.ndjson.zst', 'gzip': '.ndjson.gz'}
+_lock = threading.Lock()
+
+
+def entry_epoch_ms(entry: dict) -> int | None:
+    """로그의 timestamp(ISO 8601)를 epoch 밀리초로 변환 (없거나 해석 불가 시 None)."""
+    raw = entry.get('timestamp') or entry.get('timeIso') if isinstance(entry, dict) else None
+    if not raw:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(raw).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def _codec(preferred: str | None) -> str:
+    preferred = (preferred or '').lower()
+    if preferred == 'gzip' or _zstd is None:
+        return 'gzip'
+    return 'zstd'
+
+
+def _encode(payload: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        return _zstd.ZstdCompressor(level=10).compress(payload)
+    return gzip.compress(payload, compresslevel=6)
+
+
+def _decode(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if _zstd is None:
+            raise RuntimeError('zstandard is required to read .zst log segments')
+        return _zstd.ZstdDecompressor().decompressobj().decompress(data)
+    return gzip.decompress(data)
+
+
+def write_segments(root: str, entries: list[dict], codec: str | None = None) -> int:
+    """로그 목록을 UTC 날짜별 세그먼트로 기록하고 기록한 건수를 반환."""
+    codec = _codec(codec)
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    by_day: dict[str, list[tuple[int, dict]]] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        ms = entry_epoch_ms(entry) or now_ms
+        day = datetime.fromtimestamp(ms / 1000, timezone.utc).strftime('%Y-%m-%d')
+        by_day.setdefault(day, []).append((ms, entry))
+
+    written = 0
+    for day, rows in sorted(by_day.items()):
+        rows.sort(key=lambda row: row[0])
+        first_ms, last_ms = rows[0][0], rows[-1][0]
+        rel_path = os.path.join(day, f'{first_ms}_{last_ms}_{len(rows)}{_SUFFIX[codec]}')
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for _, entry in rows)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_encode(payload.encode('utf-8'), codec))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        meta = {
+            'path': rel_path,
+            'codec': codec,
+            'first_ms': first_ms,
+            'last_ms': last_ms,
+            'count': len(rows),
+        }
+        with _lock, open(os.path.join(root, INDEX_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(meta) + '\n')
+        written += len(rows)
+    return written
+
+
+def load_index(root: str) -> list[dict]:
+    """세그먼트 인덱스 (최신 세그먼트 우선)."""
+    try:
+        with open(os.path.join(root, INDEX_FILE), 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return []
+    segments = []
+    for line in lines:
+        try:
+            segments.append(json.loads(line))
+        except ValueError:
+            continue
+    segments.sort(key=lambda s: (s.get('last_ms', 0), s.get('first_ms', 0)), reverse=True)
+    return segments
+
+
+def query(root: str, start_ms: int | None = None, end_ms: int | None = None, limit: int | None = None) -> list[dict]:
+    """[start_ms, end_ms] 구간의 보관 로그를 최신순으로 반환 (구간과 겹치는 세그먼트만 연다)."""
+    results: list[tuple[int, dict]] = []
+    for meta in load_index(root):
+        if limit and len(results) >= limit:
+            # 이미 모은 상위 limit 건보다 오래된 세그먼트만 남았으면 중단
+            threshold = sorted((ms for ms, _ in results), reverse=True)[limit - 1]
+            if meta.get('last_ms', 0) < threshold:
+                break
+        if end_ms is not None and meta.get('first_ms', 0) > end_ms:
+            continue
+        if start_ms is not None and meta.get('last_ms', 0) < start_ms:
+            continue
+        try:
+            with open(os.path.join(root, meta['path']), 'rb') as f:
+                text = _decode(f.read(), meta.get('codec', 'gzip')).decode('utf-8')
+        except (OSError, RuntimeError):
+            continue
+        for line in text.splitlines():
+            if not line:
+                continue
+            entry = json.loads(line)
+            ms = entry_epoch_ms(entry) or meta.get('last_ms', 0)
+            if (start_ms is None or ms >= start_ms) and (end_ms is None or ms <= end_ms):
+                results.append((ms, entry))
+    results.sort(key=lambda row: row[0], reverse=True)
+    entries = [entry for _, entry in results]
+    return entries[:limit] if limit else entries
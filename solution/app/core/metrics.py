@@ -0,0 +1,336 @@
+"""로그 적재 시점에 갱신되는 시간 버킷 통계(rollup).
+
+레지스트리 로그가 ``repo.append_registry_log`` 로 들어올 때마다 분/시/일 버킷과 전체 누적 카운터를
+증가시켜 두고, ``/api/stats`` 는 요청 구간을 덮는 버킷만 읽어 합산한다 (로그 전체 스캔 없음).
+
+카운터 필드::
+
+    events, violations, verdict:<v>, method:<m>, fail_stage:<s>, agent:<agent_id>
+
+에이전트/룰셋/그룹 개수는 저장 시점에 갱신되는 gauge로 보관한다.
+REDIS_URL 이 없으면 프로세스 메모리에 같은 구조로 보관한다. Redis 가 설정되어 있는데 명령이 실패하면
+프로세스 메모리로 나눠 쓰지 않고 경고만 남긴 채 그 증감을 버린다.
+
+rollup 도입(또는 프로세스 메모리 모드의 시작) 이전 로그는 ``ensure_backfill`` 이 한 번만 반영한다.
+카운터가 처음 쓰이는 시각을 high-water(``since``)로 남겨 두고 그보다 이른 로그만 다시 세므로,
+백필 전에 이미 카운터에 들어간 로그가 두 번 세어지지 않는다. 백필이 끝난 Redis 클라이언트는 프로세스에
+기억해 두어 ``/api/stats`` 요청마다 확인하지 않는다.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from . import repo
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = os.environ.get('METRICS_REDIS_PREFIX', 'metrics')
+TOTAL_KEY = f'{_PREFIX}:total'
+GAUGES_KEY = f'{_PREFIX}:gauges'
+# since: 카운터가 로그를 받기 시작한 시각(epoch ms), done: 백필을 맡은 시각
+_BACKFILL_KEY = f'{_PREFIX}:backfill'
+_LEGACY_BACKFILL_KEY = f'{_PREFIX}:backfilled'
+
+# (버킷 크기 초, 보존 기간 초) - 작은 단위부터
+GRANULARITIES = (
+    (60, int(os.environ.get('SOLUTION_METRICS_MINUTE_RETENTION', str(2 * 24 * 3600)))),
+    (3600, int(os.environ.get('SOLUTION_METRICS_HOUR_RETENTION', str(90 * 24 * 3600)))),
+    (86400, int(os.environ.get('SOLUTION_METRICS_DAY_RETENTION', str(400 * 24 * 3600)))),
+)
+VIOLATION_VERDICTS = {'violation', 'blocked'}
+DIMENSIONS = ('verdict', 'method', 'fail_stage', 'agent')
+
+# gauge가 있을 때만 증감 (없으면 다음 조회 때 다시 계산)
+_ADJUST_GAUGE_LUA = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+  return redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+end
+return nil
+"""
+
+_local_lock = threading.Lock()
+_local_counters: dict[str, dict[str, int]] = {}
+_local_expiry: dict[str, float] = {}
+_local_gauges: dict[str, int] = {}
+_local_backfill: dict[str, int] = {}
+# 만료된 프로세스 메모리 버킷을 다음에 정리할 시각
+_local_next_prune = 0.0
+# 백필이 끝난 것으로 확인한 Redis 클라이언트 (다시 확인하지 않음)
+_backfill_done_client = None
+
+
+def _bucket_key(size: int, start: int) -> str:
+    return f'{_PREFIX}:{size}:{start}'
+
+
+def _to_epoch(value) -> float | None:
+    """ISO 문자열, epoch 초, datetime 을 epoch 초로 변환 (해석 불가 시 None)."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, (int, float)):
+        return float(value)
+    else:
+        text = str(value).strip()
+        try:
+            return float(text)
+        except ValueError:
+            pass
+        try:
+            dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _fields_for(entry: dict) -> list[str]:
+    verdict = str(entry.get('verdict') or '').strip().lower()
+    fields = ['events']
+    if verdict in VIOLATION_VERDICTS:
+        fields.append('violations')
+    values = {
+        'verdict': verdict,
+        'method': str(entry.get('method') or '').strip(),
+        'fail_stage': str(entry.get('fail_stage') or '').strip(),
+        'agent': str(entry.get('agent_id') or '').strip(),
+    }
+    fields.extend(f'{dim}:{val}' for dim, val in values.items() if val)
+    return fields
+
+
+def _targets(epoch: float, now: float) -> list[tuple[str, float | None]]:
+    """이벤트 시각이 속한 (카운터 키, 만료 시각) 목록. 보존 기간이 지난 버킷은 제외."""
+    targets: list[tuple[str, float | None]] = [(TOTAL_KEY, None)]
+    for size, retention in GRANULARITIES:
+        start = int(epoch) // size * size
+        expire_at = start + size + retention
+        if expire_at > now:
+            targets.append((_bucket_key(size, start), expire_at))
+    return targets
+
+
+def _prune_local(now: float) -> None:
+    """보존 기간이 지난 프로세스 메모리 버킷을 지운다 (1분에 한 번, _local_lock 안에서 호출)."""
+    global _local_next_prune
+    if now < _local_next_prune:
+        return
+    _local_next_prune = now + GRANULARITIES[0][0]
+    for key in [key for key, expire_at in _local_expiry.items() if expire_at <= now]:
+        _local_expiry.pop(key, None)
+        _local_counters.pop(key, None)
+
+
+def _apply(entries: list[dict]) -> None:
+    now = time.time()
+    epochs = [_to_epoch(entry.get('timestamp')) or now for entry in entries]
+    # 카운터보다 먼저 high-water 를 남겨, 이후 백필이 이 로그들을 다시 세지 않게 한다
+    since = int(min(epochs + [now]) * 1000)
+    client = repo._get_redis_client()
+    if client is not None:
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hsetnx(_BACKFILL_KEY, 'since', since)
+            for entry, epoch in zip(entries, epochs):
+                for key, expire_at in _targets(epoch, now):
+                    for field in _fields_for(entry):
+                        pipe.hincrby(key, field, 1)
+                    if expire_at:
+                        pipe.expireat(key, int(expire_at))
+            pipe.execute()
+        except Exception as e:
+            logger.warning("metrics: dropped %d log(s), Redis update failed: %s", len(entries), e)
+        return
+    with _local_lock:
+        _prune_local(now)
+        _local_backfill.setdefault('since', since)
+        for entry, epoch in zip(entries, epochs):
+            for key, expire_at in _targets(epoch, now):
+                counters = _local_counters.setdefault(key, {})
+                for field in _fields_for(entry):
+                    counters[field] = counters.get(field, 0) + 1
+                if expire_at:
+                    _local_expiry[key] = expire_at
+
+
+def record_log(entry: dict) -> None:
+    """정규화된 로그 한 건을 카운터에 반영한다 (실패해도 로그 적재를 막지 않음)."""
+    if isinstance(entry, dict) and entry:
+        _apply([entry])
+
+
+def ensure_backfill() -> None:
+    """high-water(since) 이전에 저장된 레지스트리 로그(보관 세그먼트 포함)를 한 번만 카운터에 반영.
+
+    앱 시작 시 호출하며, Redis 를 쓰는 여러 프로세스 중 ``done`` 을 먼저 차지한 한 곳만 실행한다.
+    """
+    global _backfill_done_client
+    now_ms = int(time.time() * 1000)
+    client = repo._get_redis_client()
+    if client is not None and client is _backfill_done_client:
+        return
+    if client is not None:
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hsetnx(_BACKFILL_KEY, 'since', now_ms)
+            pipe.exists(_LEGACY_BACKFILL_KEY)
+            pipe.hget(_BACKFILL_KEY, 'since')
+            _, legacy, since = pipe.execute()
+            # 이전 방식(플래그 키)으로 이미 백필한 배포는 다시 세지 않는다
+            if legacy or not client.hsetnx(_BACKFILL_KEY, 'done', now_ms):
+                _backfill_done_client = client
+                return
+        except Exception as e:
+            logger.warning("metrics: backfill skipped, Redis unavailable: %s", e)
+            return
+        since = int(since)
+        _backfill_done_client = client
+    else:
+        with _local_lock:
+            if 'done' in _local_backfill:
+                return
+            since = _local_backfill.setdefault('since', now_ms)
+            _local_backfill['done'] = now_ms
+    try:
+        entries = repo.query_registry_logs(end_ms=since - 1)
+    except Exception as e:
+        logger.warning("metrics: backfill failed to read registry logs: %s", e)
+        return
+    if entries:
+        _apply(entries)
+
+
+def _plan(start: float, end: float, now: float) -> list[str]:
+    """[start, end) 를 정렬된 버킷들로 덮는 최소 키 목록 (큰 버킷 우선, 만료된 작은 버킷은 상위 단위로 확장)."""
+
+    def _finest(at: float) -> int:
+        for size, retention in GRANULARITIES:
+            if at >= now - retention:
+                return size
+        return GRANULARITIES[-1][0]
+
+    low = _finest(start)
+    high = _finest(max(end - 1, start))
+    t = int(start) // low * low
+    stop = -(-int(end) // high) * high
+    keys = []
+    while t < stop:
+        # 양 끝이 분 단위 이상으로 정렬되어 있으므로 가장 작은 버킷은 항상 들어간다
+        size = next(
+            s for s, _ in reversed(GRANULARITIES)
+            if t % s == 0 and t + s <= stop or s == GRANULARITIES[0][0]
+        )
+        keys.append(_bucket_key(size, t))
+        t += size
+    return keys
+
+
+def _read(keys: list[str]) -> list[dict]:
+    client = repo._get_redis_client()
+    if client is not None:
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+            return pipe.execute()
+        except Exception as e:
+            logger.warning("metrics: Redis read failed: %s", e)
+            return []
+    now = time.time()
+    with _local_lock:
+        return [
+            dict(_local_counters.get(key, {}))
+            for key in keys
+            if _local_expiry.get(key, now + 1) > now
+        ]
+
+
+def summarize(start=None, end=None) -> dict:
+    """구간 통계. start/end 가 모두 없으면 전체 누적 카운터를 읽는다."""
+    ensure_backfill()
+    start_epoch, end_epoch = _to_epoch(start), _to_epoch(end)
+    if start is not None and start != '' and start_epoch is None:
+        raise ValueError(f'invalid start: {start}')
+    if end is not None and end != '' and end_epoch is None:
+        raise ValueError(f'invalid end: {end}')
+
+    now = time.time()
+    if start_epoch is None and end_epoch is None:
+        keys = [TOTAL_KEY]
+        window = None
+    else:
+        end_epoch = min(end_epoch if end_epoch is not None else now, now + 60)
+        start_epoch = start_epoch if start_epoch is not None else end_epoch - 24 * 3600
+        if start_epoch >= end_epoch:
+            raise ValueError('start must be earlier than end')
+        keys = _plan(start_epoch, end_epoch, now)
+        window = {
+            'start': datetime.fromtimestamp(start_epoch, timezone.utc).isoformat(),
+            'end': datetime.fromtimestamp(end_epoch, timezone.utc).isoformat(),
+            'buckets': len(keys),
+        }
+
+    totals: dict[str, int] = {}
+    for counters in _read(keys):
+        for field, value in (counters or {}).items():
+            totals[field] = totals.get(field, 0) + int(value)
+
+    summary = {
+        'events': totals.get('events', 0),
+        'violations': totals.get('violations', 0),
+        'range': window,
+    }
+    for dim in DIMENSIONS:
+        breakdown = {
+            field.split(':', 1)[1]: count
+            for field, count in totals.items()
+            if field.startswith(f'{dim}:')
+        }
+        summary[f'by_{dim}'] = dict(sorted(breakdown.items(), key=lambda kv: (-kv[1], kv[0])))
+    return summary
+
+
+def set_gauge(name: str, value: int) -> None:
+    client = repo._get_redis_client()
+    if client is not None:
+        try:
+            client.hset(GAUGES_KEY, name, int(value))
+        except Exception as e:
+            logger.warning("metrics: gauge %s not stored: %s", name, e)
+        return
+    with _local_lock:
+        _local_gauges[name] = int(value)
+
+
+def adjust_gauge(name: str, delta: int) -> None:
+    """gauge가 이미 계산되어 있을 때만 delta 만큼 증감."""
+    client = repo._get_redis_client()
+    if client is not None:
+        try:
+            client.eval(_ADJUST_GAUGE_LUA, 1, GAUGES_KEY, name, int(delta))
+        except Exception as e:
+            logger.warning("metrics: gauge %s not adjusted: %s", name, e)
+        return
+    with _local_lock:
+        if name in _local_gauges:
+            _local_gauges[name] += int(delta)
+
+
+def get_gauge(name: str) -> int | None:
+    client = repo._get_redis_client()
+    if client is not None:
+        try:
+            value = client.hget(GAUGES_KEY, name)
+            return int(value) if value is not None else None
+        except Exception as e:
+            logger.warning("metrics: gauge %s not read: %s", name, e)
+            return None
+    with _local_lock:
+        return _local_gauges.get(name)
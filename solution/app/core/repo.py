@@ -1,6 +1,9 @@
 import copy
+import hashlib
 import os
 import json
+import threading
+import uuid
 from datetime import datetime, timezone, timedelta
 
 try:
@@ -30,8 +33,29 @@ REGISTRY_LOG_FILE = os.path.join(_AGENTS_DIR, 'r-logs.json')
 RULESETS_FILE = os.path.join(_AGENTS_DIR, 'rulesets.json')
 _OLD_RULESETS_FILE = os.path.join(_DATA_DIR, 'rulesets.json')
 REGISTRY_MAX_LOG_ENTRIES = int(os.environ.get('SOLUTION_MAX_LOG_ENTRIES', '500'))
+# 상한을 넘는 레지스트리 로그는 버리지 않고 압축 세그먼트로 보관 (빈 문자열이면 보관하지 않음)
+REGISTRY_LOG_ARCHIVE_DIR = os.environ.get(
+    'SOLUTION_LOG_ARCHIVE_DIR', os.path.join(_DATA_DIR, 'archive', 'registry-logs')
+)
+REGISTRY_LOG_ARCHIVE_CODEC = os.environ.get('SOLUTION_LOG_ARCHIVE_CODEC', '')
+# 상한 초과분이 이만큼 쌓이면 한 세그먼트로 묶어 보관
+REGISTRY_LOG_ARCHIVE_BATCH = int(os.environ.get('SOLUTION_LOG_ARCHIVE_BATCH', '100'))
 _AGENTS_REDIS_KEY = os.environ.get('AGENTS_REDIS_KEY', 'agents')
 _REGISTRY_LOGS_REDIS_KEY = os.environ.get('REGISTRY_LOGS_REDIS_KEY', 'r-logs')
+# 상한 초과분 보관은 한 프로세스만 (세그먼트를 먼저 쓰고 잘라내므로 동시에 하면 중복 보관된다)
+_REGISTRY_LOG_ARCHIVE_LOCK_KEY = f'{_REGISTRY_LOGS_REDIS_KEY}:archive-lock'
+# 세그먼트에 썼지만 아직 잘라내지 못한 로그의 digest 목록 (중단 후 다시 보관하지 않고 잘라내기만 한다)
+_REGISTRY_LOG_ARCHIVE_WATERMARK_KEY = f'{_REGISTRY_LOGS_REDIS_KEY}:archive-watermark'
+_registry_log_lock = threading.Lock()
+_registry_archive_lock = threading.Lock()
+_registry_archive_watermark = None
+# 락 값(토큰)이 자기 것일 때만 해제
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
 _CRUD_MAP = {'c': 'Create', 'r': 'Read', 'u': 'Update', 'd': 'Delete'}
 _CRUD_KEYWORDS = {
     'c': ['create', '생성', '등록', '추가'],
@@ -202,6 +226,54 @@ def load_agents():
 def save_agents(data):
     if isinstance(data, list):
         _save_list_to_redis(_AGENTS_REDIS_KEY, data)
+        from . import metrics  # 지연 import로 순환 참조 회피
+
+        metrics.set_gauge('total_agents', len(_filter_deleted_agents(data)))
+
+
+def _update_redis_list(client, key, mutate, load_fallback):
+    """WATCH/MULTI 로 key 의 JSON 목록을 mutate(current) -> (new_list, result) 로 바꿔 저장 (충돌 시 재시도)."""
+    with client.pipeline() as pipe:
+        while True:
+            try:
+                pipe.watch(key)
+                raw = pipe.get(key)
+                current = json.loads(raw) if raw is not None else load_fallback()
+                if not isinstance(current, list):
+                    current = []
+                new_list, result = mutate(current)
+                pipe.multi()
+                pipe.set(key, json.dumps(new_list, ensure_ascii=False))
+                pipe.execute()
+                return new_list, result
+            except _redis_module.WatchError:
+                continue
+
+
+def update_agents(mutate):
+    """agents 목록을 읽어 mutate(agents) -> (new_agents, result) 로 바꾼 뒤 한 번에 저장하고 result 를 반환.
+
+    Redis 사용 시 WATCH/MULTI 로 감싸 동시에 들어온 다른 저장과 섞이지 않게 하며, 충돌하면 최신 목록으로
+    mutate 를 다시 호출한다 (mutate 는 부수 효과 없이 새 목록을 만들어야 함).
+    """
+    client = _get_redis_client()
+    if client is not None:
+        try:
+            agents, result = _update_redis_list(
+                client,
+                _AGENTS_REDIS_KEY,
+                lambda current: mutate(_filter_deleted_agents(current)),
+                lambda: load_json(AGENTS_FILE, []),
+            )
+            from . import metrics  # 지연 import로 순환 참조 회피
+
+            metrics.set_gauge('total_agents', len(_filter_deleted_agents(agents)))
+            return result
+        except _redis_module.RedisError:
+            pass
+    agents, result = mutate(load_agents())
+    save_agents(agents)
+    return result
 
 
 def load_logs():
@@ -407,16 +479,159 @@ def _normalize_agent_log_entry(entry: dict) -> dict:
     return normalized
 
 
+def update_registry_logs(mutate):
+    """레지스트리 로그(최신순)를 mutate(logs) -> (new_logs, result) 로 바꿔 저장하고 result 를 반환.
+
+    update_agents 와 같이 Redis 사용 시 WATCH/MULTI 로 감싸며 충돌하면 mutate 를 다시 호출한다.
+    """
+    ensure_seed()
+    client = _get_redis_client()
+    if client is not None:
+        try:
+            _, result = _update_redis_list(
+                client,
+                _REGISTRY_LOGS_REDIS_KEY,
+                lambda current: mutate(_normalize_registry_logs(current)),
+                lambda: load_json(REGISTRY_LOG_FILE, []),
+            )
+            return result
+        except _redis_module.RedisError:
+            pass
+    with _registry_log_lock:
+        logs, result = mutate(load_registry_logs())
+        save_registry_logs(logs)
+    return result
+
+
+def _registry_log_digest(entry):
+    payload = json.dumps(entry, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _load_archive_watermark(client):
+    if client is None:
+        return _registry_archive_watermark
+    raw = client.get(_REGISTRY_LOG_ARCHIVE_WATERMARK_KEY)
+    return json.loads(raw) if raw else None
+
+
+def _save_archive_watermark(client, digests):
+    global _registry_archive_watermark
+    if client is None:
+        _registry_archive_watermark = digests
+    elif digests:
+        client.set(_REGISTRY_LOG_ARCHIVE_WATERMARK_KEY, json.dumps(digests))
+    else:
+        client.delete(_REGISTRY_LOG_ARCHIVE_WATERMARK_KEY)
+
+
+def _trim_archived_registry_logs(digests):
+    """보관한 로그(digests, 최신순)를 목록 끝에서 잘라낸다.
+
+    보관하는 동안 상한 초과로 가장 오래된 로그가 잘려 나갔을 수 있으므로, 목록 끝이 보관한 로그의
+    앞부분과 일치하는 만큼만 잘라낸다.
+    """
+
+    def _trim(logs):
+        tail = [_registry_log_digest(entry) for entry in logs[-len(digests):]]
+        for count in range(len(tail), 0, -1):
+            if tail[-count:] == digests[:count]:
+                return logs[:-count], count
+        return logs, 0
+
+    return update_registry_logs(_trim)
+
+
+def _archive_registry_overflow():
+    """상한을 넘은 오래된 로그를 보관 세그먼트로 옮기고 잘라낸다.
+
+    IAMDatabase.archive_logs 처럼 락을 쥔 한 곳만 실행하며, 세그먼트를 먼저 쓰고 watermark 를 남긴 뒤
+    잘라낸다. 잘라내기 전에 중단되었다면 다음 실행이 watermark 의 로그를 다시 보관하지 않고 잘라내기만 한다.
+    """
+    from . import log_archive  # 지연 import
+
+    client = _get_redis_client()
+    token = uuid.uuid4().hex
+    if client is not None:
+        try:
+            if not client.set(_REGISTRY_LOG_ARCHIVE_LOCK_KEY, token, nx=True, ex=60):
+                return
+        except _redis_module.RedisError:
+            return
+    elif not _registry_archive_lock.acquire(blocking=False):
+        return
+    try:
+        pending = _load_archive_watermark(client)
+        if pending:
+            _trim_archived_registry_logs(pending)
+            _save_archive_watermark(client, None)
+        overflow = load_registry_logs()[REGISTRY_MAX_LOG_ENTRIES:]
+        if len(overflow) < REGISTRY_LOG_ARCHIVE_BATCH:
+            return
+        try:
+            log_archive.write_segments(REGISTRY_LOG_ARCHIVE_DIR, overflow, REGISTRY_LOG_ARCHIVE_CODEC)
+        except OSError:
+            # 보관 실패 시 보관 대상은 남겨 다음 append에서 다시 시도하되, 실패가 계속되어도
+            # hot 목록이 끝없이 커지지 않도록 상한 + 한 배치 분량을 넘는 가장 오래된 로그는 버린다
+            keep = REGISTRY_MAX_LOG_ENTRIES + REGISTRY_LOG_ARCHIVE_BATCH
+            update_registry_logs(lambda logs: (logs[:keep], None))
+            return
+        digests = [_registry_log_digest(entry) for entry in overflow]
+        _save_archive_watermark(client, digests)
+        _trim_archived_registry_logs(digests)
+        _save_archive_watermark(client, None)
+    except Exception:
+        # watermark 를 읽거나 쓰지 못하면 이번 보관은 건너뛴다 (다음 append에서 다시 시도)
+        return
+    finally:
+        if client is not None:
+            try:
+                client.eval(_RELEASE_LOCK_LUA, 1, _REGISTRY_LOG_ARCHIVE_LOCK_KEY, token)
+            except _redis_module.RedisError:
+                pass
+        else:
+            _registry_archive_lock.release()
+
+
 def append_registry_log(entry: dict):
     """data/redisDB/r-logs.json에 스키마를 맞춰 append."""
     normalized = _normalize_registry_log_entry(entry)
     if not normalized:
         return
-    logs = load_registry_logs()
-    logs.insert(0, normalized)
-    if isinstance(logs, list) and len(logs) > REGISTRY_MAX_LOG_ENTRIES:
-        del logs[REGISTRY_MAX_LOG_ENTRIES:]
-    save_registry_logs(logs)
+
+    def _prepend(logs):
+        logs = [normalized] + list(logs)
+        if not REGISTRY_LOG_ARCHIVE_DIR:
+            del logs[REGISTRY_MAX_LOG_ENTRIES:]
+        return logs, len(logs)
+
+    count = update_registry_logs(_prepend)
+    if REGISTRY_LOG_ARCHIVE_DIR and count >= REGISTRY_MAX_LOG_ENTRIES + REGISTRY_LOG_ARCHIVE_BATCH:
+        _archive_registry_overflow()
+    from . import metrics  # 지연 import로 순환 참조 회피
+
+    metrics.record_log(normalized)
+
+
+def query_registry_logs(start_ms=None, end_ms=None, limit=None):
+    """Redis(hot) + 보관 세그먼트(cold)에서 구간 [start_ms, end_ms] 로그를 최신순으로 반환."""
+    from . import log_archive  # 지연 import
+
+    hot = []
+    for entry in load_registry_logs():
+        ms = log_archive.entry_epoch_ms(entry)
+        if ms is None or (start_ms is not None and ms < start_ms) or (end_ms is not None and ms > end_ms):
+            continue
+        hot.append((ms, entry))
+    cold = []
+    if REGISTRY_LOG_ARCHIVE_DIR:
+        cold = [
+            (log_archive.entry_epoch_ms(entry) or 0, entry)
+            for entry in log_archive.query(REGISTRY_LOG_ARCHIVE_DIR, start_ms, end_ms, limit)
+        ]
+    merged = sorted(hot + cold, key=lambda row: row[0], reverse=True)
+    entries = [entry for _, entry in merged]
+    return entries[:limit] if limit else entries
 
 
 def load_rulesets():
@@ -426,3 +641,6 @@ def load_rulesets():
 
 def save_rulesets(data):
     save_json(RULESETS_FILE, data)
+    from . import metrics  # 지연 import로 순환 참조 회피
+
+    metrics.set_gauge('total_rulesets', len(data) if isinstance(data, list) else 0)
@@ -1,16 +1,25 @@
 """
 JWS 관련 서명 유틸리티.
 
-현재는 구조적(JWS‑like) 검증만 제공하며, 암호학적 검증은 포함하지 않음.
+- verify_jws: 구조적(JWS‑like) 검증 (암호학적 검증 아님)
+- verify_card_signatures / verify_token_locally: jws-server JWKS 공개키(ES256/EdDSA)로 로컬 암호 검증
 """
 
 from __future__ import annotations
 
 import json
 import base64
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 import os
 
+import jwt
+
+from .jwks import JWKS_CACHE
+from .validators import canonical_json, card_hash as _card_hash
+
+# JWKS 로 로컬 검증하는 비대칭 알고리즘 (HS256 등은 jws-server /verify 로 검증)
+LOCAL_JWS_ALGS = ("ES256", "EdDSA")
+
 
 def _b64url_decode(data: str) -> bytes:
     data = data.strip()
@@ -33,7 +42,7 @@ def _is_base64url(text: str) -> bool:
 
 
 def _allowed_algs() -> set[str]:
-    raw = os.environ.get("ALLOWED_JWS_ALGS", "ES256,RS256,HS256")
+    raw = os.environ.get("ALLOWED_JWS_ALGS", "ES256,EdDSA,RS256,HS256")
     return {alg.strip() for alg in raw.split(',') if alg.strip()}
 
 
@@ -93,6 +102,103 @@ def verify_jws(card: Dict[str, Any]) -> Tuple[bool, str]:
     return True, ''
 
 
+def unverified_header(token: str) -> Dict[str, Any]:
+    """compact JWS 의 protected 헤더 (서명 확인 전, 형식 오류 시 빈 dict)."""
+    try:
+        header = json.loads(_b64url_decode(token.split('.')[0]).decode('utf-8'))
+    except Exception:
+        return {}
+    return header if isinstance(header, dict) else {}
+
+
+def _local_key(header: Dict[str, Any]):
+    """헤더의 alg/kid 에 맞는 JWKS 공개키. 로컬 검증 대상이 아니거나 키를 모르면 None."""
+    if header.get('alg') not in LOCAL_JWS_ALGS:
+        return None
+    key = JWKS_CACHE.get(header.get('kid'))
+    if key is None or (key.algorithm_name and key.algorithm_name != header.get('alg')):
+        return None
+    return key
+
+
+def verify_card_signatures(card: Dict[str, Any]) -> Tuple[Optional[bool], str]:
+    """카드 signatures 의 레지스트리 detached 서명(RFC 7797, b64=false)을 JWKS 공개키로 검증.
+
+    반환값:
+      - (True, kid): 레지스트리 서명 하나 이상이 현재 카드 내용과 일치
+      - (False, 사유): 레지스트리 키로 서명됐지만 카드가 바뀌었거나 서명이 틀림
+      - (None, 사유): 로컬에서 검증할 수 있는 서명이 없음 (HS256, 알 수 없는 kid 등)
+    """
+    sigs = card.get('signatures') if isinstance(card, dict) else None
+    if not isinstance(sigs, list) or not sigs:
+        return None, 'signatures missing or empty'
+    # detached payload: jws-server 와 같은 정준화로 직렬화한 signatures 제외 카드 본문
+    payload = canonical_json({k: v for k, v in card.items() if k != 'signatures'})
+    failure = None
+    for i, sig in enumerate(sigs):
+        if not isinstance(sig, dict) or not isinstance(sig.get('protected'), str) or not isinstance(sig.get('signature'), str):
+            continue
+        header = unverified_header(sig['protected'])
+        if header.get('b64') is not False:
+            continue  # 클레임 토큰 조각 등 카드 본문에 대한 서명이 아님
+        key = _local_key(header)
+        if key is None:
+            continue
+        try:
+            jwt.PyJWS().decode_complete(
+                f"{sig['protected']}..{sig['signature']}",
+                key.key,
+                algorithms=[header['alg']],
+                detached_payload=payload,
+            )
+        except jwt.InvalidTokenError as e:
+            failure = f'signatures[{i}]: {e}'
+            continue
+        return True, header.get('kid')
+    if failure:
+        return False, failure
+    return None, 'no signature verifiable with registry keys'
+
+
+class CardHashMismatch(ValueError):
+    """토큰의 card_hash 클레임이 전달된 카드/해시와 다름 (detail 은 jws-server 400 응답과 같은 형식)."""
+
+    def __init__(self, detail: Dict[str, Any]):
+        super().__init__(detail.get('message'))
+        self.detail = detail
+
+
+def verify_token_locally(token: str, card: Optional[Dict[str, Any]] = None,
+                         card_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """레지스트리 클레임 토큰(jws-server /sign 의 jws)을 JWKS 공개키로 검증.
+
+    jws-server /verify 와 같은 형식의 결과를 반환하고, 로컬 검증 대상이 아니면 None.
+    서명/만료 오류는 jwt.InvalidTokenError, 해시 불일치는 CardHashMismatch 로 알린다.
+    """
+    key = _local_key(unverified_header(token))
+    if key is None:
+        return None
+    decoded = jwt.decode(token, key.key, algorithms=[key.algorithm_name])
+    provided = _card_hash(card) if isinstance(card, dict) else card_hash
+    hash_verified = False
+    if provided is not None:
+        expected = decoded.get('card_hash')
+        if not isinstance(expected, str) or not expected:
+            raise CardHashMismatch({
+                'code': 'TOKEN_MISSING_CARD_HASH',
+                'message': 'card_hash claim missing in token',
+            })
+        if provided != expected:
+            raise CardHashMismatch({
+                'code': 'CARD_HASH_MISMATCH',
+                'message': 'agent card hash does not match token',
+                'expected': expected,
+                'actual': provided,
+            })
+        hash_verified = True
+    return {'valid': True, 'payload': decoded, 'hash_verified': hash_verified, 'verified_locally': True}
+
+
 def validate_signatures_jws_like(card: Dict[str, Any]) -> Tuple[bool, str]:
     """
     Backward-compatible alias used by API layer.
@@ -103,5 +209,8 @@ def validate_signatures_jws_like(card: Dict[str, Any]) -> Tuple[bool, str]:
 
 __all__ = [
     'verify_jws',
+    'verify_card_signatures',
+    'verify_token_locally',
+    'CardHashMismatch',
     'validate_signatures_jws_like',
 ]
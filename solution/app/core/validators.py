@@ -4,16 +4,20 @@ AgentCard 전용 스키마 검증 도구.
 1. 입력 크기 검사 (비정상적으로 큰 Agent Card 차단)
 2. a2a.json 기반 JSON Schema 검증
 3. 정책 모듈 / 서명 모듈에서 사용할 핵심 필드 추출
+4. 카드 해시(jws-server 와 동일한 정준화 SHA-256) 기준 검증 결과 캐시
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
 
 try:
     # --- 선택적 환경 로더 (env_loader 사용 시) ---
@@ -47,8 +51,10 @@ except Exception:
 
     try: 
         from jsonschema import Draft7Validator, RefResolver, ValidationError 
+        from jsonschema.exceptions import best_match
     except Exception: 
         Draft7Validator = object # type: ignore 
+        best_match = None # type: ignore 
         RefResolver = object # type: ignore 
         class ValidationError(Exception): # type: ignore 
             pass
@@ -61,6 +67,64 @@ DEFAULT_MAX_AGENT_CARD_BYTES = int(os.environ.get("AGENT_CARD_MAX_BYTES", "26214
 # 스키마 파일 경로 (solution/data/a2a.json)
 A2A_SCHEMA_PATH = Path(__file__).resolve().parents[2] / "data" / "a2a.json"
 
+# 검증 결과 캐시 크기 (0 이면 캐시 사용 안 함)
+VALIDATION_CACHE_SIZE = int(os.environ.get("AGENT_CARD_VALIDATION_CACHE_SIZE", "1024"))
+
+
+def canonical_json(obj: Any) -> bytes:
+    """jws-server 와 동일한 정준화(키 정렬 + 공백 제거) 직렬화."""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def card_hash(card: Dict[str, Any]) -> str:
+    """signatures 를 제외한 카드의 SHA-256 ("sha256:<hex>", jws-server 의 card_hash 클레임과 동일)."""
+    material = {k: v for k, v in card.items() if k != "signatures"} if isinstance(card, dict) else card
+    return "sha256:" + hashlib.sha256(canonical_json(material)).hexdigest()
+
+
+def _digest(obj: Any) -> str:
+    return hashlib.sha256(canonical_json(obj)).hexdigest()
+
+
+class ValidationCache:
+    """카드 해시 기반 키 -> 검증 결과 LRU 캐시 (스레드 안전, 결과는 불변 값만 저장)."""
+
+    def __init__(self, maxsize: int = VALIDATION_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if self.maxsize <= 0:
+            return compute()
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+VALIDATION_CACHE = ValidationCache()
+
 
 @dataclass(frozen=True)
 class AgentCardParseResult:
@@ -73,9 +137,24 @@ class AgentCardParseResult:
     signatures: Any
 
 
+@dataclass(frozen=True)
+class CardCheckResult:
+    """스키마 / 기본 필드 / 서명 구조 검증을 한 번에 수행한 결과."""
+
+    card_hash: str
+    schema_message: Optional[str]  # validate() 가 던지는 메시지와 동일, 통과 시 None
+    schema_errors: Tuple[Dict[str, Any], ...]
+    basic_errors: Tuple[str, ...]
+    jws_error: Optional[str]  # signatures 가 있을 때만 검사, 통과 시 None
+
+
 class AgentCardSchemaError(Exception):
     """스키마 검증 실패를 표현하는 공통 예외."""
 
+    def __init__(self, message: str, errors: Optional[List[Dict[str, Any]]] = None) -> None:
+        super().__init__(message)
+        self.errors = errors or []
+
 
 class AgentCardSchema:
     """Agent Card 스키마 검증 및 필드 추출기."""
@@ -135,12 +214,62 @@ class AgentCardSchema:
                 f"Agent Card payload exceeds allowed size ({size} bytes > {self.max_bytes} bytes)"
             )
 
+    def _collect_errors(self, card: Dict[str, Any]) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """한 번의 순회로 (대표 오류 메시지, 전체 오류 목록)을 구한다. 대표 메시지는 validate() 와 동일(best_match)."""
+        raw = list(self._validator.iter_errors(card))  # type: ignore[attr-defined]
+        if not raw:
+            return None, []
+        errors = [
+            {
+                "path": "/" + "/".join(str(p) for p in err.absolute_path),
+                "message": err.message,
+                "validator": err.validator,
+            }
+            for err in raw
+        ]
+        errors.sort(key=lambda e: (e["path"], e["validator"]))
+        return best_match(raw).message, errors
+
+    def iter_errors(self, card: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """모든 스키마 오류를 수집 (path, message, validator), 경로순 정렬."""
+        return self._collect_errors(card)[1]
+
     def validate(self, card: Dict[str, Any]) -> None:
-        """스키마 검증 수행."""
-        try:
-            self._validator.validate(card)  # type: ignore[attr-defined]
-        except ValidationError as exc:  # type: ignore[name-defined]
-            raise AgentCardSchemaError(f"Agent Card schema validation failed: {exc.message}") from exc
+        """스키마 검증 수행 (실패 시 전체 오류 목록을 예외의 errors 로 전달)."""
+        message, errors = self._collect_errors(card)
+        if errors:
+            raise AgentCardSchemaError(f"Agent Card schema validation failed: {message}", errors)
+
+    def check(self, card: Dict[str, Any], mode: str = "create") -> CardCheckResult:
+        """스키마 + 기본 필드 + 서명 구조 검증 결과를 카드 해시 기준으로 캐시해 반환.
+
+        mode="create": 스키마 + validate_card_basic, mode="update": validate_card_basic_update (스키마 생략),
+        mode="import": 스키마 + validate_card_basic_update (서명 없는 카드는 등록 시 레지스트리가 서명).
+        서명 검증 결과는 signatures 와 허용 알고리즘에 의존하므로 키에 함께 포함한다.
+        """
+        from .signatures import _allowed_algs, verify_jws  # 지연 import
+
+        hashed = card_hash(card)
+        signatures = card.get("signatures")
+        key = ("card", mode, hashed, _digest(signatures), tuple(sorted(_allowed_algs())))
+
+        def _compute() -> CardCheckResult:
+            schema_message, schema_errors = self._collect_errors(card) if mode != "update" else (None, [])
+            basic = validate_card_basic if mode == "create" else validate_card_basic_update
+            _, basic_errors = basic(card)
+            jws_error = None
+            if isinstance(signatures, list) and signatures:
+                ok, reason = verify_jws(card)
+                jws_error = None if ok else (reason or "Invalid JWS signature")
+            return CardCheckResult(
+                hashed,
+                f"Agent Card schema validation failed: {schema_message}" if schema_message else None,
+                tuple(schema_errors),
+                tuple(basic_errors),
+                jws_error,
+            )
+
+        return VALIDATION_CACHE.get_or_compute(key, _compute)
 
     def parse_fields(self, card: Dict[str, Any]) -> AgentCardParseResult:
         """
@@ -312,10 +441,34 @@ def validate_card_basic_update(card: dict):
 
 
 
+def cached_policy_checks(evaluator: Any, card: Dict[str, Any], extensions: Any) -> Tuple[Optional[str], Optional[str]]:
+    """PolicyEvaluator 의 화이트리스트 / extension 검사 결과를 (카드 해시, 정책 설정) 기준으로 캐시."""
+    key = ("policy", card_hash(card), _digest(extensions), evaluator.config)
+
+    def _compute() -> Tuple[Optional[str], Optional[str]]:
+        try:
+            whitelist_error = evaluator._check_whitelist(card)
+        except Exception:
+            whitelist_error = None
+        try:
+            extension_error = evaluator._check_extension_limits(extensions)
+        except Exception:
+            extension_error = None
+        return whitelist_error, extension_error
+
+    return VALIDATION_CACHE.get_or_compute(key, _compute)
+
+
 __all__ = [
     "AgentCardSchema",
     "AgentCardParseResult",
     "AgentCardSchemaError",
+    "CardCheckResult",
+    "ValidationCache",
+    "VALIDATION_CACHE",
+    "cached_policy_checks",
+    "canonical_json",
+    "card_hash",
     "validate_card_basic",
     "validate_card_basic_update",
 ]
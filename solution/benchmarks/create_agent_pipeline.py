@@ -0,0 +1,132 @@
+"""Measure ``POST /api/create-agent`` throughput with a cold vs warm validation cache.
+
+``N`` distinct agent cards (every 10th one invalid, so the 422 path is covered too)
+are posted through the Flask test client for several rounds:
+
+* ``cold`` - ``VALIDATION_CACHE`` is cleared before every round, so each request runs
+  the JSON Schema, ``validate_card_basic``, ``verify_jws`` and policy checks
+* ``warm`` - the cache is kept, so re-registering an unchanged card is a hash + lookup
+
+Authentication, the duplicate check's agent store and the audit log are patched out
+(storage is not what is being measured), and the cards carry structurally valid
+signatures so the JWS server is never called. Responses from both modes are compared.
+
+Usage::
+
+    python solution/benchmarks/create_agent_pipeline.py [--cards 200] [--rounds 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SOLUTION_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SOLUTION_ROOT))
+os.environ.setdefault("SOLUTION_DATA_ROOT", tempfile.mkdtemp(prefix="bench-create-agent-"))
+os.environ.pop("REDIS_URL", None)
+
+from app import create_app  # noqa: E402
+from app.api import create_agent as create_agent_module  # noqa: E402
+from app.core.validators import VALIDATION_CACHE  # noqa: E402
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def make_card(i: int) -> dict:
+    kid = "bench-key-1"
+    card = {
+        "protocolVersion": "0.3.0",
+        "name": f"bench-agent-{i:05d}",
+        "description": "Benchmark agent card",
+        "url": f"http://localhost:{9000 + i}/",
+        "preferredTransport": "JSONRPC",
+        "version": "1.0.0",
+        "provider": {"organization": "bench", "url": "http://localhost"},
+        "capabilities": {
+            "streaming": False,
+            "extensions": [
+                {"uri": "http://localhost/ext/trace", "params": {"depth": [1, 2, {"x": i}]}}
+            ],
+        },
+        "defaultInputModes": ["text/plain"],
+        "defaultOutputModes": ["application/json"],
+        "securitySchemes": {"bearerAuth": {"type": "http", "scheme": "bearer"}},
+        "security": [{"bearerAuth": []}],
+        "skills": [
+            {
+                "id": f"skill-{n}",
+                "name": f"Skill {n}",
+                "description": "Does a benchmark thing",
+                "tags": ["bench", f"t{n}"],
+                "security": [{"bearerAuth": []}],
+            }
+            for n in range(5)
+        ],
+        "signatures": [
+            {
+                "protected": _b64url(json.dumps({"alg": "HS256", "kid": kid}).encode()),
+                "signature": _b64url(os.urandom(32)),
+                "header": {"kid": kid},
+            }
+        ],
+    }
+    if i % 10 == 9:
+        del card["skills"]  # 422 SCHEMA_VALIDATION_FAILED
+    return card
+
+
+def _patch_environment() -> None:
+    create_agent_module.require_jwt = lambda: None
+    create_agent_module.require_admin = lambda: None
+    create_agent_module.append_log = lambda *args, **kwargs: None
+    create_agent_module.repo.load_agents = lambda: []
+    create_agent_module.repo.save_agents = lambda data: None
+
+
+def _run(client, bodies: list[bytes], rounds: int, clear: bool) -> tuple[float, list]:
+    responses = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if clear:
+            VALIDATION_CACHE.clear()
+        responses = []
+        for body in bodies:
+            resp = client.post("/api/create-agent", data=body, content_type="application/json")
+            responses.append((resp.status_code, resp.get_json()))
+    elapsed = time.perf_counter() - started
+    return len(bodies) * rounds / elapsed, responses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    _patch_environment()
+    client = create_app().test_client()
+    bodies = [json.dumps({"card": make_card(i)}).encode("utf-8") for i in range(args.cards)]
+
+    cold_rate, cold_responses = _run(client, bodies, args.rounds, clear=True)
+    VALIDATION_CACHE.clear()
+    _run(client, bodies, 1, clear=False)  # 캐시 채우기
+    warm_rate, warm_responses = _run(client, bodies, args.rounds, clear=False)
+
+    statuses = sorted({status for status, _ in warm_responses})
+    print(f"cards={args.cards} rounds={args.rounds} statuses={statuses}")
+    print(f"cold  {cold_rate:10.1f} cards/s")
+    print(f"warm  {warm_rate:10.1f} cards/s  ({warm_rate / cold_rate:.1f}x)  cache={VALIDATION_CACHE.stats()}")
+    print(f"identical responses: {cold_responses == warm_responses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""solution 테스트 공용 준비: 임시 데이터/키 디렉터리, import 경로, jws-server 앱 로더."""
+
+import importlib.util
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+os.environ.setdefault("SOLUTION_DATA_ROOT", tempfile.mkdtemp(prefix="solution-tests-"))
+os.environ.setdefault("JWS_KEY_DIR", tempfile.mkdtemp(prefix="jws-keys-"))
+sys.path.insert(0, str(ROOT))
+
+
+def import_jws_server():
+    # jws-server 는 패키지가 아니므로 jws.py 를 jws_server 모듈로 한 번만 불러온다
+    if "jws_server" in sys.modules:
+        return sys.modules["jws_server"]
+    server_dir = ROOT.parent / "jws-server"
+    sys.path.insert(0, str(server_dir))
+    spec = importlib.util.spec_from_file_location("jws_server", server_dir / "jws.py")
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules["jws_server"] = module
+    spec.loader.exec_module(module)  # type: ignore[attr-defined]
+    return module
+
+
+class RequestsResponse:
+    """requests.Response 처럼 보이도록 TestClient 응답을 감싼다."""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.ok = response.status_code < 400
+
+    def json(self):
+        return self._response.json()
+
+    def raise_for_status(self):
+        self._response.raise_for_status()
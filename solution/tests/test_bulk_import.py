@@ -0,0 +1,124 @@
+import base64
+import json
+import unittest
+from unittest import mock
+from urllib.parse import urlsplit
+
+import fakeredis
+from conftest import RequestsResponse, import_jws_server
+from fastapi.testclient import TestClient
+
+from app import create_app
+from app.core import auth, repo
+
+jws_server = import_jws_server()
+
+
+def _card(name, **extra):
+    return {
+        "name": name,
+        "url": f"http://localhost:10001/{name}",
+        "version": "1.0.0",
+        "description": "test",
+        "protocolVersion": "0.3.0",
+        "preferredTransport": "JSONRPC",
+        "provider": {"organization": "test", "url": "http://localhost/"},
+        "capabilities": {},
+        "defaultInputModes": ["text"],
+        "defaultOutputModes": ["text"],
+        "securitySchemes": {"bearerAuth": {"type": "http", "scheme": "bearer"}},
+        "security": [{"bearerAuth": []}],
+        "skills": [{"id": name, "name": name, "description": "test", "tags": ["test"], "security": [{"bearerAuth": []}]}],
+        **extra,
+    }
+
+
+class BulkImportTests(unittest.TestCase):
+    def setUp(self):
+        self._saved = (repo._REDIS_CLIENT, repo._REDIS_CLIENT_FAILED)
+        repo._REDIS_CLIENT = fakeredis.FakeRedis(decode_responses=True)
+        repo._REDIS_CLIENT_FAILED = False
+        jws = TestClient(jws_server.app)
+        self.sign_calls = []
+
+        def post(url, **kwargs):
+            kwargs.pop("timeout", None)
+            self.sign_calls.append(urlsplit(url).path)
+            return RequestsResponse(jws.post(urlsplit(url).path, **kwargs))
+
+        user = {"status": 200, "json": {"email": auth.ADMIN_EMAIL}}
+        self._patches = [
+            mock.patch("requests.post", post),
+            mock.patch.object(auth, "get_user_me", lambda token: user),
+        ]
+        for patch in self._patches:
+            patch.start()
+        self.client = create_app().test_client()
+
+    def tearDown(self):
+        for patch in self._patches:
+            patch.stop()
+        repo._REDIS_CLIENT, repo._REDIS_CLIENT_FAILED = self._saved
+
+    def _post(self, data, content_type="application/json"):
+        return self.client.post(
+            "/api/agents/bulk-import",
+            data=data if isinstance(data, str) else json.dumps(data),
+            content_type=content_type,
+            headers={"Authorization": "Bearer test"},
+        )
+
+    def test_per_card_statuses_and_multi_status(self):
+        bad_protected = base64.urlsafe_b64encode(b'{"alg":"none","kid":"k"}').rstrip(b"=").decode()
+        cards = [
+            _card("delivery_agent"),
+            {"card": _card("delivery_agent"), "tenants": ["t1"]},
+            {"url": "http://localhost:1/", "version": "1.0.0"},
+            _card("vehicle_agent", signatures=[{"protected": bad_protected, "signature": "c2ln", "header": {"kid": "k"}}]),
+            _card("item_agent", url="http://evil.example.com/"),
+            {"card": _card("quality_agent"), "tenants": ["t2"]},
+        ]
+        response = self._post({"cards": cards, "tenants": ["default"]})
+
+        self.assertEqual(response.status_code, 207)
+        body = response.get_json()
+        self.assertEqual((body["total"], body["accepted"], body["rejected"]), (6, 2, 4))
+        statuses = [(r["index"], r["status"], r.get("error")) for r in body["results"]]
+        self.assertEqual(statuses, [
+            (0, 201, None),
+            (1, 409, "CONFLICT"),
+            (2, 422, "SCHEMA_VALIDATION_FAILED"),
+            (3, 498, "INVALID_TOKEN"),
+            (4, 400, "WHITELIST_REJECTED"),
+            (5, 201, None),
+        ])
+        # 서명이 없는 카드 세 장(중복 포함)은 /sign/batch 한 번으로 서명한다
+        self.assertEqual(self.sign_calls, ["/sign/batch"])
+
+        stored = {agent["card"]["name"]: agent for agent in repo.load_agents()}
+        self.assertEqual(sorted(stored), ["delivery_agent", "quality_agent"])
+        self.assertEqual(stored["delivery_agent"]["tenants"], ["default"])
+        self.assertEqual(stored["quality_agent"]["tenants"], ["t2"])
+        self.assertTrue(stored["quality_agent"]["card"]["signatures"])
+
+    def test_all_accepted_returns_201(self):
+        response = self._post({"cards": [_card("delivery_agent"), _card("vehicle_agent")]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([r["status"] for r in response.get_json()["results"]], [201, 201])
+
+    def test_ndjson_bad_line_is_rejected_per_item(self):
+        lines = [json.dumps(_card("delivery_agent")), "{not json", json.dumps(_card("vehicle_agent"))]
+        response = self._post("\n".join(lines), content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 207)
+        results = response.get_json()["results"]
+        self.assertEqual([r["status"] for r in results], [201, 400, 201])
+        self.assertEqual(results[1]["error"], "BAD_JSON")
+
+    def test_malformed_body_is_rejected_as_a_whole(self):
+        response = self._post("{not json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(repo.load_agents(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
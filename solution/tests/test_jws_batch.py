@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+
+from conftest import import_jws_server
+from fastapi.testclient import TestClient
+
+jws_server = import_jws_server()
+
+
+CARD = {"name": "delivery_agent", "url": "http://localhost:10001/", "version": "1.0.0"}
+
+
+class JWSBatchTests(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(jws_server.app)
+
+    def _batch(self, path, items, **extra):
+        response = self.client.post(path, json={"items": items, **extra})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_sign_batch_reports_item_errors_in_order(self):
+        body = self._batch("/sign/batch", [
+            {"sub": "agent:delivery_agent", "card": CARD},
+            {"card": CARD},
+            "not-an-object",
+            {"sub": "agent:vehicle_agent", "card_hash": "sha256:abc"},
+        ])
+        results = body["results"]
+        self.assertEqual([r["index"] for r in results], [0, 1, 2, 3])
+        self.assertEqual([r["ok"] for r in results], [True, False, False, True])
+        self.assertEqual((results[1]["status"], results[1]["error"]), (422, "'sub' is required"))
+        self.assertEqual(results[2]["status"], 422)
+        self.assertIn("card_signature", results[0])
+        self.assertNotIn("card_signature", results[3])
+        self.assertEqual((body["succeeded"], body["failed"]), (2, 2))
+
+    def test_parallel_batch_keeps_request_order(self):
+        items = [{"sub": f"agent:{i}", "card_hash": f"sha256:{i}"} if i % 3 else {"card_hash": "x"} for i in range(20)]
+        with mock.patch.object(jws_server, "BATCH_WORKERS", 4):
+            body = self._batch("/sign/batch", items, parallel=True)
+        self.assertEqual([r["index"] for r in body["results"]], list(range(20)))
+        for i, result in enumerate(body["results"]):
+            self.assertEqual(result["ok"], bool(i % 3))
+            if result["ok"]:
+                self.assertEqual(result["payload"]["sub"], f"agent:{i}")
+
+    def test_verify_batch_reports_item_errors(self):
+        signed = self.client.post("/sign", json={"sub": "agent:delivery_agent", "card": CARD}).json()["jws"]
+        legacy = jws_server.jwt.encode({"sub": "x"}, "other-secret", algorithm="HS256")
+        body = self._batch("/verify/batch", [
+            {"jws": signed, "card": CARD},
+            {"jws": signed, "card": {**CARD, "url": "http://evil.example.com/"}},
+            {"jws": "not.a.token"},
+            {},
+            {"jws": legacy},
+        ])
+        results = body["results"]
+        self.assertEqual([r["ok"] for r in results], [True, False, False, False, False])
+        self.assertTrue(results[0]["hash_verified"])
+        self.assertEqual((results[1]["status"], results[1]["error"]["code"]), (400, "CARD_HASH_MISMATCH"))
+        self.assertEqual(results[2]["status"], 400)
+        self.assertEqual((results[3]["status"], results[3]["error"]), (422, "'jws' is required"))
+        self.assertEqual(results[4]["status"], 400)
+        self.assertEqual((body["succeeded"], body["failed"]), (1, 4))
+
+    def test_batch_shape_and_size_limits(self):
+        self.assertEqual(self.client.post("/verify/batch", json={"items": "x"}).status_code, 422)
+        with mock.patch.object(jws_server, "MAX_BATCH_ITEMS", 2):
+            response = self.client.post("/sign/batch", json=[{}, {}, {}])
+        self.assertEqual(response.status_code, 413)
+
+
+if __name__ == "__main__":
+    unittest.main()
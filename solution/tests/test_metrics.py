@@ -0,0 +1,117 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+import fakeredis
+
+os.environ.setdefault("SOLUTION_DATA_ROOT", tempfile.mkdtemp(prefix="solution-tests-"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core import metrics, repo  # noqa: E402
+
+
+def _iso(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+class _BrokenRedis:
+    def pipeline(self, transaction=False):
+        raise ConnectionError("redis down")
+
+
+class MetricsPlanTests(unittest.TestCase):
+    def test_plan_covers_range_without_gaps(self):
+        now = 1_700_000_000
+        start = now // 86400 * 86400 - 3 * 86400 + 125
+        end = now - 30
+        keys = metrics._plan(start, end, now)
+
+        spans = []
+        for key in keys:
+            size, bucket = (int(part) for part in key.rsplit(":", 2)[1:])
+            spans.append((bucket, bucket + size))
+        self.assertLessEqual(spans[0][0], start)
+        self.assertGreaterEqual(spans[-1][1], end)
+        for (_, prev_end), (next_start, _) in zip(spans, spans[1:]):
+            self.assertEqual(prev_end, next_start)
+        sizes = {int(key.rsplit(":", 2)[1]) for key in keys}
+        self.assertEqual(sizes, {60, 3600, 86400})
+        self.assertLess(len(keys), 3 * 24 + 2 * 60)
+
+
+class MetricsBackfillTests(unittest.TestCase):
+    def setUp(self):
+        self._saved = (repo._REDIS_CLIENT, repo._REDIS_CLIENT_FAILED)
+        repo._REDIS_CLIENT = fakeredis.FakeRedis(decode_responses=True)
+        repo._REDIS_CLIENT_FAILED = False
+        self._archive_dir = repo.REGISTRY_LOG_ARCHIVE_DIR
+        repo.REGISTRY_LOG_ARCHIVE_DIR = ""
+        for state in (metrics._local_counters, metrics._local_expiry, metrics._local_backfill):
+            state.clear()
+        metrics._local_next_prune = 0.0
+
+    def tearDown(self):
+        repo._REDIS_CLIENT, repo._REDIS_CLIENT_FAILED = self._saved
+        repo.REGISTRY_LOG_ARCHIVE_DIR = self._archive_dir
+
+    def test_logs_recorded_before_backfill_are_counted_once(self):
+        old = time.time() - 3600
+        repo.save_registry_logs([
+            {"timestamp": _iso(old), "verdict": "blocked", "agent_id": "a1", "message": "old"},
+            {"timestamp": _iso(old - 60), "verdict": "allowed", "agent_id": "a1", "message": "old"},
+        ])
+        repo.append_registry_log({"verdict": "violation", "agent_id": "a2", "message": "new"})
+
+        summary = metrics.summarize()
+        self.assertEqual(summary["events"], 3)
+        self.assertEqual(summary["violations"], 2)
+        self.assertEqual(summary["by_agent"], {"a1": 2, "a2": 1})
+
+        metrics.ensure_backfill()
+        self.assertEqual(metrics.summarize()["events"], 3)
+
+    def test_window_reads_only_requested_buckets(self):
+        now = time.time()
+        metrics.ensure_backfill()
+        metrics.record_log({"timestamp": _iso(now - 2 * 86400), "verdict": "allowed"})
+        metrics.record_log({"timestamp": _iso(now - 120), "verdict": "blocked"})
+
+        summary = metrics.summarize(_iso(now - 3600), _iso(now))
+        self.assertEqual(summary["events"], 1)
+        self.assertEqual(summary["by_verdict"], {"blocked": 1})
+
+    def test_redis_failure_drops_instead_of_falling_back_to_memory(self):
+        repo._REDIS_CLIENT = _BrokenRedis()
+        with self.assertLogs("app.core.metrics", level="WARNING"):
+            metrics.record_log({"verdict": "blocked"})
+        self.assertEqual(metrics._local_counters, {})
+
+    def test_backfill_is_checked_once_per_client(self):
+        metrics.summarize()
+        with mock.patch.object(repo._REDIS_CLIENT, "pipeline", wraps=repo._REDIS_CLIENT.pipeline) as pipeline:
+            metrics.summarize()
+        # 합계 읽기 한 번뿐, 백필 확인은 다시 하지 않는다
+        self.assertEqual(pipeline.call_count, 1)
+
+    def test_memory_mode_drops_expired_buckets(self):
+        repo._REDIS_CLIENT, repo._REDIS_CLIENT_FAILED = None, True
+        now = time.time()
+        metrics.record_log({"timestamp": _iso(now), "verdict": "blocked"})
+        minute_keys = [key for key in metrics._local_counters if key.startswith(f"{metrics._PREFIX}:60:")]
+        self.assertEqual(len(minute_keys), 1)
+
+        later = now + 3 * 24 * 3600
+        with mock.patch.object(metrics.time, "time", return_value=later):
+            metrics.record_log({"timestamp": _iso(later), "verdict": "allowed"})
+        self.assertNotIn(minute_keys[0], metrics._local_counters)
+        self.assertNotIn(minute_keys[0], metrics._local_expiry)
+        self.assertEqual(metrics._local_counters[metrics.TOTAL_KEY]["events"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import fakeredis
+
+os.environ.setdefault("SOLUTION_DATA_ROOT", tempfile.mkdtemp(prefix="solution-tests-"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core import log_archive, repo  # noqa: E402
+
+
+class RegistryLogArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self._saved = (repo._REDIS_CLIENT, repo._REDIS_CLIENT_FAILED)
+        repo._REDIS_CLIENT = fakeredis.FakeRedis(decode_responses=True)
+        repo._REDIS_CLIENT_FAILED = False
+        self.archive_dir = tempfile.mkdtemp(prefix="registry-archive-")
+        self._patches = [
+            mock.patch.object(repo, "REGISTRY_LOG_ARCHIVE_DIR", self.archive_dir),
+            mock.patch.object(repo, "REGISTRY_LOG_ARCHIVE_CODEC", "gzip"),
+            mock.patch.object(repo, "REGISTRY_MAX_LOG_ENTRIES", 5),
+            mock.patch.object(repo, "REGISTRY_LOG_ARCHIVE_BATCH", 3),
+        ]
+        for patch in self._patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self._patches:
+            patch.stop()
+        repo._REDIS_CLIENT, repo._REDIS_CLIENT_FAILED = self._saved
+
+    def _messages(self):
+        hot = [entry["message"] for entry in repo.load_registry_logs()]
+        cold = [entry["message"] for entry in log_archive.query(self.archive_dir, None, None, None)]
+        return hot, cold
+
+    def test_concurrent_appends_archive_each_entry_once(self):
+        def worker(n):
+            for i in range(10):
+                repo.append_registry_log({"message": f"worker-{n}-{i}", "verdict": "allowed"})
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        hot, cold = self._messages()
+        self.assertLess(len(hot), 5 + 3)
+        self.assertEqual(len(hot + cold), 80)
+        self.assertEqual(len(set(hot + cold)), 80)
+        self.assertIsNone(repo._REDIS_CLIENT.get(repo._REGISTRY_LOG_ARCHIVE_LOCK_KEY))
+
+    def test_failed_segment_write_keeps_hot_logs_bounded(self):
+        with mock.patch.object(log_archive, "write_segments", side_effect=OSError("disk full")):
+            for i in range(12):
+                repo.append_registry_log({"message": f"entry-{i}"})
+        hot, cold = self._messages()
+        # 보관이 계속 실패해도 상한 + 한 배치(5 + 3)까지만 남는다
+        self.assertEqual(hot, [f"entry-{i}" for i in range(11, 3, -1)])
+        self.assertEqual(cold, [])
+
+        repo.append_registry_log({"message": "entry-12"})
+        hot, cold = self._messages()
+        self.assertEqual(hot, [f"entry-{i}" for i in range(12, 7, -1)])
+        self.assertEqual(sorted(cold), [f"entry-{i}" for i in range(4, 8)])
+
+    def test_crash_before_trim_is_not_archived_twice(self):
+        for i in range(7):
+            repo.append_registry_log({"message": f"entry-{i}"})
+        with mock.patch.object(repo, "_trim_archived_registry_logs", side_effect=[SystemExit, ]):
+            with self.assertRaises(SystemExit):
+                repo.append_registry_log({"message": "entry-7"})
+        self.assertIsNotNone(repo._REDIS_CLIENT.get(repo._REGISTRY_LOG_ARCHIVE_WATERMARK_KEY))
+        # 중단된 프로세스의 락은 만료되었다고 가정
+        repo._REDIS_CLIENT.delete(repo._REGISTRY_LOG_ARCHIVE_LOCK_KEY)
+
+        for i in range(8, 11):
+            repo.append_registry_log({"message": f"entry-{i}"})
+        hot, cold = self._messages()
+        self.assertEqual(len(hot + cold), 11)
+        self.assertEqual(sorted(hot + cold), sorted(f"entry-{i}" for i in range(11)))
+        self.assertIsNone(repo._REDIS_CLIENT.get(repo._REGISTRY_LOG_ARCHIVE_WATERMARK_KEY))
+        self.assertEqual([entry["message"] for entry in repo.query_registry_logs()], [f"entry-{i}" for i in range(10, -1, -1)])
+
+    def test_expired_lock_taken_by_another_process_is_not_released(self):
+        write_segments = log_archive.write_segments
+
+        def slow_write(*args):
+            # 보관이 오래 걸려 락이 만료되고 다른 프로세스가 락을 잡은 상황
+            repo._REDIS_CLIENT.set(repo._REGISTRY_LOG_ARCHIVE_LOCK_KEY, "other-process", ex=60)
+            return write_segments(*args)
+
+        with mock.patch.object(log_archive, "write_segments", slow_write):
+            for i in range(8):
+                repo.append_registry_log({"message": f"entry-{i}"})
+        self.assertEqual(repo._REDIS_CLIENT.get(repo._REGISTRY_LOG_ARCHIVE_LOCK_KEY), "other-process")
+
+
+class LogArchiveSegmentTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="log-segments-")
+        self.entries = [
+            {"timestamp": "2026-03-01T23:59:58Z", "message": "a"},
+            {"timestamp": "2026-03-01T23:59:59Z", "message": "b"},
+            {"timestamp": "2026-03-02T00:00:01Z", "message": "c"},
+            {"timestamp": "2026-03-02T10:00:00+09:00", "message": "d"},
+        ]
+
+    def test_round_trip_splits_by_utc_day(self):
+        self.assertEqual(log_archive.write_segments(self.root, self.entries, "gzip"), 4)
+        segments = log_archive.load_index(self.root)
+        self.assertEqual([s["count"] for s in segments], [2, 2])
+        self.assertTrue(segments[0]["path"].startswith("2026-03-02"))
+        self.assertEqual(log_archive.query(self.root), list(reversed(self.entries)))
+
+    def test_query_window_and_limit(self):
+        log_archive.write_segments(self.root, self.entries, "gzip")
+        start = log_archive.entry_epoch_ms(self.entries[1])
+        end = log_archive.entry_epoch_ms(self.entries[2])
+        self.assertEqual([e["message"] for e in log_archive.query(self.root, start, end)], ["c", "b"])
+        self.assertEqual([e["message"] for e in log_archive.query(self.root, limit=3)], ["d", "c", "b"])
+        self.assertEqual(log_archive.query(self.root, end_ms=start - 10_000), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
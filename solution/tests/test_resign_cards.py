@@ -0,0 +1,129 @@
+import unittest
+from unittest import mock
+from urllib.parse import urlsplit
+
+import fakeredis
+from conftest import RequestsResponse, import_jws_server
+from fastapi.testclient import TestClient
+
+from app.api import create_agent, resign_cards
+from app.core import repo, signatures
+from app.core.jwks import JWKSCache
+
+jws_server = import_jws_server()
+
+
+def _signed_card(name):
+    card = {"name": name, "url": f"http://{name}:10001/", "version": "1.0.0", "description": "test"}
+    data = jws_server._sign_one(create_agent._sign_payload_for(card))
+    card["signatures"] = [create_agent._signature_entry(data)]
+    return card
+
+
+def _verify(card):
+    """jws-server 의 현재 JWKS 로 카드 서명을 로컬 검증."""
+    cache = JWKSCache("http://unused/jwks.json")
+    cache._loaded = True
+    cache._expires_at = float("inf")
+    cache._set_keys(jws_server.KEYS.jwks()["body"])
+    with mock.patch.object(signatures, "JWKS_CACHE", cache):
+        return signatures.verify_card_signatures(card)
+
+
+class CardSignatureVerificationTests(unittest.TestCase):
+    def test_valid_card_verifies_with_its_kid(self):
+        card = _signed_card("item_agent")
+        self.assertEqual(_verify(card), (True, card["signatures"][0]["header"]["kid"]))
+
+    def test_tampered_card_fails(self):
+        card = _signed_card("item_agent")
+        ok, reason = _verify({**card, "url": "http://evil.example.com/"})
+        self.assertIs(ok, False)
+        self.assertIn("signatures[0]", reason)
+
+    def test_tampered_signature_fails(self):
+        card = _signed_card("item_agent")
+        sig = dict(card["signatures"][0])
+        sig["signature"] = sig["signature"][::-1]
+        self.assertIs(_verify({**card, "signatures": [sig]})[0], False)
+
+    def test_signatures_key_order_and_extra_signatures_are_ignored(self):
+        card = _signed_card("item_agent")
+        publisher_sig = {"protected": "eyJhbGciOiJFUzI1NiJ9", "signature": "c2ln", "header": {"kid": "publisher-key"}}
+        reordered = dict(reversed(list({**card, "signatures": [publisher_sig] + card["signatures"]}.items())))
+        self.assertIs(_verify(reordered)[0], True)
+
+    def test_unknown_or_missing_signatures_are_unverifiable(self):
+        self.assertEqual(_verify({"name": "x"}), (None, "signatures missing or empty"))
+        card = _signed_card("item_agent")
+        with mock.patch.object(jws_server.KEYS, "jwks", lambda: {"body": {"keys": []}}):
+            self.assertIsNone(_verify(card)[0])
+
+
+class ResignCardsTests(unittest.TestCase):
+    def setUp(self):
+        self._saved = (repo._REDIS_CLIENT, repo._REDIS_CLIENT_FAILED)
+        repo._REDIS_CLIENT = fakeredis.FakeRedis(decode_responses=True)
+        repo._REDIS_CLIENT_FAILED = False
+        client = TestClient(jws_server.app)
+
+        def route(method):
+            def call(url, **kwargs):
+                kwargs.pop("timeout", None)
+                return RequestsResponse(getattr(client, method)(urlsplit(url).path, **kwargs))
+            return call
+
+        self._patches = [
+            mock.patch("requests.get", route("get")),
+            mock.patch("requests.post", route("post")),
+        ]
+        for patch in self._patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self._patches:
+            patch.stop()
+        repo._REDIS_CLIENT, repo._REDIS_CLIENT_FAILED = self._saved
+
+    def test_cards_signed_with_retired_key_are_resigned(self):
+        old = _signed_card("delivery_agent")
+        publisher_sig = {"protected": "eyJhbGciOiJFUzI1NiJ9", "signature": "c2ln", "header": {"kid": "publisher-key"}}
+        old["signatures"].append(publisher_sig)
+        repo.save_agents([{"agent_id": "agent:delivery_agent.v1.0.0", "card": old, "status": "Active"}])
+        retired_kid = old["signatures"][0]["header"]["kid"]
+
+        active = jws_server.KEYS.rotate()
+        summary = resign_cards.resign_cards()
+
+        self.assertIn(retired_kid, summary["retired_kids"])
+        self.assertEqual(summary["resigned"], ["agent:delivery_agent.v1.0.0"])
+        stored = repo.load_agents()[0]["card"]
+        kids = [sig["header"]["kid"] for sig in stored["signatures"]]
+        self.assertEqual(kids, ["publisher-key", active.kid])
+        self.assertEqual(_verify(stored), (True, active.kid))
+
+        # 이미 다시 서명한 카드는 건드리지 않는다
+        self.assertEqual(resign_cards.resign_cards()["checked"], 0)
+
+    def test_card_changed_while_signing_is_not_overwritten(self):
+        card = _signed_card("vehicle_agent")
+        repo.save_agents([{"agent_id": "agent:vehicle_agent.v1.0.0", "card": card, "status": "Active"}])
+        jws_server.KEYS.rotate()
+
+        original_sign = resign_cards._sign_cards
+
+        def sign_then_edit(cards):
+            signed = original_sign(cards)
+            edited = {**card, "description": "edited meanwhile"}
+            repo.save_agents([{"agent_id": "agent:vehicle_agent.v1.0.0", "card": edited, "status": "Active"}])
+            return signed
+
+        with mock.patch.object(resign_cards, "_sign_cards", sign_then_edit):
+            summary = resign_cards.resign_cards()
+
+        self.assertEqual(summary["resigned"], [])
+        self.assertEqual(repo.load_agents()[0]["card"]["description"], "edited meanwhile")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import base64
+import json
+import os
+import sys
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("SOLUTION_DATA_ROOT", tempfile.mkdtemp(prefix="solution-tests-"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core import validators  # noqa: E402
+from app.core.policy import PolicyEvaluator  # noqa: E402
+
+
+def _signature(alg, kid="key-1"):
+    protected = base64.urlsafe_b64encode(json.dumps({"alg": alg, "kid": kid}).encode()).rstrip(b"=").decode()
+    return {"protected": protected, "signature": "c2ln", "header": {"kid": kid}}
+
+
+class ValidationCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = validators.ValidationCache(maxsize=16)
+        patch = mock.patch.object(validators, "VALIDATION_CACHE", self.cache)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.schema = validators.AgentCardSchema()
+        self.card = {
+            "name": "delivery_agent",
+            "url": "http://localhost:10001/",
+            "version": "1.0.0",
+            "description": "test",
+            "signatures": [_signature("ES256")],
+        }
+
+    def test_same_card_hits_regardless_of_key_order(self):
+        first = self.schema.check(self.card)
+        second = self.schema.check(dict(reversed(list(self.card.items()))))
+        self.assertIs(first, second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_signature_change_misses(self):
+        self.assertIsNone(self.schema.check(self.card).jws_error)
+        tampered = {**self.card, "signatures": [_signature("none")]}
+        result = self.schema.check(tampered)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertIn("alg not allowed", result.jws_error)
+        self.assertEqual(result.card_hash, validators.card_hash(self.card))
+
+    def test_allowed_algs_change_misses(self):
+        self.assertIsNone(self.schema.check(self.card).jws_error)
+        with mock.patch.dict(os.environ, {"ALLOWED_JWS_ALGS": "EdDSA"}):
+            result = self.schema.check(self.card)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertIn("alg not allowed", result.jws_error)
+
+    def test_mode_is_part_of_the_key(self):
+        self.schema.check(self.card, mode="create")
+        self.schema.check(self.card, mode="update")
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_policy_config_change_misses(self):
+        evaluator = PolicyEvaluator()
+        card = {**self.card, "url": "http://agents.example.com/"}
+        self.assertIsNotNone(validators.cached_policy_checks(evaluator, card, None)[0])
+
+        allowed = PolicyEvaluator(replace(evaluator.config, domains=evaluator.config.domains + ("agents.example.com",)))
+        self.assertIsNone(validators.cached_policy_checks(allowed, card, None)[0])
+        self.assertEqual(self.cache.misses, 2)
+
+        validators.cached_policy_checks(allowed, card, None)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = validators.ValidationCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 0)
+        cache.get_or_compute("c", lambda: 3)
+        self.assertEqual(cache.get_or_compute("a", lambda: 0), 1)
+        self.assertEqual(cache.get_or_compute("b", lambda: 0), 0)
+        self.assertEqual(cache.stats()["size"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()